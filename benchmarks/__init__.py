@@ -0,0 +1 @@
+"""Benchmarks do projeto NASA GCN (scripts avulsos e o pacote replay)."""
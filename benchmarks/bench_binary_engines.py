@@ -0,0 +1,74 @@
+"""
+Benchmark: engines de decodificação de pacotes binários (sql, pandas, scalar).
+
+Compara rows/sec de cada engine de parse_binary ao decodificar a coluna
+`value` de gcn_classic_binary em um SparkSession local. A saída é descartada
+pelo formato `noop`, então o tempo medido é só decodificação (+ transferência
+JVM <-> Python nas engines com UDF).
+
+Para rodar:
+    uv run python benchmarks/bench_binary_engines.py --rows 1000000 --batch-size 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from pyspark.sql import SparkSession
+
+from nasa_gcn.binary_spark import BINARY_ENGINES, parse_binary
+
+
+def synthetic_packets(n: int, seed: int = 0, pkt_types=(61, 67, 111, 112, 115, 150, 173)) -> list:
+    """Gera N pacotes de 160 bytes com campos plausíveis (tipos, TJD, RA/Dec)."""
+    rng = np.random.default_rng(seed)
+    longs = rng.integers(0, 2**31 - 1, size=(n, 40), dtype=np.int64)
+    longs[:, 0] = rng.choice(pkt_types, size=n)
+    longs[:, 5] = rng.integers(19000, 21000, size=n)
+    longs[:, 6] = rng.integers(0, 8_640_000, size=n)
+    longs[:, 7] = rng.integers(0, 3_600_000, size=n)
+    longs[:, 8] = rng.integers(-900_000, 900_000, size=n)
+    longs[:, 11] = rng.integers(1, 10_000, size=n)
+    raw = longs.astype(">i4").tobytes()
+    return [raw[i : i + 160] for i in range(0, len(raw), 160)]
+
+
+def run(df, engine: str, repeat: int) -> float:
+    """Executa a engine `repeat` vezes e retorna o melhor rows/sec."""
+    rows = df.count()
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parsed = df.select(parse_binary("value", engine).alias("p")).select("p.*")
+        parsed.write.format("noop").mode("overwrite").save()
+        elapsed = time.perf_counter() - start
+        best = max(best, rows / elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spark = (
+        SparkSession.builder.master("local[*]")
+        .config("spark.sql.execution.arrow.maxRecordsPerBatch", str(args.batch_size))
+        .getOrCreate()
+    )
+    spark.sparkContext.setLogLevel("ERROR")
+
+    df = spark.createDataFrame([(p,) for p in synthetic_packets(args.rows)], "value BINARY")
+    df = df.repartition(spark.sparkContext.defaultParallelism).cache()
+
+    print(f"gcn_classic_binary decode: {args.rows:,} rows, arrow batch {args.batch_size:,}")
+    results = {engine: run(df, engine, args.repeat) for engine in BINARY_ENGINES}
+    for engine, rate in results.items():
+        speedup = rate / results["scalar"]
+        print(f"  {engine:<8} {rate:>14,.0f} rows/sec  ({speedup:.1f}x vs scalar)")
+
+
+if __name__ == "__main__":
+    main()
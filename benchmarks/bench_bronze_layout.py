@@ -0,0 +1,87 @@
+"""
+Benchmark: file skipping do Bronze por layout (sem partição vs topic_family).
+
+Grava o mesmo gcn_raw sintético em Parquet sem partição e particionado por
+topic_family e, para cada família, executa a leitura que a tabela Silver faz:
+filtro em `topic` no layout antigo e em `topic_family` no novo. Reporta
+arquivos e bytes lidos pelo scan (métricas do FileSourceScanExec) e tempo.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_bronze_layout --rows 500000
+"""
+
+import argparse
+import tempfile
+import time
+
+from pyspark.sql import Column, DataFrame
+from pyspark.sql.functions import col
+
+from benchmarks.replay.harness import local_spark
+from benchmarks.replay.synthetic import write_synthetic_gcn_raw
+from nasa_gcn.config import TOPIC_FAMILIES
+
+
+def topic_filter(family: str) -> Column:
+    """Filtro por tópico usado pelas tabelas Silver antes de topic_family."""
+    match = TOPIC_FAMILIES[family]
+    return col("topic").startswith(match) if match.endswith(".") else col("topic") == match
+
+
+def scan(df: DataFrame) -> dict:
+    """Executa o plano e soma as métricas dos scans de arquivos."""
+    plan = df._jdf.queryExecution().executedPlan()
+    start = time.perf_counter()
+    rows = plan.execute().count()
+    seconds = time.perf_counter() - start
+
+    stats = {"rows": rows, "files": 0, "bytes": 0, "seconds": seconds}
+    leaves = plan.collectLeaves()
+    for i in range(leaves.size()):
+        metrics = leaves.apply(i).metrics()
+        for key, metric in (("files", "numFiles"), ("bytes", "filesSize")):
+            if metrics.contains(metric):
+                stats[key] += metrics.apply(metric).value()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    # AQE desligado para que as métricas fiquem no plano executado
+    spark = local_spark(conf={"spark.sql.adaptive.enabled": "false"})
+
+    with tempfile.TemporaryDirectory(prefix="nasa_gcn_bronze_") as tmp:
+        raw = write_synthetic_gcn_raw(spark, f"{tmp}/flat", args.rows, chunk_size=args.chunk_size)
+        raw.write.partitionBy("topic_family").parquet(f"{tmp}/partitioned")
+        flat = spark.read.parquet(f"{tmp}/flat")
+        partitioned = spark.read.parquet(f"{tmp}/partitioned")
+
+        print(f"bronze layout: {args.rows:,} mensagens\n")
+        header = f"{'família':<12}{'layout':<14}{'linhas':>10}{'arquivos':>10}{'MiB lidos':>12}"
+        print(header + f"{'segundos':>10}")
+        totals = {"flat": [0, 0], "partitioned": [0, 0]}
+        for family in TOPIC_FAMILIES:
+            runs = {
+                "flat": flat.filter(topic_filter(family)).select("value"),
+                "partitioned": partitioned.filter(col("topic_family") == family).select("value"),
+            }
+            for layout, df in runs.items():
+                stats = scan(df)
+                totals[layout][0] += stats["files"]
+                totals[layout][1] += stats["bytes"]
+                print(
+                    f"{family:<12}{layout:<14}{stats['rows']:>10,}{stats['files']:>10,}"
+                    f"{stats['bytes'] / 2**20:>12,.1f}{stats['seconds']:>10.2f}"
+                )
+
+        print("\nTotal das 7 leituras Silver:")
+        for layout, (files, size) in totals.items():
+            print(f"  {layout:<12} {files:>6,} arquivos  {size / 2**20:>10,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: coincidence_join (equi-join por balde de tempo) vs predicado ingênuo.
+
+Gera um ano de triggers sintéticos: --left triggers tipo GRB (Swift-BAT com
+erro de 3', uma fração --wide de Fermi-GBM com 5°) e --right alertas GW com
+erro de --gw-error graus, com tempos uniformes no ano. Mede, materializando
+no sink noop:
+
+- ingênuo: join com ABS(unix_t_dir - unix_t_esq) <= janela, como a consulta
+  GRB ↔ GW do ROADMAP (o Spark escolhe um nested loop)
+- coincidence_join: equi-join por balde floor(t / janela) + vizinhos
+- ingênuo + distância angular e coincidence_join com as posições (chave por
+  balde e célula HEALPix)
+
+Os pares dos dois métodos são comparados.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_coincidence --left 100000 --right 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import DataFrame
+from pyspark.sql import functions as F
+
+from benchmarks.replay.harness import local_spark
+from nasa_gcn.coincidence import coincidence_join
+from nasa_gcn.spatial import angular_distance
+
+YEAR_S = 365 * 86_400
+BAT_ERROR_DEG = 0.05
+GBM_ERROR_DEG = 5.0
+
+
+def triggers(rng: np.random.Generator, n: int, prefix: str, errors: np.ndarray) -> pd.DataFrame:
+    """n triggers com tempo uniforme no ano e posição uniforme na esfera."""
+    start = pd.Timestamp("2025-01-01")
+    return pd.DataFrame(
+        {
+            f"{prefix}id": np.arange(n),
+            f"{prefix}time": start + pd.to_timedelta(rng.uniform(0, YEAR_S, n), unit="s"),
+            f"{prefix}ra": rng.uniform(0, 360, n),
+            f"{prefix}dec": np.degrees(np.arcsin(rng.uniform(-1, 1, n))),
+            f"{prefix}err": errors,
+        }
+    )
+
+
+def timed(df: DataFrame):
+    """(pares, segundos) materializando `df`; os pares são coletados à parte."""
+    start = time.perf_counter()
+    df.write.format("noop").mode("overwrite").save()
+    seconds = time.perf_counter() - start
+    pairs = {(r[0], r[1]) for r in df.select("grb_id", "gw_id").collect()}
+    return pairs, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--left", type=int, default=100_000, help="triggers GRB no ano")
+    parser.add_argument("--right", type=int, default=20_000, help="alertas GW no ano")
+    parser.add_argument("--window", type=float, default=10.0, help="janela em segundos")
+    parser.add_argument("--wide", type=float, default=0.3, help="fração de erros de 5°")
+    parser.add_argument("--gw-error", type=float, default=20.0)
+    parser.add_argument("--master", default="local[*]")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    grb_err = np.where(rng.random(args.left) < args.wide, GBM_ERROR_DEG, BAT_ERROR_DEG)
+    spark = local_spark(args.master)
+    grbs = spark.createDataFrame(triggers(rng, args.left, "grb_", grb_err)).cache()
+    gws = spark.createDataFrame(
+        triggers(rng, args.right, "gw_", np.full(args.right, args.gw_error))
+    ).cache()
+    grbs.count(), gws.count()
+
+    naive_time = F.abs(F.unix_micros("gw_time") - F.unix_micros("grb_time")) <= (
+        args.window * 1_000_000
+    )
+    distance = angular_distance("grb_ra", "grb_dec", "gw_ra", "gw_dec")
+    positions = {
+        "left_position": ("grb_ra", "grb_dec", "grb_err"),
+        "right_position": ("gw_ra", "gw_dec", "gw_err"),
+    }
+    runs = [
+        ("ingênuo (tempo)", grbs.join(gws, naive_time)),
+        (
+            "coincidence_join (tempo)",
+            coincidence_join(grbs, gws, args.window, "grb_time", "gw_time"),
+        ),
+        (
+            "ingênuo (tempo + posição)",
+            grbs.join(gws, naive_time & (distance <= F.col("grb_err") + F.col("gw_err"))),
+        ),
+        (
+            "coincidence_join (tempo + posição)",
+            coincidence_join(grbs, gws, args.window, "grb_time", "gw_time", **positions),
+        ),
+    ]
+
+    print(
+        f"coincidência em ±{args.window:g}s: {args.left:,} GRBs × {args.right:,} alertas GW "
+        f"em um ano, Spark {args.master}"
+    )
+    print(f"{'join':<38}{'pares':>10}{'segundos':>12}")
+    results = []
+    for label, df in runs:
+        pairs, seconds = timed(df)
+        results.append(pairs)
+        print(f"{label:<38}{len(pairs):>10,}{seconds:>12.2f}")
+    assert results[0] == results[1], "coincidence_join (tempo) diverge do ingênuo"
+    assert results[2] == results[3], "coincidence_join (tempo + posição) diverge do ingênuo"
+
+
+if __name__ == "__main__":
+    main()
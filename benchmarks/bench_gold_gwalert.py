@@ -0,0 +1,182 @@
+"""
+Benchmark: join Gold com igwn_gwalert inteiro vs gw_latest em broadcast.
+
+Grava em Parquet circulares e alertas GW sintéticos (--alerts por
+superevento, ex: PRELIMINARY, INITIAL, UPDATE, RETRACTION) e materializa
+gcn_events_summarized no sink noop:
+
+- igwn_gwalert: agregação anterior das circulares com left join em todas as
+  linhas de igwn_gwalert (a narrativa é repetida por alerta)
+- gw_latest: a mesma agregação com join em broadcast contra latest_gwalerts
+  (uma linha por superevento)
+- summarize_events_batch: a Gold atual (narrativa ordenada e limitada, com
+  narrative_chunks) sobre gw_latest
+
+Reporta linhas de saída, bytes de narrativa na saída, bytes de shuffle (lidos
+do status store do Spark) e tempo. Por padrão o broadcast automático fica
+desligado, como acontece no pipeline quando igwn_gwalert (com a coluna json)
+passa do limite de spark.sql.autoBroadcastJoinThreshold; use --auto-broadcast
+para mantê-lo.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_gold_gwalert --events 20000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import DataFrame, SparkSession
+from pyspark.sql.functions import (
+    broadcast,
+    col,
+    collect_list,
+    concat_ws,
+    count,
+    current_timestamp,
+    max,
+    octet_length,
+    sum,
+)
+
+from benchmarks.replay.harness import local_spark
+from benchmarks.replay.synthetic import _BASE_TIME, _WORDS
+from nasa_gcn.gold import NARRATIVE_SEPARATOR, latest_gwalerts, summarize_events_batch
+
+ALERT_TYPES = ("PRELIMINARY", "PRELIMINARY", "INITIAL", "UPDATE", "RETRACTION")
+
+
+def synthetic_silver(
+    rng: np.random.Generator, events: int, circulars: int, alerts: int, words: int
+):
+    """(gcn_circulars, igwn_gwalert) sintéticos como DataFrames pandas."""
+    # _event_ids se repete a partir de 8.736 eventos; aqui cada evento é único
+    ids = np.array([f"S{i:07d}" for i in range(events)])
+    base = pd.Timestamp(_BASE_TIME.replace(tzinfo=None))
+    n = events * circulars
+    created = base + pd.to_timedelta(np.arange(n), unit="min")
+    circs = pd.DataFrame(
+        {
+            "event_id": np.repeat(ids, circulars),
+            "circular_id": np.arange(n, dtype=np.int32),
+            "created_on": created,
+            "document_text": [" ".join(rng.choice(_WORDS, size=words)) for _ in range(n)],
+            "kafka_timestamp": created + timedelta(seconds=1),
+        }
+    )
+    m = events * alerts
+    sent = base + pd.to_timedelta(np.arange(m), unit="s")
+    gw = pd.DataFrame(
+        {
+            "event_id": np.repeat(ids, alerts),
+            "alert_type": np.tile(
+                np.array(ALERT_TYPES)[np.arange(alerts) % len(ALERT_TYPES)], events
+            ),
+            "time_created": sent,
+            "far": rng.random(m),
+            "json": ['{"superevent_id": "..."}' * 40] * m,
+            "kafka_timestamp": sent,
+        }
+    )
+    return circs, gw
+
+
+def legacy_summary(circulars: DataFrame, gwalerts: DataFrame) -> DataFrame:
+    """Agregação de gcn_events_summarized anterior a gw_latest, com join em `gwalerts`."""
+    agg_circs = (
+        circulars.groupBy("event_id")
+        .agg(
+            count("circular_id").alias("circular_count"),
+            concat_ws(NARRATIVE_SEPARATOR, collect_list("document_text")).alias(
+                "scientific_narrative"
+            ),
+            max("created_on").alias("last_date"),
+        )
+        .filter(col("event_id").isNotNull())
+    )
+    return agg_circs.join(gwalerts, "event_id", "left").select(
+        "event_id",
+        "circular_count",
+        "last_date",
+        "alert_type",
+        "scientific_narrative",
+        current_timestamp().alias("gold_ts"),
+    )
+
+
+def shuffle_bytes(spark: SparkSession) -> int:
+    """Total de bytes escritos em shuffle por todos os stages até agora."""
+    sc = spark.sparkContext
+    jsc = sc._jsc.sc()
+    jsc.listenerBus().waitUntilEmpty()
+    empty = sc._jvm.java.util.ArrayList
+    stages = jsc.statusStore().stageList(
+        empty(), False, False, sc._gateway.new_array(sc._jvm.double, 0), empty()
+    )
+    total, it = 0, stages.iterator()
+    while it.hasNext():
+        total += it.next().shuffleWriteBytes()
+    return total
+
+
+def measure(spark: SparkSession, df: DataFrame):
+    """(linhas, bytes de narrativa, bytes de shuffle, segundos) materializando `df`."""
+    before = shuffle_bytes(spark)
+    start = time.perf_counter()
+    df.write.format("noop").mode("overwrite").save()
+    seconds = time.perf_counter() - start
+    shuffled = shuffle_bytes(spark) - before
+    rows, narrative = df.select(count("*"), sum(octet_length("scientific_narrative"))).first()
+    return rows, narrative, shuffled, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--circulars", type=int, default=5, help="circulares por evento")
+    parser.add_argument("--alerts", type=int, default=4, help="alertas GW por superevento")
+    parser.add_argument("--words", type=int, default=200, help="palavras por circular")
+    parser.add_argument("--auto-broadcast", action="store_true")
+    parser.add_argument("--master", default="local[*]")
+    args = parser.parse_args()
+
+    conf = {} if args.auto_broadcast else {"spark.sql.autoBroadcastJoinThreshold": "-1"}
+    spark = local_spark(args.master, conf)
+    circs, gw = synthetic_silver(
+        np.random.default_rng(0), args.events, args.circulars, args.alerts, args.words
+    )
+
+    with tempfile.TemporaryDirectory(prefix="nasa_gcn_gw_") as tmp:
+        spark.createDataFrame(circs).write.parquet(f"{tmp}/circulars")
+        spark.createDataFrame(gw).write.parquet(f"{tmp}/gwalerts")
+        circulars = spark.read.parquet(f"{tmp}/circulars")
+        gwalerts = spark.read.parquet(f"{tmp}/gwalerts")
+
+        gw_latest = latest_gwalerts(gwalerts)
+        runs = {
+            "igwn_gwalert": legacy_summary(circulars, gwalerts),
+            "gw_latest": legacy_summary(circulars, broadcast(gw_latest)),
+            "summarize_events_batch": summarize_events_batch(circulars, gw_latest),
+        }
+        # Aquecimento (codegen) fora das medições
+        runs["gw_latest"].write.format("noop").mode("overwrite").save()
+
+        print(
+            f"gcn_events_summarized: {args.events:,} eventos × {args.circulars} circulares, "
+            f"{args.alerts} alertas/superevento, Spark {args.master}"
+        )
+        header = f"{'join':<24}{'linhas':>10}{'narrativa (MiB)':>17}"
+        print(header + f"{'shuffle (MiB)':>15}{'segundos':>10}")
+        for label, df in runs.items():
+            rows, narrative, shuffled, seconds = measure(spark, df)
+            print(
+                f"{label:<24}{rows:>10,}{narrative / 2**20:>17.1f}"
+                f"{shuffled / 2**20:>15.1f}{seconds:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
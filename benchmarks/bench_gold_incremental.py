@@ -0,0 +1,134 @@
+"""
+Benchmark: refresh de gcn_events_summarized, batch vs incremental.
+
+Para cada volume de circulares (1×, 10× e 100× de --base), grava um
+gcn_circulars sintético em Parquet, faz o backfill do modo incremental
+(applyInPandasWithState, trigger availableNow) e então acrescenta um delta
+fixo de --delta circulares. Mede:
+
+- batch: summarize_events_batch sobre o histórico completo (refresh atual)
+- incremental: o micro-batch que processa só o delta, com o estado existente
+
+O refresh incremental deve ficar proporcional ao delta (e aos eventos que
+ele toca), enquanto o batch cresce com o histórico.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_gold_incremental --base 2000 --delta 500
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import DataFrame, SparkSession
+
+from benchmarks.replay.harness import local_spark
+from benchmarks.replay.synthetic import _BASE_TIME, _WORDS, _event_ids
+from nasa_gcn.gold import event_updates, summarize_events_batch, summarize_events_incremental
+
+CIRCULARS = (
+    "event_id STRING, circular_id INT, created_on TIMESTAMP, document_text STRING, "
+    "kafka_timestamp TIMESTAMP"
+)
+GWALERTS = "event_id STRING, alert_type STRING, kafka_timestamp TIMESTAMP"
+
+
+def circulars_frame(rng: np.random.Generator, start: int, n: int, events: list, words: int):
+    """`n` circulares (ids a partir de `start`) distribuídas entre `events`."""
+    created = pd.Timestamp(_BASE_TIME.replace(tzinfo=None)) + pd.to_timedelta(
+        start + np.arange(n), unit="min"
+    )
+    return pd.DataFrame(
+        {
+            "event_id": rng.choice(events, size=n),
+            "circular_id": np.arange(start, start + n, dtype=np.int32),
+            "created_on": created,
+            "document_text": [
+                "SUBJECT: follow-up\n---\n" + " ".join(rng.choice(_WORDS, size=words))
+                for _ in range(n)
+            ],
+            "kafka_timestamp": created + timedelta(seconds=1),
+        }
+    )
+
+
+class IncrementalRefresh:
+    """Query incremental com checkpoint persistente entre refreshes."""
+
+    def __init__(self, spark: SparkSession, workdir: str):
+        self.spark = spark
+        self.workdir = workdir
+
+    def run(self) -> int:
+        """Processa o que chegou desde o último refresh; retorna os eventos emitidos."""
+        circulars = self.spark.readStream.schema(CIRCULARS).parquet(f"{self.workdir}/circulars")
+        alerts = self.spark.readStream.schema(GWALERTS).parquet(f"{self.workdir}/gwalerts")
+        emitted = [0]
+
+        def sink(batch: DataFrame, _batch_id: int) -> None:
+            batch.write.mode("append").parquet(f"{self.workdir}/changes")
+            emitted[0] += batch.count()
+
+        query = (
+            summarize_events_incremental(event_updates(circulars, alerts))
+            .writeStream.foreachBatch(sink)
+            .option("checkpointLocation", f"{self.workdir}/checkpoint")
+            .trigger(availableNow=True)
+            .start()
+        )
+        query.awaitTermination()
+        return emitted[0]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base", type=int, default=2_000, help="circulares no volume 1×")
+    parser.add_argument("--delta", type=int, default=500, help="circulares novas por refresh")
+    parser.add_argument("--factors", type=int, nargs="*", default=[1, 10, 100])
+    parser.add_argument("--words", type=int, default=40, help="palavras por circular")
+    parser.add_argument("--master", default="local[*]")
+    args = parser.parse_args()
+
+    spark = local_spark(args.master)
+    rng = np.random.default_rng(0)
+
+    print(f"gcn_events_summarized: delta de {args.delta:,} circulares, Spark {args.master}")
+    header = f"{'volume':>7}{'circulares':>12}{'batch (s)':>11}{'backfill (s)':>14}"
+    print(header + f"{'incremental (s)':>17}{'eventos emitidos':>18}")
+    for factor in args.factors:
+        rows = args.base * factor
+        events = _event_ids(max(1, rows // 10))
+        with tempfile.TemporaryDirectory(prefix="nasa_gcn_gold_") as tmp:
+            history = circulars_frame(rng, 0, rows, events, args.words)
+            spark.createDataFrame(history, CIRCULARS).write.parquet(f"{tmp}/circulars")
+            spark.createDataFrame([], GWALERTS).write.parquet(f"{tmp}/gwalerts")
+
+            refresh = IncrementalRefresh(spark, tmp)
+            _, backfill = timed(refresh.run)
+
+            delta = circulars_frame(rng, rows, args.delta, events, args.words)
+            spark.createDataFrame(delta, CIRCULARS).write.mode("append").parquet(f"{tmp}/circulars")
+            emitted, incremental = timed(refresh.run)
+
+            full = summarize_events_batch(
+                spark.read.parquet(f"{tmp}/circulars"), spark.read.parquet(f"{tmp}/gwalerts")
+            )
+            _, batch = timed(lambda: full.write.format("noop").mode("overwrite").save())
+
+        print(
+            f"{factor:>6}×{rows + args.delta:>12,}{batch:>11.2f}{backfill:>14.2f}"
+            f"{incremental:>17.2f}{emitted:>18,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: get_json_object por campo vs um from_json com schema versionado.
+
+Sobre um corpus sintético de gcn.notices.*, extrai k campos com uma chamada
+`get_json_object` por campo (cada uma re-escaneia o documento) e com um único
+`from_json(json, NOTICE_SCHEMA)`. Reporta os scans de JSON por linha contados
+no plano executado e o tempo materializando no sink noop. A primeira linha é
+a extração anterior de gcn_notices (id/event_name + duas passadas de
+regexp_replace para limpar o id).
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_json_schemas --docs 200000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from pyspark.sql import Column, DataFrame
+from pyspark.sql.functions import coalesce, col, from_json, get, get_json_object, regexp_replace
+
+from benchmarks.replay.harness import local_spark
+from benchmarks.replay.synthetic import _event_ids, _notices
+from nasa_gcn.schemas import NOTICE_FIELDS, NOTICE_SCHEMA
+
+_JSON_EXPRESSIONS = ("get_json_object(", "from_json(")
+
+
+def legacy_notice_id() -> Column:
+    """Extração de notice_id antes dos schemas (get_json_object + regex)."""
+    raw = coalesce(get_json_object("json", "$.id"), get_json_object("json", "$.event_name"))
+    return regexp_replace(regexp_replace(raw, r'^[\["]+', ""), r'[\]"]+$', "")
+
+
+def run(df: DataFrame, repeat: int):
+    """(scans de JSON por linha no plano executado, melhor tempo em s)."""
+    plan = df._jdf.queryExecution().executedPlan().toString()
+    scans = sum(plan.count(name) for name in _JSON_EXPRESSIONS)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df.write.format("noop").mode("overwrite").save()
+        best = min(best, time.perf_counter() - start)
+    return scans, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--master", default="local[*]")
+    args = parser.parse_args()
+
+    spark = local_spark(args.master)
+    _, values = _notices(np.random.default_rng(0), args.docs, _event_ids(args.docs))
+    df = spark.createDataFrame([(v.decode(),) for v in values], "json string").cache()
+    df.count()
+
+    names = [name for name, _ in NOTICE_FIELDS if name != "$schema"]
+    print(f"gcn.notices sintéticos: {args.docs:,} documentos, Spark {args.master}")
+    print(f"{'extração':<24}{'k':>4}{'scans/linha':>13}{'segundos':>10}")
+
+    scans, seconds = run(df.select(legacy_notice_id().alias("notice_id")), args.repeat)
+    print(f"{'notice_id (anterior)':<24}{2:>4}{scans:>13}{seconds:>10.2f}")
+
+    parsed = df.select(from_json("json", NOTICE_SCHEMA).alias("p"))
+    # Aquecimento (codegen e JIT do parser JSON) fora das medições
+    parsed.write.format("noop").mode("overwrite").save()
+    for k in (2, 4, 8, len(names)):
+        fields = names[:k]
+        rows = {
+            "get_json_object": df.select(
+                *(get_json_object("json", f"$.{name}").alias(name) for name in fields)
+            ),
+            "from_json": parsed.select(
+                *(
+                    get(col("p")[name], 0).alias(name)
+                    if name in ("id", "event_name")
+                    else col("p")[name].alias(name)
+                    for name in fields
+                )
+            ),
+        }
+        for label, selected in rows.items():
+            scans, seconds = run(selected, args.repeat)
+            print(f"{label:<24}{k:>4}{scans:>13}{seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: consulta por tipo e mês no PacketArchive vs scan Spark.
+
+Gera --packets pacotes binários com burst_tjd espalhado por --days dias,
+grava o mesmo conjunto como PacketArchive e em Parquet com um SparkSession
+local e responde "todos os pacotes do tipo X no mês M" de três formas:
+
+- archive: PacketArchive.query (índice + mmap + parse_gcn_binary_array)
+- spark_raw: scan da coluna value (como gcn_raw) com parse_binary("value")
+- spark_silver: scan da tabela já decodificada (como gcn_classic_binary),
+  com filtro em pkt_type_name e burst_datetime
+
+Reporta o tempo de construção e, por consulta, linhas e segundos.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_packet_archive --packets 2000000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from pyspark.sql.functions import col
+
+from benchmarks.replay.harness import local_spark
+from nasa_gcn.binary_parser import PACKET_TYPE_NAMES, TJD_EPOCH
+from nasa_gcn.binary_spark import parse_binary
+from nasa_gcn.packet_archive import PacketArchive
+
+ENGINES = ("archive", "spark_raw", "spark_silver")
+_PKT_TYPES = (61, 67, 111, 112, 115, 150, 164, 173)
+# Primeiro dia dos pacotes: 2025-01-01
+_FIRST_TJD = (datetime(2025, 1, 1) - TJD_EPOCH).days
+
+
+def synthetic_longs(n: int, days: int, seed: int = 0) -> np.ndarray:
+    """Matriz (n, 40) de pacotes com tipos de _PKT_TYPES e TJD crescente."""
+    rng = np.random.default_rng(seed)
+    longs = rng.integers(0, 2**31 - 1, size=(n, 40), dtype=np.int64)
+    longs[:, 0] = rng.choice(_PKT_TYPES, size=n)
+    longs[:, 4] = rng.integers(1, 10**6, size=n)
+    longs[:, 5] = _FIRST_TJD + np.sort(rng.integers(0, days, size=n))
+    longs[:, 6] = rng.integers(0, 8_640_000, size=n)
+    longs[:, 7] = rng.integers(0, 3_600_000, size=n)
+    longs[:, 8] = rng.integers(-900_000, 900_000, size=n)
+    longs[:, 11] = rng.integers(1, 10_000, size=n)
+    return longs.astype(">i4")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--packets", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    longs = synthetic_longs(args.packets, args.days)
+    spark = local_spark() if any(e.startswith("spark") for e in args.engines) else None
+
+    with tempfile.TemporaryDirectory(prefix="nasa_gcn_archive_") as tmp:
+        build = {}
+        archive, build["archive"] = timed(lambda: PacketArchive.create(f"{tmp}/archive"))
+        for start in range(0, len(longs), args.chunk_size):
+            chunk = longs[start : start + args.chunk_size].tobytes()
+            _, seconds = timed(lambda: archive.append(chunk))
+            build["archive"] += seconds
+
+        if spark is not None:
+            raw = f"{tmp}/raw"
+
+            def write_raw():
+                for start in range(0, len(longs), args.chunk_size):
+                    chunk = longs[start : start + args.chunk_size]
+                    values = [row.tobytes() for row in chunk]
+                    frame = pd.DataFrame({"value": values})
+                    spark.createDataFrame(frame, "value BINARY").write.mode("append").parquet(raw)
+
+            _, build["spark_raw"] = timed(write_raw)
+            silver = f"{tmp}/silver"
+            _, build["spark_silver"] = timed(
+                lambda: (
+                    spark.read.parquet(raw)
+                    .select(parse_binary("value").alias("p"))
+                    .select("p.*")
+                    .write.parquet(silver)
+                )
+            )
+
+        print(f"packet archive: {args.packets:,} pacotes em {args.days} dias\n")
+        for engine in args.engines:
+            print(f"construção {engine:<13} {build[engine]:>8.2f}s")
+
+        month = datetime(2025, 3, 1), datetime(2025, 4, 1)
+        queries = {
+            "archive": lambda name: len(archive.query(name, *month)["pkt_type"]),
+            "spark_raw": lambda name: (
+                spark.read.parquet(raw)
+                .select(parse_binary("value").alias("p"))
+                .filter(col("p.pkt_type_name") == name)
+                .filter(
+                    col("p.burst_datetime").between(month[0], month[1] - timedelta(microseconds=1))
+                )
+                .count()
+            ),
+            "spark_silver": lambda name: (
+                spark.read.parquet(silver)
+                .filter(col("pkt_type_name") == name)
+                .filter(
+                    col("burst_datetime").between(month[0], month[1] - timedelta(microseconds=1))
+                )
+                .count()
+            ),
+        }
+
+        print(f"\n{'tipo':<24}{'engine':<14}{'linhas':>10}{'segundos':>10}")
+        for pkt_type in (115, 164):
+            name = PACKET_TYPE_NAMES[pkt_type]
+            counts = set()
+            for engine in args.engines:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    rows, seconds = timed(lambda: queries[engine](name))
+                    best = min(best, seconds)
+                counts.add(rows)
+                print(f"{name:<24}{engine:<14}{rows:>10,}{best:>10.3f}")
+            # Todas as engines devolvem os mesmos pacotes
+            assert len(counts) == 1, counts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: decodificação de campos específicos por família (packet_layouts).
+
+Para cada família do registro (Swift-BAT, Fermi-GBM, LVC, AMON/IceCube) mede
+pacotes/seg do parser genérico (parse_gcn_binary_packet) contra o decodificador
+de campos específicos, nos caminhos escalar e batch.
+
+Para rodar:
+    uv run python benchmarks/bench_packet_layouts.py --packets 200000
+"""
+
+import argparse
+import time
+
+from bench_binary_engines import synthetic_packets
+
+from nasa_gcn.binary_parser import parse_gcn_binary_batch, parse_gcn_binary_packet
+from nasa_gcn.packet_layouts import (
+    PACKET_LAYOUTS,
+    parse_packet_details,
+    parse_packet_details_batch,
+)
+
+
+def rate(fn, packets, repeat: int) -> float:
+    """Melhor pacotes/seg em `repeat` execuções."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(packets)
+        best = min(best, time.perf_counter() - start)
+    return len(packets) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--packets", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = {
+        "generic scalar": lambda ps: [parse_gcn_binary_packet(p) for p in ps],
+        "details scalar": lambda ps: [parse_packet_details(p) for p in ps],
+        "generic batch": parse_gcn_binary_batch,
+        "details batch": parse_packet_details_batch,
+    }
+
+    print(f"packet_layouts: {args.packets:,} pacotes por família")
+    for layout in PACKET_LAYOUTS:
+        packets = synthetic_packets(args.packets, pkt_types=layout.pkt_types)
+        print(f"\n{layout.family} ({len(layout.fields)} campos)")
+        for label, fn in paths.items():
+            print(f"  {label:<16} {rate(fn, packets, args.repeat):>14,.0f} pkts/sec")
+
+
+if __name__ == "__main__":
+    main()
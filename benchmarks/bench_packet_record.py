@@ -0,0 +1,66 @@
+"""
+Benchmark: dict de parse_gcn_binary_packet vs registro compacto GcnPacket.
+
+Mede, para N pacotes, o tempo (timeit) e o pico de memória (tracemalloc) de
+três padrões de uso: decodificar e reter todos os registros, ler só alguns
+campos (pkt_type, trig_num) e converter tudo para dict (caminho do Spark).
+
+Para rodar:
+    uv run python benchmarks/bench_packet_record.py --packets 1000000
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+
+from bench_binary_engines import synthetic_packets
+
+from nasa_gcn.binary_parser import GcnPacket, parse_gcn_binary_packet
+
+
+def peak_mib(fn) -> float:
+    """Pico de memória alocada (MiB) durante fn(), mantendo o resultado vivo."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()  # noqa: F841
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--packets", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    packets = synthetic_packets(args.packets)
+
+    cases = {
+        "retain all": {
+            "dict": lambda: [parse_gcn_binary_packet(p) for p in packets],
+            "GcnPacket": lambda: [GcnPacket(p) for p in packets],
+        },
+        "read 2 fields": {
+            "dict": lambda: [
+                (r["pkt_type"], r["trig_num"]) for r in map(parse_gcn_binary_packet, packets)
+            ],
+            "GcnPacket": lambda: [(r.pkt_type, r.trig_num) for r in map(GcnPacket, packets)],
+        },
+        "to dict": {
+            "dict": lambda: [parse_gcn_binary_packet(p) for p in packets],
+            "GcnPacket": lambda: [GcnPacket(p).to_dict() for p in packets],
+        },
+    }
+
+    print(f"packet record: {args.packets:,} pacotes")
+    for case, paths in cases.items():
+        print(f"\n{case}")
+        for label, fn in paths.items():
+            seconds = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+            print(f"  {label:<10} {seconds:>8.2f} s  {peak_mib(fn):>10,.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: iter_packets (mmap, sem cópia) vs leitura e fatiamento de um dump.
+
+Gera um dump de pacotes de 160 bytes back-to-back (--size-mb) e conta os
+pacotes por pkt_type, lendo também trig_num, de quatro formas:
+
+- read_slice: f.read() do arquivo inteiro e data[i:i + 160] por pacote
+- read_chunks: f.read(160) por pacote (como num socket)
+- mmap: iter_packets(caminho), GcnPacket sobre fatias do mmap
+- mmap_batch: parse_gcn_binary_batch em blocos do mmap (referência vetorizada)
+
+A memória reportada é o pico de RSS anônimo (RSS menos páginas
+compartilhadas, /proc/self/statm) acima do início do modo: cópias do
+arquivo contam, as páginas do mmap (page cache, descartáveis) não.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_packet_stream --size-mb 4096
+"""
+
+import argparse
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from nasa_gcn.binary_parser import (
+    PACKET_SIZE,
+    GcnPacket,
+    iter_packets,
+    parse_gcn_binary_batch,
+)
+
+MODES = ("read_slice", "read_chunks", "mmap", "mmap_batch")
+_BATCH_PACKETS = 1 << 18
+_PKT_TYPES = (61, 67, 111, 112, 115, 150, 173)
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _anon_rss() -> int:
+    """RSS anônimo do processo em bytes (resident - shared de /proc/self/statm)."""
+    with open("/proc/self/statm") as f:
+        _, resident, shared = f.read().split()[:3]
+    return (int(resident) - int(shared)) * _PAGE_SIZE
+
+
+def write_dump(path: Path, size_mb: int, seed: int = 0) -> int:
+    """Grava ~size_mb MiB de pacotes plausíveis; retorna o número de pacotes."""
+    rng = np.random.default_rng(seed)
+    total = size_mb * 2**20 // PACKET_SIZE
+    with open(path, "wb") as file:
+        for start in range(0, total, _BATCH_PACKETS):
+            n = min(_BATCH_PACKETS, total - start)
+            longs = rng.integers(0, 2**31 - 1, size=(n, 40), dtype=np.int64)
+            longs[:, 0] = rng.choice(_PKT_TYPES, size=n)
+            # Cabeçalho do socket: pkt_sernum, pkt_hop_cnt e pkt_sod
+            longs[:, 1] = np.arange(start, start + n) + 1
+            longs[:, 2] = 1
+            longs[:, 3] = rng.integers(0, 8_640_000, size=n)
+            longs[:, 4] = rng.integers(0, 10**6, size=n)
+            file.write(longs.astype(">i4").tobytes())
+    return total
+
+
+def _count(packets) -> Counter:
+    counts: Counter = Counter()
+    for packet in packets:
+        if packet.trig_num is not None:
+            counts[packet.pkt_type] += 1
+    return counts
+
+
+def run_mode(mode: str, path: str):
+    """Executa um modo e retorna (segundos, pacotes contados, pico de RSS anônimo em MiB)."""
+    baseline = peak = _anon_rss()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(0.05):
+            peak = max(peak, _anon_rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        elapsed, counts = _timed(mode, path)
+    finally:
+        done.set()
+        sampler.join()
+    return elapsed, sum(counts.values()), (peak - baseline) / 2**20
+
+
+def _timed(mode: str, path: str):
+    start = time.perf_counter()
+    if mode == "read_slice":
+        with open(path, "rb") as file:
+            data = file.read()
+        counts = _count(GcnPacket(data[i : i + PACKET_SIZE]) for i in range(0, len(data), 160))
+    elif mode == "read_chunks":
+        with open(path, "rb") as file:
+            counts = _count(map(GcnPacket, iter(lambda: file.read(PACKET_SIZE), b"")))
+    elif mode == "mmap":
+        counts = _count(iter_packets(path))
+    else:
+        counts = Counter()
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            step = _BATCH_PACKETS * PACKET_SIZE
+            for offset in range(0, len(view), step):
+                chunk = view[offset : offset + step]
+                columns = parse_gcn_binary_batch(chunk)
+                selected = columns["pkt_type"][~columns["trig_num"].mask].compressed()
+                counts.update(dict(zip(*np.unique(selected, return_counts=True))))
+                del columns, chunk, selected
+            view.release()
+    return time.perf_counter() - start, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--dir", default=None, help="diretório do dump (padrão: temporário)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = Path(tmp) / "gcn_dump.bin"
+        total = write_dump(path, args.size_mb)
+        print(f"dump: {total:,} pacotes, {os.path.getsize(path) / 2**20:,.0f} MiB")
+
+        print(f"{'modo':<12} {'segundos':>9} {'pacotes/s':>12} {'RSS anônimo MiB':>16}")
+        expected = None
+        for mode in args.modes:
+            elapsed, selected, rss_mib = run_mode(mode, str(path))
+            # Todos os modos contam os mesmos pacotes
+            expected = selected if expected is None else expected
+            assert selected == expected, (mode, selected, expected)
+            print(f"{mode:<12} {elapsed:>9.2f} {total / elapsed:>12,.0f} {rss_mib:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
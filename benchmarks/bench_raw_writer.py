@@ -0,0 +1,157 @@
+"""
+Benchmark: RawWriter (micro-batches Parquet) vs um arquivo por alerta vs JSONL.
+
+Consome mensagens sintéticas de gcn_raw de um MemorySource com o
+AlertConsumer e mede mensagens/s e arquivos gerados por sink:
+
+- per_alert: um Parquet por mensagem (amostra de --per-alert mensagens)
+- jsonl: JsonlSink com decode_messages (saída padrão do `consume`)
+- raw_writer: RawWriter com decode=raw_records e flush a cada --flush-rows
+
+Depois mede a latência de flush (chegada da mensagem -> arquivo gravado,
+p50/p99) com mensagens chegando a --rate msg/s e flush por idade
+(--flush-age-s), o limite que domina com tráfego baixo.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_raw_writer --rows 200000 --rate 2000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from benchmarks.replay.synthetic import synthetic_chunk
+from nasa_gcn.consumer import AlertConsumer, CallbackSink, JsonlSink, KafkaMessage, MemorySource
+from nasa_gcn.raw_writer import RawWriter, raw_records
+
+
+def synthetic_messages(rows: int, seed: int = 0) -> list:
+    """Mensagens de synthetic_chunk como KafkaMessages, 1 ms entre elas."""
+    chunk = synthetic_chunk(rows, seed=seed)
+    start_ms = int(time.time() * 1000)
+    return [
+        KafkaMessage(topic, 0, i, value, start_ms + i)
+        for i, (topic, value) in enumerate(zip(chunk["topic"], chunk["value"]))
+    ]
+
+
+def run_sink(messages, sink, **options) -> float:
+    """Mensagens/s consumindo `messages` até o fim."""
+    start = time.perf_counter()
+    stats = asyncio.run(AlertConsumer(MemorySource(messages), sink, **options).run())
+    return stats.messages / (time.perf_counter() - start)
+
+
+def per_alert_sink(root: Path) -> CallbackSink:
+    """Um arquivo Parquet por mensagem."""
+
+    def write(records):
+        for record in records:
+            name = f"{record['topic_family']}-{record['offset']}.parquet"
+            pq.write_table(pa.Table.from_pylist([record]), root / name)
+
+    return CallbackSink(write)
+
+
+class PacedSource(MemorySource):
+    """MemorySource que entrega `rate` mensagens/s e guarda o horário de chegada."""
+
+    def __init__(self, messages, rate: float):
+        super().__init__(messages)
+        self.rate = rate
+        self.arrivals = []
+        self._start = None
+
+    async def poll(self, max_messages, timeout_s):
+        if self._start is None:
+            self._start = time.monotonic()
+        due = int((time.monotonic() - self._start) * self.rate) + 1
+        available = max(0, due - len(self.arrivals))
+        if not available:
+            await asyncio.sleep(min(timeout_s, 1 / self.rate))
+            return []
+        messages = await super().poll(min(max_messages, available), timeout_s)
+        self.arrivals += [time.monotonic()] * len(messages)
+        return messages
+
+
+def flush_latencies(messages, root: Path, rate: float, age_s: float) -> np.ndarray:
+    """Segundos entre a chegada de cada mensagem e o fim do flush que a gravou."""
+    source = PacedSource(messages, rate)
+    flushed = []
+
+    def on_flush(info):
+        flushed.append((info.rows, time.monotonic()))
+
+    writer = RawWriter(root, max_age_s=age_s, on_flush=on_flush)
+    consumer = AlertConsumer(
+        source, writer, commit_interval_s=age_s, commit_every=10**9, decode=raw_records
+    )
+    asyncio.run(consumer.run())
+
+    done = np.concatenate([np.full(rows, at) for rows, at in flushed])
+    return done - np.array(source.arrivals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--per-alert", type=int, default=2_000)
+    parser.add_argument("--flush-rows", type=int, default=50_000)
+    parser.add_argument("--rate", type=float, default=2_000)
+    parser.add_argument("--latency-rows", type=int, default=20_000)
+    parser.add_argument("--flush-age-s", type=float, default=1.0)
+    args = parser.parse_args()
+
+    messages = synthetic_messages(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "per_alert").mkdir()
+        results = {
+            "per_alert": run_sink(
+                messages[: args.per_alert], per_alert_sink(tmp / "per_alert"), decode=raw_records
+            )
+        }
+        with open(tmp / "alerts.jsonl", "w") as output:
+            results["jsonl"] = run_sink(messages, JsonlSink(output))
+        writer = RawWriter(tmp / "raw", max_rows=args.flush_rows)
+        results["raw_writer"] = run_sink(
+            messages, writer, commit_every=args.flush_rows, commit_interval_s=60, decode=raw_records
+        )
+
+        files = {
+            "per_alert": len(list((tmp / "per_alert").iterdir())),
+            "jsonl": 1,
+            "raw_writer": writer.files_written,
+        }
+        sizes = {
+            "per_alert": sum(p.stat().st_size for p in (tmp / "per_alert").iterdir()),
+            "jsonl": (tmp / "alerts.jsonl").stat().st_size,
+            "raw_writer": sum(p.stat().st_size for p in (tmp / "raw").rglob("*.parquet")),
+        }
+        counts = {"per_alert": args.per_alert, "jsonl": args.rows, "raw_writer": args.rows}
+
+        print(f"{'sink':<12} {'msgs/s':>10} {'arquivos':>9} {'bytes/msg':>10}")
+        for name, rate in results.items():
+            print(
+                f"{name:<12} {rate:>10,.0f} {files[name]:>9,} {sizes[name] / counts[name]:>10,.0f}"
+            )
+
+        latencies = flush_latencies(
+            messages[: args.latency_rows], tmp / "paced", args.rate, args.flush_age_s
+        )
+        p50, p99, worst = np.percentile(latencies, [50, 99, 100]) * 1000
+        print(
+            f"\nlatência de flush a {args.rate:,.0f} msg/s, max_age_s={args.flush_age_s:g}: "
+            f"p50 {p50:,.0f} ms · p99 {p99:,.0f} ms · max {worst:,.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
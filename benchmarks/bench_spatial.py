@@ -0,0 +1,139 @@
+"""
+Benchmark: cross-match espacial com índice HEALPix vs cross join ingênuo.
+
+Posições sintéticas uniformes na esfera: --left círculos de erro tipo GRB
+(maioria Swift-BAT de 3', uma fração --wide de Fermi-GBM com 5°) contra
+--right posições de notices com erro de 0.1°. Mede:
+
+- NumPy: crossmatch (join por célula + distância exata) vs força bruta
+  (haversine por par) sobre --naive-rows linhas da esquerda, extrapolada
+- Spark: healpix nas engines "pandas" e "sql" sobre a tabela da esquerda,
+  spatial_join completo vs crossJoin + filtro por distância sobre
+  --naive-rows linhas, extrapolado
+
+Os pares da amostra ingênua são comparados com os do índice.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_spatial --left 1000000 --right 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import functions as F
+
+from benchmarks.replay.harness import local_spark
+from nasa_gcn.spatial import (
+    angular_distance,
+    angular_distance_deg,
+    crossmatch,
+    healpix,
+    spatial_join,
+)
+
+BAT_ERROR_DEG = 0.05
+GBM_ERROR_DEG = 5.0
+NOTICE_ERROR_DEG = 0.1
+
+
+def positions(rng: np.random.Generator, n: int):
+    """(ra, dec) uniformes na esfera, em graus."""
+    return rng.uniform(0, 360, n), np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+
+
+def naive_numpy(ra1, dec1, err1, ra2, dec2, err2, chunk: int = 200):
+    """Força bruta em blocos: haversine de cada par."""
+    pairs = []
+    for start in range(0, len(ra1), chunk):
+        rows = slice(start, start + chunk)
+        dist = angular_distance_deg(ra1[rows, None], dec1[rows, None], ra2[None], dec2[None])
+        i, j = np.nonzero(dist <= err1[rows, None] + err2[None])
+        pairs.append(np.stack([i + start, j], axis=1))
+    return np.concatenate(pairs)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--left", type=int, default=1_000_000)
+    parser.add_argument("--right", type=int, default=100_000)
+    parser.add_argument("--wide", type=float, default=0.01, help="fração de círculos de 5°")
+    parser.add_argument("--naive-rows", type=int, default=1_000)
+    parser.add_argument("--skip-spark", action="store_true")
+    parser.add_argument("--master", default="local[*]")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ra1, dec1 = positions(rng, args.left)
+    err1 = np.where(rng.random(args.left) < args.wide, GBM_ERROR_DEG, BAT_ERROR_DEG)
+    ra2, dec2 = positions(rng, args.right)
+    err2 = np.full(args.right, NOTICE_ERROR_DEG)
+    sample = args.naive_rows
+    scale = args.left / sample
+
+    print(
+        f"cross-match: {args.left:,} × {args.right:,} posições "
+        f"({args.wide:.0%} com erro de {GBM_ERROR_DEG}°)"
+    )
+    print(f"{'método':<34}{'pares':>12}{'segundos':>12}")
+
+    (i, j, _), seconds = timed(lambda: crossmatch(ra1, dec1, err1, ra2, dec2, err2))
+    print(f"{'numpy crossmatch (HEALPix)':<34}{len(i):>12,}{seconds:>12.2f}")
+    naive, seconds = timed(
+        lambda: naive_numpy(ra1[:sample], dec1[:sample], err1[:sample], ra2, dec2, err2)
+    )
+    label = f"numpy força bruta (×{scale:,.0f})"
+    print(f"{label:<34}{round(len(naive) * scale):>12,}{seconds * scale:>12.2f}")
+    indexed = {(a, b) for a, b in zip(i.tolist(), j.tolist()) if a < sample}
+    assert indexed == set(map(tuple, naive.tolist())), "crossmatch diverge da força bruta"
+
+    if args.skip_spark:
+        return
+
+    spark = local_spark(args.master)
+    left = spark.createDataFrame(
+        pd.DataFrame({"grb_id": np.arange(args.left), "ra": ra1, "dec": dec1, "err": err1})
+    ).cache()
+    right = spark.createDataFrame(
+        pd.DataFrame(
+            {"notice_id": np.arange(args.right), "n_ra": ra2, "n_dec": dec2, "n_err": err2}
+        )
+    ).cache()
+    left.count(), right.count()
+
+    for engine in ("pandas", "sql"):
+        _, seconds = timed(
+            lambda: (
+                left.select(healpix("ra", "dec", engine=engine))
+                .write.format("noop")
+                .mode("overwrite")
+                .save()
+            )
+        )
+        label = f"spark healpix engine={engine}"
+        print(f"{label:<34}{args.left:>12,}{seconds:>12.2f}")
+
+    joined = spatial_join(left, right, ("ra", "dec", "err"), ("n_ra", "n_dec", "n_err"))
+    pairs, seconds = timed(joined.count)
+    print(f"{'spark spatial_join':<34}{pairs:>12,}{seconds:>12.2f}")
+
+    distance = angular_distance("ra", "dec", "n_ra", "n_dec")
+    naive_df = (
+        left.filter(F.col("grb_id") < sample)
+        .crossJoin(right)
+        .filter(distance <= F.col("err") + F.col("n_err"))
+    )
+    pairs, seconds = timed(naive_df.count)
+    label = f"spark crossJoin (×{scale:,.0f})"
+    print(f"{label:<34}{round(pairs * scale):>12,}{seconds * scale:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: extração de campos VOEvent com xpath_string vs parse único.
+
+Compara, no Spark local, o custo de extrair N campos de documentos VOEvent
+sintéticos com uma expressão `xpath_string` por campo (cada uma re-parseia o
+XML) contra o pandas_udf voevent_details, que parseia cada documento uma vez
+e retorna todos os campos. Também mede o parser puro (docs/seg).
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.bench_voevent --docs 200000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from pyspark.sql import DataFrame
+from pyspark.sql.functions import expr
+
+from benchmarks.replay.harness import local_spark
+from benchmarks.replay.synthetic import _event_ids, _voevent
+from nasa_gcn.voevent import parse_voevent, voevent_details
+
+_ROOT = '/*[local-name()="VOEvent"]'
+_ANY = "//*[local-name()="
+
+# Campos de VOEVENT_FIELDS equivalentes em XPath, na ordem do incremento de N
+XPATHS = {
+    "ivorn": f"{_ROOT}/@ivorn",
+    "role": f"{_ROOT}/@role",
+    "author_date": f'{_ANY}"Who"]/*[local-name()="Date"]',
+    "ra_deg": f'{_ANY}"Value2"]/*[local-name()="C1"]',
+    "dec_deg": f'{_ANY}"Value2"]/*[local-name()="C2"]',
+    "error_deg": f'{_ANY}"Error2Radius"]',
+    "concept": f'{_ANY}"Concept"]',
+    "event_time": f'{_ANY}"ISOTime"]',
+}
+
+
+def timed(df: DataFrame, repeat: int) -> float:
+    """Melhor tempo (s) materializando o DataFrame no sink noop."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df.write.format("noop").mode("overwrite").save()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--master", default="local[*]")
+    args = parser.parse_args()
+
+    _, values = _voevent(np.random.default_rng(0), args.docs, _event_ids(args.docs))
+    docs = [v.decode() for v in values]
+
+    sample = docs[: min(len(docs), 20_000)]
+    start = time.perf_counter()
+    for doc in sample:
+        parse_voevent(doc)
+    rate = len(sample) / (time.perf_counter() - start)
+    print(f"parse_voevent (Python puro): {rate:,.0f} docs/sec\n")
+
+    spark = local_spark(args.master)
+    df = spark.createDataFrame([(doc,) for doc in docs], "xml string").cache()
+    df.count()
+
+    print(f"Spark {args.master}: {args.docs:,} documentos")
+    print(f"{'campos':>6}{'xpath_string (s)':>20}{'voevent_details (s)':>22}")
+    single = df.select(voevent_details("xml").alias("v")).select("v.*")
+    single_seconds = timed(single, args.repeat)
+    for n in (1, 2, 4, len(XPATHS)):
+        columns = [expr(f"xpath_string(xml, '{path}')") for path in list(XPATHS.values())[:n]]
+        xpath_seconds = timed(df.select(*columns), args.repeat)
+        print(f"{n:>6}{xpath_seconds:>20.2f}{single_seconds:>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
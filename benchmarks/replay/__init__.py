@@ -0,0 +1,13 @@
+"""
+Replay local do pipeline DLT com dados sintéticos.
+
+Gera mensagens no formato de `gcn_raw` para todas as famílias de tópicos,
+executa cada tabela Silver/Gold de dlt_pipeline.py em um SparkSession local
+(com um shim do módulo `dlt`) e reporta rows/sec, pico de memória e tempo por
+estágio, para que regressões em qualquer tabela apareçam como números antes
+do deploy.
+
+Para rodar (a partir da raiz do repositório):
+    uv run python -m benchmarks.replay --rows 200000
+    uv run python -m benchmarks.replay --rows 200000 --engine sql --json results.json
+"""
@@ -0,0 +1,68 @@
+"""Linha de comando do replay: python -m benchmarks.replay --help"""
+
+import argparse
+import json
+import tempfile
+import time
+
+from benchmarks.replay.harness import local_spark, run_replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay local do pipeline DLT")
+    parser.add_argument("--rows", type=int, default=100_000, help="mensagens em gcn_raw")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--master", default="local[*]")
+    parser.add_argument("--engine", default="pandas", help="nasa_gcn.binary_engine")
+    parser.add_argument("--bronze-layout", default="flat", help="nasa_gcn.bronze_layout")
+    parser.add_argument("--gold-mode", default="batch", help="nasa_gcn.gold_mode")
+    parser.add_argument("--arrow-batch", type=int, default=10_000)
+    parser.add_argument("--tables", nargs="*", help="tabelas a executar (padrão: todas)")
+    parser.add_argument("--workdir", help="diretório de saída (padrão: temporário)")
+    parser.add_argument("--json", help="grava os resultados em JSON neste arquivo")
+    args = parser.parse_args()
+
+    spark = local_spark(
+        args.master, {"spark.sql.execution.arrow.maxRecordsPerBatch": str(args.arrow_batch)}
+    )
+    spark.conf.set("nasa_gcn.binary_engine", args.engine)
+    spark.conf.set("nasa_gcn.bronze_layout", args.bronze_layout)
+    spark.conf.set("nasa_gcn.gold_mode", args.gold_mode)
+
+    with tempfile.TemporaryDirectory(prefix="nasa_gcn_replay_") as tmp:
+        start = time.perf_counter()
+        results = run_replay(spark, args.workdir or tmp, args.rows, args.seed, args.tables)
+        total = time.perf_counter() - start
+
+    print(
+        f"replay: {args.rows:,} mensagens, engine binária {args.engine}, "
+        f"bronze {args.bronze_layout}, gold {args.gold_mode}, {args.master}\n"
+    )
+    print(
+        f"{'tabela':<24}{'modo':>8}{'linhas':>12}{'segundos':>10}{'rows/sec':>14}{'pico MiB':>10}"
+    )
+    for r in results:
+        peak = f"{r.peak_rss_mib:,.0f}" if r.peak_rss_mib is not None else "-"
+        mode = "stream" if r.streaming else "batch"
+        print(
+            f"{r.table:<24}{mode:>8}{r.rows:>12,}{r.seconds:>10.2f}{r.rows_per_sec:>14,.0f}{peak:>10}"
+        )
+    print(f"\ntotal (incluindo geração dos dados): {total:.1f} s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "rows": args.rows,
+                    "engine": args.engine,
+                    "bronze_layout": args.bronze_layout,
+                    "gold_mode": args.gold_mode,
+                    "stages": [r.to_dict() for r in results],
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Substituto local do módulo `dlt` para executar dlt_pipeline.py sem Databricks.
+
+Cada `@dlt.table` (ou streaming table alimentada por `@dlt.append_flow` ou
+`dlt.apply_changes`) é registrada e materializada sob demanda em Parquet:
+DataFrames streaming rodam como query com trigger availableNow (checkpoint
+próprio por flow), os demais como escrita batch. `partition_cols` é
+respeitado na escrita. `dlt.read` e `dlt.read_stream` leem a materialização
+da tabela de origem, então o grafo inteiro é executado na ordem de
+dependência.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+import types
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pyspark.sql import Column, DataFrame, SparkSession, Window
+from pyspark.sql.functions import col, row_number
+from pyspark.sql.types import StructType
+
+import nasa_gcn
+
+PIPELINE_PATH = Path(nasa_gcn.__file__).parent / "dlt_pipeline.py"
+
+
+@dataclass
+class Materialized:
+    """Resultado da materialização de uma tabela."""
+
+    name: str
+    path: str
+    schema: StructType
+    streaming: bool
+    seconds: float
+    rows: int
+
+
+class DltShim(types.ModuleType):
+    """
+    Implementa o subconjunto da API `dlt` usado pelo pipeline.
+
+    Args:
+        spark: SparkSession local
+        workdir: Diretório para tabelas e checkpoints
+        on_stage: Callback opcional que envolve a execução de cada tabela
+            (ex: medir memória); recebe o nome e uma função sem argumentos
+    """
+
+    def __init__(
+        self,
+        spark: SparkSession,
+        workdir: str,
+        on_stage: Optional[Callable[[str, Callable[[], None]], None]] = None,
+    ):
+        super().__init__("dlt")
+        self._spark = spark
+        self._workdir = Path(workdir)
+        self._on_stage = on_stage or (lambda name, run: run())
+        # Tabela -> função (None para streaming tables alimentadas por flows)
+        self.tables: Dict[str, Optional[Callable[[], DataFrame]]] = {}
+        self.options: Dict[str, Dict[str, Any]] = {}
+        self.flows: Dict[str, List[Tuple[str, Callable[[], DataFrame]]]] = {}
+        self.materialized: Dict[str, Materialized] = {}
+        self.order: List[str] = []
+
+    # --------------------------------------------------------------------------
+    # API dlt
+    # --------------------------------------------------------------------------
+
+    def table(self, function=None, *, name: Optional[str] = None, **options):
+        """@dlt.table ou @dlt.table(name=..., partition_cols=..., ...)."""
+
+        def register(fn):
+            table_name = name or fn.__name__
+            self.tables[table_name] = fn
+            self.options[table_name] = options
+            return fn
+
+        return register(function) if callable(function) else register
+
+    view = table
+
+    def create_streaming_table(self, name: str, **options) -> None:
+        self.tables[name] = None
+        self.options[name] = options
+        self.flows.setdefault(name, [])
+
+    def append_flow(self, target: str, name: Optional[str] = None, **_options):
+        def register(fn):
+            self.flows.setdefault(target, []).append((name or fn.__name__, fn))
+            return fn
+
+        return register
+
+    def apply_changes(
+        self,
+        target: str,
+        source: str,
+        keys: List[str],
+        sequence_by: Union[str, Column],
+        stored_as_scd_type: int = 1,
+        **_options,
+    ) -> None:
+        """SCD tipo 1: a tabela `target` guarda a última linha de `source` por chave."""
+        if stored_as_scd_type != 1:
+            raise NotImplementedError("Only SCD type 1 is supported by the local shim")
+        sequence = col(sequence_by) if isinstance(sequence_by, str) else sequence_by
+
+        def latest() -> DataFrame:
+            window = Window.partitionBy(*keys).orderBy(sequence.desc())
+            ranked = self.read(source).withColumn("_rank", row_number().over(window))
+            return ranked.filter(col("_rank") == 1).drop("_rank")
+
+        self.flows.setdefault(target, []).append((f"{target}_apply_changes", latest))
+
+    def read(self, name: str) -> DataFrame:
+        table = self.materialize(name)
+        return self._spark.read.schema(table.schema).parquet(table.path)
+
+    def read_stream(self, name: str) -> DataFrame:
+        table = self.materialize(name)
+        return self._spark.readStream.schema(table.schema).parquet(table.path)
+
+    # --------------------------------------------------------------------------
+    # Execução local
+    # --------------------------------------------------------------------------
+
+    def _write(self, name: str, df: DataFrame, path: str, checkpoint: str) -> None:
+        partition_cols = self.options.get(name, {}).get("partition_cols") or []
+        if not df.isStreaming:
+            df.write.mode("overwrite").partitionBy(*partition_cols).parquet(path)
+            return
+
+        # foreachBatch com append permite vários flows escrevendo no mesmo diretório
+        def append(batch: DataFrame, _batch_id: int) -> None:
+            batch.write.mode("append").partitionBy(*partition_cols).parquet(path)
+
+        query = (
+            df.writeStream.foreachBatch(append)
+            .option("checkpointLocation", checkpoint)
+            .trigger(availableNow=True)
+            .start()
+        )
+        query.awaitTermination()
+
+    def _record(self, name: str, path: str, schema: StructType, streaming: bool, seconds: float):
+        rows = self._spark.read.schema(schema).parquet(path).count()
+        table = Materialized(name, path, schema, streaming, seconds, rows)
+        self.materialized[name] = table
+        self.order.append(name)
+        return table
+
+    def register_source(self, name: str, df: DataFrame) -> Materialized:
+        """Substitui uma tabela (ex: gcn_raw, que lê do Kafka) por um DataFrame batch."""
+        path = str(self._workdir / "tables" / name)
+        elapsed = []
+
+        def run():
+            start = time.perf_counter()
+            self._write(name, df, path, "")
+            elapsed.append(time.perf_counter() - start)
+
+        self._on_stage(name, run)
+        return self._record(name, path, df.schema, False, elapsed[0])
+
+    def materialize(self, name: str) -> Materialized:
+        """Executa a tabela (e, recursivamente, suas dependências) uma única vez."""
+        if name in self.materialized:
+            return self.materialized[name]
+        if name not in self.tables:
+            raise KeyError(f"Table {name!r} is not defined by the pipeline")
+
+        # Montar os planos resolve as dependências (dlt.read/read_stream) antes do timer
+        fn = self.tables[name]
+        plans = [(name, fn())] if fn is not None else [(f, g()) for f, g in self.flows[name]]
+        path = str(self._workdir / "tables" / name)
+        os.makedirs(path, exist_ok=True)
+        elapsed = []
+
+        def run():
+            start = time.perf_counter()
+            for flow, df in plans:
+                self._write(name, df, path, str(self._workdir / "checkpoints" / flow))
+            elapsed.append(time.perf_counter() - start)
+
+        self._on_stage(name, run)
+        schema = plans[0][1].schema
+        return self._record(name, path, schema, plans[0][1].isStreaming, elapsed[0])
+
+    def run_all(self) -> List[Materialized]:
+        """Materializa todas as tabelas do pipeline, na ordem de definição."""
+        for name in self.tables:
+            self.materialize(name)
+        return [self.materialized[name] for name in self.order]
+
+
+def load_pipeline(spark: SparkSession, shim: DltShim, path: Path = PIPELINE_PATH):
+    """
+    Importa dlt_pipeline.py com o shim no lugar de `dlt` e `spark` injetado
+    como global (como faz o runtime do DLT).
+    """
+    sys.modules["dlt"] = shim
+    spec = importlib.util.spec_from_file_location("dlt_pipeline", path)
+    module = importlib.util.module_from_spec(spec)
+    module.spark = spark
+    spec.loader.exec_module(module)
+    return module
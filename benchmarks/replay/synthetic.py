@@ -0,0 +1,345 @@
+"""
+Gerador de dados sintéticos no formato de `gcn_raw`.
+
+Produz mensagens plausíveis para cada família de tópicos consumida pelo
+pipeline (binário de 160 bytes, texto clássico, VOEvent XML, notices JSON,
+circulares, alertas IGWN e heartbeat), com IDs de eventos compartilhados entre
+circulares e gwalerts para que a camada Gold tenha joins reais.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import DataFrame, SparkSession
+
+from nasa_gcn.binary_parser import PACKET_SIZE, PACKET_TYPE_NAMES, TJD_EPOCH
+from nasa_gcn.config import get_topic_family
+
+# Mesmo schema das colunas selecionadas por dlt_pipeline.gcn_raw
+GCN_RAW_SCHEMA = (
+    "message_key STRING, value BINARY, topic STRING, topic_family STRING, partition INT, "
+    "offset LONG, kafka_timestamp TIMESTAMP, ingestion_timestamp TIMESTAMP"
+)
+
+# Proporção padrão de mensagens por família
+DEFAULT_MIX: Dict[str, float] = {
+    "binary": 0.30,
+    "text": 0.20,
+    "voevent": 0.20,
+    "notices": 0.15,
+    "circulars": 0.05,
+    "gwalert": 0.05,
+    "heartbeat": 0.05,
+}
+
+# Tipos de pacote usados nos tópicos classic (binary/text/voevent)
+CLASSIC_PKT_TYPES = (61, 67, 111, 112, 115, 150, 151, 163, 173, 174)
+
+NOTICE_TOPICS = {
+    "gcn.notices.swift.bat.guano": ("Swift", "BAT", "X-ray"),
+    "gcn.notices.icecube.lvk_nu_track_search": ("IceCube", "IC86", "Neutrino"),
+    "gcn.notices.einstein_probe.wxt.alert": ("Einstein Probe", "WXT", "X-ray"),
+    "gcn.notices.superk.sn_alert": ("Super-Kamiokande", "SK", "Neutrino"),
+}
+
+GW_ALERT_TYPES = ("PRELIMINARY", "INITIAL", "UPDATE", "RETRACTION")
+_BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+_WORDS = (
+    "observation detected source counterpart optical follow-up telescope "
+    "magnitude filter exposure localization afterglow candidate spectrum redshift"
+).split()
+
+
+def _event_ids(n: int) -> List[str]:
+    """IDs de superevento (S260101a...) compartilhados entre circulares e gwalerts."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        f"S26{(i // 26) // 28 % 12 + 1:02d}{(i // 26) % 28 + 1:02d}{letters[i % 26]}"
+        for i in range(n)
+    ]
+
+
+def _packets(rng: np.random.Generator, pkt_types: np.ndarray) -> List[bytes]:
+    """Pacotes de 160 bytes com TJD/SOD, RA/Dec e erro plausíveis."""
+    n = len(pkt_types)
+    longs = rng.integers(0, 2**31 - 1, size=(n, PACKET_SIZE // 4), dtype=np.int64)
+    longs[:, 0] = pkt_types
+    longs[:, 4] = rng.integers(1, 2_000_000, size=n)
+    longs[:, 5] = rng.integers(20_000, 21_000, size=n)
+    longs[:, 6] = rng.integers(0, 8_640_000, size=n)
+    longs[:, 7] = rng.integers(0, 3_600_000, size=n)
+    longs[:, 8] = rng.integers(-900_000, 900_000, size=n)
+    longs[:, 11] = rng.integers(1, 10_000, size=n)
+    raw = longs.astype(">i4").tobytes()
+    return [raw[i : i + PACKET_SIZE] for i in range(0, len(raw), PACKET_SIZE)]
+
+
+def _classic_fields(rng: np.random.Generator, n: int) -> Iterator[Tuple]:
+    pkt_type = rng.choice(CLASSIC_PKT_TYPES, size=n)
+    trig_num = rng.integers(1, 2_000_000, size=n)
+    tjd = rng.integers(20_000, 21_000, size=n)
+    sod = rng.integers(0, 8_640_000, size=n) / 100
+    ra = rng.uniform(0, 360, size=n)
+    dec = rng.uniform(-90, 90, size=n)
+    err = rng.uniform(0.01, 10, size=n)
+    return zip(pkt_type.tolist(), trig_num.tolist(), tjd.tolist(), sod, ra, dec, err)
+
+
+def _binary(rng, n, event_ids) -> Tuple[List[str], List[bytes]]:
+    pkt_types = rng.choice(CLASSIC_PKT_TYPES, size=n)
+    topics = [f"gcn.classic.binary.{PACKET_TYPE_NAMES[t]}" for t in pkt_types.tolist()]
+    return topics, _packets(rng, pkt_types)
+
+
+def _text(rng, n, event_ids) -> Tuple[List[str], List[bytes]]:
+    topics, values = [], []
+    for pkt_type, trig_num, tjd, sod, ra, dec, err in _classic_fields(rng, n):
+        name = PACKET_TYPE_NAMES[pkt_type]
+        date = TJD_EPOCH + timedelta(days=tjd)
+        topics.append(f"gcn.classic.text.{name}")
+        values.append(
+            f"TITLE:           GCN/{name.split('_')[0]} NOTICE\n"
+            f"NOTICE_DATE:     {date:%a %d %b %y} 00:00:00 UT\n"
+            f"NOTICE_TYPE:     {name.replace('_', ' ').title()}\n"
+            f"TRIGGER_NUM:     {trig_num},   Seg_Num: 0\n"
+            f"GRB_RA:          {ra:.3f}d (J2000),\n"
+            f"GRB_DEC:         {dec:+.3f}d (J2000),\n"
+            f"GRB_ERROR:       {err * 60:.2f} [arcmin radius, statistical only]\n"
+            f"GRB_DATE:        {tjd} TJD;   {date:%j} DOY;   {date:%y/%m/%d}\n"
+            f"GRB_TIME:        {sod:.2f} SOD UT\n"
+            f"COMMENTS:        {name.replace('_', ' ')}.\n".encode()
+        )
+    return topics, values
+
+
+def _voevent(rng, n, event_ids) -> Tuple[List[str], List[bytes]]:
+    topics, values = [], []
+    for pkt_type, trig_num, tjd, sod, ra, dec, err in _classic_fields(rng, n):
+        name = PACKET_TYPE_NAMES[pkt_type]
+        when = TJD_EPOCH + timedelta(days=tjd, seconds=float(sod))
+        role = "test" if name.endswith("TEST") else "observation"
+        topics.append(f"gcn.classic.voevent.{name}")
+        values.append(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<voe:VOEvent xmlns:voe="http://www.ivoa.net/xml/VOEvent/v2.0" '
+            f'ivorn="ivo://nasa.gsfc.gcn/{name}#{trig_num}_{tjd}" role="{role}" version="2.0">\n'
+            f"  <Who><AuthorIVORN>ivo://nasa.gsfc.tan/gcn</AuthorIVORN>"
+            f"<Date>{when:%Y-%m-%dT%H:%M:%S}</Date></Who>\n"
+            "  <What>\n"
+            f'    <Param name="Packet_Type" value="{pkt_type}" />\n'
+            f'    <Param name="TrigID" value="{trig_num}" />\n'
+            f'    <Param name="Burst_TJD" value="{tjd}" />\n'
+            f'    <Param name="Burst_SOD" value="{sod:.2f}" unit="sec" />\n'
+            "  </What>\n"
+            "  <WhereWhen><ObsDataLocation><ObservationLocation><AstroCoords>"
+            f"<Time><TimeInstant><ISOTime>{when:%Y-%m-%dT%H:%M:%S.%f}</ISOTime></TimeInstant></Time>"
+            f"<Position2D><Value2><C1>{ra:.4f}</C1><C2>{dec:.4f}</C2></Value2>"
+            f"<Error2Radius>{err:.4f}</Error2Radius></Position2D>"
+            "</AstroCoords></ObservationLocation></ObsDataLocation></WhereWhen>\n"
+            f"  <Why><Inference><Concept>{name.replace('_', ' ').lower()}</Concept>"
+            "</Inference></Why>\n"
+            "</voe:VOEvent>\n".encode()
+        )
+    return topics, values
+
+
+# Campos específicos por tópico (ver schemas.NOTICE_TOPIC_FIELDS)
+_NOTICE_EXTRAS: Dict[str, Callable[[np.random.Generator], Dict]] = {
+    "gcn.notices.swift.bat.guano": lambda rng: {
+        "rate_snr": round(float(rng.uniform(4, 30)), 2),
+        "rate_duration": round(float(rng.uniform(0.1, 100)), 3),
+        "far": float(rng.uniform(1e-8, 1e-3)),
+        "classification": {"GRB": 0.95, "noise": 0.05},
+    },
+    "gcn.notices.icecube.lvk_nu_track_search": lambda rng: {
+        "n_events_coincident": int(rng.integers(0, 3)),
+        "pval_generic": round(float(rng.random()), 4),
+        "pval_bayesian": round(float(rng.random()), 4),
+    },
+    "gcn.notices.einstein_probe.wxt.alert": lambda rng: {
+        "image_snr": round(float(rng.uniform(5, 50)), 2),
+        "net_count_rate": round(float(rng.uniform(0.01, 10)), 4),
+        "image_energy_range": [0.5, 4.0],
+    },
+    "gcn.notices.superk.sn_alert": lambda rng: {
+        "n_events": int(rng.integers(1, 1000)),
+        "luminosity_distance": round(float(rng.uniform(1, 50)), 2),
+    },
+}
+
+
+def _notices(rng, n, event_ids) -> Tuple[List[str], List[bytes]]:
+    names = list(NOTICE_TOPICS)
+    topics, values = [], []
+    for i, topic_index in enumerate(rng.integers(0, len(names), size=n).tolist()):
+        topic = names[topic_index]
+        mission, instrument, messenger = NOTICE_TOPICS[topic]
+        when = _BASE_TIME + timedelta(seconds=int(rng.integers(0, 30 * 86_400)))
+        topics.append(topic)
+        values.append(
+            json.dumps(
+                {
+                    "$schema": "https://gcn.nasa.gov/schema/v4.0.0/"
+                    + topic.replace(".", "/")
+                    + ".json",
+                    "mission": mission,
+                    "instrument": instrument,
+                    "messenger": messenger,
+                    "id": [f"{mission.replace(' ', '')}-{i:07d}"],
+                    "alert_type": str(rng.choice(["initial", "update"])),
+                    "alert_tense": "current",
+                    "alert_datetime": when.isoformat(),
+                    "trigger_time": when.isoformat(),
+                    "ra": round(float(rng.uniform(0, 360)), 4),
+                    "dec": round(float(rng.uniform(-90, 90)), 4),
+                    "ra_dec_error": round(float(rng.uniform(0.01, 5)), 3),
+                    "containment_probability": 0.9,
+                    **_NOTICE_EXTRAS[topic](rng),
+                }
+            ).encode()
+        )
+    return topics, values
+
+
+def _circulars(rng, n, event_ids) -> Tuple[List[str], List[bytes]]:
+    values = []
+    for i in range(n):
+        event_id = event_ids[int(rng.integers(0, len(event_ids)))]
+        body = " ".join(rng.choice(_WORDS, size=int(rng.integers(50, 400))).tolist())
+        created = _BASE_TIME + timedelta(seconds=int(rng.integers(0, 30 * 86_400)))
+        values.append(
+            json.dumps(
+                {
+                    "circularId": 40_000 + i,
+                    "eventId": event_id,
+                    "subject": f"LIGO/Virgo/KAGRA {event_id}: follow-up observations",
+                    "body": body,
+                    "submitter": "A. Astronomer at Observatory <astro@example.org>",
+                    "submittedHow": "web",
+                    "createdOn": int(created.timestamp() * 1000),
+                    "format": "text/plain",
+                }
+            ).encode()
+        )
+    return ["gcn.circulars"] * n, values
+
+
+def _gwalert(rng, n, event_ids) -> Tuple[List[str], List[bytes]]:
+    values = []
+    for _ in range(n):
+        event_id = event_ids[int(rng.integers(0, len(event_ids)))]
+        created = _BASE_TIME + timedelta(seconds=int(rng.integers(0, 30 * 86_400)))
+        probs = rng.dirichlet(np.ones(4)).round(4).tolist()
+        values.append(
+            json.dumps(
+                {
+                    "superevent_id": event_id,
+                    "alert_type": str(rng.choice(GW_ALERT_TYPES)),
+                    "time_created": created.isoformat(),
+                    "urls": {"gracedb": f"https://gracedb.ligo.org/superevents/{event_id}/view/"},
+                    "event": {
+                        "time": created.isoformat(),
+                        "far": float(rng.uniform(1e-12, 1e-6)),
+                        "significant": bool(rng.random() < 0.2),
+                        "instruments": ["H1", "L1", "V1"],
+                        "group": "CBC",
+                        "pipeline": str(rng.choice(["gstlal", "pycbc", "mbta", "spiir"])),
+                        "classification": dict(zip(["BNS", "NSBH", "BBH", "Terrestrial"], probs)),
+                        "properties": {"HasNS": probs[0], "HasRemnant": probs[0] / 2},
+                    },
+                }
+            ).encode()
+        )
+    return ["igwn.gwalert"] * n, values
+
+
+def _heartbeat(rng, n, event_ids) -> Tuple[List[str], List[bytes]]:
+    values = [
+        json.dumps({"alert_datetime": (_BASE_TIME + timedelta(seconds=i)).isoformat()}).encode()
+        for i in range(n)
+    ]
+    return ["gcn.heartbeat"] * n, values
+
+
+FAMILY_GENERATORS: Dict[str, Callable] = {
+    "binary": _binary,
+    "text": _text,
+    "voevent": _voevent,
+    "notices": _notices,
+    "circulars": _circulars,
+    "gwalert": _gwalert,
+    "heartbeat": _heartbeat,
+}
+
+
+def family_counts(rows: int, mix: Dict[str, float] = DEFAULT_MIX) -> Dict[str, int]:
+    """Distribui `rows` mensagens entre as famílias (o resto vai para a primeira)."""
+    total = sum(mix.values())
+    counts = {family: int(rows * weight / total) for family, weight in mix.items()}
+    first = next(iter(counts))
+    counts[first] += rows - sum(counts.values())
+    return counts
+
+
+def synthetic_chunk(
+    rows: int, seed: int = 0, offset: int = 0, mix: Dict[str, float] = DEFAULT_MIX
+) -> pd.DataFrame:
+    """
+    Gera um bloco de `rows` mensagens no schema de gcn_raw.
+
+    Args:
+        rows: Número de mensagens
+        seed: Semente do gerador (blocos com seeds diferentes não se repetem)
+        offset: Offset Kafka inicial do bloco
+        mix: Proporção de mensagens por família
+    """
+    rng = np.random.default_rng(seed)
+    event_ids = _event_ids(max(1, rows // 50))
+
+    topics: List[str] = []
+    values: List[bytes] = []
+    for family, count in family_counts(rows, mix).items():
+        if count:
+            family_topics, family_values = FAMILY_GENERATORS[family](rng, count, event_ids)
+            topics += family_topics
+            values += family_values
+
+    # Intercala as famílias como chegariam do broker
+    order = rng.permutation(len(values))
+    kafka_ts = pd.Timestamp(_BASE_TIME) + pd.to_timedelta(
+        np.sort(rng.integers(0, 30 * 86_400_000, size=len(values))), unit="ms"
+    )
+    return pd.DataFrame(
+        {
+            "message_key": None,
+            "value": [values[i] for i in order],
+            "topic": [topics[i] for i in order],
+            "topic_family": [get_topic_family(topics[i]) for i in order],
+            "partition": np.zeros(len(values), dtype=np.int32),
+            "offset": np.arange(offset, offset + len(values), dtype=np.int64),
+            "kafka_timestamp": kafka_ts,
+            "ingestion_timestamp": kafka_ts + pd.Timedelta(seconds=1),
+        }
+    )
+
+
+def write_synthetic_gcn_raw(
+    spark: SparkSession,
+    path: str,
+    rows: int,
+    seed: int = 0,
+    chunk_size: int = 100_000,
+    mix: Dict[str, float] = DEFAULT_MIX,
+) -> DataFrame:
+    """
+    Grava `rows` mensagens sintéticas em Parquet (em blocos, para limitar a
+    memória do driver) e retorna o DataFrame lido de volta.
+    """
+    for index, start in enumerate(range(0, rows, chunk_size)):
+        chunk = synthetic_chunk(min(chunk_size, rows - start), seed + index, start, mix)
+        frame = spark.createDataFrame(chunk, GCN_RAW_SCHEMA)
+        frame.write.mode("overwrite" if index == 0 else "append").parquet(path)
+    return spark.read.parquet(path)
@@ -195,8 +195,12 @@ LIMIT 5;
 SELECT 
     ivorn,
     role,
-    date,
+    author_date,
+    ra_deg,
+    dec_deg,
+    error_deg,
     concept,
+    params,
     document_text 
 FROM sandbox.nasa_gcn_dev.gcn_classic_voevent 
 LIMIT 5;
@@ -222,6 +226,26 @@ SELECT *
 FROM sandbox.nasa_gcn_dev.gcn_events_summarized 
 LIMIT 5;
 
+-- Eventos mais pesados: narrativa limitada (narrative_max_bytes) vs total das circulares
+SELECT 
+    event_id, 
+    circular_count, 
+    omitted_count, 
+    narrative_bytes, 
+    source_bytes
+FROM sandbox.nasa_gcn_dev.gcn_events_summarized 
+ORDER BY source_bytes DESC
+LIMIT 20;
+
+-- Circulares fora da narrativa de um evento (busca via narrative_chunks)
+SELECT c.circular_id, c.created_on, c.document_text
+FROM sandbox.nasa_gcn_dev.gcn_events_summarized g
+LATERAL VIEW explode(g.narrative_chunks) AS chunk
+JOIN sandbox.nasa_gcn_dev.gcn_circulars c
+  ON c.circular_id = chunk.circular_id
+WHERE g.event_id = 'S190425z' AND NOT chunk.in_narrative
+ORDER BY c.created_on;
+
 -- ============================================================================
 -- SILVER LAYER - Outras tabelas
 -- ============================================================================
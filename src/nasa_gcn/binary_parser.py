@@ -10,9 +10,16 @@ Referência: https://gcn.gsfc.nasa.gov/sock_pkt_def_doc.html
 Autores: Projeto NASA GCN Databricks
 """
 
+import mmap
+import os
+import stat
 import struct
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+import warnings
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 # ==============================================================================
 # MAPEAMENTO DE TIPOS DE PACOTES GCN
@@ -198,6 +205,15 @@ PACKET_TYPE_NAMES: Dict[int, str] = {
 
 # TJD (Truncated Julian Day) epoch: 1968-05-24 00:00:00 UTC (MJD 40000)
 TJD_EPOCH = datetime(1968, 5, 24, 0, 0, 0)
+_TJD_EPOCH_UTC = TJD_EPOCH.replace(tzinfo=timezone.utc)
+
+# Conversão inteira para microssegundos desde 1970-01-01 UTC (epoch Unix)
+_US_PER_DAY = 86_400_000_000
+_US_PER_CENTI = 10_000
+_TJD_EPOCH_US = (TJD_EPOCH - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+_MAX_DATETIME_US = (datetime.max - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+# Acima deste TJD o datetime estoura (ano > 9999) mesmo com SOD = 0
+_MAX_TJD = (_MAX_DATETIME_US - _TJD_EPOCH_US) // _US_PER_DAY
 
 
 def get_packet_type_name(pkt_type: int) -> str:
@@ -231,14 +247,72 @@ def tjd_sod_to_datetime(tjd: int, sod_centi: int) -> Optional[datetime]:
         >>> tjd_sod_to_datetime(10281, 4320000)  # TJD 10281 = 17 Jul 1996
         datetime.datetime(1996, 7, 17, 12, 0, 0)
     """
+    timestamp = tjd_sod_to_timestamp(tjd, sod_centi)
+    return None if timestamp is None else timestamp.replace(tzinfo=None)
+
+
+@lru_cache(maxsize=4096)
+def _tjd_day_start(tjd: int) -> Optional[datetime]:
+    """Início (UTC) do dia TJD; memorizado porque os pacotes se concentram em poucos TJDs."""
+    try:
+        return _TJD_EPOCH_UTC + timedelta(days=tjd)
+    except OverflowError:
+        return None
+
+
+def tjd_sod_to_timestamp(tjd: int, sod_centi: int) -> Optional[datetime]:
+    """
+    Converte TJD + SOD (centi-segundos) para datetime UTC com timezone.
+
+    É o valor gravado nas colunas TIMESTAMP: o Spark converte datetimes com
+    tzinfo sem depender do timezone da sessão.
+
+    Returns:
+        datetime UTC (timezone-aware) ou None se os valores forem inválidos
+    """
     if tjd <= 0 or sod_centi < 0:
         return None
 
+    day_start = _tjd_day_start(tjd)
+    if day_start is None:
+        return None
     try:
-        sod_seconds = sod_centi / 100.0
-        return TJD_EPOCH + timedelta(days=tjd, seconds=sod_seconds)
-    except (ValueError, OverflowError):
+        return day_start + timedelta(microseconds=sod_centi * _US_PER_CENTI)
+    except OverflowError:
+        return None
+
+
+def tjd_sod_to_epoch_us(
+    tjd: Union[int, np.ndarray], sod_centi: Union[int, np.ndarray]
+) -> Union[Optional[int], np.ma.MaskedArray]:
+    """
+    Converte TJD + SOD (centi-segundos) para microssegundos desde 1970-01-01 UTC,
+    usando apenas aritmética inteira.
+
+    Aceita inteiros ou arrays NumPy; a variante vetorizada retorna um
+    np.ma.MaskedArray int64 com os valores inválidos mascarados.
+
+    Returns:
+        Microssegundos desde o epoch Unix, ou None (mascarado) para TJD <= 0,
+        SOD < 0 ou datas além de datetime.max
+
+    Examples:
+        >>> tjd_sod_to_epoch_us(10281, 4320000)  # 1996-07-17 12:00:00 UTC
+        837604800000000
+    """
+    if isinstance(tjd, np.ndarray) or isinstance(sod_centi, np.ndarray):
+        tjd = np.asarray(tjd, dtype=np.int64)
+        sod_centi = np.asarray(sod_centi, dtype=np.int64)
+        valid = (tjd > 0) & (sod_centi >= 0) & (tjd <= _MAX_TJD)
+        epoch_us = _TJD_EPOCH_US + np.where(valid, tjd, 0) * _US_PER_DAY
+        epoch_us += np.where(valid, sod_centi, 0) * _US_PER_CENTI
+        valid &= epoch_us <= _MAX_DATETIME_US
+        return np.ma.masked_array(np.where(valid, epoch_us, 0), mask=~valid)
+
+    if tjd <= 0 or sod_centi < 0 or tjd > _MAX_TJD:
         return None
+    epoch_us = _TJD_EPOCH_US + tjd * _US_PER_DAY + sod_centi * _US_PER_CENTI
+    return epoch_us if epoch_us <= _MAX_DATETIME_US else None
 
 
 def centi_to_deg(value: int, scale: int = 100) -> float:
@@ -278,7 +352,7 @@ def parse_gcn_binary_packet(binary_data: bytes) -> Dict[str, Any]:
         - trig_num: int - Número do trigger (se aplicável)
         - burst_tjd: int - Truncated Julian Day
         - burst_sod_centi: int - Segundos do dia em centi-segundos
-        - burst_datetime: str - ISO timestamp
+        - burst_datetime: datetime - Timestamp UTC (timezone-aware)
         - burst_ra_deg: float - RA em graus decimais
         - burst_dec_deg: float - Dec em graus decimais
         - burst_error_deg: float - Erro de posição em graus
@@ -334,10 +408,7 @@ def parse_gcn_binary_packet(binary_data: bytes) -> Dict[str, Any]:
         result["burst_tjd"] = burst_tjd
         result["burst_sod_centi"] = burst_sod
 
-        if burst_tjd > 0 and burst_sod >= 0:
-            burst_dt = tjd_sod_to_datetime(burst_tjd, burst_sod)
-            if burst_dt:
-                result["burst_datetime"] = burst_dt.isoformat()
+        result["burst_datetime"] = tjd_sod_to_timestamp(burst_tjd, burst_sod)
 
         # Coordenadas: RA (slot 7), Dec (slot 8), Error (slot 11)
         burst_ra = longs[7]
@@ -382,7 +453,7 @@ PARSED_BINARY_SCHEMA = """
     trig_num INT,
     burst_tjd INT,
     burst_sod_centi INT,
-    burst_datetime STRING,
+    burst_datetime TIMESTAMP,
     burst_ra_deg DOUBLE,
     burst_dec_deg DOUBLE,
     burst_error_deg DOUBLE,
@@ -390,3 +461,492 @@ PARSED_BINARY_SCHEMA = """
     misc INT,
     parse_error STRING
 """
+
+
+# ==============================================================================
+# DECODIFICAÇÃO VETORIZADA (BATCH)
+# ==============================================================================
+# Para backfills de anos de histórico, o custo do parser escalar está no
+# trabalho Python por pacote (struct.unpack, dict, datetime). O caminho batch
+# enxerga N pacotes como uma única matriz (N, 40) de int32 big-endian e calcula
+# cada campo como uma coluna NumPy, produzindo exatamente os mesmos valores de
+# parse_gcn_binary_packet.
+
+PACKET_SIZE = 160
+
+# Ordem dos campos em PARSED_BINARY_SCHEMA / parse_gcn_binary_packet
+BINARY_FIELDS = (
+    "pkt_type",
+    "pkt_type_name",
+    "pkt_sernum",
+    "trig_num",
+    "burst_tjd",
+    "burst_sod_centi",
+    "burst_datetime",
+    "burst_ra_deg",
+    "burst_dec_deg",
+    "burst_error_deg",
+    "trigger_id",
+    "misc",
+    "parse_error",
+)
+
+_PACKET_DTYPE = np.dtype(">i4")
+
+# Tabelas de lookup indexadas por pkt_type
+_TYPE_NAME_TABLE = np.array(
+    [PACKET_TYPE_NAMES.get(i) for i in range(max(PACKET_TYPE_NAMES) + 1)], dtype=object
+)
+_TYPE_KNOWN_TABLE = np.array([name is not None for name in _TYPE_NAME_TABLE], dtype=bool)
+
+
+def _packet_type_names(pkt_type: np.ndarray) -> np.ndarray:
+    """Mapeia pkt_type para nomes via tabela de lookup (fallback UNKNOWN_{num})."""
+    names = np.empty(len(pkt_type), dtype=object)
+    known = np.zeros(len(pkt_type), dtype=bool)
+    in_table = (pkt_type >= 0) & (pkt_type < len(_TYPE_NAME_TABLE))
+    names[in_table] = _TYPE_NAME_TABLE[pkt_type[in_table]]
+    known[in_table] = _TYPE_KNOWN_TABLE[pkt_type[in_table]]
+
+    unknown = np.flatnonzero(~known)
+    if len(unknown):
+        values, inverse = np.unique(pkt_type[unknown], return_inverse=True)
+        labels = np.array([get_packet_type_name(int(v)) for v in values], dtype=object)
+        names[unknown] = labels[inverse]
+    return names
+
+
+def _decode_longs(longs: np.ndarray) -> Dict[str, np.ma.MaskedArray]:
+    """Calcula as colunas de parse_gcn_binary_packet a partir de uma matriz (N, 40)."""
+    n = len(longs)
+
+    def column(values: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ma.MaskedArray:
+        return np.ma.masked_array(values, mask=np.zeros(n, dtype=bool) if mask is None else mask)
+
+    pkt_type = longs[:, 0].astype(np.int32)
+    trig_num = longs[:, 4].astype(np.int32)
+
+    # int64 evita overflow de abs() em -2**31
+    burst_ra = longs[:, 7].astype(np.int64)
+    burst_dec = longs[:, 8].astype(np.int64)
+    burst_error = longs[:, 11].astype(np.int64)
+
+    # Mesma heurística de escala (100 vs 10000) do parser escalar
+    scale = np.where((burst_ra > 36000) | (burst_ra < 0) | (np.abs(burst_dec) > 9000), 10000, 100)
+    ra_deg = burst_ra / scale
+    dec_deg = burst_dec / scale
+    err_deg = np.abs(burst_error) / scale
+
+    return {
+        "pkt_type": column(pkt_type),
+        "pkt_type_name": column(_packet_type_names(pkt_type)),
+        "pkt_sernum": column(longs[:, 1].astype(np.int32)),
+        "trig_num": column(trig_num, trig_num <= 0),
+        "burst_tjd": column(longs[:, 5].astype(np.int32)),
+        "burst_sod_centi": column(longs[:, 6].astype(np.int32)),
+        "burst_datetime": tjd_sod_to_epoch_us(longs[:, 5], longs[:, 6]).astype("datetime64[us]"),
+        "burst_ra_deg": column(ra_deg, ~((ra_deg >= 0) & (ra_deg < 360))),
+        "burst_dec_deg": column(dec_deg, ~((dec_deg >= -90) & (dec_deg <= 90))),
+        "burst_error_deg": column(err_deg),
+        "trigger_id": column(longs[:, 18].astype(np.int32)),
+        "misc": column(longs[:, 19].astype(np.int32)),
+        "parse_error": column(np.full(n, None, dtype=object), np.ones(n, dtype=bool)),
+    }
+
+
+def packets_to_array(buffers: Union[bytes, bytearray, memoryview, Sequence[bytes]]) -> np.ndarray:
+    """
+    Enxerga pacotes GCN como uma matriz (N, 40) de int32 big-endian.
+
+    Um buffer contíguo (stream de pacotes back-to-back) é lido sem cópia via
+    np.frombuffer; uma sequência de pacotes é concatenada uma única vez.
+
+    Raises:
+        ValueError: se o tamanho total não for múltiplo de 160 bytes
+    """
+    if not isinstance(buffers, (bytes, bytearray, memoryview)):
+        buffers = b"".join(buffers)
+    if len(buffers) % PACKET_SIZE:
+        raise ValueError(f"Buffer size {len(buffers)} is not a multiple of {PACKET_SIZE} bytes")
+    return np.frombuffer(buffers, dtype=_PACKET_DTYPE).reshape(-1, PACKET_SIZE // 4)
+
+
+def packets_to_matrix(
+    buffers: Union[bytes, bytearray, memoryview, Sequence[Optional[bytes]]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Como packets_to_array, mas tolera pacotes None ou de tamanho inválido.
+
+    Returns:
+        Tupla (longs, valid): matriz (N, 40) com linhas zeradas para pacotes
+        inválidos e máscara booleana dos pacotes com exatamente 160 bytes
+    """
+    if isinstance(buffers, (bytes, bytearray, memoryview)):
+        longs = packets_to_array(buffers)
+        return longs, np.ones(len(longs), dtype=bool)
+
+    n = len(buffers)
+    valid = np.fromiter(
+        (b is not None and len(b) == PACKET_SIZE for b in buffers), dtype=bool, count=n
+    )
+    if valid.all():
+        return packets_to_array(buffers), valid
+
+    longs = np.zeros((n, PACKET_SIZE // 4), dtype=np.int32)
+    good = np.flatnonzero(valid)
+    if len(good):
+        longs[good] = packets_to_array([buffers[i] for i in good])
+    return longs, valid
+
+
+def parse_gcn_binary_array(longs: np.ndarray) -> Dict[str, np.ma.MaskedArray]:
+    """
+    Decodifica uma matriz (N, 40) de pacotes já vista como inteiros (ex:
+    packets_to_array ou linhas selecionadas de um arquivo mapeado), sem
+    passar por bytes. Mesmo resultado de parse_gcn_binary_batch.
+
+    Raises:
+        ValueError: se a matriz não tiver 40 colunas
+    """
+    if longs.ndim != 2 or longs.shape[1] != PACKET_SIZE // 4:
+        raise ValueError(f"Expected an (N, {PACKET_SIZE // 4}) array, got shape {longs.shape}")
+    return _decode_longs(longs)
+
+
+def parse_gcn_binary_batch(
+    buffers: Union[bytes, bytearray, memoryview, Sequence[Optional[bytes]]],
+    matrix: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Dict[str, np.ma.MaskedArray]:
+    """
+    Decodifica N pacotes binários GCN de uma vez (equivalente vetorizado de
+    parse_gcn_binary_packet).
+
+    Args:
+        buffers: Sequência de pacotes (bytes de 160, ou None/tamanho inválido,
+            que geram parse_error como no parser escalar) ou um buffer contíguo
+            com N * 160 bytes
+        matrix: Resultado de packets_to_matrix(buffers), quando já calculado
+            (ex: para decodificar também parse_packet_details_batch sem
+            converter os pacotes de novo)
+
+    Returns:
+        Dicionário coluna -> np.ma.MaskedArray de tamanho N, com as mesmas
+        chaves de parse_gcn_binary_packet (BINARY_FIELDS). Posições mascaradas
+        correspondem a None no resultado escalar.
+
+    Examples:
+        >>> cols = parse_gcn_binary_batch(packets)
+        >>> cols["burst_ra_deg"].mean()
+    """
+    buffers = buffers if isinstance(buffers, (bytes, bytearray, memoryview)) else list(buffers)
+    longs, valid = packets_to_matrix(buffers) if matrix is None else matrix
+    columns = _decode_longs(longs)
+    if valid.all():
+        return columns
+
+    # Linhas inválidas: todos os campos None e parse_error preenchido
+    errors = columns["parse_error"]
+    for i in np.flatnonzero(~valid):
+        b = buffers[i]
+        if b is None:
+            errors[i] = "binary_data is None"
+        else:
+            errors[i] = f"Invalid packet size: {len(b)} bytes (expected 160)"
+    for name in BINARY_FIELDS:
+        if name != "parse_error":
+            columns[name][~valid] = np.ma.masked
+    return columns
+
+
+def batch_to_records(columns: Dict[str, np.ma.MaskedArray]) -> List[Dict[str, Any]]:
+    """
+    Converte o resultado de parse_gcn_binary_batch em uma lista de dicionários
+    no formato de parse_gcn_binary_packet (valores mascarados viram None).
+    """
+    values = [_column_values(columns[name]) for name in BINARY_FIELDS]
+    return [dict(zip(BINARY_FIELDS, row)) for row in zip(*values)]
+
+
+def _column_values(values: np.ma.MaskedArray) -> List[Any]:
+    """tolist() da coluna; datetime64 vira datetime UTC como no parser escalar."""
+    if values.dtype.kind == "M":
+        return [v if v is None else v.replace(tzinfo=timezone.utc) for v in values.tolist()]
+    return values.tolist()
+
+
+# ==============================================================================
+# REGISTRO COMPACTO (GcnPacket)
+# ==============================================================================
+# Para consumidores em processo, parse_gcn_binary_packet aloca um dict de 13
+# chaves e constrói um datetime por pacote mesmo quando só alguns campos
+# são lidos. GcnPacket guarda apenas a referência aos 160 bytes e desempacota
+# cada slot sob demanda; campos derivados (nome do tipo, graus, datetime) são
+# calculados no primeiro acesso e memorizados em __slots__.
+
+_LONG = struct.Struct(">i")
+_COORDS = struct.Struct(">28x2i8xi")  # slots 7, 8 e 11
+_UNSET = object()
+
+
+class GcnPacket:
+    """
+    Visão preguiçosa de um pacote binário GCN de 160 bytes.
+
+    Expõe os mesmos campos de parse_gcn_binary_packet como atributos; to_dict()
+    produz exatamente o dicionário do parser escalar (ex: para Spark).
+
+    Examples:
+        >>> packet = GcnPacket(data)
+        >>> packet.pkt_type, packet.trig_num
+        (61, 1234567)
+    """
+
+    __slots__ = ("_data", "parse_error", "_datetime", "_coords")
+
+    def __init__(self, binary_data: Optional[bytes]):
+        self._data = None
+        self.parse_error: Optional[str] = None
+        self._datetime: Any = _UNSET
+        self._coords: Optional[Tuple[Optional[float], Optional[float], float]] = None
+
+        if binary_data is None:
+            self.parse_error = "binary_data is None"
+        elif len(binary_data) != PACKET_SIZE:
+            self.parse_error = f"Invalid packet size: {len(binary_data)} bytes (expected 160)"
+        else:
+            self._data = binary_data
+
+    @property
+    def data(self) -> Optional[Union[bytes, memoryview]]:
+        """Os 160 bytes do pacote (None se inválido)."""
+        return self._data
+
+    def _slot(self, slot: int) -> Optional[int]:
+        if self._data is None:
+            return None
+        return _LONG.unpack_from(self._data, 4 * slot)[0]
+
+    @property
+    def pkt_type(self) -> Optional[int]:
+        return self._slot(0)
+
+    @property
+    def pkt_type_name(self) -> Optional[str]:
+        pkt_type = self._slot(0)
+        return None if pkt_type is None else get_packet_type_name(pkt_type)
+
+    @property
+    def pkt_sernum(self) -> Optional[int]:
+        return self._slot(1)
+
+    @property
+    def trig_num(self) -> Optional[int]:
+        trig_num = self._slot(4)
+        return trig_num if trig_num is not None and trig_num > 0 else None
+
+    @property
+    def burst_tjd(self) -> Optional[int]:
+        return self._slot(5)
+
+    @property
+    def burst_sod_centi(self) -> Optional[int]:
+        return self._slot(6)
+
+    @property
+    def burst_datetime(self) -> Optional[datetime]:
+        if self._datetime is _UNSET:
+            self._datetime = None
+            if self._data is not None:
+                self._datetime = tjd_sod_to_timestamp(self._slot(5), self._slot(6))
+        return self._datetime
+
+    def _degrees(self) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        if self._data is None:
+            return None, None, None
+        if self._coords is None:
+            burst_ra, burst_dec, burst_error = _COORDS.unpack_from(self._data)
+            if burst_ra > 36000 or burst_ra < 0 or abs(burst_dec) > 9000:
+                scale = 10000
+            else:
+                scale = 100
+            ra_deg = centi_to_deg(burst_ra, scale)
+            dec_deg = centi_to_deg(burst_dec, scale)
+            self._coords = (
+                ra_deg if 0 <= ra_deg < 360 else None,
+                dec_deg if -90 <= dec_deg <= 90 else None,
+                centi_to_deg(abs(burst_error), scale),
+            )
+        return self._coords
+
+    @property
+    def burst_ra_deg(self) -> Optional[float]:
+        return self._degrees()[0]
+
+    @property
+    def burst_dec_deg(self) -> Optional[float]:
+        return self._degrees()[1]
+
+    @property
+    def burst_error_deg(self) -> Optional[float]:
+        return self._degrees()[2]
+
+    @property
+    def trigger_id(self) -> Optional[int]:
+        return self._slot(18)
+
+    @property
+    def misc(self) -> Optional[int]:
+        return self._slot(19)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte para o dicionário de parse_gcn_binary_packet."""
+        if self._data is None:
+            result: Dict[str, Any] = dict.fromkeys(BINARY_FIELDS)
+            result["parse_error"] = self.parse_error
+            return result
+        # Com todos os campos pedidos, um único unpack de 40 slots é mais
+        # barato que os acessos preguiçosos campo a campo
+        return parse_gcn_binary_packet(self._data)
+
+    def __repr__(self) -> str:
+        if self._data is None:
+            return f"GcnPacket(parse_error={self.parse_error!r})"
+        return f"GcnPacket(pkt_type={self.pkt_type}, trig_num={self.trig_num})"
+
+
+# ==============================================================================
+# STREAMS DE PACOTES (iter_packets)
+# ==============================================================================
+# O protocolo de socket do GCN e os dumps arquivados são pacotes de 160 bytes
+# back-to-back. iter_packets percorre um memoryview do buffer (ou um mmap do
+# arquivo) em registros de 160 bytes e entrega cada pacote como GcnPacket sobre
+# uma fatia do memoryview, sem copiar bytes. Tipos fora de PACKET_TYPE_NAMES
+# são pacotes válidos (tipos novos ou não listados); o alinhamento só é
+# questionado quando o cabeçalho do registro é impossível (pkt_type,
+# pkt_sernum, pkt_hop_cnt ou pkt_sod fora da faixa do protocolo). Nesse caso o
+# stream é ressincronizado byte a byte no próximo cabeçalho válido seguido de
+# outro (ou do fim), e o trecho pulado (ou um pacote final truncado) é
+# reportado a on_error.
+
+PacketSource = Union[bytes, bytearray, memoryview, mmap.mmap, str, os.PathLike, BinaryIO]
+
+# on_error(offset, tamanho em bytes, mensagem)
+PacketStreamErrorHandler = Callable[[int, int, str], None]
+
+
+def _map_file(file: BinaryIO) -> memoryview:
+    """mmap somente-leitura de um arquivo regular; outros (pipes, sockets) são lidos."""
+    try:
+        fileno = file.fileno()
+    except (AttributeError, OSError):
+        return memoryview(file.read())
+    info = os.fstat(fileno)
+    if not stat.S_ISREG(info.st_mode):
+        return memoryview(file.read())
+    if info.st_size == 0:
+        return memoryview(b"")
+    # O mmap duplica o descritor e vive enquanto houver fatias (pacotes) apontando para ele
+    return memoryview(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ))
+
+
+def _packet_view(source: PacketSource) -> memoryview:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            return _map_file(file)
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(source)
+        return view if view.ndim == 1 and view.itemsize == 1 else view.cast("B")
+    return _map_file(source)
+
+
+# Cabeçalho de um pacote do socket: pkt_type, pkt_sernum, pkt_hop_cnt, pkt_sod
+_HEADER = struct.Struct(">4i")
+_MAX_PKT_TYPE = 1000
+_MAX_HOP_COUNT = 255
+# pkt_sod em centi-segundos, com folga para um leap second
+_MAX_PKT_SOD = 86_401 * 100
+
+
+def _valid_header(view: memoryview, offset: int) -> bool:
+    pkt_type, sernum, hop_cnt, pkt_sod = _HEADER.unpack_from(view, offset)
+    return (
+        0 < pkt_type < _MAX_PKT_TYPE
+        and sernum >= 0
+        and 0 <= hop_cnt <= _MAX_HOP_COUNT
+        and 0 <= pkt_sod < _MAX_PKT_SOD
+    )
+
+
+def _resync(view: memoryview, start: int, stop: int, end: int) -> Optional[int]:
+    """Primeiro offset em [start, stop) com cabeçalho válido seguido de outro ou do fim."""
+    for candidate in range(start, min(stop, end - PACKET_SIZE + 1)):
+        if _valid_header(view, candidate):
+            following = candidate + PACKET_SIZE
+            if following == end or (
+                end - following >= PACKET_SIZE and _valid_header(view, following)
+            ):
+                return candidate
+    return None
+
+
+def _warn_stream_error(offset: int, size: int, message: str) -> None:
+    warnings.warn(message, stacklevel=3)
+
+
+def iter_packets(
+    source: PacketSource, on_error: Optional[PacketStreamErrorHandler] = None
+) -> Iterator[GcnPacket]:
+    """
+    Itera os pacotes de um stream de pacotes GCN de 160 bytes back-to-back.
+
+    Args:
+        source: Buffer (bytes, bytearray, memoryview, mmap), caminho de um
+            arquivo (aberto via mmap) ou arquivo binário aberto
+        on_error: Chamado com (offset, tamanho, mensagem) para cada trecho
+            desalinhado pulado e para um pacote final truncado (padrão:
+            warnings.warn)
+
+    Yields:
+        GcnPacket sobre uma fatia do buffer (sem cópia), em ordem
+
+    Examples:
+        >>> for packet in iter_packets("gcn_dump.bin"):
+        ...     if packet.pkt_type == 61:
+        ...         print(packet.trig_num, packet.burst_ra_deg)
+    """
+    view = _packet_view(source)
+    report = on_error or _warn_stream_error
+    end = len(view)
+    last = end - PACKET_SIZE  # último offset com um pacote completo
+    offset = 0
+    # Cada cabeçalho é conferido uma vez: a validade do seguinte é reaproveitada
+    valid = last >= 0 and _valid_header(view, 0)
+    while offset <= last:
+        following = offset + PACKET_SIZE
+        next_valid = following <= last and _valid_header(view, following)
+        if valid:
+            # Um pacote válido só é descartado se o seguinte não é e outro pacote
+            # alinhado começa dentro dele (ex: pacote cortado por uma reconexão do socket)
+            resync = None
+            if following <= last and not next_valid:
+                resync = _resync(view, offset + 1, following, end)
+            if resync is None:
+                yield GcnPacket(view[offset:following])
+                offset, valid = following, next_valid
+                continue
+        else:
+            resync = _resync(view, offset + 1, end, end)
+        resync = end if resync is None else resync
+        report(
+            offset,
+            resync - offset,
+            f"Misaligned data at offset {offset}: skipped {resync - offset} bytes",
+        )
+        # _resync só devolve offsets com cabeçalho válido
+        offset, valid = resync, True
+    if offset < end:
+        report(
+            offset,
+            end - offset,
+            f"Truncated packet at offset {offset}: {end - offset} bytes (expected 160)",
+        )
@@ -0,0 +1,361 @@
+"""
+Decodificação de pacotes binários GCN no Spark.
+
+Três engines equivalentes para decodificar a coluna `value`, tanto nos campos
+genéricos (parse_binary) quanto nos específicos por tipo de pacote
+(packet_details, a partir do registro de packet_layouts):
+
+- "sql": expressões Catalyst (binary_columns), sem worker Python
+- "pandas": pandas_udf vetorizado sobre batches Arrow, usando
+  parse_gcn_binary_batch em uma única passada colunar
+- "scalar": UDF linha a linha com parse_gcn_binary_packet, mantida como referência
+
+decode_binary junta as duas structs numa só coluna: cada engine lê `value`
+uma vez (um único round trip Arrow no pandas, uma única conversão para a
+matriz (N, 40)) em vez de decodificar o pacote duas vezes.
+
+O tamanho dos batches Arrow é controlado por
+`spark.sql.execution.arrow.maxRecordsPerBatch` (configuração do pipeline).
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import Column
+from pyspark.sql import functions as F
+from pyspark.sql.functions import pandas_udf, udf
+from pyspark.sql.types import (
+    BooleanType,
+    DoubleType,
+    IntegerType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+from nasa_gcn.binary_parser import (
+    BINARY_FIELDS,
+    PACKET_SIZE,
+    PACKET_TYPE_NAMES,
+    TJD_EPOCH,
+    packets_to_matrix,
+    parse_gcn_binary_batch,
+    parse_gcn_binary_packet,
+)
+from nasa_gcn.packet_layouts import (
+    DETAIL_FIELDS,
+    PACKET_LAYOUTS,
+    parse_packet_details,
+    parse_packet_details_batch,
+)
+
+BINARY_ENGINES = ("sql", "pandas", "scalar")
+
+# Equivalente a PARSED_BINARY_SCHEMA como StructType: UDFs definidas no nível do
+# módulo são reimportadas nos workers, onde não há SparkContext para parsear DDL
+PARSED_BINARY_STRUCT = StructType(
+    [
+        StructField("pkt_type", IntegerType()),
+        StructField("pkt_type_name", StringType()),
+        StructField("pkt_sernum", IntegerType()),
+        StructField("trig_num", IntegerType()),
+        StructField("burst_tjd", IntegerType()),
+        StructField("burst_sod_centi", IntegerType()),
+        StructField("burst_datetime", TimestampType()),
+        StructField("burst_ra_deg", DoubleType()),
+        StructField("burst_dec_deg", DoubleType()),
+        StructField("burst_error_deg", DoubleType()),
+        StructField("trigger_id", IntegerType()),
+        StructField("misc", IntegerType()),
+        StructField("parse_error", StringType()),
+    ]
+)
+
+
+def _to_pandas(values: np.ma.MaskedArray) -> pd.Series:
+    """Converte uma coluna mascarada em Series nullable (máscara vira null no Arrow)."""
+    mask = np.ma.getmaskarray(values)
+    data = np.ma.getdata(values)
+    if data.dtype.kind == "i":
+        return pd.Series(pd.arrays.IntegerArray(data, mask))
+    if data.dtype.kind == "f":
+        return pd.Series(pd.arrays.FloatingArray(data, mask))
+    if data.dtype.kind == "b":
+        return pd.Series(pd.arrays.BooleanArray(data, mask))
+    if data.dtype.kind == "M":
+        # UTC explícito: datetimes sem timezone seriam lidos no timezone da sessão
+        return pd.Series(np.where(mask, np.datetime64("NaT"), data)).dt.tz_localize("UTC")
+    return pd.Series(np.where(mask, None, data), dtype=object)
+
+
+def parse_binary_frame(values: pd.Series) -> pd.DataFrame:
+    """
+    Decodifica uma Series de pacotes binários em um DataFrame com as colunas
+    de PARSED_BINARY_STRUCT.
+    """
+    columns = parse_gcn_binary_batch(values.tolist())
+    return pd.DataFrame({name: _to_pandas(columns[name]) for name in BINARY_FIELDS})
+
+
+@pandas_udf(PARSED_BINARY_STRUCT)
+def parse_binary_pandas_udf(batches: Iterator[pd.Series]) -> Iterator[pd.DataFrame]:
+    for values in batches:
+        yield parse_binary_frame(values)
+
+
+parse_binary_udf = udf(parse_gcn_binary_packet, PARSED_BINARY_STRUCT)
+
+
+# ==============================================================================
+# ENGINE SQL (expressões Catalyst)
+# ==============================================================================
+
+_UNIX_EPOCH = datetime(1970, 1, 1)
+_US_PER_DAY = 86_400_000_000
+_US_PER_CENTI = 10_000
+_TJD_EPOCH_US = (TJD_EPOCH - _UNIX_EPOCH) // timedelta(microseconds=1)
+# Maior timestamp representável como datetime (e TIMESTAMP do Spark)
+_MAX_EPOCH_US = (datetime.max - _UNIX_EPOCH) // timedelta(microseconds=1)
+_MAX_TJD = (_MAX_EPOCH_US - _TJD_EPOCH_US) // _US_PER_DAY
+
+
+def _slot(packet: Column, index: int) -> Column:
+    """Lê o inteiro big-endian com sinal do slot `index` (offset 4 * index)."""
+    unsigned = F.conv(F.hex(F.substring(packet, 4 * index + 1, 4)), 16, 10).cast("long")
+    # Complemento de dois sem CASE WHEN: uma única referência a `unsigned`
+    return (unsigned + 2**31) % 2**32 - 2**31
+
+
+def _burst_timestamp(tjd: Column, sod_centi: Column) -> Column:
+    """
+    Equivalente a tjd_sod_to_timestamp: microssegundos desde o epoch Unix com
+    aritmética inteira e timestamp_micros (independe do timezone da sessão).
+    """
+    # TJD fora do range vira null antes da multiplicação (evita overflow de long)
+    day_us = F.when((tjd > 0) & (tjd <= _MAX_TJD), tjd * _US_PER_DAY + _TJD_EPOCH_US)
+    epoch_us = day_us + sod_centi * _US_PER_CENTI
+    return F.when((sod_centi >= 0) & (epoch_us <= _MAX_EPOCH_US), F.timestamp_micros(epoch_us))
+
+
+def binary_columns(value: Union[str, Column] = "value") -> List[Column]:
+    """
+    Decodifica pacotes binários GCN apenas com expressões Spark SQL.
+
+    Reproduz parse_gcn_binary_packet campo a campo (nomes de tipo via literal
+    `map`, conversão TJD/SOD, heurística de escala e validação de ranges)
+    sem serializar linhas para um worker Python.
+
+    Args:
+        value: Coluna (ou nome) com os bytes do pacote
+
+    Returns:
+        Lista de colunas com os nomes de BINARY_FIELDS, na mesma ordem
+
+    Examples:
+        >>> df.select("topic", *binary_columns("value"))
+    """
+    value = F.col(value) if isinstance(value, str) else value
+    size = F.length(value)
+    valid = value.isNotNull() & (size == PACKET_SIZE)
+    packet = F.when(valid, value)
+
+    pkt_type = _slot(packet, 0)
+    trig_num = _slot(packet, 4)
+    burst_tjd = _slot(packet, 5)
+    burst_sod = _slot(packet, 6)
+    burst_ra = _slot(packet, 7)
+    burst_dec = _slot(packet, 8)
+    burst_error = _slot(packet, 11)
+
+    type_names = F.create_map(
+        *[F.lit(item) for pair in sorted(PACKET_TYPE_NAMES.items()) for item in pair]
+    )
+    pkt_type_name = F.coalesce(
+        F.try_element_at(type_names, pkt_type.cast("int")),
+        F.concat(F.lit("UNKNOWN_"), pkt_type.cast("string")),
+    )
+
+    # Mesma heurística de escala (100 vs 10000) do parser escalar
+    scale = F.when(
+        (burst_ra > 36000) | (burst_ra < 0) | (F.abs(burst_dec) > 9000), 10000
+    ).otherwise(100)
+    ra_deg = burst_ra / scale
+    dec_deg = burst_dec / scale
+
+    parse_error = F.when(value.isNull(), F.lit("binary_data is None")).when(
+        ~valid,
+        F.concat(
+            F.lit("Invalid packet size: "),
+            size.cast("string"),
+            F.lit(f" bytes (expected {PACKET_SIZE})"),
+        ),
+    )
+
+    columns = {
+        "pkt_type": pkt_type.cast("int"),
+        "pkt_type_name": F.when(valid, pkt_type_name),
+        "pkt_sernum": _slot(packet, 1).cast("int"),
+        "trig_num": F.when(trig_num > 0, trig_num).cast("int"),
+        "burst_tjd": burst_tjd.cast("int"),
+        "burst_sod_centi": burst_sod.cast("int"),
+        "burst_datetime": _burst_timestamp(burst_tjd, burst_sod),
+        "burst_ra_deg": F.when((ra_deg >= 0) & (ra_deg < 360), ra_deg),
+        "burst_dec_deg": F.when((dec_deg >= -90) & (dec_deg <= 90), dec_deg),
+        "burst_error_deg": F.abs(burst_error) / scale,
+        "trigger_id": _slot(packet, 18).cast("int"),
+        "misc": _slot(packet, 19).cast("int"),
+        "parse_error": parse_error,
+    }
+    return [columns[name].alias(name) for name in BINARY_FIELDS]
+
+
+def parse_binary(value: Union[str, Column] = "value", engine: str = "sql") -> Column:
+    """
+    Retorna uma coluna struct (PARSED_BINARY_STRUCT) com o pacote decodificado
+    pela engine escolhida.
+
+    Args:
+        value: Coluna (ou nome) com os bytes do pacote
+        engine: "sql", "pandas" ou "scalar" (ver BINARY_ENGINES)
+
+    Raises:
+        ValueError: se a engine não for suportada
+    """
+    if engine == "sql":
+        return F.struct(*binary_columns(value))
+    if engine == "pandas":
+        return parse_binary_pandas_udf(value)
+    if engine == "scalar":
+        return parse_binary_udf(value)
+    raise ValueError(f"Unknown binary engine: {engine!r} (expected one of {BINARY_ENGINES})")
+
+
+# ==============================================================================
+# CAMPOS ESPECÍFICOS POR TIPO (packet_layouts)
+# ==============================================================================
+
+_SPARK_TYPES = {"BOOLEAN": BooleanType(), "INT": IntegerType(), "DOUBLE": DoubleType()}
+
+# Equivalente a PACKET_DETAILS_SCHEMA como StructType (ver PARSED_BINARY_STRUCT)
+PACKET_DETAILS_STRUCT = StructType(
+    [
+        StructField(column, _SPARK_TYPES[f.spark_type])
+        for layout in PACKET_LAYOUTS
+        for column, f in zip(layout.columns, layout.fields)
+    ]
+)
+
+
+def packet_details_frame(values: pd.Series) -> pd.DataFrame:
+    """
+    Decodifica uma Series de pacotes binários em um DataFrame com as colunas
+    de PACKET_DETAILS_STRUCT.
+    """
+    columns = parse_packet_details_batch(values.tolist())
+    return pd.DataFrame({name: _to_pandas(columns[name]) for name in DETAIL_FIELDS})
+
+
+@pandas_udf(PACKET_DETAILS_STRUCT)
+def packet_details_pandas_udf(batches: Iterator[pd.Series]) -> Iterator[pd.DataFrame]:
+    for values in batches:
+        yield packet_details_frame(values)
+
+
+packet_details_udf = udf(parse_packet_details, PACKET_DETAILS_STRUCT)
+
+
+def packet_detail_columns(value: Union[str, Column] = "value") -> List[Column]:
+    """
+    Versão Spark SQL de parse_packet_details: para cada campo do registro,
+    lê o slot apenas quando pkt_type pertence à família do layout.
+
+    Returns:
+        Lista de colunas com os nomes de DETAIL_FIELDS, na mesma ordem
+    """
+    value = F.col(value) if isinstance(value, str) else value
+    packet = F.when(value.isNotNull() & (F.length(value) == PACKET_SIZE), value)
+    pkt_type = _slot(packet, 0)
+
+    columns = []
+    for layout in PACKET_LAYOUTS:
+        in_family = pkt_type.isin(list(layout.pkt_types))
+        for column, packet_field in zip(layout.columns, layout.fields):
+            raw = _slot(packet, packet_field.slot)
+            if packet_field.bit is not None:
+                converted = F.shiftright(raw, packet_field.bit).bitwiseAND(1) == 1
+            elif packet_field.divisor is not None:
+                converted = raw / packet_field.divisor
+            else:
+                converted = raw.cast("int")
+            columns.append(F.when(in_family, converted).alias(column))
+    return columns
+
+
+def packet_details(value: Union[str, Column] = "value", engine: str = "sql") -> Column:
+    """
+    Retorna uma coluna struct (PACKET_DETAILS_STRUCT) com os campos específicos
+    do tipo de pacote, decodificados pela engine escolhida (ver parse_binary).
+    """
+    if engine == "sql":
+        return F.struct(*packet_detail_columns(value))
+    if engine == "pandas":
+        return packet_details_pandas_udf(value)
+    if engine == "scalar":
+        return packet_details_udf(value)
+    raise ValueError(f"Unknown binary engine: {engine!r} (expected one of {BINARY_ENGINES})")
+
+
+# ==============================================================================
+# DECODIFICAÇÃO ÚNICA (parse_binary + packet_details)
+# ==============================================================================
+
+DECODED_BINARY_STRUCT = StructType(PARSED_BINARY_STRUCT.fields + PACKET_DETAILS_STRUCT.fields)
+
+
+def decode_binary_frame(values: pd.Series) -> pd.DataFrame:
+    """
+    Decodifica uma Series de pacotes binários em um DataFrame com as colunas
+    de DECODED_BINARY_STRUCT, convertendo os pacotes para a matriz (N, 40)
+    uma única vez.
+    """
+    packets = values.tolist()
+    matrix = packets_to_matrix(packets)
+    columns = {
+        **parse_gcn_binary_batch(packets, matrix=matrix),
+        **parse_packet_details_batch(packets, matrix=matrix),
+    }
+    return pd.DataFrame({name: _to_pandas(columns[name]) for name in DECODED_BINARY_STRUCT.names})
+
+
+@pandas_udf(DECODED_BINARY_STRUCT)
+def decode_binary_pandas_udf(batches: Iterator[pd.Series]) -> Iterator[pd.DataFrame]:
+    for values in batches:
+        yield decode_binary_frame(values)
+
+
+def _decode_binary_packet(binary_data: Optional[bytes]) -> dict:
+    return {**parse_gcn_binary_packet(binary_data), **parse_packet_details(binary_data)}
+
+
+decode_binary_udf = udf(_decode_binary_packet, DECODED_BINARY_STRUCT)
+
+
+def decode_binary(value: Union[str, Column] = "value", engine: str = "sql") -> Column:
+    """
+    Retorna uma coluna struct (DECODED_BINARY_STRUCT) com os campos de
+    parse_binary seguidos dos de packet_details, decodificados numa única
+    passada pela engine escolhida.
+
+    Examples:
+        >>> df.select(decode_binary("value", "pandas").alias("p")).select("p.*")
+    """
+    if engine == "sql":
+        return F.struct(*binary_columns(value), *packet_detail_columns(value))
+    if engine == "pandas":
+        return decode_binary_pandas_udf(value)
+    if engine == "scalar":
+        return decode_binary_udf(value)
+    raise ValueError(f"Unknown binary engine: {engine!r} (expected one of {BINARY_ENGINES})")
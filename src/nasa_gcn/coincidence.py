@@ -0,0 +1,102 @@
+"""
+Join de coincidência temporal (e opcionalmente espacial) entre duas tabelas.
+
+O predicado ingênuo ABS(t_esq - t_dir) <= janela não é de igualdade, então o
+Spark o executa como nested loop (BroadcastNestedLoopJoin ou cartesiano). Aqui
+os dois lados recebem o balde floor(t / janela): todo par dentro da janela
+cai no mesmo balde ou num balde vizinho. O lado esquerdo é expandido para os
+3 baldes (b - 1, b, b + 1) e o direito fica com o seu, então o join vira
+equi-join por balde (hash/sort-merge) e cada par candidato aparece uma única
+vez. O intervalo exato é aplicado depois como condição de range sobre os
+timestamps, que é também o que o Spark usa para descartar estado em joins
+stream-stream com watermark.
+
+Com posições, a chave do join ganha a célula HEALPix (spatial.spatial_join):
+cada linha do lado esquerdo expande para célula + 8 vizinhas na ordem de
+cover_order(erro + raio máximo) e os candidatos são filtrados pela distância
+angular. Acima de spatial.COVER_MAX_RADIUS_DEG (~29°, erros de GBM e de
+ondas gravitacionais) nem a ordem 0 cobre o raio: essas linhas juntam só
+pelo balde de tempo e a distância é aplicada como filtro.
+"""
+
+from typing import Optional, Tuple, Union
+
+from pyspark.sql import Column, DataFrame
+from pyspark.sql import functions as F
+
+from nasa_gcn.spatial import spatial_join
+
+Position = Tuple[str, str, str]
+
+
+def time_bucket(ts: Union[str, Column], window_s: float) -> Column:
+    """Balde floor(t / window_s) (LONG) de uma coluna TIMESTAMP."""
+    if window_s <= 0:
+        raise ValueError(f"window_s must be positive, got {window_s}")
+    ts = F.col(ts) if isinstance(ts, str) else ts
+    return F.floor(F.unix_micros(ts) / F.lit(window_s * 1_000_000)).cast("long")
+
+
+def _seconds(window_s: float) -> Column:
+    return F.expr(f"INTERVAL '{window_s}' SECOND")
+
+
+def coincidence_join(
+    left: DataFrame,
+    right: DataFrame,
+    window_s: float,
+    left_time: str,
+    right_time: str,
+    left_position: Optional[Position] = None,
+    right_position: Optional[Position] = None,
+    window_deg: float = 0.0,
+    max_radius_deg: Optional[float] = None,
+    engine: str = "pandas",
+) -> DataFrame:
+    """
+    Pares de linhas com |t_dir - t_esq| <= window_s, com a coluna time_diff_s
+    (t_dir - t_esq, em segundos). As colunas dos dois lados não devem colidir
+    (renomeie antes).
+
+    Com left_position/right_position (ra, dec, erro em graus, erro null conta
+    como 0) os pares também precisam de círculos de erro sobrepostos
+    (distância <= erro_esq + erro_dir + window_deg), e a coluna
+    angular_distance_deg é acrescentada. O join espacial é o de
+    spatial.spatial_join com o balde de tempo como condição extra: cada
+    linha da esquerda recebe a sua ordem HEALPix e max_radius_deg limita
+    erro_dir + window_deg (um limite da soma com erro_esq também serve).
+    Linhas acima do limite ou de spatial.COVER_MAX_RADIUS_DEG não são
+    perdidas: caem no join só por balde de tempo, com a distância como
+    filtro. Sem max_radius_deg ele é calculado com uma consulta de max na
+    direita, o que não é possível em DataFrames de streaming.
+
+    Em streaming, aplique withWatermark em left_time e right_time antes: a
+    condição de range sobre os timestamps limita o estado do join.
+    """
+    spatial = left_position is not None or right_position is not None
+    if spatial and (left_position is None or right_position is None):
+        raise ValueError("left_position and right_position must be given together")
+
+    bucket = time_bucket(left_time, window_s)
+    left = left.withColumn("_time_bucket", F.explode(F.array(bucket - 1, bucket, bucket + 1)))
+    right = right.withColumn("_time_key", time_bucket(right_time, window_s))
+    lt, rt = F.col(left_time), F.col(right_time)
+    condition = (F.col("_time_bucket") == F.col("_time_key")) & rt.between(
+        lt - _seconds(window_s), lt + _seconds(window_s)
+    )
+    if spatial:
+        joined = spatial_join(
+            left,
+            right,
+            left_position,
+            right_position,
+            window_deg=window_deg,
+            max_radius_deg=max_radius_deg,
+            on=condition,
+            engine=engine,
+        )
+    else:
+        joined = left.join(right, condition)
+    return joined.withColumn(
+        "time_diff_s", (F.unix_micros(rt) - F.unix_micros(lt)) / 1_000_000
+    ).drop("_time_bucket", "_time_key")
@@ -7,7 +7,10 @@ Credentials are loaded from:
 """
 
 import os
+import re
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Mapping, Optional, Tuple
 
 # Try to load .env file if it exists (for local development)
 try:
@@ -40,6 +43,14 @@ def _get_credential(name: str) -> str:
     return os.getenv(name, "")
 
 
+def _get_setting(name: str) -> str:
+    """
+    Get a pipeline/job setting (e.g. 'nasa_gcn.kafka.mode') from Spark config or
+    from the environment variable with the upper-case name ('NASA_GCN_KAFKA_MODE').
+    """
+    return _get_credential(name) or os.getenv(name.upper().replace(".", "_"), "")
+
+
 # Kafka broker settings
 KAFKA_BOOTSTRAP_SERVERS = "kafka.gcn.nasa.gov:9092"
 KAFKA_SECURITY_PROTOCOL = "SASL_SSL"
@@ -74,9 +85,171 @@ GCN_COMBINED_PATTERN = "|".join(GCN_TOPIC_PATTERNS)
 # Include heartbeat for testing
 GCN_INCLUDE_HEARTBEAT = True
 
+# Topic family -> topic prefix (ending in ".") or exact topic name.
+# gcn_raw carries the family as `topic_family` so each silver stream only reads
+# its own files (or, in the "routed" layout, its own bronze table).
+TOPIC_FAMILIES = {
+    "text": "gcn.classic.text.",
+    "voevent": "gcn.classic.voevent.",
+    "binary": "gcn.classic.binary.",
+    "notices": "gcn.notices.",
+    "circulars": "gcn.circulars",
+    "gwalert": "igwn.gwalert",
+    "heartbeat": "gcn.heartbeat",
+}
+
+# Family for topics that match none of the above
+OTHER_TOPIC_FAMILY = "other"
+
+# Physical layout of the bronze layer (pipeline setting nasa_gcn.bronze_layout):
+#   flat        -> gcn_raw with no partitioning (default, the layout of existing tables)
+#   partitioned -> gcn_raw partitioned by topic_family
+#   clustered   -> gcn_raw liquid-clustered by topic_family
+#   routed      -> one gcn_raw_<family> table per family, fed by dlt.append_flow
+# The last three are opt-in: switching an existing gcn_raw requires a full refresh
+# (see BRONZE_BACKFILL_SETTINGS to carry the old history over).
+BRONZE_LAYOUTS = ("flat", "partitioned", "clustered", "routed")
+
+# One-shot backfill of the bronze layer after a layout change: rows of the backup
+# table with kafka_timestamp before the cutoff are copied once, and the Kafka
+# stream keeps only messages from the cutoff on, so the two never overlap.
+BRONZE_BACKFILL_SETTINGS = ("nasa_gcn.bronze_backfill_table", "nasa_gcn.bronze_backfill_before")
+
+
+def get_topic_family(topic: str) -> str:
+    """Return the topic family (key of TOPIC_FAMILIES) of a Kafka topic."""
+    for family, match in TOPIC_FAMILIES.items():
+        if topic.startswith(match) if match.endswith(".") else topic == match:
+            return family
+    return OTHER_TOPIC_FAMILY
+
+
+# Classic notice type prefixes of instruments that number their triggers
+# independently of the rest of the mission (GBM and LAT trigger numbers overlap),
+# so gcn_triggers keys them by instrument. Other classic topics key by the first
+# token of the notice type (SWIFT_BAT/XRT/UVOT share the BAT trigger number).
+CLASSIC_INSTRUMENT_MISSIONS = {
+    "FERMI_GBM_": "fermi_gbm",
+    "FERMI_LAT_": "fermi_lat",
+}
+
+
+def get_topic_mission(topic: str) -> Optional[str]:
+    """
+    Return the lowercase mission of a classic or notices topic (None for others),
+    or the instrument for CLASSIC_INSTRUMENT_MISSIONS.
+    Ex: 'gcn.classic.voevent.FERMI_GBM_FIN_POS' -> 'fermi_gbm',
+    'gcn.classic.text.SWIFT_XRT_POSITION' -> 'swift',
+    'gcn.notices.swift.bat.guano' -> 'swift'
+    """
+    if topic.startswith("gcn.classic."):
+        notice_type = topic.rsplit(".", 1)[1]
+        for prefix, mission in CLASSIC_INSTRUMENT_MISSIONS.items():
+            if notice_type.startswith(prefix):
+                return mission
+        return notice_type.split("_", 1)[0].lower()
+    if topic.startswith(TOPIC_FAMILIES["notices"]):
+        parts = topic.split(".")
+        return parts[2].lower() if len(parts) > 2 else None
+    return None
+
+
+def get_topic_pattern(family: str) -> str:
+    """Return the Kafka subscribePattern regex for a single topic family."""
+    match = TOPIC_FAMILIES[family]
+    pattern = re.escape(match)
+    return f"{pattern}.*" if match.endswith(".") else pattern
+
+
+# Ingest mode of the Kafka bronze stream (pipeline setting nasa_gcn.kafka.mode):
+#   bounded -> every micro-batch reads at most max_offsets_per_trigger offsets;
+#              min_offsets_per_trigger / max_trigger_delay may hold small
+#              batches back to coalesce them
+#   catchup -> large cap (catchup_max_offsets_per_trigger) and no minimum, with
+#              a short trigger interval. The Kafka source reads
+#              min(lag, cap) offsets per trigger, so a lagging stream drains the
+#              backlog in large bounded batches and, once caught up, each
+#              trigger only reads what arrived since the previous one.
+KAFKA_INGEST_MODES = ("bounded", "catchup")
+
+# Pipeline settings -> defaults (None = option not set)
+KAFKA_SETTINGS = {
+    "nasa_gcn.kafka.mode": "bounded",
+    "nasa_gcn.kafka.starting_offsets": "earliest",
+    "nasa_gcn.kafka.max_offsets_per_trigger": "100000",
+    "nasa_gcn.kafka.catchup_max_offsets_per_trigger": "1000000",
+    "nasa_gcn.kafka.min_offsets_per_trigger": None,
+    "nasa_gcn.kafka.max_trigger_delay": None,
+    "nasa_gcn.kafka.min_partitions": None,
+    "nasa_gcn.kafka.trigger_interval": None,
+}
 
-def get_kafka_options() -> dict:
-    """Return Kafka connection options for Spark readStream."""
+# Trigger interval used by the catchup mode when none is configured
+CATCHUP_TRIGGER_INTERVAL = "1 second"
+
+
+def _get_kafka_settings(settings: Optional[Mapping[str, str]]) -> dict:
+    """Resolve KAFKA_SETTINGS from `settings` (or Spark config / env), with defaults."""
+    resolved = {}
+    for name, default in KAFKA_SETTINGS.items():
+        value = settings.get(name) if settings is not None else _get_setting(name)
+        resolved[name.rsplit(".", 1)[1]] = value or default
+
+    if resolved["mode"] not in KAFKA_INGEST_MODES:
+        raise ValueError(
+            f"Unknown kafka mode: {resolved['mode']!r} (expected one of {KAFKA_INGEST_MODES})"
+        )
+    for name in (
+        "max_offsets_per_trigger",
+        "catchup_max_offsets_per_trigger",
+        "min_offsets_per_trigger",
+        "min_partitions",
+    ):
+        value = resolved[name]
+        if value is not None and (not str(value).isdigit() or int(value) <= 0):
+            raise ValueError(f"nasa_gcn.kafka.{name} must be a positive integer, got {value!r}")
+    return resolved
+
+
+def get_kafka_throughput_options(settings: Optional[Mapping[str, str]] = None) -> dict:
+    """
+    Return the Kafka source options that bound each micro-batch
+    (startingOffsets, maxOffsetsPerTrigger, minOffsetsPerTrigger,
+    maxTriggerDelay, minPartitions) for the configured KAFKA_INGEST_MODES mode.
+    """
+    resolved = _get_kafka_settings(settings)
+    options = {"startingOffsets": resolved["starting_offsets"]}
+    if resolved["mode"] == "catchup":
+        options["maxOffsetsPerTrigger"] = resolved["catchup_max_offsets_per_trigger"]
+    else:
+        options["maxOffsetsPerTrigger"] = resolved["max_offsets_per_trigger"]
+        if resolved["min_offsets_per_trigger"]:
+            options["minOffsetsPerTrigger"] = resolved["min_offsets_per_trigger"]
+            if resolved["max_trigger_delay"]:
+                options["maxTriggerDelay"] = resolved["max_trigger_delay"]
+    if resolved["min_partitions"]:
+        options["minPartitions"] = resolved["min_partitions"]
+    return options
+
+
+def get_trigger_interval(settings: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """
+    Return the micro-batch trigger interval of the bronze stream
+    (e.g. '10 seconds'), or None to keep the pipeline default.
+    """
+    resolved = _get_kafka_settings(settings)
+    if resolved["trigger_interval"]:
+        return resolved["trigger_interval"]
+    return CATCHUP_TRIGGER_INTERVAL if resolved["mode"] == "catchup" else None
+
+
+def get_kafka_options(settings: Optional[Mapping[str, str]] = None) -> dict:
+    """
+    Return Kafka connection and throughput options for Spark readStream.
+
+    Throughput settings (see KAFKA_SETTINGS) are read from `settings` when
+    given, otherwise from the Spark configuration / environment.
+    """
     # Get credentials at runtime (allows Spark config to be available)
     client_id = _get_credential("GCN_CLIENT_ID")
     client_secret = _get_credential("GCN_CLIENT_SECRET")
@@ -99,7 +272,7 @@ def get_kafka_options() -> dict:
         ),
         "kafka.sasl.oauthbearer.token.endpoint.url": OAUTH_TOKEN_ENDPOINT,
         "failOnDataLoss": "false",
-        "startingOffsets": "earliest",
+        **get_kafka_throughput_options(settings),
     }
 
     # Use subscribePattern for flexible matching
@@ -109,3 +282,124 @@ def get_kafka_options() -> dict:
         options["subscribePattern"] = GCN_COMBINED_PATTERN
 
     return options
+
+
+def get_consumer_config(group_id: str, offset_reset: str = "latest") -> dict:
+    """
+    Return the confluent-kafka Consumer configuration for the standalone
+    consumer (nasa_gcn.consumer): same broker and OAuth credentials as
+    get_kafka_options, with manual offset commits.
+    """
+    client_id = _get_credential("GCN_CLIENT_ID")
+    client_secret = _get_credential("GCN_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        import warnings
+
+        warnings.warn(
+            "GCN credentials not found. "
+            "Set GCN_CLIENT_ID and GCN_CLIENT_SECRET in .env file or environment."
+        )
+
+    return {
+        "bootstrap.servers": KAFKA_BOOTSTRAP_SERVERS,
+        "security.protocol": KAFKA_SECURITY_PROTOCOL,
+        "sasl.mechanisms": KAFKA_SASL_MECHANISM,
+        "sasl.oauthbearer.method": "oidc",
+        "sasl.oauthbearer.client.id": client_id,
+        "sasl.oauthbearer.client.secret": client_secret,
+        "sasl.oauthbearer.token.endpoint.url": OAUTH_TOKEN_ENDPOINT,
+        "group.id": group_id,
+        "auto.offset.reset": offset_reset,
+        "enable.auto.commit": False,
+    }
+
+
+# Alert latency thresholds in seconds (see latency.LATENCY_STAGES), checked by
+# main.py against the percentiles of the latest pipeline update. Each one can be
+# overridden by the setting of the same name; "0" disables it.
+LATENCY_THRESHOLDS = {
+    "nasa_gcn.latency.ingest_p95_s": "60",
+    "nasa_gcn.latency.ingest_p99_s": "120",
+    "nasa_gcn.latency.silver_p95_s": "300",
+    "nasa_gcn.latency.silver_p99_s": "600",
+}
+
+
+def get_latency_thresholds(settings: Optional[Mapping[str, str]] = None) -> dict:
+    """
+    Return {(stage, percentile column): seconds} for the enabled LATENCY_THRESHOLDS,
+    e.g. {('silver', 'p95_s'): 300.0}.
+    """
+    thresholds = {}
+    for name, default in LATENCY_THRESHOLDS.items():
+        value = (settings.get(name) if settings is not None else _get_setting(name)) or default
+        try:
+            seconds = float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number of seconds, got {value!r}") from None
+        if seconds > 0:
+            stage, percentile = name.rsplit(".", 1)[1].split("_", 1)
+            thresholds[(stage, percentile)] = seconds
+    return thresholds
+
+
+# Days of gcn_latency_metrics kept (setting nasa_gcn.latency.retention_days): the
+# maintenance job task deletes older rows; "0" keeps them all.
+LATENCY_RETENTION_DAYS = "7"
+
+
+def get_latency_retention(settings: Optional[Mapping[str, str]] = None) -> Optional[timedelta]:
+    """Return the gcn_latency_metrics retention, or None when it is disabled."""
+    name = "nasa_gcn.latency.retention_days"
+    value = (settings.get(name) if settings is not None else _get_setting(name)) or (
+        LATENCY_RETENTION_DAYS
+    )
+    try:
+        days = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number of days, got {value!r}") from None
+    return timedelta(days=days) if days > 0 else None
+
+
+# Days without packets after which the gcn_triggers state of a trigger is dropped
+# (setting nasa_gcn.triggers.state_ttl_days); "0" keeps it forever.
+TRIGGER_STATE_TTL_DAYS = "7"
+
+
+def get_trigger_state_ttl(settings: Optional[Mapping[str, str]] = None) -> Optional[timedelta]:
+    """Return the gcn_triggers state timeout, or None when it is disabled."""
+    name = "nasa_gcn.triggers.state_ttl_days"
+    value = (settings.get(name) if settings is not None else _get_setting(name)) or (
+        TRIGGER_STATE_TTL_DAYS
+    )
+    try:
+        days = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number of days, got {value!r}") from None
+    return timedelta(days=days) if days > 0 else None
+
+
+def get_bronze_backfill(
+    settings: Optional[Mapping[str, str]] = None,
+) -> Optional[Tuple[str, datetime]]:
+    """
+    Return (backup table, cutoff) from BRONZE_BACKFILL_SETTINGS, or None when no
+    backfill is configured. The cutoff is an ISO 8601 timestamp (UTC if naive).
+    """
+    table, before = (
+        (settings.get(name) if settings is not None else _get_setting(name)) or ""
+        for name in BRONZE_BACKFILL_SETTINGS
+    )
+    if not table and not before:
+        return None
+    if not table or not before:
+        raise ValueError(f"{' and '.join(BRONZE_BACKFILL_SETTINGS)} must be set together")
+    try:
+        cutoff = datetime.fromisoformat(before)
+    except ValueError:
+        raise ValueError(
+            f"{BRONZE_BACKFILL_SETTINGS[1]} must be an ISO 8601 timestamp, got {before!r}"
+        ) from None
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    return table, cutoff
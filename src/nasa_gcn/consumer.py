@@ -0,0 +1,480 @@
+"""
+Consumidor Kafka standalone (sem Spark) para decodificar alertas em milissegundos.
+
+O gcn_raw do pipeline DLT lê o Kafka em micro-batches do Structured
+Streaming: segundos de latência por batch, mais o startup do cluster. Este
+módulo é um processo asyncio leve com as mesmas credenciais e padrões de
+tópico (config). Cada lote lido do broker é decodificado em processo
+(parse_gcn_binary_batch para gcn.classic.binary.*) e entregue a um sink.
+
+Fluxo de AlertConsumer.run:
+
+    fonte --poll--> decode_messages --fila limitada--> sink --> commit em lote
+
+- backpressure: a fila entre o poll e o sink guarda no máximo
+  `queue_batches` lotes; com o sink lento, o poll espera e o broker não é
+  lido além disso
+- commits em lote: os offsets só são commitados depois que o sink gravou
+  os registros (at-least-once), a cada `commit_every` mensagens, após
+  `commit_interval_s` segundos e no encerramento
+- fontes: KafkaSource (confluent-kafka, do extra opcional `consumer`) ou
+  MemorySource (tópico em memória, para testes e replays)
+- sinks: JsonlSink (arquivo ou stdout) e CallbackSink (função síncrona ou
+  coroutine)
+
+Para rodar:
+    uv sync --extra consumer
+    uv run consume --families binary --output alerts.jsonl
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple, Union
+
+from nasa_gcn.binary_parser import batch_to_records, parse_gcn_binary_batch
+from nasa_gcn.config import (
+    TOPIC_FAMILIES,
+    get_consumer_config,
+    get_topic_family,
+    get_topic_pattern,
+)
+
+# (topic, partition) -> próximo offset a consumir (último processado + 1)
+Offsets = Dict[Tuple[str, int], int]
+
+
+@dataclass(frozen=True)
+class KafkaMessage:
+    """Mensagem lida do broker."""
+
+    topic: str
+    partition: int
+    offset: int
+    value: Optional[bytes]
+    timestamp_ms: Optional[int] = None
+    key: Optional[bytes] = None
+
+
+# ==============================================================================
+# FONTES
+# ==============================================================================
+
+
+class MemorySource:
+    """
+    Tópico em memória: entrega `messages` em ordem e registra os commits.
+    Fica `exhausted` depois de entregar todas as mensagens.
+    """
+
+    def __init__(self, messages: Iterable[KafkaMessage]):
+        self._messages = list(messages)
+        self._position = 0
+        self.committed: Offsets = {}
+        self.commits = 0
+        self.polls = 0
+        self.closed = False
+
+    @property
+    def exhausted(self) -> bool:
+        return self._position >= len(self._messages)
+
+    async def poll(self, max_messages: int, timeout_s: float) -> List[KafkaMessage]:
+        batch = self._messages[self._position : self._position + max_messages]
+        self._position += len(batch)
+        self.polls += 1
+        # Cede o event loop como um poll de rede cederia
+        await asyncio.sleep(0)
+        return batch
+
+    async def commit(self, offsets: Offsets) -> None:
+        self.committed.update(offsets)
+        self.commits += 1
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class KafkaSource:
+    """
+    Fonte confluent-kafka: assina os padrões regex (prefixo '^') e faz poll
+    e commit síncronos num executor, sem bloquear o event loop.
+    """
+
+    exhausted = False
+
+    def __init__(self, config: Dict[str, Any], patterns: Sequence[str]):
+        try:
+            from confluent_kafka import Consumer
+        except ImportError:
+            raise ImportError(
+                "KafkaSource requires confluent-kafka: pip install 'nasa_gcn[consumer]'"
+            ) from None
+        self._consumer = Consumer(config)
+        self._consumer.subscribe(list(patterns))
+
+    async def poll(self, max_messages: int, timeout_s: float) -> List[KafkaMessage]:
+        loop = asyncio.get_running_loop()
+        raw = await loop.run_in_executor(None, self._consumer.consume, max_messages, timeout_s)
+        messages = []
+        for message in raw:
+            error = message.error()
+            if error is not None:
+                # Eventos como fim de partição não são fatais
+                if error.fatal():
+                    raise RuntimeError(f"Kafka error: {error}")
+                continue
+            timestamp_type, timestamp_ms = message.timestamp()
+            messages.append(
+                KafkaMessage(
+                    topic=message.topic(),
+                    partition=message.partition(),
+                    offset=message.offset(),
+                    value=message.value(),
+                    timestamp_ms=timestamp_ms if timestamp_type else None,
+                    key=message.key(),
+                )
+            )
+        return messages
+
+    async def commit(self, offsets: Offsets) -> None:
+        from confluent_kafka import TopicPartition
+
+        partitions = [TopicPartition(t, p, o) for (t, p), o in offsets.items()]
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, lambda: self._consumer.commit(offsets=partitions, asynchronous=False)
+        )
+
+    async def close(self) -> None:
+        self._consumer.close()
+
+
+def subscription_patterns(families: Sequence[str]) -> List[str]:
+    """Padrões regex do confluent-kafka ('^...') para as famílias de TOPIC_FAMILIES."""
+    return [f"^{get_topic_pattern(family)}" for family in families]
+
+
+# ==============================================================================
+# DECODIFICAÇÃO
+# ==============================================================================
+
+
+def decode_messages(messages: Sequence[KafkaMessage]) -> List[Dict[str, Any]]:
+    """
+    Um registro por mensagem, com os campos de gcn_raw (message_key, topic,
+    topic_family, partition, offset, kafka_timestamp) e decoded_at. Pacotes
+    de gcn.classic.binary.* recebem os campos de parse_gcn_binary_packet,
+    decodificados num único parse_gcn_binary_batch; as demais mensagens
+    recebem o payload UTF-8 em `text`.
+    """
+    decoded_at = datetime.now(timezone.utc)
+    records = []
+    binary: List[Tuple[Dict[str, Any], Optional[bytes]]] = []
+    for message in messages:
+        family = get_topic_family(message.topic)
+        record = {
+            "message_key": None if message.key is None else message.key.decode("utf-8", "replace"),
+            "topic": message.topic,
+            "topic_family": family,
+            "partition": message.partition,
+            "offset": message.offset,
+            "kafka_timestamp": (
+                None
+                if message.timestamp_ms is None
+                else datetime.fromtimestamp(message.timestamp_ms / 1000, tz=timezone.utc)
+            ),
+            "decoded_at": decoded_at,
+        }
+        if family == "binary":
+            binary.append((record, message.value))
+        else:
+            record["text"] = (
+                None if message.value is None else message.value.decode("utf-8", "replace")
+            )
+        records.append(record)
+
+    if binary:
+        parsed = batch_to_records(parse_gcn_binary_batch([value for _, value in binary]))
+        for (record, _), fields in zip(binary, parsed):
+            record.update(fields)
+    return records
+
+
+def _last_offsets(messages: Sequence[KafkaMessage]) -> Offsets:
+    offsets: Offsets = {}
+    for message in messages:
+        key = (message.topic, message.partition)
+        offsets[key] = max(offsets.get(key, 0), message.offset + 1)
+    return offsets
+
+
+# ==============================================================================
+# SINKS
+# ==============================================================================
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JsonlSink:
+    """Uma linha JSON por registro (datetimes em ISO 8601). '-' escreve no stdout."""
+
+    def __init__(self, output: Union[str, Path, TextIO] = "-"):
+        if output == "-":
+            self._file, self._owned = sys.stdout, False
+        elif isinstance(output, (str, Path)):
+            self._file, self._owned = open(output, "a", encoding="utf-8"), True
+        else:
+            self._file, self._owned = output, False
+
+    async def write(self, records: List[Dict[str, Any]]) -> None:
+        text = "".join(json.dumps(r, default=_json_default) + "\n" for r in records)
+        # Escrita e flush fora do event loop, como em RawWriter._flush
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_text, text)
+
+    def _write_text(self, text: str) -> None:
+        self._file.write(text)
+        self._file.flush()
+
+    async def flush(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        if self._owned:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._file.close)
+
+
+class CallbackSink:
+    """Entrega cada lote de registros a `callback` (função síncrona ou coroutine)."""
+
+    def __init__(self, callback: Callable[[List[Dict[str, Any]]], Any]):
+        self._callback = callback
+
+    async def write(self, records: List[Dict[str, Any]]) -> None:
+        result = self._callback(records)
+        if inspect.isawaitable(result):
+            await result
+
+    async def flush(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+# ==============================================================================
+# CONSUMIDOR
+# ==============================================================================
+
+
+@dataclass
+class ConsumerStats:
+    """Contadores de uma execução de AlertConsumer.run."""
+
+    messages: int = 0
+    batches: int = 0
+    commits: int = 0
+    seconds: float = 0.0
+
+
+class AlertConsumer:
+    """
+    Lê `source`, decodifica e grava em `sink` com backpressure e commits em lote.
+
+    Args:
+        source: MemorySource, KafkaSource ou objeto com poll/commit/close
+        sink: JsonlSink, CallbackSink, raw_writer.RawWriter ou objeto com
+            write/flush/close; flush() é chamado antes de cada commit, então
+            sinks com buffer só têm offsets commitados depois de gravados
+        decode: Mensagens -> registros entregues ao sink (padrão
+            decode_messages; raw_writer.raw_records para linhas de gcn_raw)
+        max_batch: Máximo de mensagens por poll
+        poll_timeout_s: Espera máxima de um poll sem mensagens
+        queue_batches: Lotes decodificados aguardando o sink (backpressure)
+        commit_every: Mensagens gravadas entre commits
+        commit_interval_s: Tempo máximo com offsets gravados e não commitados
+    """
+
+    def __init__(
+        self,
+        source,
+        sink,
+        max_batch: int = 500,
+        poll_timeout_s: float = 0.1,
+        queue_batches: int = 4,
+        commit_every: int = 1000,
+        commit_interval_s: float = 1.0,
+        decode: Callable[[Sequence[KafkaMessage]], List[Dict[str, Any]]] = decode_messages,
+    ):
+        if max_batch <= 0 or queue_batches <= 0 or commit_every <= 0:
+            raise ValueError("max_batch, queue_batches and commit_every must be positive")
+        self.source = source
+        self.sink = sink
+        self.max_batch = max_batch
+        self.poll_timeout_s = poll_timeout_s
+        self.queue_batches = queue_batches
+        self.commit_every = commit_every
+        self.commit_interval_s = commit_interval_s
+        self.decode = decode
+        self.stats = ConsumerStats()
+
+    async def run(
+        self, stop: Optional[asyncio.Event] = None, max_messages: Optional[int] = None
+    ) -> ConsumerStats:
+        """
+        Consome até `stop` ser sinalizado, `max_messages` mensagens serem lidas
+        ou a fonte se esgotar. Os lotes já lidos são gravados e commitados
+        antes de retornar.
+        """
+        stop = stop or asyncio.Event()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_batches)
+        started = time.perf_counter()
+        reader = asyncio.create_task(self._read(queue, stop, max_messages))
+        try:
+            await self._write(queue, reader)
+            await reader
+        finally:
+            if not reader.done():
+                reader.cancel()
+            await self.source.close()
+            await self.sink.close()
+            self.stats.seconds = time.perf_counter() - started
+        return self.stats
+
+    async def _read(
+        self, queue: asyncio.Queue, stop: asyncio.Event, max_messages: Optional[int]
+    ) -> None:
+        read = 0
+        while not stop.is_set() and not self.source.exhausted:
+            limit = self.max_batch
+            if max_messages is not None:
+                limit = min(limit, max_messages - read)
+                if limit <= 0:
+                    break
+            messages = await self.source.poll(limit, self.poll_timeout_s)
+            if not messages:
+                continue
+            read += len(messages)
+            # put() espera enquanto a fila está cheia: o sink dita o ritmo do poll
+            await queue.put((self.decode(messages), _last_offsets(messages)))
+        await queue.put(None)
+
+    async def _write(self, queue: asyncio.Queue, reader: asyncio.Task) -> None:
+        pending: Offsets = {}
+        pending_messages = 0
+        last_commit = time.monotonic()
+
+        async def commit():
+            nonlocal pending, pending_messages, last_commit
+            if pending:
+                await self.sink.flush()
+                await self.source.commit(pending)
+                self.stats.commits += 1
+            pending, pending_messages, last_commit = {}, 0, time.monotonic()
+
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=self.commit_interval_s)
+            except asyncio.TimeoutError:
+                await commit()
+                # Leitura interrompida por erro: run() o propaga ao aguardar o reader
+                if reader.done() and queue.empty():
+                    break
+                continue
+            if item is None:
+                break
+            records, offsets = item
+            await self.sink.write(records)
+            self.stats.messages += len(records)
+            self.stats.batches += 1
+            pending.update(offsets)
+            pending_messages += len(records)
+            if (
+                pending_messages >= self.commit_every
+                or time.monotonic() - last_commit >= self.commit_interval_s
+            ):
+                await commit()
+        await commit()
+
+
+def main(argv=None):
+    """Entry point `consume`: consome os tópicos do GCN e grava JSONL ou gcn_raw em Parquet."""
+    parser = argparse.ArgumentParser(description="NASA GCN standalone Kafka consumer")
+    parser.add_argument(
+        "--families",
+        nargs="+",
+        default=["binary"],
+        choices=sorted(TOPIC_FAMILIES),
+        help="famílias de tópicos assinadas (padrão: binary)",
+    )
+    parser.add_argument("--group-id", default="nasa-gcn-consumer")
+    parser.add_argument("--offset-reset", default="latest", choices=["earliest", "latest"])
+    parser.add_argument("--output", default="-", help="arquivo JSONL ('-' = stdout)")
+    parser.add_argument(
+        "--raw-dir",
+        default=None,
+        help="grava linhas de gcn_raw em micro-batches neste diretório em vez de JSONL",
+    )
+    parser.add_argument("--raw-format", default="parquet", choices=["parquet", "delta"])
+    parser.add_argument("--flush-rows", type=int, default=50_000)
+    parser.add_argument("--flush-mb", type=float, default=64.0)
+    parser.add_argument("--flush-age-s", type=float, default=60.0)
+    parser.add_argument("--max-batch", type=int, default=500)
+    parser.add_argument("--max-messages", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    async def consume():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        source = KafkaSource(
+            get_consumer_config(args.group_id, args.offset_reset),
+            subscription_patterns(args.families),
+        )
+        if args.raw_dir is None:
+            consumer = AlertConsumer(source, JsonlSink(args.output), max_batch=args.max_batch)
+        else:
+            from nasa_gcn.raw_writer import RawWriter, raw_records
+
+            # Commits (e portanto flushes) seguem os limites do writer, não o padrão de 1s
+            writer = RawWriter(
+                args.raw_dir,
+                format=args.raw_format,
+                max_rows=args.flush_rows,
+                max_bytes=int(args.flush_mb * 1024 * 1024),
+                max_age_s=args.flush_age_s,
+            )
+            consumer = AlertConsumer(
+                source,
+                writer,
+                max_batch=args.max_batch,
+                commit_every=args.flush_rows,
+                commit_interval_s=args.flush_age_s,
+                decode=raw_records,
+            )
+        return await consumer.run(stop, args.max_messages)
+
+    stats = asyncio.run(consume())
+    print(
+        f"{stats.messages:,} mensagens em {stats.batches:,} lotes, "
+        f"{stats.commits:,} commits, {stats.seconds:.1f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
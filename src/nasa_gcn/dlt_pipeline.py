@@ -2,120 +2,197 @@
 NASA GCN Data Pipeline (Delta Live Tables)
 """
 
-import os
-import struct
-from typing import Any, Dict
+import sys
+from typing import Optional
 
 import dlt
 from pyspark.sql.functions import (
     Column,
+    array_join,
     coalesce,
     col,
-    collect_list,
+    concat,
     concat_ws,
-    count,
     current_timestamp,
+    date_format,
     decode,
-    expr,
     from_json,
-    get_json_object,
+    get,
     lit,
-    max,
     regexp_extract,
-    regexp_replace,
-    udf,
 )
 
-
-def decode_utf8(col_name: str = "value") -> Column:
-    return decode(col(col_name), "UTF-8")
-
-
-def clean_json_id(id_col: Column) -> Column:
-    step1 = regexp_replace(id_col, r'^[\["]+', "")
-    return regexp_replace(step1, r'[\]"]+$', "")
-
-
-CIRCULAR_SCHEMA = (
-    "circularId INT, eventId STRING, subject STRING, body STRING, submitter STRING, "
-    "submittedHow STRING, createdOn LONG, format STRING"
+# Permite importar o pacote nasa_gcn a partir do código sincronizado pelo bundle
+sys.path.append(spark.conf.get("bundle.sourcePath", "."))  # type: ignore
+
+from nasa_gcn.binary_spark import decode_binary  # noqa: E402
+from nasa_gcn.config import (  # noqa: E402
+    BRONZE_LAYOUTS,
+    TOPIC_FAMILIES,
+    get_bronze_backfill,
+    get_kafka_options,
+    get_topic_pattern,
+    get_trigger_interval,
+    get_trigger_state_ttl,
+)
+from nasa_gcn.gold import (  # noqa: E402
+    GOLD_MODES,
+    NARRATIVE_MAX_BYTES,
+    event_updates,
+    latest_gwalerts,
+    summarize_events_batch,
+    summarize_events_incremental,
+)
+from nasa_gcn.latency import latency_metrics, latency_samples  # noqa: E402
+from nasa_gcn.liveness import liveness_rollups, parse_heartbeats  # noqa: E402
+from nasa_gcn.schemas import (  # noqa: E402
+    CIRCULAR_SCHEMA,
+    GWALERT_SCHEMA,
+    NOTICE_FIELDS,
+    NOTICE_SCHEMA,
+)
+from nasa_gcn.triggers import consolidate_triggers, trigger_updates  # noqa: E402
+from nasa_gcn.utils import topic_family  # noqa: E402
+from nasa_gcn.voevent import voevent_details  # noqa: E402
+
+# Engine de decodificação de gcn_classic_binary: "sql", "pandas" ou "scalar"
+BINARY_ENGINE = spark.conf.get("nasa_gcn.binary_engine", "pandas")  # type: ignore
+
+# Layout físico do Bronze: "flat" (padrão), "partitioned", "clustered" ou "routed"
+# (ver config.BRONZE_LAYOUTS)
+BRONZE_LAYOUT = spark.conf.get("nasa_gcn.bronze_layout", "flat")  # type: ignore
+if BRONZE_LAYOUT not in BRONZE_LAYOUTS:
+    raise ValueError(f"Unknown bronze layout: {BRONZE_LAYOUT!r} (expected one of {BRONZE_LAYOUTS})")
+
+# Backfill único do Bronze após uma troca de layout: (tabela de backup, corte) ou None
+# (ver config.BRONZE_BACKFILL_SETTINGS)
+BRONZE_BACKFILL = get_bronze_backfill()
+
+# Agregação Gold: "batch" (recalcula tudo) ou "incremental" (ver gold.GOLD_MODES)
+GOLD_MODE = spark.conf.get("nasa_gcn.gold_mode", "batch")  # type: ignore
+if GOLD_MODE not in GOLD_MODES:
+    raise ValueError(f"Unknown gold mode: {GOLD_MODE!r} (expected one of {GOLD_MODES})")
+
+# Limite de bytes de scientific_narrative por evento (o excedente vira resumo final)
+NARRATIVE_MAX_BYTES = int(
+    spark.conf.get("nasa_gcn.narrative_max_bytes", str(NARRATIVE_MAX_BYTES))  # type: ignore
 )
 
+# Intervalo de trigger do Bronze (nasa_gcn.kafka.trigger_interval / mode); os
+# limites por micro-batch vêm de get_kafka_options (ver config.KAFKA_SETTINGS)
+TRIGGER_INTERVAL = get_trigger_interval()
+_BRONZE_CONF = {"pipelines.trigger.interval": TRIGGER_INTERVAL} if TRIGGER_INTERVAL else {}
 
-def _get_credential(name: str) -> str:
-    try:
-        if spark:  # type: ignore
-            val = spark.conf.get(name, "")
-            if val:
-                return val
-    except:
-        pass
-    return os.getenv(name, "")
+# Campos de identificação do notice, expostos como notice_id/notice_ids
+_NOTICE_IDS = ("$schema", "id", "event_name")
 
 
-def get_kafka_options() -> dict:
-    cid = _get_credential("GCN_CLIENT_ID")
-    sec = _get_credential("GCN_CLIENT_SECRET")
-    jaas = (
-        f"kafkashaded.org.apache.kafka.common.security.oauthbearer.OAuthBearerLoginModule required "
-        f'clientId="{cid}" clientSecret="{sec}";'
-    )
-    return {
-        "kafka.bootstrap.servers": "kafka.gcn.nasa.gov:9092",
-        "kafka.security.protocol": "SASL_SSL",
-        "kafka.sasl.mechanism": "OAUTHBEARER",
-        "kafka.sasl.jaas.config": jaas,
-        "kafka.sasl.login.callback.handler.class": "kafkashaded.org.apache.kafka.common.security.oauthbearer.OAuthBearerLoginCallbackHandler",
-        "kafka.sasl.oauthbearer.token.endpoint.url": "https://auth.gcn.nasa.gov/oauth2/token",
-        "failOnDataLoss": "false",
-        "startingOffsets": "earliest",
-        "subscribePattern": "gcn\\.heartbeat|gcn\\.classic\\.text\\..*|gcn\\.classic\\.voevent\\..*|gcn\\.classic\\.binary\\..*|gcn\\.notices\\..*|gcn\\.circulars|igwn\\.gwalert",
-    }
-
-
-def parse_gcn_binary_packet(data: bytes) -> Dict[str, Any]:
-    if data is None or len(data) != 160:
-        return {"parse_error": "size"}
-    try:
-        l = struct.unpack(">40i", data)
-        return {
-            "pkt_type": l[0],
-            "trig_num": l[4] if l[4] > 0 else None,
-            "ra": l[7] / 100.0,
-            "dec": l[8] / 100.0,
-        }
-    except Exception as e:
-        return {"parse_error": str(e)}
-
-
-parse_binary_udf = udf(
-    parse_gcn_binary_packet, "pkt_type INT, trig_num INT, ra DOUBLE, dec DOUBLE, parse_error STRING"
-)
+def decode_utf8(col_name: str = "value") -> Column:
+    return decode(col(col_name), "UTF-8")
 
 
-@dlt.table(name="gcn_raw")
-def gcn_raw():
-    return (
+def read_kafka(subscribe_pattern: str):
+    raw = (
         spark.readStream.format("kafka")
         .options(**get_kafka_options())
+        .option("subscribePattern", subscribe_pattern)
         .load()
         .select(  # type: ignore
             col("key").cast("string").alias("message_key"),
             "value",
             "topic",
+            topic_family(col("topic")).alias("topic_family"),
             "partition",
             "offset",
             col("timestamp").alias("kafka_timestamp"),
             current_timestamp().alias("ingestion_timestamp"),
         )
     )
+    if BRONZE_BACKFILL:
+        # O que é anterior ao corte vem do backup (read_backfill), nunca dos dois
+        raw = raw.filter(col("kafka_timestamp") >= lit(BRONZE_BACKFILL[1]))
+    return raw
+
+
+def read_backfill(family: Optional[str] = None):
+    # Histórico do Bronze antigo (qualquer layout) anterior ao corte, no schema de read_kafka;
+    # topic_family é recalculada do tópico, pois linhas antigas do gcn_raw flat não a têm
+    table, before = BRONZE_BACKFILL
+    raw = (
+        spark.read.table(table)  # type: ignore
+        .withColumn("topic_family", topic_family(col("topic")))
+        .filter(col("kafka_timestamp") < lit(before))
+    )
+    if family is not None:
+        raw = raw.filter(col("topic_family") == family)
+    return raw.select(
+        "message_key",
+        "value",
+        "topic",
+        "topic_family",
+        "partition",
+        "offset",
+        "kafka_timestamp",
+        "ingestion_timestamp",
+    )
+
+
+if BRONZE_LAYOUT == "routed":
+    # Uma tabela Bronze por família, cada uma assinando só os seus tópicos no Kafka
+    for _family in TOPIC_FAMILIES:
+        dlt.create_streaming_table(name=f"gcn_raw_{_family}")
+
+        @dlt.append_flow(
+            target=f"gcn_raw_{_family}", name=f"gcn_raw_{_family}_kafka", spark_conf=_BRONZE_CONF
+        )
+        def _ingest_family(pattern=get_topic_pattern(_family)):
+            return read_kafka(pattern)
+
+        if BRONZE_BACKFILL:
+
+            @dlt.append_flow(
+                target=f"gcn_raw_{_family}", name=f"gcn_raw_{_family}_backfill", once=True
+            )
+            def _backfill_family(family=_family):
+                return read_backfill(family)
+
+else:
+    # Particionar (ou clusterizar) por topic_family permite que cada stream Silver
+    # leia apenas os arquivos da sua família; "flat" mantém o gcn_raw sem layout
+    _layout = {
+        "flat": {},
+        "partitioned": {"partition_cols": ["topic_family"]},
+        "clustered": {"cluster_by": ["topic_family"]},
+    }[BRONZE_LAYOUT]
+
+    @dlt.table(name="gcn_raw", spark_conf=_BRONZE_CONF, **_layout)
+    def gcn_raw():
+        return read_kafka(get_kafka_options()["subscribePattern"])
+
+    if BRONZE_BACKFILL:
+
+        @dlt.append_flow(target="gcn_raw", name="gcn_raw_backfill", once=True)
+        def _backfill_raw():
+            return read_backfill()
+
+
+def bronze_family() -> Column:
+    # No layout flat, linhas gravadas antes da coluna topic_family a têm null
+    if BRONZE_LAYOUT == "flat":
+        return topic_family(col("topic"))
+    return col("topic_family")
+
+
+def read_bronze(family: str):
+    if BRONZE_LAYOUT == "routed":
+        return dlt.read_stream(f"gcn_raw_{family}")
+    return dlt.read_stream("gcn_raw").filter(bronze_family() == family)
 
 
 @dlt.table(name="gcn_classic_text")
 def gcn_classic_text():
     return (
-        dlt.read_stream("gcn_raw")
-        .filter(col("topic").startswith("gcn.classic.text."))
+        read_bronze("text")
         .withColumn("text", decode_utf8())
         .select(
             "message_key",
@@ -132,16 +209,21 @@ def gcn_classic_text():
 @dlt.table(name="gcn_classic_voevent")
 def gcn_classic_voevent():
     return (
-        dlt.read_stream("gcn_raw")
-        .filter(col("topic").startswith("gcn.classic.voevent."))
+        read_bronze("voevent")
         .withColumn("xml", decode_utf8())
+        # Um único parse do XML por linha; os campos saem do struct `v`
+        .withColumn("v", voevent_details("xml"))
         .select(
             "message_key",
             "xml",
             "topic",
-            expr("xpath_string(xml, '/*[local-name()=\"VOEvent\"]/@ivorn')").alias("ivorn"),
+            "v.*",
             concat_ws(
-                " | ", lit("ID"), expr("xpath_string(xml, '/*[local-name()=\"VOEvent\"]/@ivorn')")
+                " | ",
+                concat(lit("ID: "), col("v.ivorn")),
+                concat(lit("ROLE: "), col("v.role")),
+                concat(lit("DATE: "), date_format("v.author_date", "yyyy-MM-dd'T'HH:mm:ss")),
+                concat(lit("CONCEPT: "), col("v.concept")),
             ).alias("document_text"),
             "kafka_timestamp",
             current_timestamp().alias("silver_ts"),
@@ -152,11 +234,15 @@ def gcn_classic_voevent():
 @dlt.table(name="gcn_classic_binary")
 def gcn_classic_binary():
     return (
-        dlt.read_stream("gcn_raw")
-        .filter(col("topic").startswith("gcn.classic.binary."))
-        .withColumn("p", parse_binary_udf("value"))
+        read_bronze("binary")
+        # Campos genéricos e específicos do tipo numa única decodificação de `value`
+        .withColumn("p", decode_binary("value", BINARY_ENGINE))
         .select(
-            "message_key", "p.*", "topic", "kafka_timestamp", current_timestamp().alias("silver_ts")
+            "message_key",
+            "p.*",
+            "topic",
+            "kafka_timestamp",
+            current_timestamp().alias("silver_ts"),
         )
     )
 
@@ -164,16 +250,17 @@ def gcn_classic_binary():
 @dlt.table(name="gcn_notices")
 def gcn_notices():
     return (
-        dlt.read_stream("gcn_raw")
-        .filter(col("topic").startswith("gcn.notices."))
+        read_bronze("notices")
         .withColumn("json", decode_utf8())
+        # Um único parse do JSON por linha, com o schema versionado de todos os tópicos
+        .withColumn("p", from_json("json", NOTICE_SCHEMA))
         .select(
             "message_key",
             "json",
             "topic",
-            clean_json_id(
-                coalesce(get_json_object("json", "$.id"), get_json_object("json", "$.event_name"))
-            ).alias("notice_id"),
+            coalesce(get(col("p.id"), 0), get(col("p.event_name"), 0)).alias("notice_id"),
+            col("p.id").alias("notice_ids"),
+            *(col("p")[name].alias(name) for name, _ in NOTICE_FIELDS if name not in _NOTICE_IDS),
             "kafka_timestamp",
             current_timestamp().alias("silver_ts"),
         )
@@ -183,8 +270,7 @@ def gcn_notices():
 @dlt.table(name="gcn_circulars")
 def gcn_circulars():
     return (
-        dlt.read_stream("gcn_raw")
-        .filter(col("topic") == "gcn.circulars")
+        read_bronze("circulars")
         .withColumn("json", decode_utf8())
         .withColumn("p", from_json("json", CIRCULAR_SCHEMA))
         .select(
@@ -206,48 +292,145 @@ def gcn_circulars():
 
 @dlt.table(name="igwn_gwalert")
 def igwn_gwalert():
+    event = col("p.event")
     return (
-        dlt.read_stream("gcn_raw")
-        .filter(col("topic") == "igwn.gwalert")
+        read_bronze("gwalert")
         .withColumn("json", decode_utf8())
+        .withColumn("p", from_json("json", GWALERT_SCHEMA))
         .select(
             "message_key",
             "json",
-            get_json_object("json", "$.superevent_id").alias("event_id"),
-            get_json_object("json", "$.alert_type").alias("alert_type"),
+            col("p.superevent_id").alias("event_id"),
+            "p.alert_type",
+            "p.time_created",
+            event["group"].alias("group"),
+            event["pipeline"].alias("pipeline"),
+            array_join(event["instruments"], ",").alias("instruments"),
+            event["far"].alias("far"),
+            event["significant"].alias("significant"),
+            col("p.urls")["gracedb"].alias("gracedb_url"),
+            event["classification"]["BNS"].alias("prob_bns"),
+            event["classification"]["NSBH"].alias("prob_nsbh"),
+            event["classification"]["BBH"].alias("prob_bbh"),
+            event["classification"]["Terrestrial"].alias("prob_terrestrial"),
+            event["properties"]["HasNS"].alias("prob_has_ns"),
+            event["properties"]["HasRemnant"].alias("prob_has_remnant"),
             "kafka_timestamp",
             current_timestamp().alias("silver_ts"),
         )
     )
 
 
-@dlt.table(name="gcn_heartbeat")
+@dlt.view(name="gcn_heartbeat")
 def gcn_heartbeat():
-    return (
-        dlt.read_stream("gcn_raw")
-        .filter(col("topic") == "gcn.heartbeat")
-        .select("message_key", decode_utf8().alias("heartbeat_json"), "topic", "kafka_timestamp")
-    )
+    # View só para gcn_liveness: os heartbeats brutos (1 Hz) já estão no gcn_raw e só
+    # os agregados por minuto são gravados. Um único parse do JSON: heartbeat_at
+    # alimenta o lag de publicação
+    return parse_heartbeats(read_bronze("heartbeat"))
+
+
+# Família de tópicos de cada tabela Silver com silver_ts (latência do estágio "silver")
+_SILVER_FAMILIES = {
+    "gcn_classic_text": "text",
+    "gcn_classic_voevent": "voevent",
+    "gcn_classic_binary": "binary",
+    "gcn_notices": "notices",
+    "gcn_circulars": "circulars",
+    "igwn_gwalert": "gwalert",
+}
+
+# p50/p95/p99 por família, estágio e micro-batch (ver latency.LATENCY_STAGES): cada flow
+# agrega as amostras da sua tabela de origem em streaming e só grava as linhas por batch_ts
+dlt.create_streaming_table(name="gcn_latency_metrics")
+
+for _table in (
+    [f"gcn_raw_{f}" for f in TOPIC_FAMILIES] if BRONZE_LAYOUT == "routed" else ["gcn_raw"]
+):
+
+    @dlt.append_flow(target="gcn_latency_metrics", name=f"{_table}_latency")
+    def _ingest_latency(table=_table):
+        return latency_metrics(
+            latency_samples(
+                dlt.read_stream(table), "ingest", "ingestion_timestamp", bronze_family()
+            )
+        )
+
 
+for _table, _family in _SILVER_FAMILIES.items():
 
-@dlt.table(name="gcn_events_summarized")
-def gcn_events_summarized():
-    circs = dlt.read("gcn_circulars")
-    gws = dlt.read("igwn_gwalert")
-    agg_circs = (
-        circs.groupBy("event_id")
-        .agg(
-            count("circular_id").alias("circular_count"),
-            concat_ws("\n\n---\n\n", collect_list("document_text")).alias("scientific_narrative"),
-            max("created_on").alias("last_date"),
+    @dlt.append_flow(target="gcn_latency_metrics", name=f"{_table}_latency")
+    def _silver_latency(table=_table, family=_family):
+        return latency_metrics(
+            latency_samples(dlt.read_stream(table), "silver", "silver_ts", family)
         )
-        .filter(col("event_id").isNotNull())
+
+
+@dlt.view(name="gcn_trigger_changes")
+def gcn_trigger_changes():
+    # Só os triggers com pacotes novos no micro-batch são emitidos (estado O(1) por trigger,
+    # removido depois de nasa_gcn.triggers.state_ttl_days sem pacotes)
+    updates = trigger_updates(
+        dlt.read_stream("gcn_classic_binary"),
+        dlt.read_stream("gcn_classic_text"),
+        dlt.read_stream("gcn_classic_voevent"),
+        dlt.read_stream("gcn_notices"),
     )
-    return agg_circs.join(gws.withColumnRenamed("event_id", "event_id"), "event_id", "left").select(
-        "event_id",
-        "circular_count",
-        "last_date",
-        "alert_type",
-        "scientific_narrative",
-        current_timestamp().alias("gold_ts"),
+    return consolidate_triggers(updates, state_ttl=get_trigger_state_ttl())
+
+
+dlt.create_streaming_table(name="gcn_triggers")
+dlt.apply_changes(
+    target="gcn_triggers",
+    source="gcn_trigger_changes",
+    keys=["mission", "trig_num"],
+    sequence_by=col("trigger_version"),
+    stored_as_scd_type=1,
+)
+
+
+@dlt.view(name="gcn_liveness_changes")
+def gcn_liveness_changes():
+    # Estado de tamanho fixo por tópico: minutos fechados + minuto aberto a cada micro-batch
+    return liveness_rollups(dlt.read_stream("gcn_heartbeat"))
+
+
+dlt.create_streaming_table(name="gcn_liveness")
+dlt.apply_changes(
+    target="gcn_liveness",
+    source="gcn_liveness_changes",
+    keys=["topic", "minute"],
+    sequence_by=col("liveness_version"),
+    stored_as_scd_type=1,
+)
+
+
+@dlt.table(name="gw_latest")
+def gw_latest():
+    # Uma linha por superevento: último alerta + histórico de alert_type
+    return latest_gwalerts(dlt.read("igwn_gwalert"))
+
+
+if GOLD_MODE == "incremental":
+
+    @dlt.view(name="gcn_events_summary_changes")
+    def gcn_events_summary_changes():
+        # Só os event_ids com circulares/alertas novos no micro-batch são recalculados
+        updates = event_updates(dlt.read_stream("gcn_circulars"), dlt.read_stream("igwn_gwalert"))
+        return summarize_events_incremental(updates, NARRATIVE_MAX_BYTES)
+
+    dlt.create_streaming_table(name="gcn_events_summarized")
+    dlt.apply_changes(
+        target="gcn_events_summarized",
+        source="gcn_events_summary_changes",
+        keys=["event_id"],
+        sequence_by=col("summary_version"),
+        stored_as_scd_type=1,
     )
+
+else:
+
+    @dlt.table(name="gcn_events_summarized")
+    def gcn_events_summarized():
+        return summarize_events_batch(
+            dlt.read("gcn_circulars"), dlt.read("gw_latest"), NARRATIVE_MAX_BYTES
+        )
@@ -0,0 +1,74 @@
+"""
+Consultas ao event_log do pipeline DLT usadas pelo main.py: métricas do
+último update.
+
+O event_log de um pipeline cresce com cada update (meses de flow_progress),
+então latest_update_metrics lê só os eventos recentes (create_update e
+flow_progress desde `since`): uma agregação pequena sobre os create_update
+encontra o update mais recente (uma linha), que volta por broadcast join
+às linhas de flow_progress, somadas por flow. A função recebe um DataFrame
+com as colunas do event_log (event_type, timestamp, origin.update_id,
+origin.flow_name e details em JSON), então roda igual sobre
+event_log('<id>') e sobre um DataFrame local nos testes.
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from pyspark.sql import DataFrame
+from pyspark.sql.functions import (
+    broadcast,
+    col,
+    first,
+    get_json_object,
+    lit,
+    max,
+    max_by,
+    substring_index,
+    sum,
+    when,
+)
+
+_NUM_OUTPUT_ROWS = "$.flow_progress.metrics.num_output_rows"
+
+
+def latest_update_metrics(
+    events: DataFrame, since: Optional[datetime] = None
+) -> Tuple[Optional[datetime], Dict[str, int]]:
+    """
+    (início do update mais recente, {tabela: num_output_rows}) a partir dos
+    eventos do event_log com timestamp >= since. O nome da tabela é a última
+    parte de origin.flow_name ("catalog.schema.table" -> "table").
+    """
+    events = events.filter(col("event_type").isin("create_update", "flow_progress"))
+    if since is not None:
+        events = events.filter(col("timestamp") >= lit(since))
+
+    updates = events.filter(col("event_type") == "create_update").agg(
+        max_by(col("origin.update_id"), col("timestamp")).alias("latest_update"),
+        max("timestamp").alias("started_at"),
+    )
+    rows = get_json_object(col("details"), _NUM_OUTPUT_ROWS).cast("long")
+    latest = (
+        events.select(
+            "event_type",
+            col("origin.update_id").alias("update_id"),
+            substring_index(col("origin.flow_name"), ".", -1).alias("table_name"),
+            rows.alias("rows_processed"),
+        )
+        .filter((col("event_type") == "create_update") | col("rows_processed").isNotNull())
+        .join(broadcast(updates), col("update_id") == col("latest_update"))
+    )
+    result = (
+        latest.groupBy(when(col("event_type") == "flow_progress", col("table_name")).alias("table"))
+        .agg(sum("rows_processed").alias("rows_processed"), first("started_at").alias("started_at"))
+        .collect()
+    )
+
+    started_at = next((row.started_at for row in result), None)
+    metrics = {
+        row.table: int(row.rows_processed)
+        for row in result
+        if row.table is not None and row.rows_processed is not None
+    }
+    return started_at, metrics
@@ -0,0 +1,404 @@
+"""
+Agregação Gold por evento (gcn_events_summarized).
+
+Dois modos, selecionados por `nasa_gcn.gold_mode` no pipeline:
+
+- "batch": groupBy("event_id") com collect_list sobre todo o histórico de
+  gcn_circulars a cada refresh (custo cresce com o arquivo), com join em
+  broadcast contra gw_latest (uma linha por superevento, ver latest_gwalerts)
+- "incremental": agregação com estado (applyInPandasWithState) sobre os
+  streams de gcn_circulars e igwn_gwalert. A cada micro-batch só os
+  event_ids com mensagens novas são recalculados e emitidos; o resultado é
+  aplicado na tabela Gold com dlt.apply_changes (upsert por event_id).
+
+O estado por evento guarda as circulares já vistas (deduplicadas por
+circular_id, já que o Kafka entrega at-least-once) e o histórico de alertas
+GW do evento.
+
+Nos dois modos cada evento tem uma única linha, com o alert_type do alerta
+mais recente (por kafka_timestamp) e o histórico em alert_history.
+
+Nos dois modos a narrativa (scientific_narrative) é montada em ordem de
+(created_on, circular_id) e limitada a `max_bytes`: entram as circulares
+enquanto o total couber, as demais viram um resumo no final do texto. A
+lista completa fica em narrative_chunks (array<struct> com circular_id,
+created_on, bytes e in_narrative), para o RAG buscar em gcn_circulars só o
+que precisar. narrative_bytes, source_bytes e omitted_count medem o tamanho
+de cada evento.
+"""
+
+from functools import partial
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import Column, DataFrame, Window
+from pyspark.sql.functions import (
+    array_distinct,
+    broadcast,
+    coalesce,
+    col,
+    collect_list,
+    concat_ws,
+    count,
+    current_timestamp,
+    format_string,
+    lit,
+    max,
+    octet_length,
+    sort_array,
+    struct,
+    sum,
+    transform,
+    when,
+)
+from pyspark.sql.streaming.state import GroupState, GroupStateTimeout
+from pyspark.sql.types import (
+    ArrayType,
+    BooleanType,
+    IntegerType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+from nasa_gcn.utils import timestamp_from_us, timestamps_to_us
+
+GOLD_MODES = ("batch", "incremental")
+
+NARRATIVE_SEPARATOR = "\n\n---\n\n"
+_SEPARATOR_BYTES = len(NARRATIVE_SEPARATOR.encode())
+
+# Limite padrão de scientific_narrative (pipeline: nasa_gcn.narrative_max_bytes)
+NARRATIVE_MAX_BYTES = 256 * 1024
+
+# Resumo no final da narrativa quando circulares ficam de fora (printf: igual no Spark e no Python)
+NARRATIVE_TAIL = "[... %d more circulars (%d bytes) omitted, see narrative_chunks ...]"
+
+# Referência a uma circular do evento, em ordem de (created_on, circular_id)
+NARRATIVE_CHUNK_STRUCT = StructType(
+    [
+        StructField("circular_id", IntegerType()),
+        StructField("created_on", TimestampType()),
+        StructField("bytes", IntegerType()),
+        StructField("in_narrative", BooleanType()),
+    ]
+)
+
+# Histórico de alertas GW de um superevento, em ordem de kafka_timestamp
+ALERT_HISTORY_STRUCT = StructType(
+    [
+        StructField("kafka_timestamp", TimestampType()),
+        StructField("alert_type", StringType()),
+    ]
+)
+
+# Mensagens de gcn_circulars e igwn_gwalert em um schema comum (ver event_updates)
+EVENT_UPDATE_STRUCT = StructType(
+    [
+        StructField("event_id", StringType()),
+        StructField("circular_id", IntegerType()),
+        StructField("created_on", TimestampType()),
+        StructField("document_text", StringType()),
+        StructField("alert_type", StringType()),
+        StructField("updated_at", TimestampType()),
+    ]
+)
+
+EVENT_SUMMARY_STRUCT = StructType(
+    [
+        StructField("event_id", StringType()),
+        StructField("circular_count", LongType()),
+        StructField("last_date", TimestampType()),
+        StructField("alert_type", StringType()),
+        StructField("alert_history", ArrayType(ALERT_HISTORY_STRUCT)),
+        StructField("scientific_narrative", StringType()),
+        StructField("narrative_chunks", ArrayType(NARRATIVE_CHUNK_STRUCT)),
+        StructField("narrative_bytes", LongType()),
+        StructField("source_bytes", LongType()),
+        StructField("omitted_count", LongType()),
+        StructField("summary_version", LongType()),
+        StructField("gold_ts", TimestampType()),
+    ]
+)
+
+# Timestamps no estado como microssegundos (LONG): independem do timezone do processo.
+# Só as circulares dentro da narrativa guardam o texto (documents null nas demais),
+# então o estado por evento também fica limitado a ~max_bytes.
+EVENT_STATE_STRUCT = StructType(
+    [
+        StructField("circular_ids", ArrayType(IntegerType())),
+        StructField("created_on_us", ArrayType(LongType())),
+        StructField("sizes", ArrayType(IntegerType())),
+        StructField("documents", ArrayType(StringType())),
+        StructField("alert_history_us", ArrayType(LongType())),
+        StructField("alert_history_types", ArrayType(StringType())),
+        StructField("version", LongType()),
+    ]
+)
+
+
+# ==============================================================================
+# MODO BATCH
+# ==============================================================================
+
+
+def latest_gwalerts(gwalerts: DataFrame) -> DataFrame:
+    """
+    gw_latest: uma linha por superevento (event_id) com as colunas do alerta
+    mais recente por kafka_timestamp e o histórico de alert_type em
+    alert_history. Alertas reentregues aparecem uma vez no histórico.
+    """
+    latest = ["kafka_timestamp", "alert_type"] + [
+        name
+        for name in gwalerts.columns
+        if name not in ("event_id", "kafka_timestamp", "alert_type")
+    ]
+    history = [f.name for f in ALERT_HISTORY_STRUCT]
+    return (
+        gwalerts.filter(col("event_id").isNotNull())
+        .groupBy("event_id")
+        .agg(
+            max(struct(*latest)).alias("latest"),
+            array_distinct(sort_array(collect_list(struct(*history)))).alias("alert_history"),
+        )
+        .select("event_id", *(col("latest")[name].alias(name) for name in latest), "alert_history")
+    )
+
+
+def _narrative(texts: Column, omitted: Column, omitted_bytes: Column) -> Column:
+    tail = when(omitted > 0, format_string(NARRATIVE_TAIL, omitted, omitted_bytes))
+    return concat_ws(NARRATIVE_SEPARATOR, texts, tail)
+
+
+def summarize_events_batch(
+    circulars: DataFrame, gw_latest: DataFrame, max_bytes: int = NARRATIVE_MAX_BYTES
+) -> DataFrame:
+    """
+    Recalcula o resumo de todos os eventos a partir do histórico completo.
+    `gw_latest` é a saída de latest_gwalerts (uma linha por evento), pequena
+    o bastante para o join em broadcast.
+
+    O corte da narrativa é decidido por linha (soma acumulada de bytes numa
+    janela por evento) antes do collect_list, então só os textos que entram
+    na narrativa são coletados no executor.
+    """
+    order = Window.partitionBy("event_id").orderBy("created_on", "circular_id")
+    sized = (
+        circulars.filter(col("event_id").isNotNull())
+        .withColumn("bytes", coalesce(octet_length("document_text"), lit(0)))
+        .withColumn(
+            "in_narrative",
+            sum(when(col("document_text").isNotNull(), col("bytes") + _SEPARATOR_BYTES)).over(
+                order.rowsBetween(Window.unboundedPreceding, Window.currentRow)
+            )
+            <= max_bytes + _SEPARATOR_BYTES,
+        )
+        .withColumn("in_narrative", coalesce("in_narrative", lit(True)))
+    )
+    agg_circs = (
+        sized.groupBy("event_id")
+        .agg(
+            count("circular_id").alias("circular_count"),
+            sort_array(
+                collect_list(
+                    when(col("in_narrative"), struct("created_on", "circular_id", "document_text"))
+                )
+            ).alias("texts"),
+            sort_array(
+                collect_list(struct("created_on", "circular_id", "bytes", "in_narrative"))
+            ).alias("chunks"),
+            max("created_on").alias("last_date"),
+            sum("bytes").alias("source_bytes"),
+            count(when(~col("in_narrative"), True)).alias("omitted_count"),
+            coalesce(sum(when(~col("in_narrative"), col("bytes"))), lit(0)).alias("omitted_bytes"),
+        )
+        .withColumn(
+            "scientific_narrative",
+            _narrative(
+                transform("texts", lambda t: t["document_text"]),
+                col("omitted_count"),
+                col("omitted_bytes"),
+            ),
+        )
+    )
+    chunk = [f.name for f in NARRATIVE_CHUNK_STRUCT]
+    return agg_circs.join(broadcast(gw_latest), "event_id", "left").select(
+        "event_id",
+        "circular_count",
+        "last_date",
+        "alert_type",
+        "alert_history",
+        "scientific_narrative",
+        transform("chunks", lambda c: struct(*(c[name].alias(name) for name in chunk))).alias(
+            "narrative_chunks"
+        ),
+        octet_length("scientific_narrative").cast("long").alias("narrative_bytes"),
+        "source_bytes",
+        "omitted_count",
+        current_timestamp().alias("gold_ts"),
+    )
+
+
+# ==============================================================================
+# MODO INCREMENTAL
+# ==============================================================================
+
+
+def event_updates(circulars: DataFrame, gwalerts: DataFrame) -> DataFrame:
+    """União de circulares e alertas GW no schema EVENT_UPDATE_STRUCT."""
+    null = {f.name: lit(None).cast(f.dataType).alias(f.name) for f in EVENT_UPDATE_STRUCT}
+    circs = circulars.select(
+        "event_id",
+        col("circular_id").cast("int"),
+        "created_on",
+        "document_text",
+        null["alert_type"],
+        col("kafka_timestamp").alias("updated_at"),
+    )
+    alerts = gwalerts.select(
+        "event_id",
+        null["circular_id"],
+        null["created_on"],
+        null["document_text"],
+        "alert_type",
+        col("kafka_timestamp").alias("updated_at"),
+    )
+    return circs.unionByName(alerts).filter(col("event_id").isNotNull())
+
+
+def bound_narrative(chunks: List[Tuple[int, int, int, str]], max_bytes: int):
+    """
+    Decide quais circulares entram na narrativa. `chunks` são tuplas
+    (circular_id, created_on_us, bytes, document) já ordenadas; entram
+    enquanto o texto acumulado (com separadores) couber em `max_bytes`.
+    Documento null não ocupa espaço; texto ausente (descartado do estado)
+    encerra a narrativa. Retorna (narrativa, lista de in_narrative).
+    """
+    texts, included = [], []
+    end, fits, omitted, omitted_bytes = -_SEPARATOR_BYTES, True, 0, 0
+    for _, _, size, doc in chunks:
+        if doc is not None:
+            end += size + _SEPARATOR_BYTES
+        elif size:
+            fits = False
+        fits = fits and end <= max_bytes
+        included.append(fits)
+        if fits:
+            if doc is not None:
+                texts.append(doc)
+        else:
+            omitted, omitted_bytes = omitted + 1, omitted_bytes + size
+    if omitted:
+        texts.append(NARRATIVE_TAIL % (omitted, omitted_bytes))
+    return NARRATIVE_SEPARATOR.join(texts), included
+
+
+def update_event_summary(
+    key: Tuple[str],
+    batches: Iterator[pd.DataFrame],
+    state: GroupState,
+    max_bytes: int = NARRATIVE_MAX_BYTES,
+) -> Iterator[pd.DataFrame]:
+    """
+    Função de applyInPandasWithState: incorpora as mensagens novas de um
+    evento ao estado e emite o resumo atualizado (uma linha) se o evento
+    tiver circulares.
+    """
+    if state.exists:
+        ids, created_us, sizes, docs, history_us, history_types, version = state.get
+        circulars = {cid: (c, n, d) for cid, c, n, d in zip(ids, created_us, sizes, docs)}
+        history = set(zip(history_us, history_types))
+    else:
+        circulars, history, version = {}, set(), 0
+
+    for pdf in batches:
+        is_circular = pdf["circular_id"].notna().to_numpy()
+        rows = pdf[is_circular]
+        for cid, created, doc in zip(
+            rows["circular_id"].astype(int).tolist(),
+            timestamps_to_us(rows["created_on"]).tolist(),
+            rows["document_text"].tolist(),
+        ):
+            doc = None if pd.isna(doc) else doc
+            circulars[cid] = (created, 0 if doc is None else len(doc.encode()), doc)
+
+        alerts = pdf[~is_circular]
+        history.update(
+            zip(timestamps_to_us(alerts["updated_at"]).tolist(), alerts["alert_type"].tolist())
+        )
+
+    version += 1
+    ordered = sorted(
+        ((cid, created, size, doc) for cid, (created, size, doc) in circulars.items()),
+        key=lambda chunk: (chunk[1], chunk[0]),
+    )
+    narrative, included = bound_narrative(ordered, max_bytes)
+    # Mesma ordem de sort_array(struct(kafka_timestamp, alert_type)) no modo batch
+    alerts = sorted(history, key=lambda alert: (alert[0], alert[1] is not None, alert[1]))
+    state.update(
+        (
+            [cid for cid, _, _, _ in ordered],
+            [created for _, created, _, _ in ordered],
+            [size for _, _, size, _ in ordered],
+            [doc if fits else None for (_, _, _, doc), fits in zip(ordered, included)],
+            [updated for updated, _ in alerts],
+            [alert_type for _, alert_type in alerts],
+            version,
+        )
+    )
+    if not circulars:
+        return
+
+    yield pd.DataFrame(
+        {
+            "event_id": [key[0]],
+            "circular_count": [len(ordered)],
+            "last_date": [timestamp_from_us(ordered[-1][1])],
+            "alert_type": [alerts[-1][1] if alerts else None],
+            "alert_history": [
+                [
+                    {"kafka_timestamp": timestamp_from_us(updated), "alert_type": alert_type}
+                    for updated, alert_type in alerts
+                ]
+                if alerts
+                else None
+            ],
+            "scientific_narrative": [narrative],
+            "narrative_chunks": [
+                [
+                    {
+                        "circular_id": cid,
+                        "created_on": timestamp_from_us(created),
+                        "bytes": size,
+                        "in_narrative": fits,
+                    }
+                    for (cid, created, size, _), fits in zip(ordered, included)
+                ]
+            ],
+            "narrative_bytes": [len(narrative.encode())],
+            "source_bytes": [np.sum([size for _, _, size, _ in ordered], dtype=np.int64)],
+            "omitted_count": [included.count(False)],
+            "summary_version": [version],
+            "gold_ts": [pd.Timestamp.now(tz="UTC")],
+        }
+    )
+
+
+def summarize_events_incremental(
+    updates: DataFrame, max_bytes: int = NARRATIVE_MAX_BYTES
+) -> DataFrame:
+    """
+    Agregação com estado sobre o stream de event_updates: emite uma linha de
+    EVENT_SUMMARY_STRUCT por evento alterado em cada micro-batch. Aplicar na
+    tabela final com upsert por event_id (sequence_by summary_version).
+    """
+    return updates.groupBy("event_id").applyInPandasWithState(
+        partial(update_event_summary, max_bytes=max_bytes),
+        outputStructType=EVENT_SUMMARY_STRUCT,
+        stateStructType=EVENT_STATE_STRUCT,
+        outputMode="append",
+        timeoutConf=GroupStateTimeout.NoTimeout,
+    )
@@ -0,0 +1,156 @@
+"""
+Latência de alerta: do publish no Kafka (kafka_timestamp) ao commit da linha.
+
+Estágios medidos por mensagem (LATENCY_STAGES):
+
+- ingest: ingestion_timestamp - kafka_timestamp (gcn_raw)
+- silver: silver_ts - kafka_timestamp (tabelas Silver)
+
+ingestion_timestamp e silver_ts vêm de current_timestamp(), que é fixo
+dentro de um micro-batch: o valor identifica o commit (batch_ts) e a
+latência inclui a espera pelo trigger. latency_samples gera uma amostra
+por mensagem, que não é gravada: latency_metrics agrega p50/p95/p99 por
+família, estágio e batch_ts numa agregação em streaming (watermark sem
+atraso em batch_ts, que cresce com os commits da tabela de origem), e só
+essas linhas por micro-batch vão para gcn_latency_metrics.
+combine_latency_metrics junta os micro-batches de um update no main.py,
+que compara os percentis com os limites de config.LATENCY_THRESHOLDS
+(latency_breaches).
+"""
+
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+from pyspark.sql import Column, DataFrame
+from pyspark.sql.functions import (
+    col,
+    count,
+    lit,
+    max,
+    min,
+    percentile_approx,
+    sum,
+    unix_micros,
+    when,
+)
+from pyspark.sql.types import DoubleType, StringType, StructField, StructType, TimestampType
+
+LATENCY_STAGES = ("ingest", "silver")
+
+# Percentis -> coluna de latency_percentiles
+LATENCY_PERCENTILES = {"p50_s": 0.5, "p95_s": 0.95, "p99_s": 0.99}
+
+LATENCY_SAMPLE_STRUCT = StructType(
+    [
+        StructField("topic_family", StringType()),
+        StructField("stage", StringType()),
+        StructField("batch_ts", TimestampType()),
+        StructField("kafka_timestamp", TimestampType()),
+        StructField("latency_s", DoubleType()),
+    ]
+)
+
+
+def latency_samples(
+    df: DataFrame, stage: str, committed: str, family: Union[str, Column]
+) -> DataFrame:
+    """
+    Uma linha de LATENCY_SAMPLE_STRUCT por mensagem de `df`: latência em
+    segundos entre kafka_timestamp e a coluna `committed` (ingestion_timestamp
+    ou silver_ts), que vira batch_ts. `family` é o nome da família ou uma
+    coluna (ex: topic_family do gcn_raw).
+    """
+    if stage not in LATENCY_STAGES:
+        raise ValueError(f"Unknown latency stage: {stage!r} (expected one of {LATENCY_STAGES})")
+    family = lit(family) if isinstance(family, str) else family
+    columns = {
+        "topic_family": family.cast("string"),
+        "stage": lit(stage),
+        "batch_ts": col(committed),
+        "kafka_timestamp": col("kafka_timestamp"),
+        "latency_s": (unix_micros(col(committed)) - unix_micros(col("kafka_timestamp")))
+        / 1_000_000,
+    }
+    # Literais e current_timestamp() não são nullable; when() sem otherwise é, e
+    # assim o schema é sempre LATENCY_SAMPLE_STRUCT
+    return df.select(
+        *(when(value.isNotNull(), value).alias(name) for name, value in columns.items())
+    ).filter(col("latency_s").isNotNull())
+
+
+def latency_percentiles(samples: DataFrame, *group_cols: str) -> DataFrame:
+    """
+    Agrega amostras de latency_samples por `group_cols`: mensagens,
+    p50_s/p95_s/p99_s (percentile_approx), max_s e o intervalo de
+    kafka_timestamp coberto.
+    """
+    return samples.groupBy(*group_cols).agg(
+        count(lit(1)).alias("messages"),
+        *(percentile_approx("latency_s", p).alias(name) for name, p in LATENCY_PERCENTILES.items()),
+        max("latency_s").alias("max_s"),
+        min("kafka_timestamp").alias("first_kafka_timestamp"),
+        max("kafka_timestamp").alias("last_kafka_timestamp"),
+    )
+
+
+def latency_metrics(samples: DataFrame) -> DataFrame:
+    """
+    Percentis por família, estágio e micro-batch (tabela gcn_latency_metrics).
+
+    Em streaming o watermark de batch_ts (sem atraso) fecha cada micro-batch
+    da origem assim que ele é lido, e a saída em modo append tem uma linha
+    por (família, estágio, batch_ts). Um commit da origem dividido entre
+    micro-batches (mais arquivos que maxFilesPerTrigger) conta só a parte
+    lida primeiro.
+    """
+    return latency_percentiles(
+        samples.withWatermark("batch_ts", "0 seconds"), "topic_family", "stage", "batch_ts"
+    )
+
+
+def combine_latency_metrics(metrics: DataFrame, *group_cols: str) -> DataFrame:
+    """
+    Junta linhas de latency_metrics (vários micro-batches) por `group_cols`,
+    nas colunas de latency_percentiles. Percentis não se combinam exatamente:
+    cada um é a média dos micro-batches ponderada por mensagens; max_s e o
+    intervalo de kafka_timestamp são exatos.
+    """
+    messages = sum("messages")
+    return metrics.groupBy(*group_cols).agg(
+        messages.alias("messages"),
+        *(
+            (sum(col(name) * col("messages")) / messages).alias(name)
+            for name in LATENCY_PERCENTILES
+        ),
+        max("max_s").alias("max_s"),
+        min("first_kafka_timestamp").alias("first_kafka_timestamp"),
+        max("last_kafka_timestamp").alias("last_kafka_timestamp"),
+    )
+
+
+def latency_breaches(
+    report: Mapping[Tuple[Optional[str], str], Mapping[str, float]],
+    thresholds: Mapping[Tuple[str, str], float],
+) -> List[str]:
+    """
+    Percentis acima do limite. `report` mapeia (família, estágio) -> linha de
+    latency_percentiles (família None = todas) e `thresholds` vem de
+    config.get_latency_thresholds: {(estágio, coluna do percentil): segundos}.
+    """
+    breaches = []
+    for (family, stage), row in sorted(report.items(), key=lambda kv: (kv[0][1], kv[0][0] or "")):
+        for (limit_stage, percentile), limit in thresholds.items():
+            value: Optional[float] = row.get(percentile)
+            if limit_stage == stage and value is not None and value > limit:
+                breaches.append(
+                    f"{stage}/{family or 'todas'}: {percentile[:-2]} {value:.1f}s > {limit:g}s"
+                )
+    return breaches
+
+
+def format_latency(row: Optional[Dict[str, float]]) -> str:
+    """'p50 1.2s · p95 3.4s · p99 5.0s' para uma linha de latency_percentiles."""
+    if not row:
+        return ""
+    return " · ".join(
+        f"{name[:-2]} {row[name]:.1f}s" for name in LATENCY_PERCENTILES if row.get(name) is not None
+    )
@@ -0,0 +1,228 @@
+"""
+Liveness e lag do stream a partir dos heartbeats (gcn_liveness).
+
+O GCN publica um heartbeat por segundo em gcn.heartbeat, com o horário de
+emissão em alert_datetime. parse_heartbeats decodifica o JSON uma única vez
+(a view gcn_heartbeat, que não grava os heartbeats) e liveness_rollups
+mantém, com applyInPandasWithState, um resumo por (topic, minuto) de
+kafka_timestamp:
+
+- heartbeats recebidos, primeiro e último, e atrasados (kafka_timestamp
+  anterior ao último já visto, só contados no minuto aberto)
+- gap: intervalo entre heartbeats consecutivos (kafka_timestamp)
+- publish_lag: kafka_timestamp - heartbeat_at (emissão -> broker)
+- ingest_lag: ingestion_timestamp - kafka_timestamp (broker -> Bronze)
+- percentis do gap numa janela móvel dos últimos LIVENESS_WINDOW gaps
+
+O estado por tópico tem tamanho fixo: os acumuladores do minuto aberto e a
+janela de gaps (no máximo LIVENESS_WINDOW valores), então o custo não cresce
+com o histórico. Cada micro-batch emite os minutos fechados por ele
+(closed=True) e o minuto aberto com os valores parciais; a tabela final
+recebe as linhas com dlt.apply_changes (upsert por topic, minute), de modo
+que a última versão de cada minuto prevalece.
+"""
+
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import DataFrame
+from pyspark.sql.functions import col, from_json
+from pyspark.sql.streaming.state import GroupState, GroupStateTimeout
+from pyspark.sql.types import (
+    ArrayType,
+    BooleanType,
+    DoubleType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+from nasa_gcn.schemas import HEARTBEAT_SCHEMA
+from nasa_gcn.utils import decode_utf8, timestamp_from_us, timestamps_to_us
+
+# Métricas por heartbeat, na ordem dos arrays do estado (em segundos)
+LIVENESS_METRICS = ("gap", "publish_lag", "ingest_lag")
+
+# Número de gaps da janela móvel (~5 minutos com um heartbeat por segundo)
+LIVENESS_WINDOW = 300
+
+# Percentis do gap na janela móvel -> coluna
+WINDOW_PERCENTILES = {"window_gap_p50_s": 50, "window_gap_p95_s": 95}
+
+_MINUTE_US = 60_000_000
+
+LIVENESS_STRUCT = StructType(
+    [
+        StructField("topic", StringType()),
+        StructField("minute", TimestampType()),
+        StructField("closed", BooleanType()),
+        StructField("heartbeats", LongType()),
+        StructField("late_heartbeats", LongType()),
+        StructField("first_heartbeat_at", TimestampType()),
+        StructField("last_heartbeat_at", TimestampType()),
+        *(
+            StructField(f"{metric}_{stat}_s", DoubleType())
+            for metric in LIVENESS_METRICS
+            for stat in ("mean", "max")
+        ),
+        *(StructField(name, DoubleType()) for name in WINDOW_PERCENTILES),
+        StructField("window_gap_max_s", DoubleType()),
+        StructField("liveness_version", LongType()),
+        StructField("liveness_ts", TimestampType()),
+    ]
+)
+
+# Timestamps como microssegundos (LONG, -1 = ausente), como em triggers.TRIGGER_STATE_STRUCT
+LIVENESS_STATE_STRUCT = StructType(
+    [
+        StructField("minute_us", LongType()),
+        StructField("first_us", LongType()),
+        StructField("last_us", LongType()),
+        StructField("heartbeats", LongType()),
+        StructField("late_heartbeats", LongType()),
+        StructField("sums", ArrayType(DoubleType())),
+        StructField("maxima", ArrayType(DoubleType())),
+        StructField("samples", ArrayType(LongType())),
+        StructField("window_gaps", ArrayType(DoubleType())),
+        StructField("previous_us", LongType()),
+        StructField("version", LongType()),
+    ]
+)
+
+
+def parse_heartbeats(bronze: DataFrame) -> DataFrame:
+    """
+    Heartbeats do Bronze com o JSON decodificado uma vez: heartbeat_json e
+    heartbeat_at (alert_datetime; null se ausente ou inválido), mais
+    kafka_timestamp e ingestion_timestamp para o cálculo de lag.
+    """
+    return (
+        bronze.withColumn("heartbeat_json", decode_utf8())
+        .withColumn("p", from_json("heartbeat_json", HEARTBEAT_SCHEMA))
+        .select(
+            "message_key",
+            "heartbeat_json",
+            col("p.alert_datetime").alias("heartbeat_at"),
+            "topic",
+            "kafka_timestamp",
+            "ingestion_timestamp",
+        )
+    )
+
+
+def _seconds(later: np.ndarray, earlier: np.ndarray) -> np.ndarray:
+    """(later - earlier) em segundos, NaN quando um dos lados é ausente (-1)."""
+    return np.where((later >= 0) & (earlier >= 0), (later - earlier) / 1e6, np.nan)
+
+
+def update_liveness(
+    key: Tuple[str], batches: Iterator[pd.DataFrame], state: GroupState
+) -> Iterator[pd.DataFrame]:
+    """
+    Função de applyInPandasWithState: incorpora os heartbeats novos de um
+    tópico ao estado (tamanho fixo) e emite os minutos alterados.
+    """
+    if state.exists:
+        (minute, first, last, count, late, sums, maxima, samples, window, previous, version) = (
+            state.get
+        )
+        sums, maxima, samples, window = list(sums), list(maxima), list(samples), list(window)
+    else:
+        minute, first, last, count, late, previous, version = -1, -1, -1, 0, 0, -1, 0
+        sums, maxima, samples = [0.0] * 3, [0.0] * 3, [0] * 3
+        window = []
+
+    pdf = pd.concat(list(batches), ignore_index=True)
+    received = timestamps_to_us(pdf["kafka_timestamp"])
+    order = np.argsort(received, kind="stable")
+    received = received[order]
+    published = timestamps_to_us(pdf["heartbeat_at"])[order]
+    ingested = timestamps_to_us(pdf["ingestion_timestamp"])[order]
+
+    # Sem kafka_timestamp o heartbeat não tem minuto; anteriores ao último visto são atrasados
+    in_order = received >= max(previous, 0)
+    late += int(((received >= 0) & ~in_order).sum())
+    received, published, ingested = received[in_order], published[in_order], ingested[in_order]
+    metrics = (
+        _seconds(received, np.concatenate([[previous], received[:-1]])),
+        _seconds(received, published),
+        _seconds(ingested, received),
+    )
+    if len(received):
+        previous = int(received[-1])
+
+    version += 1
+    now = pd.Timestamp.now(tz="UTC")
+    rows = []
+
+    def rollup(closed: bool) -> dict:
+        row = {
+            "topic": key[0],
+            "minute": timestamp_from_us(minute),
+            "closed": closed,
+            "heartbeats": count,
+            "late_heartbeats": late,
+            "first_heartbeat_at": timestamp_from_us(first),
+            "last_heartbeat_at": timestamp_from_us(last),
+        }
+        for index, metric in enumerate(LIVENESS_METRICS):
+            n = samples[index]
+            row[f"{metric}_mean_s"] = sums[index] / n if n else None
+            row[f"{metric}_max_s"] = maxima[index] if n else None
+        for name, q in WINDOW_PERCENTILES.items():
+            row[name] = float(np.percentile(window, q)) if window else None
+        row["window_gap_max_s"] = max(window) if window else None
+        row["liveness_version"] = version
+        row["liveness_ts"] = now
+        return row
+
+    minutes = received - received % _MINUTE_US
+    for start in np.unique(minutes):
+        if minute >= 0 and start != minute:
+            rows.append(rollup(closed=True))
+            first, count, late = -1, 0, 0
+            sums, maxima, samples = [0.0] * 3, [0.0] * 3, [0] * 3
+        minute = int(start)
+
+        selected = minutes == start
+        times = received[selected]
+        first = int(times[0]) if first < 0 else first
+        last = int(times[-1])
+        count += len(times)
+        for index, values in enumerate(metrics):
+            values = values[selected]
+            values = values[~np.isnan(values)]
+            if len(values):
+                top = float(values.max())
+                maxima[index] = max(maxima[index], top) if samples[index] else top
+                sums[index] += float(values.sum())
+                samples[index] += len(values)
+                if index == 0:
+                    window = (window + values.tolist())[-LIVENESS_WINDOW:]
+
+    if minute >= 0:
+        rows.append(rollup(closed=False))
+
+    state.update(
+        (minute, first, last, count, late, sums, maxima, samples, window, previous, version)
+    )
+    yield pd.DataFrame(rows, columns=[f.name for f in LIVENESS_STRUCT])
+
+
+def liveness_rollups(heartbeats: DataFrame) -> DataFrame:
+    """
+    Agregação com estado sobre o stream de parse_heartbeats: emite linhas de
+    LIVENESS_STRUCT para os minutos alterados em cada micro-batch. Aplicar
+    na tabela final com upsert por (topic, minute), sequence_by
+    liveness_version.
+    """
+    return heartbeats.groupBy("topic").applyInPandasWithState(
+        update_liveness,
+        outputStructType=LIVENESS_STRUCT,
+        stateStructType=LIVENESS_STATE_STRUCT,
+        outputMode="append",
+        timeoutConf=GroupStateTimeout.NoTimeout,
+    )
@@ -3,10 +3,31 @@ NASA GCN Pipeline - Entry Point
 
 Este módulo é o ponto de entrada para execução via Databricks Jobs.
 Executa validações e exibe estatísticas do pipeline, incluindo métricas
-de linhas processadas na última execução do DLT.
+de linhas processadas e percentis de latência (kafka_timestamp -> commit)
+na última execução do DLT. O relatório só lê: a retenção de
+gcn_latency_metrics é a task de manutenção (nasa_gcn.maintenance).
+
+As estatísticas das tabelas vêm de DESCRIBE DETAIL (arquivos e bytes) e de
+SELECT COUNT(*), que o Delta responde pelas stats dos arquivos sem ler os
+dados, consultados em paralelo. Uma contagem que falha aparece no relatório
+com o erro, em vez de ser omitida.
+
+Uso:
+    main [--workers N] [--pipeline-id ID]
 """
 
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 from databricks.sdk.runtime import spark
+from pyspark.sql.functions import col, lit
+
+from nasa_gcn.config import get_latency_thresholds
+from nasa_gcn.event_log import latest_update_metrics
+from nasa_gcn.latency import combine_latency_metrics, format_latency, latency_breaches
 
 # Configurações do pipeline
 CATALOG = "sandbox"
@@ -22,26 +43,48 @@ TABLE_LAYERS = {
         "gcn_notices",
         "gcn_circulars",
         "igwn_gwalert",
-        "gcn_heartbeat",
     ],
     "🥇 GOLD": ["gcn_events_summarized"],
 }
 
+# Tabela -> (família, estágio) da latência exibida ao lado da contagem
+# (família None = todas; ver latency.LATENCY_STAGES)
+TABLE_LATENCY = {
+    "gcn_raw": (None, "ingest"),
+    "gcn_classic_text": ("text", "silver"),
+    "gcn_classic_voevent": ("voevent", "silver"),
+    "gcn_classic_binary": ("binary", "silver"),
+    "gcn_notices": ("notices", "silver"),
+    "gcn_circulars": ("circulars", "silver"),
+    "igwn_gwalert": ("gwalert", "silver"),
+}
+
+# Só os eventos recentes do event_log são lidos (o job roda diariamente)
+EVENT_LOG_LOOKBACK = timedelta(days=7)
 
-def get_pipeline_id():
+# Janela de latência quando o início do último update não está disponível
+LATENCY_FALLBACK_WINDOW = timedelta(days=1)
+
+# Consultas de estatísticas de tabelas em paralelo
+STATS_WORKERS = 8
+
+
+def get_pipeline_id(pipeline_id: Optional[str] = None) -> Optional[str]:
     """
-    Obtém o Pipeline ID do DLT dinamicamente.
-    Procura por pipelines que escrevem no schema configurado.
+    Obtém o Pipeline ID do DLT: o informado (parâmetro --pipeline-id, que o
+    job sempre passa) ou, em execuções manuais, o do pipeline do workspace
+    cujo nome contém "nasa_gcn".
     """
+    if pipeline_id:
+        return pipeline_id
+
     from databricks.sdk import WorkspaceClient
 
     try:
         w = WorkspaceClient()
-        pipelines = list(w.pipelines.list_pipelines())
-
-        for pipeline in pipelines:
-            # Procura pelo pipeline que usa nosso schema (considera prefixo [dev ...])
-            # Ex: "[dev dltreinamentos_data] nasa_gcn_pipeline" ou "nasa_gcn_pipeline"
+        # O filtro por nome é aplicado pela API, sem listar todos os pipelines
+        # Ex: "[dev dltreinamentos_data] nasa_gcn_pipeline" ou "nasa_gcn_pipeline"
+        for pipeline in w.pipelines.list_pipelines(filter="name LIKE '%nasa_gcn%'"):
             if pipeline.name and "nasa_gcn" in pipeline.name.lower():
                 return pipeline.pipeline_id
         return None
@@ -50,91 +93,89 @@ def get_pipeline_id():
         return None
 
 
-def get_dlt_metrics(pipeline_id: str) -> dict:
+def get_latest_update(pipeline_id: Optional[str]) -> tuple:
     """
-    Consulta o event_log do DLT para obter métricas da última execução.
-
-    Retorna um dicionário com o número de linhas processadas por tabela:
-    {"table_name": num_output_rows, ...}
+    Consulta o event_log do DLT uma única vez (só os eventos de
+    EVENT_LOG_LOOKBACK) e retorna (início do último update, {tabela: linhas
+    processadas nesse update}); ver event_log.latest_update_metrics.
 
     Nota: Tabelas streaming (Bronze/Silver) podem não reportar num_output_rows
     da mesma forma que tabelas batch (Gold).
     """
     if not pipeline_id:
-        return {}
+        return None, {}
 
     try:
-        # Query para obter métricas de flow_progress da última execução
         # O event_log() é uma table-valued function do Unity Catalog
-        #
-        # Status possíveis: QUEUED, STARTING, RUNNING, COMPLETED, FAILED,
-        #                   SKIPPED, STOPPED, IDLE, EXCLUDED
-        # - Tabelas batch (dlt.read) geralmente reportam COMPLETED
-        # - Tabelas streaming (dlt.read_stream) podem reportar IDLE ou RUNNING
-        query = f"""
-        WITH latest_update AS (
-            -- Encontra o update_id mais recente
-            SELECT origin.update_id
-            FROM event_log('{pipeline_id}')
-            WHERE event_type = 'create_update'
-            ORDER BY timestamp DESC
-            LIMIT 1
-        ),
-        flow_metrics AS (
-            -- Extrai métricas de cada flow (tabela) do último update
-            -- Não filtra por status específico para capturar streaming e batch
-            SELECT
-                origin.flow_name AS table_name,
-                details:flow_progress:status::STRING AS flow_status,
-                details:flow_progress:metrics:num_output_rows::LONG AS rows_processed
-            FROM event_log('{pipeline_id}')
-            WHERE event_type = 'flow_progress'
-              AND origin.update_id = (SELECT update_id FROM latest_update)
-              AND details:flow_progress:metrics:num_output_rows IS NOT NULL
-        )
-        SELECT table_name, flow_status, SUM(rows_processed) as rows_processed
-        FROM flow_metrics
-        GROUP BY table_name, flow_status
-        """
-
-        result = spark.sql(query).collect()
-
-        # Normaliza nomes: flow_name vem como "catalog.schema.table", queremos só "table"
-        metrics = {}
-        for row in result:
-            full_name = row.table_name
-            # Extrai apenas o nome base da tabela (última parte após o último ponto)
-            table_basename = full_name.split(".")[-1] if full_name else full_name
-            # Soma caso haja múltiplos registros para a mesma tabela
-            if table_basename in metrics:
-                metrics[table_basename] += row.rows_processed
-            else:
-                metrics[table_basename] = row.rows_processed
+        events = spark.sql(f"SELECT * FROM event_log('{pipeline_id}')")
+        return latest_update_metrics(events, datetime.now(timezone.utc) - EVENT_LOG_LOOKBACK)
+    except Exception as e:
+        print(f"⚠️  Não foi possível obter métricas DLT: {e}")
+        return None, {}
 
-        return metrics
 
+def get_latency_report(since) -> dict:
+    """
+    Percentis de latência dos micro-batches com batch_ts >= since (linhas de
+    gcn_latency_metrics combinadas), por (família, estágio) e por (None,
+    estágio) para todas as famílias juntas.
+    """
+    try:
+        metrics = spark.table(f"{CATALOG}.{SCHEMA}.gcn_latency_metrics").filter(
+            col("batch_ts") >= lit(since)
+        )
+        report = {}
+        for row in combine_latency_metrics(metrics, "topic_family", "stage").collect():
+            report[(row.topic_family, row.stage)] = row.asDict()
+        for row in combine_latency_metrics(metrics, "stage").collect():
+            report[(None, row.stage)] = row.asDict()
+        return report
     except Exception as e:
-        print(f"⚠️  Não foi possível obter métricas DLT: {e}")
+        print(f"⚠️  Não foi possível obter métricas de latência: {e}")
         return {}
 
 
-def get_pipeline_stats():
-    """Retorna estatísticas das tabelas do pipeline GCN (contagem total)."""
-    stats = {}
-
-    for layer_name, tables in TABLE_LAYERS.items():
-        stats[layer_name] = {}
-        for table_name in tables:
-            full_name = f"{CATALOG}.{SCHEMA}.{table_name}"
-            try:
-                count = spark.table(full_name).count()
-                stats[layer_name][table_name] = count
-            except Exception as e:
-                stats[layer_name][table_name] = f"Error: {e}"
+def get_table_stats(full_name: str) -> dict:
+    """
+    Estatísticas de uma tabela Delta:
 
+    - files, bytes: DESCRIBE DETAIL (numFiles, sizeInBytes)
+    - rows: SELECT COUNT(*), respondido pelo Delta a partir das stats
+      (numRecords) dos arquivos, sem ler os dados
+    - rows_error: motivo quando a contagem falha (rows fica None)
+    """
+    detail = spark.sql(f"DESCRIBE DETAIL {full_name}").first()
+    stats = {"files": detail.numFiles, "bytes": detail.sizeInBytes, "rows": None}
+    try:
+        stats["rows"] = spark.sql(f"SELECT COUNT(*) AS n FROM {full_name}").first().n
+    except Exception as e:
+        stats["rows_error"] = str(e).splitlines()[0] if str(e) else type(e).__name__
     return stats
 
 
+def get_pipeline_stats(workers: int = STATS_WORKERS) -> dict:
+    """
+    Retorna estatísticas das tabelas do pipeline GCN por camada
+    ({camada: {tabela: get_table_stats ou "Error: ..."}}), com as consultas
+    das tabelas em paralelo.
+    """
+
+    def table_stats(table_name: str):
+        try:
+            return get_table_stats(f"{CATALOG}.{SCHEMA}.{table_name}")
+        except Exception as e:
+            return f"Error: {e}"
+
+    tables = [t for layer_tables in TABLE_LAYERS.values() for t in layer_tables]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(tables, pool.map(table_stats, tables)))
+
+    return {
+        layer_name: {table_name: results[table_name] for table_name in layer_tables}
+        for layer_name, layer_tables in TABLE_LAYERS.items()
+    }
+
+
 def format_number(value) -> str:
     """Formata número com separador de milhar ou retorna string de erro."""
     if isinstance(value, int):
@@ -142,18 +183,50 @@ def format_number(value) -> str:
     return str(value)
 
 
-def main():
+def format_bytes(value) -> str:
+    """Formata bytes em B/KiB/MiB/GiB/TiB."""
+    size = float(value or 0)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def format_table_stats(stats) -> str:
+    """'1,234 linhas (12.3 MiB em 4 arquivos)' ou a mensagem de erro."""
+    if not isinstance(stats, dict):
+        return str(stats)
+    storage = f"{format_bytes(stats['bytes'])} em {format_number(stats['files'])} arquivos"
+    if stats["rows"] is None:
+        return f"⚠️  contagem indisponível: {stats.get('rows_error')} ({storage})"
+    return f"{format_number(stats['rows'])} linhas ({storage})"
+
+
+def main(argv=None):
     """Função principal executada pelo Databricks Job."""
+    parser = argparse.ArgumentParser(description="NASA GCN Pipeline - Status Report")
+    parser.add_argument("--workers", type=int, default=STATS_WORKERS)
+    parser.add_argument(
+        "--pipeline-id", help="ID do pipeline DLT (sem ele: listagem dos pipelines)"
+    )
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
     print("=" * 60)
     print("NASA GCN Pipeline - Status Report")
     print("=" * 60)
 
-    # Obtém contagens totais das tabelas
-    stats = get_pipeline_stats()
+    # Estatísticas das tabelas (DESCRIBE DETAIL + COUNT(*) pelas stats Delta)
+    stats = get_pipeline_stats(workers=args.workers)
 
-    # Obtém métricas DLT da última execução
-    pipeline_id = get_pipeline_id()
-    dlt_metrics = get_dlt_metrics(pipeline_id) if pipeline_id else {}
+    # Obtém início e métricas DLT da última execução (uma consulta ao event_log)
+    pipeline_id = get_pipeline_id(args.pipeline_id)
+    update_start, dlt_metrics = get_latest_update(pipeline_id)
+
+    # Latência das mensagens commitadas desde o início do último update
+    since = update_start or datetime.now(timezone.utc) - LATENCY_FALLBACK_WINDOW
+    latency = get_latency_report(since)
 
     if dlt_metrics:
         print("\n📊 Métricas da última execução do pipeline")
@@ -163,18 +236,30 @@ def main():
         print(f"\n{layer}")
         print("-" * 40)
 
-        for table_name, total_count in tables.items():
-            total_str = format_number(total_count)
+        for table_name, table_stats in tables.items():
+            total_str = format_table_stats(table_stats)
 
             # Verifica se temos métricas DLT para esta tabela
             rows_processed = dlt_metrics.get(table_name)
 
             if rows_processed is not None and rows_processed > 0:
-                print(
-                    f"  • {table_name}: {total_str} (total) | +{rows_processed:,} (última execução)"
-                )
+                line = f"  • {table_name}: {total_str} | +{rows_processed:,} (última execução)"
             else:
-                print(f"  • {table_name}: {total_str}")
+                line = f"  • {table_name}: {total_str}"
+
+            latency_str = format_latency(latency.get(TABLE_LATENCY.get(table_name)))
+            print(f"{line} | ⏱️  {latency_str}" if latency_str else line)
+
+    if latency:
+        breaches = latency_breaches(latency, get_latency_thresholds())
+        print(f"\n⏱️  Latência desde {since:%Y-%m-%d %H:%M:%S} (kafka_timestamp -> commit)")
+        print("-" * 40)
+        for message in breaches:
+            print(f"  🚨 {message}")
+        if not breaches:
+            print("  ✅ Todos os percentis dentro dos limites")
+
+    print(f"\n⏱️  Relatório gerado em {time.perf_counter() - started:.1f}s")
 
     print("\n" + "=" * 60)
     print("Pipeline executado com sucesso!")
@@ -0,0 +1,62 @@
+"""
+NASA GCN Pipeline - Manutenção
+
+Task do job separada do relatório (main.py, que só lê): aplica a retenção
+de gcn_latency_metrics, apagando as linhas com batch_ts anterior a agora
+(UTC) menos config.get_latency_retention. O corte é um datetime com
+timezone passado como parâmetro da consulta, então independe do timezone
+da sessão. gcn_latency_metrics é uma streaming table sem leitores em
+streaming, então o DELETE não afeta o pipeline.
+
+Uso:
+    maintenance [--retention-days N]
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from databricks.sdk.runtime import spark
+
+from nasa_gcn.config import get_latency_retention
+from nasa_gcn.main import CATALOG, SCHEMA
+
+
+def prune_latency_metrics(retention: Optional[timedelta]) -> Optional[int]:
+    """
+    Apaga de gcn_latency_metrics as linhas com batch_ts anterior a agora (UTC)
+    - retention e retorna quantas foram apagadas (None sem retenção).
+    """
+    if retention is None:
+        return None
+    cutoff = datetime.now(timezone.utc) - retention
+    result = spark.sql(
+        f"DELETE FROM {CATALOG}.{SCHEMA}.gcn_latency_metrics WHERE batch_ts < :cutoff",
+        args={"cutoff": cutoff},
+    ).first()
+    return int(result.num_affected_rows) if result else 0
+
+
+def main(argv=None):
+    """Função principal executada pela task de manutenção do job."""
+    parser = argparse.ArgumentParser(description="NASA GCN Pipeline - Maintenance")
+    parser.add_argument(
+        "--retention-days",
+        help="dias de gcn_latency_metrics mantidos (padrão: nasa_gcn.latency.retention_days)",
+    )
+    args = parser.parse_args(argv)
+
+    settings = None
+    if args.retention_days is not None:
+        settings = {"nasa_gcn.latency.retention_days": args.retention_days}
+    retention = get_latency_retention(settings)
+    pruned = prune_latency_metrics(retention)
+    if pruned is None:
+        print("Retenção de gcn_latency_metrics desligada")
+    else:
+        days = retention.total_seconds() / 86400
+        print(f"🧹 {pruned:,} linhas de gcn_latency_metrics com mais de {days:g} dias apagadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Arquivo compacto de pacotes binários GCN com índice por tipo e tempo.
+
+Responder "todos os FERMI_GBM_FINAL_POS de março" sobre as linhas Delta exige
+um scan e a decodificação de cada pacote. Um PacketArchive guarda os pacotes
+em registros de largura fixa e um índice ordenado ao lado, então uma consulta
+por tipo e intervalo de tempo lê só os registros necessários:
+
+    <dir>/packets.bin   registros de 160 bytes back-to-back (append-only)
+    <dir>/index.npy     INDEX_DTYPE (pkt_type, burst_tjd, trig_num, offset),
+                        ordenado por essas colunas
+    <dir>/archive.json  versão do formato
+
+O índice é lido com np.load(mmap_mode="r") e os pacotes via mmap; a busca
+é um searchsorted por pkt_type e depois por burst_tjd dentro do tipo, e os
+registros selecionados são decodificados de uma vez com
+binary_parser.parse_gcn_binary_array. append grava primeiro os pacotes e
+depois o índice com as entradas novas intercaladas (escrito com nome
+temporário e renomeado), então cada append reescreve o índice inteiro
+(20 bytes por pacote): acrescente em lotes. Registros que ficaram sem
+índice após um crash são indexados ao abrir o arquivo.
+
+gcn_classic_binary não guarda os bytes originais, então o arquivo é
+construído a partir das linhas binary de gcn_raw (archive_from_dataframe)
+ou de dumps do socket (append_stream, via iter_packets).
+"""
+
+import json
+import mmap
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+from nasa_gcn.binary_parser import (
+    PACKET_SIZE,
+    PACKET_TYPE_NAMES,
+    TJD_EPOCH,
+    PacketSource,
+    PacketStreamErrorHandler,
+    iter_packets,
+    packets_to_matrix,
+    parse_gcn_binary_array,
+    tjd_sod_to_epoch_us,
+)
+
+ARCHIVE_VERSION = 1
+DATA_FILE = "packets.bin"
+INDEX_FILE = "index.npy"
+META_FILE = "archive.json"
+
+INDEX_DTYPE = np.dtype(
+    [("pkt_type", "<i4"), ("burst_tjd", "<i4"), ("trig_num", "<i4"), ("offset", "<i8")]
+)
+
+_PACKET_DTYPE = np.dtype(">i4")
+_LONGS = PACKET_SIZE // 4
+_PACKET_TYPES = {name: pkt_type for pkt_type, name in PACKET_TYPE_NAMES.items()}
+_TJD_EPOCH_UTC = TJD_EPOCH.replace(tzinfo=timezone.utc)
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+PacketTypes = Union[int, str, Iterable[Union[int, str]]]
+
+
+def _utc(value: datetime) -> datetime:
+    """Datetimes sem timezone são UTC, como nas colunas de gcn_classic_binary."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _tjd(value: datetime) -> int:
+    return (_utc(value) - _TJD_EPOCH_UTC) // timedelta(days=1)
+
+
+def _epoch_us(value: datetime) -> int:
+    return (_utc(value) - _UNIX_EPOCH) // timedelta(microseconds=1)
+
+
+def _packet_type_ids(pkt_types: PacketTypes) -> np.ndarray:
+    """Tipos por número ou nome (PACKET_TYPE_NAMES) como array int32 ordenado."""
+    if isinstance(pkt_types, (int, str)):
+        pkt_types = [pkt_types]
+    ids = []
+    for pkt_type in pkt_types:
+        if isinstance(pkt_type, str):
+            if pkt_type not in _PACKET_TYPES:
+                raise ValueError(f"Unknown packet type name: {pkt_type!r}")
+            pkt_type = _PACKET_TYPES[pkt_type]
+        ids.append(pkt_type)
+    return np.unique(np.asarray(ids, dtype=np.int32))
+
+
+def _index_entries(longs: np.ndarray, first_offset: int) -> np.ndarray:
+    """Entradas do índice, ordenadas, para registros gravados a partir de first_offset."""
+    entries = np.empty(len(longs), dtype=INDEX_DTYPE)
+    entries["pkt_type"] = longs[:, 0]
+    entries["burst_tjd"] = longs[:, 5]
+    entries["trig_num"] = longs[:, 4]
+    entries["offset"] = first_offset + np.arange(len(longs), dtype=np.int64) * PACKET_SIZE
+    return _sort_index(entries)
+
+
+def _sort_index(entries: np.ndarray) -> np.ndarray:
+    order = np.lexsort(
+        (entries["offset"], entries["trig_num"], entries["burst_tjd"], entries["pkt_type"])
+    )
+    return entries[order]
+
+
+def _day_key(entries: np.ndarray) -> np.ndarray:
+    """(burst_tjd, trig_num) como uint64 com a mesma ordem lexicográfica."""
+    tjd = (entries["burst_tjd"].astype(np.int64) + 2**31).astype(np.uint64)
+    trig_num = (entries["trig_num"].astype(np.int64) + 2**31).astype(np.uint64)
+    return (tjd << np.uint64(32)) | trig_num
+
+
+def _merge_index(index: np.ndarray, entries: np.ndarray) -> np.ndarray:
+    """
+    Insere `entries` (ordenadas, com offsets maiores que os do índice) no
+    índice ordenado sem reordenar tudo: por pkt_type, a posição vem de um
+    searchsorted em (burst_tjd, trig_num); empates ficam depois (offset maior).
+    """
+    types, new_types = index["pkt_type"], entries["pkt_type"]
+    positions = np.empty(len(entries), dtype=np.int64)
+    for pkt_type in np.unique(new_types):
+        lo, hi = np.searchsorted(types, pkt_type, "left"), np.searchsorted(types, pkt_type, "right")
+        first = np.searchsorted(new_types, pkt_type, "left")
+        last = np.searchsorted(new_types, pkt_type, "right")
+        positions[first:last] = lo + np.searchsorted(
+            _day_key(index[lo:hi]), _day_key(entries[first:last]), "right"
+        )
+    return np.insert(index, positions, entries)
+
+
+class PacketArchive:
+    """
+    Arquivo de pacotes de 160 bytes com índice (pkt_type, burst_tjd, trig_num) -> offset.
+
+    Examples:
+        >>> archive = PacketArchive.create("/data/gcn_archive")
+        >>> archive.append_stream("gcn_dump.bin")
+        >>> march = archive.query("FERMI_GBM_FINAL_POS", datetime(2026, 3, 1), datetime(2026, 4, 1))
+        >>> march["burst_ra_deg"].mean()
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        meta = json.loads((self.path / META_FILE).read_text())
+        if meta.get("version") != ARCHIVE_VERSION:
+            raise ValueError(
+                f"Unsupported archive version: {meta.get('version')!r} (expected {ARCHIVE_VERSION})"
+            )
+        self._open()
+
+    @classmethod
+    def create(
+        cls,
+        path: Union[str, Path],
+        packets: Union[bytes, bytearray, memoryview, Sequence[Optional[bytes]]] = (),
+    ) -> "PacketArchive":
+        """Cria um arquivo vazio em `path` (opcionalmente com `packets`)."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        if (path / META_FILE).exists():
+            raise FileExistsError(f"Packet archive already exists: {path}")
+        (path / DATA_FILE).touch()
+        np.save(path / INDEX_FILE, np.empty(0, dtype=INDEX_DTYPE))
+        (path / META_FILE).write_text(json.dumps({"version": ARCHIVE_VERSION}))
+        archive = cls(path)
+        if len(packets):
+            archive.append(packets)
+        return archive
+
+    def _open(self) -> None:
+        data_path = self.path / DATA_FILE
+        size = data_path.stat().st_size
+        self._records = size // PACKET_SIZE
+        if self._records:
+            with open(data_path, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._longs = np.frombuffer(
+                mapped, dtype=_PACKET_DTYPE, count=self._records * _LONGS
+            ).reshape(-1, _LONGS)
+        else:
+            self._longs = np.empty((0, _LONGS), dtype=_PACKET_DTYPE)
+
+        self._index = np.load(self.path / INDEX_FILE, mmap_mode="r")
+        indexed = len(self._index)
+        if indexed < self._records:
+            # Pacotes gravados sem o índice correspondente (append interrompido)
+            tail = _index_entries(self._longs[indexed:], indexed * PACKET_SIZE)
+            self._index = _merge_index(self._index, tail)
+
+    def __len__(self) -> int:
+        return self._records
+
+    def append(
+        self, packets: Union[bytes, bytearray, memoryview, Sequence[Optional[bytes]]]
+    ) -> int:
+        """
+        Acrescenta pacotes (buffer contíguo ou sequência de pacotes) e
+        reescreve o índice. Pacotes None ou sem 160 bytes são ignorados.
+
+        Returns:
+            Número de pacotes gravados
+        """
+        longs, valid = packets_to_matrix(packets)
+        longs = longs[valid]
+        if not len(longs):
+            return 0
+
+        data_path = self.path / DATA_FILE
+        first_offset = self._records * PACKET_SIZE
+        with open(data_path, "r+b") as file:
+            # Descarta um registro parcial deixado por uma escrita interrompida
+            file.truncate(first_offset)
+            file.seek(first_offset)
+            file.write(longs.astype(_PACKET_DTYPE, copy=False).tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+
+        index = _merge_index(self._index, _index_entries(longs, first_offset))
+        temporary = self.path / f".{INDEX_FILE}"
+        with open(temporary, "wb") as file:
+            np.save(file, index)
+        os.replace(temporary, self.path / INDEX_FILE)
+        self._open()
+        return len(longs)
+
+    def append_stream(
+        self,
+        source: PacketSource,
+        on_error: Optional[PacketStreamErrorHandler] = None,
+        batch_packets: int = 1_000_000,
+    ) -> int:
+        """
+        Acrescenta os pacotes de um stream back-to-back (ver iter_packets), em
+        lotes de `batch_packets` para limitar a memória e as reescritas do índice.
+        """
+        appended = 0
+        batch = []
+        for packet in iter_packets(source, on_error):
+            batch.append(packet.data)
+            if len(batch) >= batch_packets:
+                appended += self.append(batch)
+                batch = []
+        if batch:
+            appended += self.append(batch)
+        return appended
+
+    def lookup(
+        self,
+        pkt_types: Optional[PacketTypes] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        trig_num: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Offsets (em bytes, ordem de gravação) dos pacotes dos tipos
+        `pkt_types` com burst_tjd no dia de start até o dia de end e com o
+        `trig_num` dado. Usa só o índice: o filtro exato por horário é de query.
+        """
+        index = self._index
+        tjd_min = None if start is None else _tjd(start)
+        tjd_max = None if end is None else _tjd(end)
+
+        if pkt_types is None:
+            spans = [(0, len(index))]
+        else:
+            types = index["pkt_type"]
+            spans = [
+                (
+                    np.searchsorted(types, pkt_type, "left"),
+                    np.searchsorted(types, pkt_type, "right"),
+                )
+                for pkt_type in _packet_type_ids(pkt_types)
+            ]
+
+        selected = []
+        for lo, hi in spans:
+            entries = index[lo:hi]
+            if pkt_types is not None and (tjd_min is not None or tjd_max is not None):
+                # Dentro de um tipo, o índice está ordenado por burst_tjd
+                tjd = entries["burst_tjd"]
+                first = 0 if tjd_min is None else np.searchsorted(tjd, tjd_min, "left")
+                last = len(entries) if tjd_max is None else np.searchsorted(tjd, tjd_max, "right")
+                entries = entries[first:last]
+            elif tjd_min is not None or tjd_max is not None:
+                tjd = entries["burst_tjd"]
+                keep = np.ones(len(entries), dtype=bool)
+                if tjd_min is not None:
+                    keep &= tjd >= tjd_min
+                if tjd_max is not None:
+                    keep &= tjd <= tjd_max
+                entries = entries[keep]
+            if trig_num is not None:
+                entries = entries[entries["trig_num"] == trig_num]
+            selected.append(np.asarray(entries["offset"]))
+
+        return np.sort(np.concatenate(selected)) if selected else np.empty(0, dtype=np.int64)
+
+    def read(self, offsets: np.ndarray) -> np.ndarray:
+        """Matriz (N, 40) dos pacotes nos `offsets` (lê só as páginas desses registros)."""
+        return self._longs[np.asarray(offsets, dtype=np.int64) // PACKET_SIZE]
+
+    def query(
+        self,
+        pkt_types: Optional[PacketTypes] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        trig_num: Optional[int] = None,
+    ) -> Dict[str, np.ma.MaskedArray]:
+        """
+        Pacotes dos tipos `pkt_types` (números ou nomes) com start <=
+        burst_datetime < end e o `trig_num` dado, decodificados como em
+        parse_gcn_binary_batch, mais a coluna "offset" do registro.
+        """
+        offsets = self.lookup(pkt_types, start, end, trig_num)
+        longs = self.read(offsets)
+        if start is not None or end is not None:
+            epoch_us = tjd_sod_to_epoch_us(longs[:, 5], longs[:, 6])
+            keep = ~np.ma.getmaskarray(epoch_us)
+            if start is not None:
+                keep &= epoch_us.data >= _epoch_us(start)
+            if end is not None:
+                keep &= epoch_us.data < _epoch_us(end)
+            offsets, longs = offsets[keep], longs[keep]
+        columns = parse_gcn_binary_array(longs)
+        columns["offset"] = np.ma.masked_array(offsets, mask=np.zeros(len(offsets), dtype=bool))
+        return columns
+
+
+def archive_from_dataframe(
+    df, path: Union[str, Path], value: str = "value", batch_rows: int = 1_000_000
+) -> PacketArchive:
+    """
+    Cria (ou estende) o arquivo em `path` com a coluna de pacotes `value` de
+    um DataFrame Spark, ex: as linhas binary de gcn_raw ordenadas por
+    kafka_timestamp. As linhas chegam ao driver por toLocalIterator.
+    """
+    path = Path(path)
+    archive = PacketArchive(path) if (path / META_FILE).exists() else PacketArchive.create(path)
+    batch = []
+    for row in df.select(value).toLocalIterator():
+        batch.append(row[0])
+        if len(batch) >= batch_rows:
+            archive.append(batch)
+            batch = []
+    if batch:
+        archive.append(batch)
+    return archive
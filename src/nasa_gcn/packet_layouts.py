@@ -0,0 +1,258 @@
+"""
+Registro de layouts por tipo de pacote GCN (campos específicos de cada missão).
+
+parse_gcn_binary_packet extrai apenas os slots genéricos (0-8, 11, 18, 19).
+Este módulo descreve, por família de instrumento, os slots específicos de cada
+tipo de pacote (fluência e significância do Swift-BAT, hardness do Fermi-GBM,
+probabilidades de classificação do LVC, energia/signalness do IceCube) e os
+decodifica como colunas tipadas, prefixadas pela família
+(ex: `swift_bat_image_signif`).
+
+O despacho é uma indexação direta de tabela por pkt_type, tanto no caminho
+escalar (struct.Struct pré-compilado por layout, lendo só os slots usados)
+quanto no batch (colunas da matriz (N, 40) de packets_to_matrix).
+
+Referência: https://gcn.gsfc.nasa.gov/sock_pkt_def_doc.html
+"""
+
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from nasa_gcn.binary_parser import PACKET_SIZE, packets_to_matrix
+
+
+@dataclass(frozen=True)
+class PacketField:
+    """
+    Campo específico de um layout.
+
+    Attributes:
+        name: Nome do campo (a coluna final recebe o prefixo da família)
+        slot: Índice do inteiro de 4 bytes no pacote (0-39)
+        divisor: Se definido, o valor vira DOUBLE = raw / divisor
+        bit: Se definido, o valor vira BOOLEAN = bit `bit` do slot
+    """
+
+    name: str
+    slot: int
+    divisor: Optional[int] = None
+    bit: Optional[int] = None
+
+    @property
+    def spark_type(self) -> str:
+        if self.bit is not None:
+            return "BOOLEAN"
+        return "INT" if self.divisor is None else "DOUBLE"
+
+    def convert(self, raw: int) -> Any:
+        if self.bit is not None:
+            return bool((raw >> self.bit) & 1)
+        return raw if self.divisor is None else raw / self.divisor
+
+    def convert_array(self, raw: np.ndarray) -> np.ndarray:
+        if self.bit is not None:
+            return ((raw >> self.bit) & 1).astype(bool)
+        return raw if self.divisor is None else raw.astype(np.int64) / self.divisor
+
+
+@dataclass(frozen=True)
+class PacketLayout:
+    """Layout de uma família de pacotes: tipos atendidos e campos específicos."""
+
+    family: str
+    pkt_types: Tuple[int, ...]
+    fields: Tuple[PacketField, ...]
+    compiled: struct.Struct = field(init=False, repr=False, compare=False)
+    value_index: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    columns: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Pré-compila um Struct que lê só os slots usados (pulando o resto com
+        # bytes de padding) e o índice de cada campo na tupla desempacotada
+        slots = sorted({f.slot for f in self.fields})
+        fmt, position = ">", 0
+        for slot in slots:
+            fmt += f"{4 * (slot - position)}xi" if slot > position else "i"
+            position = slot + 1
+        object.__setattr__(self, "compiled", struct.Struct(fmt))
+        object.__setattr__(self, "value_index", tuple(slots.index(f.slot) for f in self.fields))
+        object.__setattr__(self, "columns", tuple(f"{self.family}_{f.name}" for f in self.fields))
+
+
+# ==============================================================================
+# LAYOUTS POR FAMÍLIA
+# ==============================================================================
+# Slots transcritos de sock_pkt_def_doc.html. Unidades: coordenadas de
+# instrumento em centi-graus, significâncias em centi-sigma, probabilidades em
+# 0.0001, tempos do BAT em unidades de 4 ms.
+
+PACKET_LAYOUTS: Tuple[PacketLayout, ...] = (
+    PacketLayout(
+        family="swift_bat",
+        pkt_types=(61, 82, 97, 98, 99),
+        fields=(
+            PacketField("burst_flue", 9),
+            PacketField("burst_ipeak", 10),
+            PacketField("phi_deg", 12, divisor=100),
+            PacketField("theta_deg", 13, divisor=100),
+            PacketField("integ_time_s", 14, divisor=250),
+            PacketField("trig_index", 17),
+            PacketField("soln_status", 18),
+            PacketField("point_src", 18, bit=0),
+            PacketField("is_grb", 18, bit=1),
+            PacketField("interesting", 18, bit=2),
+            PacketField("catalog_src", 18, bit=3),
+            PacketField("image_trig", 18, bit=4),
+            PacketField("def_not_grb", 18, bit=5),
+            PacketField("image_signif", 20, divisor=100),
+            PacketField("rate_signif", 21, divisor=100),
+            PacketField("bkg_flue", 22),
+            PacketField("bkg_start_sod", 23, divisor=100),
+            PacketField("bkg_dur_s", 24, divisor=100),
+        ),
+    ),
+    PacketLayout(
+        family="fermi_gbm",
+        pkt_types=(111, 112, 115, 119),
+        fields=(
+            PacketField("burst_inten", 9),
+            PacketField("data_signif", 10, divisor=100),
+            PacketField("phi_deg", 12, divisor=100),
+            PacketField("theta_deg", 13, divisor=100),
+            PacketField("data_timescale_s", 14, divisor=1000),
+            PacketField("hardness_ratio", 15, divisor=100),
+            PacketField("lo_energy_kev", 16),
+            PacketField("hi_energy_kev", 17),
+            PacketField("most_likely", 23),
+            PacketField("most_likely_2", 24),
+        ),
+    ),
+    PacketLayout(
+        family="lvc",
+        pkt_types=(150, 151, 152, 153, 163, 164),
+        fields=(
+            PacketField("far", 9),
+            PacketField("group_pipeline", 16),
+            PacketField("observatories", 17),
+            PacketField("prob_bns", 20, divisor=10000),
+            PacketField("prob_nsbh", 21, divisor=10000),
+            PacketField("prob_bbh", 22, divisor=10000),
+            PacketField("prob_massgap", 23, divisor=10000),
+            PacketField("prob_terrestrial", 24, divisor=10000),
+            PacketField("prob_ns", 25, divisor=10000),
+            PacketField("prob_remnant", 26, divisor=10000),
+            PacketField("skymap_version", 27),
+        ),
+    ),
+    PacketLayout(
+        family="icecube",
+        pkt_types=(157, 158, 159, 166, 169, 172, 173, 174, 176),
+        fields=(
+            PacketField("event_num", 9),
+            PacketField("energy_tev", 10, divisor=100),
+            PacketField("signalness", 12, divisor=10000),
+            PacketField("far_per_year", 13, divisor=100),
+            PacketField("stream", 14),
+            PacketField("n_events", 15),
+        ),
+    ),
+)
+
+# Colunas de saída (ordem estável: família, depois campo)
+DETAIL_FIELDS: Tuple[str, ...] = tuple(c for layout in PACKET_LAYOUTS for c in layout.columns)
+
+# Schema para uso com Spark UDF
+PACKET_DETAILS_SCHEMA = ",\n".join(
+    f"    {column} {f.spark_type}"
+    for layout in PACKET_LAYOUTS
+    for column, f in zip(layout.columns, layout.fields)
+)
+
+# Tabelas de despacho indexadas por pkt_type
+_MAX_TYPE = max(t for layout in PACKET_LAYOUTS for t in layout.pkt_types)
+_LAYOUT_TABLE: List[Optional[PacketLayout]] = [None] * (_MAX_TYPE + 1)
+_LAYOUT_INDEX = np.full(_MAX_TYPE + 1, -1, dtype=np.int8)
+for _index, _layout in enumerate(PACKET_LAYOUTS):
+    for _pkt_type in _layout.pkt_types:
+        _LAYOUT_TABLE[_pkt_type] = _layout
+        _LAYOUT_INDEX[_pkt_type] = _index
+
+_PKT_TYPE = struct.Struct(">i")
+_NUMPY_TYPES = {"BOOLEAN": bool, "INT": np.int32, "DOUBLE": np.float64}
+
+
+def get_packet_layout(pkt_type: int) -> Optional[PacketLayout]:
+    """Retorna o layout registrado para o tipo de pacote (ou None)."""
+    if 0 <= pkt_type <= _MAX_TYPE:
+        return _LAYOUT_TABLE[pkt_type]
+    return None
+
+
+def parse_packet_details(binary_data: bytes) -> Dict[str, Any]:
+    """
+    Decodifica os campos específicos do tipo de um pacote binário GCN.
+
+    Args:
+        binary_data: Bytes do pacote GCN (deve ter exatamente 160 bytes)
+
+    Returns:
+        Dicionário com todas as colunas de DETAIL_FIELDS; apenas as da família
+        do pacote são preenchidas, as demais (ou todas, para tipos sem layout
+        ou pacotes inválidos) ficam None
+    """
+    result: Dict[str, Any] = dict.fromkeys(DETAIL_FIELDS)
+    if binary_data is None or len(binary_data) != PACKET_SIZE:
+        return result
+
+    layout = get_packet_layout(_PKT_TYPE.unpack_from(binary_data)[0])
+    if layout is None:
+        return result
+
+    values = layout.compiled.unpack_from(binary_data)
+    result.update(
+        zip(
+            layout.columns,
+            [f.convert(values[i]) for f, i in zip(layout.fields, layout.value_index)],
+        )
+    )
+    return result
+
+
+def parse_packet_details_batch(
+    buffers: Union[bytes, bytearray, memoryview, Sequence[Optional[bytes]]],
+    matrix: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Dict[str, np.ma.MaskedArray]:
+    """
+    Equivalente vetorizado de parse_packet_details.
+
+    Agrupa as linhas por família com uma indexação de tabela sobre pkt_type e
+    converte cada campo como uma coluna da matriz (N, 40). `matrix` reaproveita
+    um packets_to_matrix(buffers) já calculado (ver parse_gcn_binary_batch).
+
+    Returns:
+        Dicionário coluna -> np.ma.MaskedArray de tamanho N (DETAIL_FIELDS);
+        posições mascaradas correspondem a None no resultado escalar
+    """
+    if not isinstance(buffers, (bytes, bytearray, memoryview)):
+        buffers = list(buffers)
+    longs, valid = packets_to_matrix(buffers) if matrix is None else matrix
+    n = len(longs)
+
+    pkt_type = longs[:, 0].astype(np.int64)
+    in_table = valid & (pkt_type >= 0) & (pkt_type <= _MAX_TYPE)
+    family = np.full(n, -1, dtype=np.int8)
+    family[in_table] = _LAYOUT_INDEX[pkt_type[in_table]]
+
+    columns: Dict[str, np.ma.MaskedArray] = {}
+    for index, layout in enumerate(PACKET_LAYOUTS):
+        rows = np.flatnonzero(family == index)
+        for column, packet_field in zip(layout.columns, layout.fields):
+            values = np.zeros(n, dtype=_NUMPY_TYPES[packet_field.spark_type])
+            values[rows] = packet_field.convert_array(longs[rows, packet_field.slot])
+            mask = np.ones(n, dtype=bool)
+            mask[rows] = False
+            columns[column] = np.ma.masked_array(values, mask=mask)
+    return columns
@@ -0,0 +1,242 @@
+"""
+Escrita em micro-batches do consumidor standalone em arquivos compatíveis com gcn_raw.
+
+Um arquivo (ou uma linha) por alerta gera milhares de arquivos pequenos, e
+acumular sem limite cresce sem teto e perde tudo num crash. RawWriter é um
+sink de consumer.AlertConsumer (com decode=raw_records) que acumula as
+mensagens como Arrow RecordBatches por partição (topic_family, data UTC de
+kafka_timestamp) e grava quando um limite é atingido:
+
+- max_rows mensagens ou max_bytes bytes Arrow em buffer
+- max_age_s segundos desde a chegada da mensagem mais antiga em buffer
+- flush() do AlertConsumer antes de cada commit: os offsets só são
+  commitados depois que os arquivos existem (at-least-once)
+
+No formato "parquet" cada flush grava um arquivo por partição em
+<root>/<topic_family>/<yyyy-mm-dd>/part-<...>.parquet, com o schema de
+gcn_raw (RAW_ARROW_SCHEMA; ingestion_timestamp = horário do flush). O
+arquivo é escrito com nome oculto e renomeado no final, então leitores
+(Auto Loader com cloudFiles.format=parquet) nunca veem arquivos parciais.
+No formato "delta" o flush é um append numa tabela Delta via delta-rs
+(pacote deltalake) particionada por topic_family e kafka_date. pyarrow e
+deltalake vêm do extra opcional `consumer`.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    raise ImportError(
+        "nasa_gcn.raw_writer requires pyarrow: pip install 'nasa_gcn[consumer]'"
+    ) from None
+
+from nasa_gcn.config import get_topic_family
+from nasa_gcn.consumer import KafkaMessage
+
+# Mesmo schema das colunas selecionadas por dlt_pipeline.gcn_raw
+RAW_ARROW_SCHEMA = pa.schema(
+    [
+        ("message_key", pa.string()),
+        ("value", pa.binary()),
+        ("topic", pa.string()),
+        ("topic_family", pa.string()),
+        ("partition", pa.int32()),
+        ("offset", pa.int64()),
+        ("kafka_timestamp", pa.timestamp("us", tz="UTC")),
+        ("ingestion_timestamp", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+# Colunas em buffer: ingestion_timestamp só é conhecido no flush
+_BUFFER_SCHEMA = pa.schema([f for f in RAW_ARROW_SCHEMA if f.name != "ingestion_timestamp"])
+
+RAW_WRITER_FORMATS = ("parquet", "delta")
+
+# Partição: (topic_family, data UTC de kafka_timestamp em ISO 8601)
+PartitionKey = Tuple[str, str]
+
+
+def raw_records(messages: Sequence[KafkaMessage]) -> List[Dict[str, Any]]:
+    """decode de AlertConsumer para RawWriter: uma linha de gcn_raw por mensagem."""
+    return [
+        {
+            "message_key": None if m.key is None else m.key.decode("utf-8", "replace"),
+            "value": m.value,
+            "topic": m.topic,
+            "topic_family": get_topic_family(m.topic),
+            "partition": m.partition,
+            "offset": m.offset,
+            "kafka_timestamp": (
+                None
+                if m.timestamp_ms is None
+                else datetime.fromtimestamp(m.timestamp_ms / 1000, tz=timezone.utc)
+            ),
+        }
+        for m in messages
+    ]
+
+
+@dataclass
+class FlushInfo:
+    """Resultado de um flush de RawWriter."""
+
+    reason: str
+    rows: int
+    bytes: int
+    files: int
+    seconds: float
+    oldest_age_s: float
+
+
+class RawWriter:
+    """
+    Sink com buffer Arrow que grava Parquet (ou Delta) compatível com gcn_raw.
+
+    Args:
+        root: Diretório de saída (ou tabela Delta)
+        format: "parquet" ou "delta" (ver RAW_WRITER_FORMATS)
+        max_rows: Mensagens em buffer que disparam um flush
+        max_bytes: Bytes Arrow em buffer que disparam um flush
+        max_age_s: Idade da mensagem mais antiga que dispara um flush
+        compression: Codec Parquet
+        on_flush: Callback opcional chamado com o FlushInfo de cada flush
+        clock: Relógio monotônico (injetável nos testes)
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        format: str = "parquet",
+        max_rows: int = 50_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age_s: float = 60.0,
+        compression: str = "zstd",
+        on_flush: Optional[Callable[[FlushInfo], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if format not in RAW_WRITER_FORMATS:
+            raise ValueError(f"Unknown format: {format!r} (expected one of {RAW_WRITER_FORMATS})")
+        if format == "delta":
+            try:
+                from deltalake import write_deltalake
+            except ImportError:
+                raise ImportError(
+                    "format='delta' requires deltalake: pip install 'nasa_gcn[consumer]'"
+                ) from None
+            self._write_deltalake = write_deltalake
+        self.root = Path(root)
+        self.format = format
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.compression = compression
+        self.on_flush = on_flush
+        self._clock = clock
+        self._buffers: Dict[PartitionKey, List[pa.RecordBatch]] = defaultdict(list)
+        self._rows = 0
+        self._bytes = 0
+        self._oldest: Optional[float] = None
+        self.files_written = 0
+        self.rows_written = 0
+
+    @property
+    def buffered_rows(self) -> int:
+        return self._rows
+
+    async def write(self, records: List[Dict[str, Any]]) -> None:
+        """Acumula `records` (linhas de raw_records) e grava se um limite for atingido."""
+        if not records:
+            return
+        today = datetime.now(timezone.utc).date().isoformat()
+        partitions: Dict[PartitionKey, List[Dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            ts = record["kafka_timestamp"]
+            date = today if ts is None else ts.astimezone(timezone.utc).date().isoformat()
+            partitions[(record["topic_family"], date)].append(record)
+        for key, rows in partitions.items():
+            batch = pa.RecordBatch.from_pylist(rows, schema=_BUFFER_SCHEMA)
+            self._buffers[key].append(batch)
+            self._rows += batch.num_rows
+            self._bytes += batch.nbytes
+        if self._oldest is None:
+            self._oldest = self._clock()
+
+        if self._rows >= self.max_rows:
+            await self._flush("rows")
+        elif self._bytes >= self.max_bytes:
+            await self._flush("bytes")
+        elif self._clock() - self._oldest >= self.max_age_s:
+            await self._flush("age")
+
+    async def flush(self) -> None:
+        """Grava tudo o que está em buffer (chamado pelo AlertConsumer antes do commit)."""
+        await self._flush("commit")
+
+    async def close(self) -> None:
+        await self._flush("close")
+
+    async def _flush(self, reason: str) -> None:
+        if not self._rows:
+            return
+        started = self._clock()
+        ingestion = datetime.now(timezone.utc)
+        tables = {
+            key: self._with_ingestion(pa.Table.from_batches(batches, _BUFFER_SCHEMA), ingestion)
+            for key, batches in self._buffers.items()
+        }
+        info = FlushInfo(
+            reason=reason,
+            rows=self._rows,
+            bytes=self._bytes,
+            files=0,
+            seconds=0.0,
+            oldest_age_s=started - self._oldest,
+        )
+        self._buffers = defaultdict(list)
+        self._rows = self._bytes = 0
+        self._oldest = None
+
+        # Escrita de arquivos fora do event loop
+        loop = asyncio.get_running_loop()
+        info.files = await loop.run_in_executor(None, self._write_tables, tables)
+        info.seconds = self._clock() - started
+        self.files_written += info.files
+        self.rows_written += info.rows
+        if self.on_flush is not None:
+            self.on_flush(info)
+
+    @staticmethod
+    def _with_ingestion(table: pa.Table, ingestion: datetime) -> pa.Table:
+        field = RAW_ARROW_SCHEMA.field("ingestion_timestamp")
+        return table.append_column(field, pa.array([ingestion] * table.num_rows, field.type))
+
+    def _write_tables(self, tables: Dict[PartitionKey, pa.Table]) -> int:
+        if self.format == "delta":
+            combined = pa.concat_tables(
+                table.append_column("kafka_date", pa.array([date] * table.num_rows, pa.string()))
+                for (_, date), table in tables.items()
+            )
+            self._write_deltalake(
+                str(self.root), combined, mode="append", partition_by=["topic_family", "kafka_date"]
+            )
+            return len(tables)
+
+        for (family, date), table in tables.items():
+            directory = self.root / family / date
+            directory.mkdir(parents=True, exist_ok=True)
+            name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+            # Nome oculto até o fim da escrita: leitores ignoram arquivos com "."
+            hidden = directory / f".{name}"
+            pq.write_table(table, hidden, compression=self.compression)
+            os.replace(hidden, directory / name)
+        return len(tables)
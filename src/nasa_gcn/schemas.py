@@ -1,8 +1,167 @@
 """
 Schemas for NASA GCN Pipeline.
+
+JSON payloads are parsed with a single `from_json` per row using the DDL
+schemas below, instead of one `get_json_object` call (one scan of the
+document) per extracted field.
+
+Notice schemas are versioned per Kafka topic. Each one is the GCN Unified
+Schema core plus the topic-specific fields, inferred once from a sample of
+messages with `infer_json_fields` and then pinned here (ISO 8601 strings
+promoted to TIMESTAMP, integers narrowed where the schema allows). Fields
+missing from a message, or with an unexpected type, are parsed as null.
+
+References:
+    https://gcn.nasa.gov/docs/schema
+    https://emfollow.docs.ligo.org/userguide/content.html
 """
 
+from typing import Dict, Tuple
+
+from pyspark.sql import SparkSession
+
+# (field name, Spark SQL type) pairs, in document order
+JsonFields = Tuple[Tuple[str, str], ...]
+
+
+def to_ddl(fields: JsonFields) -> str:
+    """Render fields as a DDL schema string accepted by from_json."""
+    return ", ".join(f"`{name}` {data_type}" for name, data_type in fields)
+
+
+def merge_fields(*field_sets: JsonFields) -> JsonFields:
+    """
+    Union of several field sets, keeping the first-seen order.
+
+    Raises:
+        ValueError: if the same field is declared with different types
+    """
+    merged: Dict[str, str] = {}
+    for fields in field_sets:
+        for name, data_type in fields:
+            if merged.setdefault(name, data_type) != data_type:
+                raise ValueError(
+                    f"Conflicting types for JSON field {name!r}: {merged[name]} vs {data_type}"
+                )
+    return tuple(merged.items())
+
+
+def infer_json_fields(spark: SparkSession, path: str) -> JsonFields:
+    """
+    Infer the fields of a sample of JSON documents (one per line) at `path`.
+
+    Used offline to create or bump the versioned schemas in this module; the
+    pipeline itself never infers schemas.
+    """
+    schema = spark.read.json(path).schema
+    return tuple((field.name, field.dataType.simpleString()) for field in schema)
+
+
+# ==============================================================================
+# GCN CIRCULARS
+# ==============================================================================
+
 CIRCULAR_SCHEMA = (
     "circularId INT, eventId STRING, subject STRING, body STRING, submitter STRING, "
     "submittedHow STRING, createdOn LONG, format STRING"
 )
+
+# ==============================================================================
+# GCN NOTICES (gcn.notices.*)
+# ==============================================================================
+
+NOTICE_SCHEMA_VERSION = "v4.0.0"
+
+# Core fields shared by every notice (Unified Schema core/Event, Alert, Localization)
+NOTICE_CORE_FIELDS: JsonFields = (
+    ("$schema", "STRING"),
+    ("mission", "STRING"),
+    ("instrument", "STRING"),
+    ("messenger", "STRING"),
+    ("id", "ARRAY<STRING>"),
+    ("event_name", "ARRAY<STRING>"),
+    ("alert_type", "STRING"),
+    ("alert_tense", "STRING"),
+    ("alert_datetime", "TIMESTAMP"),
+    ("trigger_time", "TIMESTAMP"),
+    ("ra", "DOUBLE"),
+    ("dec", "DOUBLE"),
+    ("ra_dec_error", "DOUBLE"),
+    ("containment_probability", "DOUBLE"),
+)
+
+# Topic-specific fields, on top of NOTICE_CORE_FIELDS
+NOTICE_TOPIC_FIELDS: Dict[str, JsonFields] = {
+    "gcn.notices.swift.bat.guano": (
+        ("rate_snr", "DOUBLE"),
+        ("rate_duration", "DOUBLE"),
+        ("far", "DOUBLE"),
+        ("classification", "MAP<STRING, DOUBLE>"),
+    ),
+    "gcn.notices.icecube.lvk_nu_track_search": (
+        ("n_events_coincident", "INT"),
+        ("pval_generic", "DOUBLE"),
+        ("pval_bayesian", "DOUBLE"),
+    ),
+    "gcn.notices.einstein_probe.wxt.alert": (
+        ("image_snr", "DOUBLE"),
+        ("net_count_rate", "DOUBLE"),
+        ("image_energy_range", "ARRAY<DOUBLE>"),
+    ),
+    "gcn.notices.superk.sn_alert": (
+        ("n_events", "INT"),
+        ("luminosity_distance", "DOUBLE"),
+    ),
+}
+
+NOTICE_SCHEMAS: Dict[str, str] = {
+    topic: to_ddl(merge_fields(NOTICE_CORE_FIELDS, fields))
+    for topic, fields in NOTICE_TOPIC_FIELDS.items()
+}
+
+# Superset of every topic schema: one from_json over the mixed gcn.notices.* stream
+NOTICE_FIELDS = merge_fields(NOTICE_CORE_FIELDS, *NOTICE_TOPIC_FIELDS.values())
+NOTICE_SCHEMA = to_ddl(NOTICE_FIELDS)
+
+
+def get_notice_schema(topic: str) -> str:
+    """DDL schema of a notice topic (core fields only for unregistered topics)."""
+    return NOTICE_SCHEMAS.get(topic, to_ddl(NOTICE_CORE_FIELDS))
+
+
+# ==============================================================================
+# IGWN GW ALERTS (igwn.gwalert)
+# ==============================================================================
+
+GWALERT_SCHEMA_VERSION = "1.0"
+
+GWALERT_EVENT_FIELDS: JsonFields = (
+    ("time", "TIMESTAMP"),
+    ("far", "DOUBLE"),
+    ("significant", "BOOLEAN"),
+    ("instruments", "ARRAY<STRING>"),
+    ("group", "STRING"),
+    ("pipeline", "STRING"),
+    ("search", "STRING"),
+    ("classification", "MAP<STRING, DOUBLE>"),
+    ("properties", "MAP<STRING, DOUBLE>"),
+)
+
+GWALERT_FIELDS: JsonFields = (
+    ("superevent_id", "STRING"),
+    ("alert_type", "STRING"),
+    ("time_created", "TIMESTAMP"),
+    ("urls", "MAP<STRING, STRING>"),
+    ("event", f"STRUCT<{', '.join(f'`{n}`: {t}' for n, t in GWALERT_EVENT_FIELDS)}>"),
+)
+
+GWALERT_SCHEMA = to_ddl(GWALERT_FIELDS)
+
+
+# ==============================================================================
+# HEARTBEAT (gcn.heartbeat)
+# ==============================================================================
+
+HEARTBEAT_FIELDS: JsonFields = (("alert_datetime", "TIMESTAMP"),)
+
+HEARTBEAT_SCHEMA = to_ddl(HEARTBEAT_FIELDS)
@@ -0,0 +1,596 @@
+"""
+Índice espacial HEALPix (esquema NESTED) para cross-match de localizações.
+
+Cada posição (ra/dec em graus, ex: burst_ra_deg/burst_dec_deg do
+binary_parser ou ra/dec dos notices) recebe o id da célula HEALPix em
+MAX_ORDER. No esquema NESTED o id da célula ancestral em qualquer ordem menor
+é um shift (parent), então uma única coluna indexa todos os NSIDEs.
+
+Cross-match de círculos de erro vira equi-join por célula seguido da
+distância angular exata:
+
+1. escolhe-se a ordem do join com cover_order(raio máximo de busca), em que
+   a célula é grande o bastante para que todo par dentro do raio caia na
+   mesma célula ou em uma das 8 vizinhas
+2. o lado esquerdo é expandido para cover (célula + vizinhas, até 9 ids) e
+   o direito fica com a sua célula: cada par candidato aparece uma única vez
+3. os candidatos são filtrados pela distância angular (haversine)
+
+Raios acima de COVER_MAX_RADIUS_DEG (~29°, comuns em localizações GBM e de
+ondas gravitacionais) não cabem em célula + vizinhas nem na ordem 0:
+cover_order devolve FULL_SKY_ORDER e essas linhas são comparadas com todas
+as do outro lado (join sem chave de célula) antes do filtro de distância.
+spatial_join recebe o raio máximo como parâmetro (max_radius_deg), então o
+plano não depende de consultas aos dados e vale para streaming.
+
+Funções NumPy (ang2pix, pix2ang, neighbours, cover, crossmatch) e expressões
+Spark equivalentes (healpix, parent_cell, cover_cells, angular_distance,
+spatial_join) com os mesmos ids, validados nos testes.
+"""
+
+from functools import reduce
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import Column, DataFrame
+from pyspark.sql import functions as F
+from pyspark.sql.functions import pandas_udf
+from pyspark.sql.types import ArrayType, LongType
+
+# Ordem máxima com ids em int64 (NSIDE = 2**29, células de ~0.4 mas)
+MAX_ORDER = 29
+
+# Resolução mínima da célula do join em relação ao raio de busca (ver cover_order).
+# Pares fora de célula + vizinhas só aparecem a partir de ~0.71 × resolução
+# (test_cover_margin); 2 dá folga.
+COVER_MARGIN = 2.0
+
+# Ordem de cover_order para raios que nem a ordem 0 cobre: join sem chave de célula
+FULL_SKY_ORDER = -1
+
+_HALF_PI = np.pi / 2
+
+SPATIAL_ENGINES = ("sql", "pandas")
+
+# Tabelas de vizinhança do HEALPix (healpix_base.cc): deslocamento (x, y) das 8
+# vizinhas (SW, W, NW, N, NE, E, SE, S), face vizinha e troca de eixos na borda
+_NB_XOFFSET = np.array([-1, -1, 0, 1, 1, 1, 0, -1])
+_NB_YOFFSET = np.array([0, 1, 1, 1, 0, -1, -1, -1])
+_NB_FACEARRAY = np.array(
+    [
+        [8, 9, 10, 11, -1, -1, -1, -1, 10, 11, 8, 9],  # S
+        [5, 6, 7, 4, 8, 9, 10, 11, 9, 10, 11, 8],  # SE
+        [-1, -1, -1, -1, 5, 6, 7, 4, -1, -1, -1, -1],  # E
+        [4, 5, 6, 7, 11, 8, 9, 10, 11, 8, 9, 10],  # SW
+        [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11],  # centro
+        [1, 2, 3, 0, 0, 1, 2, 3, 5, 6, 7, 4],  # NE
+        [-1, -1, -1, -1, 7, 4, 5, 6, -1, -1, -1, -1],  # W
+        [3, 0, 1, 2, 3, 0, 1, 2, 4, 5, 6, 7],  # NW
+        [2, 3, 0, 1, -1, -1, -1, -1, 0, 1, 2, 3],  # N
+    ]
+)
+_NB_SWAPARRAY = np.array(
+    [
+        [0, 0, 3],
+        [0, 0, 6],
+        [0, 0, 0],
+        [0, 0, 5],
+        [0, 0, 0],
+        [5, 0, 0],
+        [0, 0, 0],
+        [6, 0, 0],
+        [3, 0, 0],
+    ]
+)
+# Anel (em unidades de NSIDE) e longitude (em unidades de π/4) do canto de cada face
+_JRLL = np.array([2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4])
+_JPLL = np.array([1, 3, 5, 7, 0, 2, 4, 6, 1, 3, 5, 7])
+
+# Máscaras para intercalar bits (x, y < 2**32 -> índice NESTED)
+_SPREAD = (
+    (16, 0x0000FFFF0000FFFF),
+    (8, 0x00FF00FF00FF00FF),
+    (4, 0x0F0F0F0F0F0F0F0F),
+    (2, 0x3333333333333333),
+    (1, 0x5555555555555555),
+)
+
+
+def nside(order: int) -> int:
+    return 1 << order
+
+
+def resolution_deg(order: int) -> float:
+    """Lado médio da célula (raiz da área) em graus."""
+    return float(np.degrees(np.sqrt(np.pi / 3) / nside(order)))
+
+
+# Maior raio coberto por célula + vizinhas (ordem 0)
+COVER_MAX_RADIUS_DEG = resolution_deg(0) / COVER_MARGIN
+
+
+def cover_order(radius_deg):
+    """
+    Ordem mais fina cuja resolução é >= COVER_MARGIN × radius_deg: pares a
+    até radius_deg de distância ficam na mesma célula ou em vizinhas.
+    Aceita escalar ou array (raio <= 0 ou NaN -> MAX_ORDER; raio acima de
+    COVER_MAX_RADIUS_DEG -> FULL_SKY_ORDER).
+    """
+    radius = np.asarray(radius_deg, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        order = np.floor(np.log2(resolution_deg(0) / (COVER_MARGIN * radius)))
+    order = np.clip(np.nan_to_num(order, nan=0.0), 0, MAX_ORDER)
+    order = np.where(radius > COVER_MAX_RADIUS_DEG, FULL_SKY_ORDER, order)
+    order = np.where(radius > 0, order, MAX_ORDER)
+    return order.astype(np.int64) if order.ndim else int(order)
+
+
+def _check_order(order: int) -> None:
+    if not 0 <= order <= MAX_ORDER:
+        raise ValueError(f"HEALPix order must be in [0, {MAX_ORDER}], got {order}")
+
+
+# ==============================================================================
+# NUMPY
+# ==============================================================================
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    v = v.astype(np.int64)
+    for shift, mask in _SPREAD:
+        v = (v | (v << shift)) & mask
+    return v
+
+
+def _xyf2nest(order: int, ix: np.ndarray, iy: np.ndarray, face: np.ndarray) -> np.ndarray:
+    return (face.astype(np.int64) << (2 * order)) + _spread_bits(ix) + (_spread_bits(iy) << 1)
+
+
+def _nest2xyf(order: int, ipix: np.ndarray):
+    ipix = np.asarray(ipix, dtype=np.int64)
+    local = ipix & ((1 << (2 * order)) - 1)
+    return _compact(local), _compact(local >> 1), ipix >> (2 * order)
+
+
+def _compact(v: np.ndarray) -> np.ndarray:
+    v = v & 0x5555555555555555
+    v = (v | (v >> 1)) & 0x3333333333333333
+    v = (v | (v >> 2)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v >> 4)) & 0x00FF00FF00FF00FF
+    v = (v | (v >> 8)) & 0x0000FFFF0000FFFF
+    return (v | (v >> 16)) & 0x00000000FFFFFFFF
+
+
+def ang2pix(order: int, ra_deg, dec_deg) -> np.ndarray:
+    """Células NESTED (int64) das posições; posições NaN viram -1."""
+    _check_order(order)
+    ra = np.radians(np.asarray(ra_deg, dtype=np.float64))
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    valid = np.isfinite(ra) & np.isfinite(dec)
+    ra, dec = np.where(valid, ra, 0.0), np.where(valid, dec, 0.0)
+    n = nside(order)
+
+    z = np.sin(dec)
+    za = np.abs(z)
+    tt = np.mod(ra, 2 * np.pi) / _HALF_PI  # [0, 4)
+
+    # Faixa equatorial (|z| <= 2/3)
+    temp1 = n * (0.5 + tt)
+    temp2 = n * z * 0.75
+    jp = (temp1 - temp2).astype(np.int64)
+    jm = (temp1 + temp2).astype(np.int64)
+    ifp, ifm = jp >> order, jm >> order
+    face_eq = np.where(ifp == ifm, ifp | 4, np.where(ifp < ifm, ifp, ifm + 8))
+    ix_eq = jm & (n - 1)
+    iy_eq = n - (jp & (n - 1)) - 1
+
+    # Calotas polares: cos(dec) em vez de sqrt(1 - |z|) preserva precisão perto do polo
+    ntt = np.minimum(tt.astype(np.int64), 3)
+    tp = tt - ntt
+    tmp = n * np.cos(dec) / np.sqrt((1 + za) / 3)
+    jp_p = np.minimum((tp * tmp).astype(np.int64), n - 1)
+    jm_p = np.minimum(((1 - tp) * tmp).astype(np.int64), n - 1)
+    north = z >= 0
+    face_p = np.where(north, ntt, ntt + 8)
+    ix_p = np.where(north, n - jm_p - 1, jp_p)
+    iy_p = np.where(north, n - jp_p - 1, jm_p)
+
+    equatorial = za <= 2 / 3
+    ipix = _xyf2nest(
+        order,
+        np.where(equatorial, ix_eq, ix_p),
+        np.where(equatorial, iy_eq, iy_p),
+        np.where(equatorial, face_eq, face_p),
+    )
+    return np.where(valid, ipix, -1)
+
+
+def pix2ang(order: int, ipix) -> Tuple[np.ndarray, np.ndarray]:
+    """Centro das células NESTED como (ra_deg, dec_deg)."""
+    _check_order(order)
+    ix, iy, face = _nest2xyf(order, ipix)
+    n = nside(order)
+    jr = _JRLL[face] * n - ix - iy - 1
+
+    north, south = jr < n, jr > 3 * n
+    nr = np.where(north, jr, np.where(south, 4 * n - jr, n)).astype(np.float64)
+    cap = nr * nr / (3.0 * n * n)
+    z = np.where(north, 1 - cap, np.where(south, cap - 1, (2 * n - jr) * 2.0 / (3 * n)))
+    kshift = np.where(north | south, 0, (jr - n) & 1)
+
+    jp = (_JPLL[face] * nr + ix - iy + 1 + kshift) / 2
+    jp = np.where(jp > 4 * n, jp - 4 * n, np.where(jp < 1, jp + 4 * n, jp))
+    phi = (jp - (kshift + 1) * 0.5) * (_HALF_PI / nr)
+    return np.degrees(phi), np.degrees(np.arcsin(np.clip(z, -1, 1)))
+
+
+def parent(ipix, order: int, parent_order: int):
+    """Célula ancestral em `parent_order` (<= order) de células NESTED."""
+    if parent_order > order:
+        raise ValueError(f"parent_order {parent_order} is finer than order {order}")
+    ipix = np.asarray(ipix, dtype=np.int64)
+    return np.where(ipix < 0, -1, ipix >> (2 * (order - parent_order)))
+
+
+def neighbours(order: int, ipix) -> np.ndarray:
+    """
+    As 8 vizinhas (SW, W, NW, N, NE, E, SE, S) de cada célula, shape (n, 8).
+    Nos cantos entre faces há só 7 vizinhas; a posição ausente é -1.
+    """
+    _check_order(order)
+    ix, iy, face = _nest2xyf(order, ipix)
+    n = nside(order)
+    x = ix[:, None] + _NB_XOFFSET[None, :]
+    y = iy[:, None] + _NB_YOFFSET[None, :]
+
+    nbnum = np.full(x.shape, 4)
+    nbnum = np.where(x < 0, nbnum - 1, np.where(x >= n, nbnum + 1, nbnum))
+    nbnum = np.where(y < 0, nbnum - 3, np.where(y >= n, nbnum + 3, nbnum))
+    x, y = np.mod(x, n), np.mod(y, n)
+
+    faces = np.broadcast_to(face[:, None], x.shape)
+    nb_face = _NB_FACEARRAY[nbnum, faces]
+    bits = _NB_SWAPARRAY[nbnum, faces >> 2]
+    x = np.where(bits & 1, n - x - 1, x)
+    y = np.where(bits & 2, n - y - 1, y)
+    x, y = np.where(bits & 4, y, x), np.where(bits & 4, x, y)
+
+    result = _xyf2nest(order, x, y, np.maximum(nb_face, 0))
+    return np.where(nb_face >= 0, result, -1)
+
+
+def cover(order: int, ipix) -> np.ndarray:
+    """Célula + 8 vizinhas, shape (n, 9); -1 onde não há vizinha."""
+    ipix = np.asarray(ipix, dtype=np.int64)
+    return np.concatenate([ipix[:, None], neighbours(order, ipix)], axis=1)
+
+
+def angular_distance_deg(ra1, dec1, ra2, dec2) -> np.ndarray:
+    """Distância angular (haversine) em graus."""
+    ra1, dec1, ra2, dec2 = (
+        np.radians(np.asarray(v, dtype=np.float64)) for v in (ra1, dec1, ra2, dec2)
+    )
+    h = np.sin((dec2 - dec1) / 2) ** 2 + np.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2) ** 2
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(h, 0, 1))))
+
+
+def crossmatch(
+    ra1, dec1, err1, ra2, dec2, err2, window_deg: float = 0.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pares (i, j) cujos círculos de erro se sobrepõem (distância <= err1 +
+    err2 + window_deg), via join por célula HEALPix. Retorna (i, j,
+    distância em graus), ordenados por (i, j).
+
+    Cada linha da esquerda usa a ordem de cover_order(err1 + max(err2) +
+    window_deg), então círculos pequenos não pagam pelos grandes (ex:
+    Swift-BAT e Fermi-GBM na mesma tabela); linhas em FULL_SKY_ORDER são
+    comparadas com todas as da direita. Erros NaN contam como 0.
+    """
+    ra1, dec1, ra2, dec2 = (np.asarray(v, dtype=np.float64) for v in (ra1, dec1, ra2, dec2))
+    err1 = np.nan_to_num(np.broadcast_to(np.asarray(err1, dtype=np.float64), ra1.shape))
+    err2 = np.nan_to_num(np.broadcast_to(np.asarray(err2, dtype=np.float64), ra2.shape))
+    pairs = [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))]
+    if len(ra1) and len(ra2):
+        left_cells = ang2pix(MAX_ORDER, ra1, dec1)
+        right_cells = ang2pix(MAX_ORDER, ra2, dec2)
+        orders = cover_order(err1 + err2.max() + window_deg)
+        for order in np.unique(orders):
+            rows = np.flatnonzero((orders == order) & (left_cells >= 0))
+            if order == FULL_SKY_ORDER:
+                right_rows = np.flatnonzero(right_cells >= 0)
+                pairs.append((np.repeat(rows, len(right_rows)), np.tile(right_rows, len(rows))))
+            else:
+                pairs.append(_join_cells(order, rows, left_cells[rows], right_cells))
+
+    i, j = (np.concatenate(side) for side in zip(*pairs))
+    dist = angular_distance_deg(ra1[i], dec1[i], ra2[j], dec2[j])
+    keep = dist <= err1[i] + err2[j] + window_deg
+    i, j, dist = i[keep], j[keep], dist[keep]
+    ordered = np.lexsort((j, i))
+    return i[ordered], j[ordered], dist[ordered]
+
+
+def _join_cells(order: int, rows: np.ndarray, left_cells: np.ndarray, right_cells: np.ndarray):
+    """Equi-join entre o cover das células da esquerda e as células da direita."""
+    cells = cover(order, parent(left_cells, MAX_ORDER, order))
+    right = parent(right_cells, MAX_ORDER, order)
+    by_cell = np.argsort(right, kind="stable")
+    sorted_cells = right[by_cell]
+
+    # Para cada célula do cover, o intervalo de linhas da direita nela (sorted_cells)
+    flat = cells.ravel()
+    start = np.searchsorted(sorted_cells, flat, side="left")
+    stop = np.searchsorted(sorted_cells, flat, side="right")
+    counts = np.where(flat >= 0, stop - start, 0)
+    left_rows = np.repeat(rows, counts.reshape(cells.shape).sum(axis=1))
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return left_rows, by_cell[np.repeat(start, counts) + offsets]
+
+
+# ==============================================================================
+# SPARK
+# ==============================================================================
+
+
+def _col(c: Union[str, Column]) -> Column:
+    return F.col(c) if isinstance(c, str) else c
+
+
+def _spread_column(v: Column) -> Column:
+    for shift, mask in _SPREAD:
+        v = v.bitwiseOR(F.shiftleft(v, shift)).bitwiseAND(F.lit(mask))
+    return v
+
+
+def _let(value: Column, fn) -> Column:
+    """Avalia `value` uma vez e aplica `fn` (lambda de transform sobre um array unitário)."""
+    return F.transform(F.array(value), fn)[0]
+
+
+def _healpix_sql(ra: Column, dec: Column, order: int) -> Column:
+    n = nside(order)
+    dec_rad = F.radians(dec)
+    geometry = F.struct(
+        (F.pmod(F.radians(ra), F.lit(2 * np.pi)) / _HALF_PI).alias("tt"),
+        F.sin(dec_rad).alias("z"),
+        F.cos(dec_rad).alias("cos_dec"),
+    )
+
+    def xyf(g: Column) -> Column:
+        tt, z = g["tt"], g["z"]
+        za = F.abs(z)
+        # Faixa equatorial (|z| <= 2/3)
+        temp1 = (tt + 0.5) * n
+        temp2 = z * (0.75 * n)
+        jp = F.floor(temp1 - temp2)
+        jm = F.floor(temp1 + temp2)
+        ifp, ifm = F.shiftright(jp, order), F.shiftright(jm, order)
+        face_eq = (
+            F.when(ifp == ifm, ifp.bitwiseOR(F.lit(4))).when(ifp < ifm, ifp).otherwise(ifm + 8)
+        )
+        ix_eq = jm.bitwiseAND(F.lit(n - 1))
+        iy_eq = F.lit(n - 1) - jp.bitwiseAND(F.lit(n - 1))
+        # Calotas polares
+        ntt = F.least(F.floor(tt), F.lit(3))
+        tp = tt - ntt
+        tmp = g["cos_dec"] * n / F.sqrt((za + 1) / 3)
+        jp_p = F.least(F.floor(tp * tmp), F.lit(n - 1))
+        jm_p = F.least(F.floor((1 - tp) * tmp), F.lit(n - 1))
+        north = z >= 0
+        equatorial = za <= 2 / 3
+        return F.struct(
+            F.when(equatorial, face_eq)
+            .otherwise(F.when(north, ntt).otherwise(ntt + 8))
+            .cast("long")
+            .alias("face"),
+            F.when(equatorial, ix_eq)
+            .otherwise(F.when(north, F.lit(n - 1) - jm_p).otherwise(jp_p))
+            .cast("long")
+            .alias("ix"),
+            F.when(equatorial, iy_eq)
+            .otherwise(F.when(north, F.lit(n - 1) - jp_p).otherwise(jm_p))
+            .cast("long")
+            .alias("iy"),
+        )
+
+    def nest(c: Column) -> Column:
+        return (
+            F.shiftleft(c["face"], 2 * order)
+            + _spread_column(c["ix"])
+            + F.shiftleft(_spread_column(c["iy"]), 1)
+        )
+
+    return _let(_let(geometry, xyf), nest)
+
+
+@pandas_udf(LongType())
+def _healpix_pandas_udf(ra: pd.Series, dec: pd.Series, orders: pd.Series) -> pd.Series:
+    if not len(ra):
+        return pd.Series([], dtype="Int64")
+    cells = ang2pix(int(orders.iloc[0]), ra.to_numpy(dtype=float), dec.to_numpy(dtype=float))
+    return pd.Series(cells, dtype="Int64").mask(cells < 0)
+
+
+def healpix(
+    ra: Union[str, Column],
+    dec: Union[str, Column],
+    order: int = MAX_ORDER,
+    engine: str = "pandas",
+) -> Column:
+    """
+    Célula NESTED (LONG) das posições, igual a ang2pix; posição null ou NaN
+    vira null. engine "pandas" usa um pandas_udf sobre ang2pix; "sql" usa
+    expressões Catalyst (sem worker Python), com os valores intermediários
+    ligados por lambdas de transform. Sem elas a intercalação de bits
+    duplica a árvore de expressões e o codegen estoura o limite de método;
+    com elas a expressão roda interpretada (~6x mais lenta que "pandas",
+    ver benchmarks/bench_spatial.py).
+    """
+    _check_order(order)
+    if engine not in SPATIAL_ENGINES:
+        raise ValueError(f"Unknown spatial engine: {engine!r} (expected one of {SPATIAL_ENGINES})")
+    ra, dec = _col(ra), _col(dec)
+    if engine == "pandas":
+        return _healpix_pandas_udf(ra, dec, F.lit(order))
+    return F.when(~F.isnan(ra) & ~F.isnan(dec), _healpix_sql(ra, dec, order))
+
+
+def parent_cell(cell: Union[str, Column], order: int, parent_order: int) -> Column:
+    """Célula ancestral em `parent_order` (<= order), como parent."""
+    if parent_order > order:
+        raise ValueError(f"parent_order {parent_order} is finer than order {order}")
+    return F.shiftright(_col(cell), 2 * (order - parent_order))
+
+
+def cover_order_column(radius_deg: Union[str, Column]) -> Column:
+    """cover_order em expressões Catalyst (INT)."""
+    radius = _col(radius_deg)
+    order = F.floor(F.log2(F.lit(resolution_deg(0) / COVER_MARGIN) / radius))
+    clipped = F.least(F.greatest(order, F.lit(0)), F.lit(MAX_ORDER))
+    return (
+        F.when(radius > COVER_MAX_RADIUS_DEG, FULL_SKY_ORDER)
+        .when(radius > 0, clipped)
+        .otherwise(MAX_ORDER)
+        .cast("int")
+    )
+
+
+@pandas_udf(ArrayType(LongType()))
+def _cover_pandas_udf(cells: pd.Series, orders: pd.Series) -> pd.Series:
+    out = [None] * len(cells)
+    valid = (cells.notna() & orders.notna()).to_numpy()
+    for order in orders[valid].unique():
+        rows = np.flatnonzero(valid & (orders == order).to_numpy())
+        for row, cells_row in zip(rows, cover(int(order), cells.iloc[rows].astype(np.int64))):
+            out[row] = cells_row
+    return pd.Series(out, index=cells.index)
+
+
+def cover_cells(cell: Union[str, Column], order: Union[int, Column]) -> Column:
+    """
+    Célula + 8 vizinhas (ARRAY<LONG> de 9, -1 onde não há vizinha) via
+    pandas_udf sobre cover. `order` pode variar por linha (coluna INT).
+    """
+    order = F.lit(order) if isinstance(order, int) else _col(order)
+    return _cover_pandas_udf(_col(cell), order)
+
+
+def angular_distance(
+    ra1: Union[str, Column],
+    dec1: Union[str, Column],
+    ra2: Union[str, Column],
+    dec2: Union[str, Column],
+) -> Column:
+    """Distância angular (haversine) em graus, como angular_distance_deg."""
+    ra1, dec1, ra2, dec2 = (F.radians(_col(c)) for c in (ra1, dec1, ra2, dec2))
+    h = F.pow(F.sin((dec2 - dec1) / 2), 2) + F.cos(dec1) * F.cos(dec2) * F.pow(
+        F.sin((ra2 - ra1) / 2), 2
+    )
+    return F.degrees(2 * F.asin(F.sqrt(F.least(F.greatest(h, F.lit(0.0)), F.lit(1.0)))))
+
+
+def spatial_join(
+    left: DataFrame,
+    right: DataFrame,
+    left_position: Tuple[str, str, str],
+    right_position: Tuple[str, str, str],
+    window_deg: float = 0.0,
+    max_radius_deg: Optional[float] = None,
+    on: Optional[Column] = None,
+    engine: str = "pandas",
+) -> DataFrame:
+    """
+    Pares de linhas cujos círculos de erro se sobrepõem (distância <=
+    erro_esq + erro_dir + window_deg), com a coluna angular_distance_deg.
+    As posições são (ra, dec, erro) em graus; erro null conta como 0. As
+    colunas dos dois lados não devem colidir (renomeie antes). `on` é uma
+    condição extra do join (ex: o balde de tempo de coincidence_join),
+    aplicada em todos os ramos abaixo.
+
+    Mesmo plano de crossmatch: max_radius_deg limita erro_dir + window_deg
+    (um limite de erro_esq + erro_dir + window_deg também serve) e cada
+    linha da esquerda recebe a ordem cover_order(erro_esq + max_radius_deg).
+    A direita é replicada nas ordens 0..cover_order(max_radius_deg), então
+    o plano sai dos parâmetros sem consultas: o join é por (ordem, célula).
+    Nada se perde quando o limite é baixo; só deixa de usar a célula:
+
+    - linhas da esquerda em FULL_SKY_ORDER juntam com toda a direita
+    - linhas da direita com erro_dir + window_deg acima de max_radius_deg
+      juntam com o resto da esquerda
+
+    Esses ramos são join só por `on` (ou crossJoin, sem `on`), unidos ao
+    join por célula. Sem max_radius_deg ele é max(erro_dir) + window_deg,
+    calculado com uma consulta na direita, o que não é possível em
+    DataFrames de streaming.
+
+    Raises:
+        ValueError: sem max_radius_deg em DataFrames de streaming
+    """
+    lra, ldec, lerr = left_position
+    rra, rdec, rerr = right_position
+    left_err = F.coalesce(F.col(lerr), F.lit(0.0))
+    right_err = F.coalesce(F.col(rerr), F.lit(0.0))
+    bounded = max_radius_deg is not None
+    if not bounded:
+        if left.isStreaming or right.isStreaming:
+            raise ValueError("max_radius_deg is required for streaming DataFrames")
+        max_radius_deg = window_deg + (right.agg(F.max(right_err)).first()[0] or 0.0)
+    orders = list(range(cover_order(max_radius_deg) + 1))
+
+    distance = angular_distance(lra, ldec, rra, rdec)
+    radius = left_err + right_err + window_deg
+
+    def matches(left: DataFrame, right: DataFrame, condition: Optional[Column]) -> DataFrame:
+        joined = left.crossJoin(right) if condition is None else left.join(right, condition)
+        return (
+            joined.withColumn("angular_distance_deg", distance)
+            .filter(F.col("angular_distance_deg") <= radius)
+            .drop("_hpx", "_hpx_order", "_hpx_cell", "_hpx_key")
+        )
+
+    left = left.withColumn("_hpx_order", cover_order_column(left_err + max_radius_deg))
+    narrow = F.col("_hpx_order") != FULL_SKY_ORDER
+    branches = [matches(left.filter(~narrow), right, on)]
+    if bounded:
+        within = right_err + window_deg <= max_radius_deg
+        branches.append(matches(left.filter(narrow), right.filter(~within), on))
+        right = right.filter(within)
+
+    if orders:
+        order_cell = F.lit(None).cast("long")
+        for order in orders:
+            order_cell = F.when(
+                F.col("_hpx_order") == order, parent_cell("_hpx", MAX_ORDER, order)
+            ).otherwise(order_cell)
+        cells = (
+            left.filter(narrow)
+            .withColumn("_hpx", healpix(lra, ldec, engine=engine))
+            .withColumn("_hpx_cell", F.explode(cover_cells(order_cell, F.col("_hpx_order"))))
+            .filter(F.col("_hpx_cell") >= 0)
+            .drop("_hpx")
+        )
+        keys = (
+            right.withColumn("_hpx", healpix(rra, rdec, engine=engine))
+            .withColumn(
+                "_hpx_key",
+                F.explode(
+                    F.array(
+                        *(
+                            F.struct(
+                                F.lit(order).alias("order"),
+                                parent_cell("_hpx", MAX_ORDER, order).alias("cell"),
+                            )
+                            for order in orders
+                        )
+                    )
+                ),
+            )
+            .drop("_hpx")
+        )
+        same_cell = (F.col("_hpx_order") == F.col("_hpx_key.order")) & (
+            F.col("_hpx_cell") == F.col("_hpx_key.cell")
+        )
+        branches.append(matches(cells, keys, same_cell if on is None else same_cell & on))
+    return reduce(DataFrame.unionByName, branches)
@@ -0,0 +1,303 @@
+"""
+Consolidação por trigger (gcn_triggers): uma linha por (mission, trig_num).
+
+Um mesmo trigger gera vários pacotes em gcn_classic_binary,
+gcn_classic_text, gcn_classic_voevent e gcn_notices (alerta, atualizações
+de posição, posição final). trigger_updates normaliza as quatro tabelas
+Silver num schema comum (TRIGGER_UPDATE_STRUCT) e
+consolidate_triggers mantém, com applyInPandasWithState, o resumo de cada
+trigger:
+
+- melhor localização até agora (menor erro; em empate vale a primeira
+  recebida) com a fonte e o tipo do pacote que a trouxe
+- primeiro e último pacote (kafka_timestamp) e contagem por fonte
+- trigger_time do primeiro pacote que o informa
+
+O estado por trigger tem tamanho fixo (não guarda os pacotes), então cada
+pacote novo custa O(1) e só os triggers com pacotes no micro-batch são
+emitidos. O resultado é aplicado na tabela final com dlt.apply_changes
+(upsert por mission, trig_num). Como o Kafka entrega at-least-once, as
+contagens são de entregas.
+
+O estado expira por event time (padrão config.TRIGGER_STATE_TTL_DAYS): o
+stream recebe um watermark de state_ttl em kafka_timestamp e um trigger sai
+do estado quando o watermark passa do último pacote + state_ttl. O último
+resumo já está na tabela; pacotes mais antigos que o watermark são
+descartados pelo Spark, e os que chegam depois da expiração abrem um
+resumo novo com trigger_version menor, que o upsert ignora. (Processing
+time não serve: com ele cada micro-batch agenda outro só para limpar o
+estado e um trigger availableNow nunca termina.)
+
+A missão vem do tópico (ver utils.topic_mission), igual nos três formatos
+clássicos, ou o instrumento quando os números de trigger se repetem entre
+instrumentos (fermi_gbm, fermi_lat); o trig_num vem de trig_num (binário), do Param TrigID
+(VOEvent), da linha TRIGGER_NUM (texto) e do id do notice.
+"""
+
+from datetime import timedelta
+from functools import partial
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pyspark.sql import Column, DataFrame
+from pyspark.sql.functions import col, lit, regexp_extract, trim, when
+from pyspark.sql.streaming.state import GroupState, GroupStateTimeout
+from pyspark.sql.types import (
+    ArrayType,
+    DoubleType,
+    IntegerType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+from nasa_gcn.config import TRIGGER_STATE_TTL_DAYS
+from nasa_gcn.utils import timestamp_from_us, timestamps_to_us, topic_mission
+
+# Fontes, na ordem das colunas <fonte>_packets
+TRIGGER_SOURCES = ("binary", "text", "voevent", "notices")
+
+# Pacotes das tabelas Silver em um schema comum (ver trigger_updates)
+TRIGGER_UPDATE_STRUCT = StructType(
+    [
+        StructField("mission", StringType()),
+        StructField("trig_num", IntegerType()),
+        StructField("source", StringType()),
+        StructField("packet_type", StringType()),
+        StructField("trigger_time", TimestampType()),
+        StructField("ra_deg", DoubleType()),
+        StructField("dec_deg", DoubleType()),
+        StructField("error_deg", DoubleType()),
+        StructField("kafka_timestamp", TimestampType()),
+    ]
+)
+
+TRIGGER_SUMMARY_STRUCT = StructType(
+    [
+        StructField("mission", StringType()),
+        StructField("trig_num", IntegerType()),
+        StructField("trigger_time", TimestampType()),
+        StructField("first_packet_at", TimestampType()),
+        StructField("last_packet_at", TimestampType()),
+        StructField("packet_count", LongType()),
+        *(StructField(f"{source}_packets", LongType()) for source in TRIGGER_SOURCES),
+        StructField("best_ra_deg", DoubleType()),
+        StructField("best_dec_deg", DoubleType()),
+        StructField("best_error_deg", DoubleType()),
+        StructField("best_source", StringType()),
+        StructField("best_packet_type", StringType()),
+        StructField("best_packet_at", TimestampType()),
+        StructField("trigger_version", LongType()),
+        StructField("gold_ts", TimestampType()),
+    ]
+)
+
+# Timestamps como microssegundos (LONG, -1 = ausente), como em gold.EVENT_STATE_STRUCT
+TRIGGER_STATE_STRUCT = StructType(
+    [
+        StructField("first_us", LongType()),
+        StructField("last_us", LongType()),
+        StructField("trigger_time_us", LongType()),
+        StructField("source_counts", ArrayType(LongType())),
+        StructField("best_ra_deg", DoubleType()),
+        StructField("best_dec_deg", DoubleType()),
+        StructField("best_error_deg", DoubleType()),
+        StructField("best_source", StringType()),
+        StructField("best_packet_type", StringType()),
+        StructField("best_us", LongType()),
+        StructField("version", LongType()),
+    ]
+)
+
+_TRIGGER_NUM = r"TRIGGER_NUM:\s*(\d+)"
+
+
+def _as_int(value: Column) -> Column:
+    """Texto numérico -> INT (null para o resto, sem erro de cast em modo ANSI)."""
+    value = trim(value)
+    return when(value.rlike(r"^\d{1,9}$"), value.cast("int"))
+
+
+def trigger_updates(
+    binary: DataFrame, text: DataFrame, voevent: DataFrame, notices: DataFrame
+) -> DataFrame:
+    """
+    União dos pacotes das quatro tabelas Silver no schema
+    TRIGGER_UPDATE_STRUCT, só com os que identificam um trigger.
+    """
+    null = {f.name: lit(None).cast(f.dataType).alias(f.name) for f in TRIGGER_UPDATE_STRUCT}
+
+    def select(df: DataFrame, source: str, trig_num: Column, packet_type: Column, *fields):
+        return df.select(
+            topic_mission(col("topic")).alias("mission"),
+            trig_num.alias("trig_num"),
+            lit(source).alias("source"),
+            packet_type.alias("packet_type"),
+            *fields,
+            "kafka_timestamp",
+        )
+
+    sources = [
+        select(
+            binary,
+            "binary",
+            col("trig_num"),
+            col("pkt_type_name"),
+            col("burst_datetime").alias("trigger_time"),
+            col("burst_ra_deg").alias("ra_deg"),
+            col("burst_dec_deg").alias("dec_deg"),
+            col("burst_error_deg").alias("error_deg"),
+        ),
+        select(
+            text,
+            "text",
+            _as_int(regexp_extract(col("message_text"), _TRIGGER_NUM, 1)),
+            col("topic"),
+            null["trigger_time"],
+            null["ra_deg"],
+            null["dec_deg"],
+            null["error_deg"],
+        ),
+        select(
+            voevent,
+            "voevent",
+            _as_int(col("params")["TrigID"]),
+            col("topic"),
+            col("event_time").alias("trigger_time"),
+            "ra_deg",
+            "dec_deg",
+            "error_deg",
+        ),
+        select(
+            notices,
+            "notices",
+            _as_int(col("notice_id")),
+            col("topic"),
+            "trigger_time",
+            col("ra").alias("ra_deg"),
+            col("dec").alias("dec_deg"),
+            col("ra_dec_error").alias("error_deg"),
+        ),
+    ]
+    updates = sources[0]
+    for df in sources[1:]:
+        updates = updates.unionByName(df)
+    return updates.filter(col("mission").isNotNull() & col("trig_num").isNotNull())
+
+
+def update_trigger_summary(
+    key: Tuple[str, int],
+    batches: Iterator[pd.DataFrame],
+    state: GroupState,
+    state_ttl_ms: int = 0,
+) -> Iterator[pd.DataFrame]:
+    """
+    Função de applyInPandasWithState: incorpora os pacotes novos de um
+    trigger ao estado (tamanho fixo) e emite o resumo atualizado. Com
+    state_ttl_ms > 0 o estado expira quando o watermark passa do último
+    pacote + state_ttl_ms e é removido sem emitir nada (o resumo já foi
+    emitido).
+    """
+    if state.hasTimedOut:
+        state.remove()
+        return
+    if state.exists:
+        first, last, trigger_us, counts, ra, dec, error, source, packet_type, best_us, version = (
+            state.get
+        )
+        counts = list(counts)
+    else:
+        first, last, trigger_us, version = -1, -1, -1, 0
+        counts = [0] * len(TRIGGER_SOURCES)
+        ra = dec = error = source = packet_type = None
+        best_us = -1
+
+    for pdf in batches:
+        received = timestamps_to_us(pdf["kafka_timestamp"])
+        order = np.argsort(received, kind="stable")
+        pdf, received = pdf.iloc[order], received[order]
+        known = received[received >= 0]
+        if len(known):
+            first = int(known[0]) if first < 0 else min(first, int(known[0]))
+            last = max(last, int(known[-1]))
+        for index, name in enumerate(TRIGGER_SOURCES):
+            counts[index] += int((pdf["source"] == name).sum())
+
+        if trigger_us < 0:
+            times = timestamps_to_us(pdf["trigger_time"])
+            times = times[times >= 0]
+            if len(times):
+                trigger_us = int(times[0])
+
+        # Menor erro do batch (o primeiro recebido em empate) contra o do estado
+        localized = np.flatnonzero(
+            pdf[["ra_deg", "dec_deg", "error_deg"]].notna().all(axis=1).to_numpy()
+        )
+        if len(localized):
+            errors = pdf["error_deg"].to_numpy(dtype=float)[localized]
+            position = localized[int(np.argmin(errors))]
+            best = pdf.iloc[position]
+            if error is None or best["error_deg"] < error:
+                ra, dec, error = (float(best[c]) for c in ("ra_deg", "dec_deg", "error_deg"))
+                source = best["source"]
+                packet_type = None if pd.isna(best["packet_type"]) else best["packet_type"]
+                best_us = int(received[position])
+
+    version += 1
+    state.update(
+        (first, last, trigger_us, counts, ra, dec, error, source, packet_type, best_us, version)
+    )
+    if state_ttl_ms > 0:
+        state.setTimeoutTimestamp(max(last // 1000, state.getCurrentWatermarkMs()) + state_ttl_ms)
+    yield pd.DataFrame(
+        {
+            "mission": [key[0]],
+            "trig_num": [key[1]],
+            "trigger_time": [timestamp_from_us(trigger_us)],
+            "first_packet_at": [timestamp_from_us(first)],
+            "last_packet_at": [timestamp_from_us(last)],
+            "packet_count": [sum(counts)],
+            **{f"{name}_packets": [n] for name, n in zip(TRIGGER_SOURCES, counts)},
+            "best_ra_deg": [ra],
+            "best_dec_deg": [dec],
+            "best_error_deg": [error],
+            "best_source": [source],
+            "best_packet_type": [packet_type],
+            "best_packet_at": [timestamp_from_us(best_us)],
+            "trigger_version": [version],
+            "gold_ts": [pd.Timestamp.now(tz="UTC")],
+        }
+    )
+
+
+def consolidate_triggers(
+    updates: DataFrame,
+    state_ttl: Optional[timedelta] = timedelta(days=float(TRIGGER_STATE_TTL_DAYS)),
+) -> DataFrame:
+    """
+    Agregação com estado sobre o stream de trigger_updates: emite uma linha
+    de TRIGGER_SUMMARY_STRUCT por trigger alterado em cada micro-batch.
+    Aplicar na tabela final com upsert por (mission, trig_num), sequence_by
+    trigger_version. O estado de um trigger expira state_ttl depois do
+    último pacote, em event time (None mantém para sempre, ver
+    config.get_trigger_state_ttl).
+    """
+    if state_ttl is None:
+        func, timeout = update_trigger_summary, GroupStateTimeout.NoTimeout
+    else:
+        ttl_ms = int(state_ttl.total_seconds() * 1000)
+        if ttl_ms <= 0:
+            raise ValueError(f"state_ttl must be positive, got {state_ttl}")
+        updates = updates.withWatermark("kafka_timestamp", f"{ttl_ms} milliseconds")
+        func = partial(update_trigger_summary, state_ttl_ms=ttl_ms)
+        timeout = GroupStateTimeout.EventTimeTimeout
+    return updates.groupBy("mission", "trig_num").applyInPandasWithState(
+        func,
+        outputStructType=TRIGGER_SUMMARY_STRUCT,
+        stateStructType=TRIGGER_STATE_STRUCT,
+        outputMode="append",
+        timeoutConf=timeout,
+    )
@@ -2,8 +2,22 @@
 Utility functions for NASA GCN Pipeline.
 """
 
+import numpy as np
+import pandas as pd
 from pyspark.sql import Column
-from pyspark.sql.functions import col, decode, regexp_replace
+from pyspark.sql.functions import (
+    col,
+    decode,
+    get,
+    lit,
+    lower,
+    regexp_replace,
+    split,
+    substring_index,
+    when,
+)
+
+from nasa_gcn.config import CLASSIC_INSTRUMENT_MISSIONS, OTHER_TOPIC_FAMILY, TOPIC_FAMILIES
 
 
 def decode_utf8(col_name: str = "value") -> Column:
@@ -22,3 +36,46 @@ def clean_json_id(id_col: Column) -> Column:
     step1 = regexp_replace(id_col, r'^[\["]+', "")
     # Remove trailing "] or ]
     return regexp_replace(step1, r'[\]"]+$', "")
+
+
+def topic_family(topic_col: Column) -> Column:
+    """
+    Maps a Kafka topic column to its family (see config.TOPIC_FAMILIES).
+    Ex: 'gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK' -> 'binary'
+    """
+    family = lit(OTHER_TOPIC_FAMILY)
+    for name, match in reversed(TOPIC_FAMILIES.items()):
+        matches = topic_col.startswith(match) if match.endswith(".") else topic_col == match
+        family = when(matches, lit(name)).otherwise(family)
+    return family
+
+
+def topic_mission(topic_col: Column) -> Column:
+    """
+    Lowercase mission of a classic or notices topic column (null for others),
+    like config.get_topic_mission.
+    Ex: 'gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK' -> 'swift'
+    """
+    notice_type = substring_index(topic_col, ".", -1)
+    classic = lower(substring_index(notice_type, "_", 1))
+    for prefix, mission in reversed(CLASSIC_INSTRUMENT_MISSIONS.items()):
+        classic = when(notice_type.startswith(prefix), lit(mission)).otherwise(classic)
+    notices = lower(get(split(topic_col, r"\."), 2))
+    return when(topic_col.startswith("gcn.classic."), classic).when(
+        topic_col.startswith(TOPIC_FAMILIES["notices"]), notices
+    )
+
+
+def timestamps_to_us(values: pd.Series) -> np.ndarray:
+    """
+    Converts a pandas timestamp Series (naive, session timezone) to epoch
+    microseconds, for state that must not depend on the process timezone.
+    NaT becomes -1.
+    """
+    us = values.to_numpy(dtype="datetime64[us]").astype(np.int64)
+    return np.where(values.isna().to_numpy(), -1, us)
+
+
+def timestamp_from_us(us: int):
+    """Inverse of timestamps_to_us for one value (None or -1 -> None)."""
+    return None if us is None or us < 0 else pd.Timestamp(us, unit="us")
@@ -0,0 +1,231 @@
+"""
+Extração de campos de documentos VOEvent XML em uma única passada.
+
+Cada documento é percorrido uma vez pelo expat (`xml.etree.ElementTree.XMLParser`)
+com um target SAX: os atributos da raiz e dos `<Param>` são lidos no start,
+os textos (Who, WhereWhen, Why) acumulados até o end, e nenhuma árvore de
+elementos é construída. Adicionar um campo é registrar mais um caminho em
+_TEXT_FIELDS, sem novo parse do documento (ao contrário de uma chamada
+`xpath_string` por campo).
+
+No Spark, voevent_details aplica o parser em um pandas_udf sobre batches
+Arrow e retorna uma coluna struct (VOEVENT_STRUCT).
+
+References:
+    https://www.ivoa.net/documents/VOEvent/
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from pyspark.sql import Column
+from pyspark.sql.functions import pandas_udf
+from pyspark.sql.types import (
+    DoubleType,
+    MapType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+VOEVENT_FIELDS = (
+    "ivorn",
+    "role",
+    "version",
+    "author_ivorn",
+    "author_date",
+    "event_time",
+    "ra_deg",
+    "dec_deg",
+    "error_deg",
+    "concept",
+    "params",
+    "parse_error",
+)
+
+# StructType (e não DDL) porque o pandas_udf é definido no nível do módulo
+VOEVENT_STRUCT = StructType(
+    [
+        StructField("ivorn", StringType()),
+        StructField("role", StringType()),
+        StructField("version", StringType()),
+        StructField("author_ivorn", StringType()),
+        StructField("author_date", TimestampType()),
+        StructField("event_time", TimestampType()),
+        StructField("ra_deg", DoubleType()),
+        StructField("dec_deg", DoubleType()),
+        StructField("error_deg", DoubleType()),
+        StructField("concept", StringType()),
+        StructField("params", MapType(StringType(), StringType())),
+        StructField("parse_error", StringType()),
+    ]
+)
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def parse_iso_timestamp(text: str) -> datetime:
+    """
+    Converte um ISO 8601 do VOEvent em datetime UTC (timezone-aware).
+
+    O padrão VOEvent usa UTC sem sufixo; "Z", offsets explícitos e frações
+    com qualquer número de dígitos também são aceitos.
+
+    Raises:
+        ValueError: se o texto não for um timestamp ISO 8601
+    """
+    text = text.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    # fromisoformat (Python 3.10) aceita apenas frações de 3 ou 6 dígitos
+    text = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), text, count=1)
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+# (elemento pai, elemento) -> (campo, conversão do texto). Vale a primeira ocorrência.
+_TEXT_FIELDS: Dict[Tuple[str, str], Tuple[str, Callable[[str], Any]]] = {
+    ("Who", "AuthorIVORN"): ("author_ivorn", str),
+    ("Who", "Date"): ("author_date", parse_iso_timestamp),
+    ("TimeInstant", "ISOTime"): ("event_time", parse_iso_timestamp),
+    ("Value2", "C1"): ("ra_deg", float),
+    ("Value2", "C2"): ("dec_deg", float),
+    ("Position2D", "Error2Radius"): ("error_deg", float),
+    ("Why", "Concept"): ("concept", str),
+    ("Inference", "Concept"): ("concept", str),
+}
+
+
+def _local_name(tag: str) -> str:
+    """Remove o namespace ("{uri}VOEvent" -> "VOEvent")."""
+    return tag.rpartition("}")[2]
+
+
+class _VOEventTarget:
+    """
+    Target SAX do XMLParser: recebe start/data/end do expat e preenche o
+    resultado sem construir a árvore de elementos.
+    """
+
+    def __init__(self, result: Dict[str, Any]):
+        self.result = result
+        self.errors: List[str] = []
+        self._path: List[str] = []
+        # Campo cujo texto está sendo acumulado (elementos folha de _TEXT_FIELDS)
+        self._capture: Optional[Tuple[str, Callable[[str], Any]]] = None
+        self._text: List[str] = []
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        name = _local_name(tag)
+        if not self._path:
+            if name != "VOEvent":
+                raise ValueError(f"Root element is {name!r}, expected 'VOEvent'")
+            for field in ("ivorn", "role", "version"):
+                self.result[field] = attrib.get(field)
+        elif name == "Param" and "name" in attrib:
+            self.result["params"].setdefault(attrib["name"], attrib.get("value"))
+
+        target = _TEXT_FIELDS.get((self._path[-1] if self._path else "", name))
+        if target is not None and self.result[target[0]] is None:
+            self._capture = target
+            self._text = []
+        self._path.append(name)
+
+    def data(self, text: str) -> None:
+        if self._capture is not None:
+            self._text.append(text)
+
+    def end(self, tag: str) -> None:
+        self._path.pop()
+        if self._capture is None:
+            return
+        field, convert = self._capture
+        self._capture = None
+        text = "".join(self._text).strip()
+        if text:
+            try:
+                self.result[field] = convert(text)
+            except ValueError:
+                self.errors.append(f"Invalid {field}: {text!r}")
+
+    def close(self) -> None:
+        return None
+
+
+def parse_voevent(xml: Union[bytes, str, None]) -> Dict[str, Any]:
+    """
+    Extrai os campos principais de um documento VOEvent em uma única passada.
+
+    Args:
+        xml: Documento VOEvent (bytes UTF-8 ou str)
+
+    Returns:
+        Dicionário com os campos de VOEVENT_FIELDS:
+        - ivorn, role, version: str - Atributos do elemento raiz
+        - author_ivorn: str - Who/AuthorIVORN
+        - author_date: datetime - Who/Date (UTC, timezone-aware)
+        - event_time: datetime - Instante do evento (WhereWhen, ISOTime)
+        - ra_deg, dec_deg, error_deg: float - Position2D (C1, C2, Error2Radius)
+        - concept: str - Why/Inference/Concept
+        - params: dict - name -> value de todos os <Param> (inclusive em <Group>)
+        - parse_error: str - Mensagem de erro se parsing falhou
+    """
+    result: Dict[str, Any] = {name: None for name in VOEVENT_FIELDS}
+    result["params"] = {}
+
+    if not xml:
+        result["parse_error"] = "Empty document"
+        return result
+
+    target = _VOEventTarget(result)
+    try:
+        parser = ET.XMLParser(target=target)
+        parser.feed(xml)
+        parser.close()
+    except (ET.ParseError, ValueError) as e:
+        target.errors.append(str(e))
+
+    if target.errors:
+        result["parse_error"] = "; ".join(target.errors)
+    return result
+
+
+# ==============================================================================
+# SPARK
+# ==============================================================================
+
+
+def parse_voevent_frame(values: pd.Series) -> pd.DataFrame:
+    """
+    Decodifica uma Series de documentos VOEvent em um DataFrame com as colunas
+    de VOEVENT_STRUCT.
+    """
+    frame = pd.DataFrame([parse_voevent(xml) for xml in values], columns=list(VOEVENT_FIELDS))
+    for name in ("author_date", "event_time"):
+        frame[name] = pd.to_datetime(frame[name], utc=True)
+    for name in ("ra_deg", "dec_deg", "error_deg"):
+        frame[name] = frame[name].astype("Float64")
+    return frame
+
+
+@pandas_udf(VOEVENT_STRUCT)
+def parse_voevent_pandas_udf(batches: Iterator[pd.Series]) -> Iterator[pd.DataFrame]:
+    for values in batches:
+        yield parse_voevent_frame(values)
+
+
+def voevent_details(xml: Union[str, Column] = "xml") -> Column:
+    """
+    Retorna uma coluna struct (VOEVENT_STRUCT) com os campos extraídos de cada
+    documento VOEvent, em um único parse por linha.
+
+    Args:
+        xml: Coluna (ou nome) com o documento VOEvent (string ou binário)
+    """
+    return parse_voevent_pandas_udf(xml)
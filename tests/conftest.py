@@ -6,8 +6,6 @@ from contextlib import contextmanager
 
 try:
     import pytest
-    from databricks.connect import DatabricksSession
-    from databricks.sdk import WorkspaceClient
     from pyspark.sql import SparkSession
 except ImportError:
     raise ImportError(
@@ -15,6 +13,33 @@ except ImportError:
         "See http://docs.astral.sh/uv to learn more about uv."
     )
 
+try:
+    from databricks.connect import DatabricksSession
+    from databricks.sdk import WorkspaceClient
+except ImportError:
+    # Without Databricks Connect (e.g. open-source pyspark) tests run on local Spark
+    DatabricksSession = None
+
+
+def use_local_spark() -> bool:
+    """Use a local SparkSession if Databricks Connect is missing or NASA_GCN_LOCAL_SPARK=1."""
+    return DatabricksSession is None or os.environ.get("NASA_GCN_LOCAL_SPARK") == "1"
+
+
+def local_spark() -> SparkSession:
+    """Create (or reuse) a small local SparkSession for tests."""
+    # Python workers must import nasa_gcn and the test helpers, like the driver
+    os.environ["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+    return (
+        SparkSession.builder.master("local[2]")
+        .appName("nasa_gcn_tests")
+        .config("spark.sql.shuffle.partitions", "2")
+        .config("spark.ui.enabled", "false")
+        .config("spark.ui.showConsoleProgress", "false")
+        .config("spark.sql.session.timeZone", "UTC")
+        .getOrCreate()
+    )
+
 
 def enable_fallback_compute():
     """Enable serverless compute if no compute is specified."""
@@ -42,6 +67,9 @@ def allow_stderr_output(config: pytest.Config):
 
 def pytest_configure(config: pytest.Config):
     """Configure pytest session."""
+    if use_local_spark():
+        return
+
     with allow_stderr_output(config):
         enable_fallback_compute()
 
@@ -57,4 +85,8 @@ def pytest_configure(config: pytest.Config):
 @pytest.fixture(scope="session")
 def spark() -> SparkSession:
     """Provide a SparkSession fixture for tests."""
+    if use_local_spark():
+        spark = local_spark()
+        spark.sparkContext.setLogLevel("ERROR")
+        return spark
     return DatabricksSession.builder.getOrCreate()
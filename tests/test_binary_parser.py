@@ -6,14 +6,27 @@ Para rodar:
     uv run pytest tests/test_binary_parser.py -v
 """
 
+import random
 import struct
-from datetime import datetime
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
 
 from nasa_gcn.binary_parser import (
+    BINARY_FIELDS,
+    PACKET_TYPE_NAMES,
+    GcnPacket,
+    batch_to_records,
     centi_to_deg,
     get_packet_type_name,
+    iter_packets,
+    packets_to_matrix,
+    parse_gcn_binary_batch,
     parse_gcn_binary_packet,
     tjd_sod_to_datetime,
+    tjd_sod_to_epoch_us,
+    tjd_sod_to_timestamp,
 )
 
 
@@ -50,6 +63,30 @@ class TestTjdSodToDatetime:
         assert tjd_sod_to_datetime(10281, -1) is None
 
 
+class TestTjdSodToEpochUs:
+    """Testes para a conversão inteira TJD+SOD -> microssegundos/timestamp UTC."""
+
+    def test_known_date(self):
+        """1996-07-17 12:00:00.01 UTC em microssegundos e como datetime UTC."""
+        expected = datetime(1996, 7, 17, 12, 0, 0, 10000, tzinfo=timezone.utc)
+        assert tjd_sod_to_epoch_us(10281, 4320001) == expected.timestamp() * 1_000_000
+        assert tjd_sod_to_timestamp(10281, 4320001) == expected
+
+    def test_invalid_values(self):
+        """TJD/SOD inválidos e datas além do ano 9999 retornam None."""
+        for tjd, sod in [(0, 0), (-1, 0), (10281, -1), (3_000_000, 0), (2**31 - 1, 0)]:
+            assert tjd_sod_to_epoch_us(tjd, sod) is None
+            assert tjd_sod_to_timestamp(tjd, sod) is None
+
+    def test_vectorized_matches_scalar(self):
+        """Variante NumPy reproduz a escalar, mascarando os inválidos."""
+        rng = np.random.default_rng(0)
+        tjd = rng.integers(-10, 3_000_000, size=2000)
+        sod = rng.integers(-10, 2**31 - 1, size=2000)
+        expected = [tjd_sod_to_epoch_us(int(t), int(s)) for t, s in zip(tjd, sod)]
+        assert tjd_sod_to_epoch_us(tjd, sod).tolist() == expected
+
+
 class TestCentiToDeg:
     """Testes para conversão de centi-graus para graus."""
 
@@ -149,12 +186,7 @@ class TestParseGcnBinaryPacket:
         )
         result = parse_gcn_binary_packet(packet)
 
-        assert result["burst_datetime"] is not None
-        dt = datetime.fromisoformat(result["burst_datetime"])
-        assert dt.year == 1996
-        assert dt.month == 7
-        assert dt.day == 17
-        assert dt.hour == 12
+        assert result["burst_datetime"] == datetime(1996, 7, 17, 12, tzinfo=timezone.utc)
 
     def test_invalid_size(self):
         """Retorna erro para pacote de tamanho errado."""
@@ -206,3 +238,226 @@ class TestParseGcnBinaryPacket:
 
         assert result["pkt_type"] == 150
         assert result["pkt_type_name"] == "LVC_PRELIMINARY"
+
+
+def _fuzz_packets(n: int, seed: int = 42) -> list:
+    """
+    Gera pacotes aleatórios cobrindo os casos de borda do parser: tipos
+    conhecidos e desconhecidos, escalas 100/10000, coordenadas fora do range,
+    TJD/SOD inválidos ou que estouram datetime, e extremos de int32.
+    """
+    rng = random.Random(seed)
+    int32_edges = [-(2**31), -1, 0, 1, 2**31 - 1]
+    known_types = list(PACKET_TYPE_NAMES)
+
+    def pick(*choices):
+        return rng.choice(choices)()
+
+    packets = []
+    for _ in range(n):
+        longs = [rng.randint(-(2**31), 2**31 - 1) for _ in range(40)]
+        longs[0] = pick(
+            lambda: rng.choice(known_types),
+            lambda: rng.randint(-5, 300),
+            lambda: rng.choice(int32_edges),
+        )
+        longs[4] = pick(lambda: rng.randint(-10, 10**6), lambda: rng.choice(int32_edges))
+        longs[5] = pick(
+            lambda: rng.randint(-10, 30000),
+            lambda: rng.randint(2_900_000, 3_000_000),  # próximo do ano 9999
+            lambda: rng.choice(int32_edges),
+        )
+        longs[6] = pick(
+            lambda: rng.randint(-10, 8_640_000),
+            lambda: rng.randint(0, 8_640_000) // 100 * 100,  # segundos inteiros
+            lambda: rng.choice(int32_edges),
+        )
+        for slot in (7, 8, 11):
+            longs[slot] = pick(
+                lambda: rng.randint(-40000, 40000),
+                lambda: rng.randint(-4_000_000, 4_000_000),
+                lambda: rng.choice(int32_edges),
+            )
+        packets.append(struct.pack(">40i", *longs))
+    return packets
+
+
+class TestParseGcnBinaryBatch:
+    """Testes de paridade do decodificador vetorizado com o parser escalar."""
+
+    def test_fuzz_parity(self):
+        """Batch deve reproduzir o parser escalar bit a bit em um corpus aleatório."""
+        packets = _fuzz_packets(5000)
+        expected = [parse_gcn_binary_packet(p) for p in packets]
+        assert batch_to_records(parse_gcn_binary_batch(packets)) == expected
+
+    def test_contiguous_buffer(self):
+        """Buffer contíguo de N * 160 bytes equivale à lista de pacotes."""
+        packets = _fuzz_packets(100, seed=7)
+        from_list = batch_to_records(parse_gcn_binary_batch(packets))
+        from_stream = batch_to_records(parse_gcn_binary_batch(b"".join(packets)))
+        assert from_stream == from_list
+
+    def test_invalid_rows(self):
+        """Pacotes None ou de tamanho errado geram o mesmo parse_error do escalar."""
+        packets = _fuzz_packets(3, seed=1)
+        batch = [packets[0], None, b"too short", packets[1], b"", packets[2]]
+        expected = [parse_gcn_binary_packet(p) for p in batch]
+        assert batch_to_records(parse_gcn_binary_batch(batch)) == expected
+
+    def test_precomputed_matrix(self):
+        """Reaproveitar o packets_to_matrix (ex: decode_binary) dá o mesmo resultado."""
+        packets = _fuzz_packets(3, seed=1)
+        batch = [packets[0], None, b"too short", packets[1], packets[2]]
+        columns = parse_gcn_binary_batch(batch, matrix=packets_to_matrix(batch))
+        assert batch_to_records(columns) == [parse_gcn_binary_packet(p) for p in batch]
+
+    def test_columns(self):
+        """Retorna uma coluna por campo do parser escalar."""
+        columns = parse_gcn_binary_batch(_fuzz_packets(10))
+        assert tuple(columns) == BINARY_FIELDS
+        assert all(len(values) == 10 for values in columns.values())
+
+    def test_empty_batch(self):
+        """Batch vazio retorna colunas vazias."""
+        assert batch_to_records(parse_gcn_binary_batch([])) == []
+
+    def test_misaligned_buffer(self):
+        """Buffer contíguo que não é múltiplo de 160 bytes é rejeitado."""
+        with pytest.raises(ValueError):
+            parse_gcn_binary_batch(b"\x00" * 161)
+
+
+class TestGcnPacket:
+    """Testes para o registro compacto GcnPacket."""
+
+    def test_fuzz_parity(self):
+        """to_dict() deve reproduzir parse_gcn_binary_packet."""
+        packets = _fuzz_packets(2000, seed=3)
+        for packet in packets:
+            assert GcnPacket(packet).to_dict() == parse_gcn_binary_packet(packet)
+
+    @pytest.mark.parametrize("data", [None, b"", b"too short", b"\x00" * 161])
+    def test_invalid_packet(self, data):
+        """Pacotes inválidos têm parse_error e todos os campos None."""
+        assert GcnPacket(data).to_dict() == parse_gcn_binary_packet(data)
+
+    def test_lazy_fields(self):
+        """Campos derivados são calculados no primeiro acesso e memorizados."""
+        packet = GcnPacket(_fuzz_packets(1)[0])
+        assert packet._coords is None
+        ra = packet.burst_ra_deg
+        assert packet._coords is not None
+        assert packet.burst_ra_deg is ra
+        first = packet.burst_datetime
+        assert packet.burst_datetime is first
+
+    def test_no_instance_dict(self):
+        """__slots__ evita o __dict__ por instância."""
+        assert not hasattr(GcnPacket(None), "__dict__")
+
+
+def _socket_header(pkt_type: int, sernum: int) -> bytes:
+    """pkt_type, pkt_sernum, pkt_hop_cnt e pkt_sod como enviados pelo socket do GCN."""
+    return struct.pack(">4i", pkt_type, sernum, 1, (sernum * 100) % 8_640_000)
+
+
+def _stream_packets(n: int, seed: int = 5) -> list:
+    """Pacotes de fuzz com cabeçalho de socket e tipo conhecido (como num dump real)."""
+    known_types = sorted(PACKET_TYPE_NAMES)
+    packets = []
+    for i, packet in enumerate(_fuzz_packets(n, seed=seed)):
+        header = _socket_header(known_types[i % len(known_types)], i + 1)
+        packets.append(header + packet[16:])
+    return packets
+
+
+class TestIterPackets:
+    """Testes para iter_packets sobre streams back-to-back."""
+
+    def test_bytes_and_parity(self):
+        """Cada pacote do stream decodifica como o parser escalar."""
+        packets = _stream_packets(50)
+        records = [p.to_dict() for p in iter_packets(b"".join(packets))]
+        assert records == [parse_gcn_binary_packet(p) for p in packets]
+
+    def test_zero_copy(self):
+        """Os pacotes são fatias do buffer original."""
+        buffer = bytearray(b"".join(_stream_packets(3)))
+        packets = list(iter_packets(buffer))
+        buffer[160:164] = struct.pack(">i", 61)
+        assert packets[1].pkt_type == 61
+
+    def test_file_mmap(self, tmp_path):
+        """Caminhos e arquivos abertos são lidos via mmap."""
+        packets = _stream_packets(20)
+        path = tmp_path / "dump.bin"
+        path.write_bytes(b"".join(packets))
+        expected = [parse_gcn_binary_packet(p) for p in packets]
+        assert [p.to_dict() for p in iter_packets(path)] == expected
+        with open(path, "rb") as file:
+            assert [p.to_dict() for p in iter_packets(file)] == expected
+
+        (tmp_path / "empty.bin").write_bytes(b"")
+        assert list(iter_packets(tmp_path / "empty.bin")) == []
+
+    def test_truncated_tail(self):
+        """Bytes finais que não formam um pacote são reportados."""
+        errors = []
+        data = b"".join(_stream_packets(3)) + b"\x00" * 37
+        assert len(list(iter_packets(data, on_error=lambda *e: errors.append(e)))) == 3
+        assert errors == [(480, 37, "Truncated packet at offset 480: 37 bytes (expected 160)")]
+
+        with pytest.warns(UserWarning, match="Truncated packet"):
+            list(iter_packets(data))
+
+    def test_resync_after_garbage(self):
+        """Lixo entre pacotes é pulado e o stream volta a alinhar."""
+        packets = _stream_packets(6)
+        data = b"".join(packets[:2]) + b"\xff" * 57 + b"".join(packets[2:])
+        errors = []
+        records = [p.to_dict() for p in iter_packets(data, on_error=lambda *e: errors.append(e))]
+        assert records == [parse_gcn_binary_packet(p) for p in packets]
+        assert [(offset, size) for offset, size, _ in errors] == [(320, 57)]
+
+    def test_trailing_garbage(self):
+        """O último pacote válido antes de lixo no fim do arquivo é mantido."""
+        packets = _stream_packets(3)
+        errors = []
+        data = b"".join(packets) + b"\xff" * 200
+        records = [p.to_dict() for p in iter_packets(data, on_error=lambda *e: errors.append(e))]
+        assert records == [parse_gcn_binary_packet(p) for p in packets]
+        assert [(offset, size) for offset, size, _ in errors] == [(480, 200)]
+
+    def test_resync_after_partial_packet(self):
+        """Um pacote cortado no meio do stream (socket reconectado) é descartado."""
+        packets = _stream_packets(5)
+        data = b"".join(packets[:2]) + packets[2][:100] + b"".join(packets[3:])
+        errors = []
+        records = [p.to_dict() for p in iter_packets(data, on_error=lambda *e: errors.append(e))]
+        assert records == [parse_gcn_binary_packet(p) for p in packets[:2] + packets[3:]]
+        assert [(offset, size) for offset, size, _ in errors] == [(320, 100)]
+
+    def test_unknown_type_keeps_alignment(self):
+        """Tipo fora de PACKET_TYPE_NAMES num stream alinhado é um pacote como outro."""
+        longs = [0] * 40
+        packets = []
+        for sernum, pkt_type in enumerate((61, 190, 61, 61), start=1):
+            longs[:5] = [pkt_type, sernum, 1, 4_320_000 + sernum, 1000 + sernum]
+            packets.append(struct.pack(">40i", *longs))
+        records = list(iter_packets(b"".join(packets), on_error=pytest.fail))
+        assert [(r.pkt_type, r.trig_num) for r in records] == [
+            (61, 1001),
+            (190, 1002),
+            (61, 1003),
+            (61, 1004),
+        ]
+
+    def test_invalid_header_resyncs(self):
+        """Um cabeçalho impossível (hop_cnt, pkt_sod) indica desalinhamento."""
+        packets = _stream_packets(4)
+        data = b"".join(packets[:2]) + b"\x00\x00\x00\x3d" + b"\xff" * 20 + b"".join(packets[2:])
+        errors = []
+        records = [p.to_dict() for p in iter_packets(data, on_error=lambda *e: errors.append(e))]
+        assert records == [parse_gcn_binary_packet(p) for p in packets]
+        assert [(offset, size) for offset, size, _ in errors] == [(320, 24)]
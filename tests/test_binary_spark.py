@@ -0,0 +1,155 @@
+"""
+Testes para as UDFs Spark de decodificação binária (binary_spark).
+
+Para rodar:
+    uv run pytest tests/test_binary_spark.py -v
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from test_binary_parser import _fuzz_packets
+
+from nasa_gcn.binary_parser import BINARY_FIELDS, parse_gcn_binary_packet
+from nasa_gcn.binary_spark import (
+    BINARY_ENGINES,
+    DECODED_BINARY_STRUCT,
+    binary_columns,
+    decode_binary,
+    decode_binary_frame,
+    packet_details,
+    parse_binary,
+    parse_binary_frame,
+    parse_binary_pandas_udf,
+    parse_binary_udf,
+)
+from nasa_gcn.packet_layouts import DETAIL_FIELDS, parse_packet_details
+
+
+def _packets_df(spark, packets):
+    return spark.createDataFrame([(p,) for p in packets], "value BINARY")
+
+
+def _as_dict(row):
+    """asDict() com TIMESTAMPs (coletados no horário local) convertidos para UTC."""
+    return {
+        k: v.astimezone(timezone.utc) if isinstance(v, datetime) else v
+        for k, v in row.asDict().items()
+    }
+
+
+class TestParseBinaryFrame:
+    """Testes para a conversão batch -> pandas DataFrame."""
+
+    def test_columns_and_nulls(self):
+        """Colunas seguem o schema e valores mascarados viram null."""
+        import pandas as pd
+
+        frame = parse_binary_frame(pd.Series([None, *_fuzz_packets(5)]))
+        assert tuple(frame.columns) == BINARY_FIELDS
+        assert frame["parse_error"][0] == "binary_data is None"
+        assert frame.drop(columns="parse_error").iloc[0].isna().all()
+
+
+class TestParseBinaryUdfs:
+    """Paridade das UDFs Spark com o parser escalar."""
+
+    def test_pandas_udf_matches_scalar(self, spark):
+        """pandas_udf retorna o mesmo struct que parse_gcn_binary_packet."""
+        packets = _fuzz_packets(500) + [None, b"short"]
+        rows = (
+            _packets_df(spark, packets)
+            .select(parse_binary_pandas_udf("value").alias("p"))
+            .select("p.*")
+            .collect()
+        )
+        assert [_as_dict(row) for row in rows] == [parse_gcn_binary_packet(p) for p in packets]
+
+    def test_scalar_udf_matches_pandas_udf(self, spark):
+        """UDF escalar e pandas_udf produzem o mesmo resultado."""
+        df = _packets_df(spark, _fuzz_packets(200, seed=3))
+        scalar = df.select(parse_binary_udf("value").alias("p")).select("p.*").collect()
+        vectorized = df.select(parse_binary_pandas_udf("value").alias("p")).select("p.*").collect()
+        assert scalar == vectorized
+
+
+class TestBinaryColumns:
+    """Paridade da engine SQL (expressões Catalyst) com o parser escalar."""
+
+    def test_sql_matches_scalar(self, spark):
+        """binary_columns reproduz parse_gcn_binary_packet em pacotes gerados."""
+        packets = _fuzz_packets(2000, seed=11) + [None, b"short", b""]
+        rows = _packets_df(spark, packets).select(*binary_columns("value")).collect()
+        assert [_as_dict(row) for row in rows] == [parse_gcn_binary_packet(p) for p in packets]
+
+    def test_sql_ignores_session_timezone(self, spark):
+        """burst_datetime não depende do timezone da sessão."""
+        packets = _fuzz_packets(200, seed=5)
+        previous = spark.conf.get("spark.sql.session.timeZone")
+        try:
+            spark.conf.set("spark.sql.session.timeZone", "America/Sao_Paulo")
+            rows = _packets_df(spark, packets).select(*binary_columns()).collect()
+        finally:
+            spark.conf.set("spark.sql.session.timeZone", previous)
+        expected = [parse_gcn_binary_packet(p)["burst_datetime"] for p in packets]
+        assert [_as_dict(row)["burst_datetime"] for row in rows] == expected
+
+    @pytest.mark.parametrize("engine", BINARY_ENGINES)
+    def test_engines_agree(self, spark, engine):
+        """Todas as engines de parse_binary produzem o mesmo struct."""
+        packets = _fuzz_packets(300, seed=13) + [None]
+        rows = (
+            _packets_df(spark, packets)
+            .select(parse_binary("value", engine).alias("p"))
+            .select("p.*")
+            .collect()
+        )
+        assert [_as_dict(row) for row in rows] == [parse_gcn_binary_packet(p) for p in packets]
+
+    def test_unknown_engine(self):
+        """Engine desconhecida é rejeitada."""
+        with pytest.raises(ValueError):
+            parse_binary("value", "rust")
+
+
+class TestPacketDetails:
+    """Paridade das engines de campos específicos com parse_packet_details."""
+
+    @pytest.mark.parametrize("engine", BINARY_ENGINES)
+    def test_engines_match_scalar(self, spark, engine):
+        """Todas as engines de packet_details reproduzem o decodificador escalar."""
+        packets = _fuzz_packets(500, seed=17) + [None, b"short"]
+        rows = (
+            _packets_df(spark, packets)
+            .select(packet_details("value", engine).alias("d"))
+            .select("d.*")
+            .collect()
+        )
+        assert [row.asDict() for row in rows] == [parse_packet_details(p) for p in packets]
+
+
+class TestDecodeBinary:
+    """parse_binary + packet_details numa única decodificação."""
+
+    def test_frame_columns(self):
+        """decode_binary_frame tem as colunas das duas structs, na ordem."""
+        import pandas as pd
+
+        frame = decode_binary_frame(pd.Series([None, b"short", *_fuzz_packets(5)]))
+        assert tuple(frame.columns) == (*BINARY_FIELDS, *DETAIL_FIELDS)
+        assert tuple(frame.columns) == tuple(DECODED_BINARY_STRUCT.names)
+        assert frame["parse_error"][1] == "Invalid packet size: 5 bytes (expected 160)"
+
+    @pytest.mark.parametrize("engine", BINARY_ENGINES)
+    def test_engines_match_scalar(self, spark, engine):
+        """Mesmo resultado de parse_binary e packet_details separados."""
+        packets = _fuzz_packets(500, seed=19) + [None, b"short"]
+        rows = (
+            _packets_df(spark, packets)
+            .select(decode_binary("value", engine).alias("p"))
+            .select("p.*")
+            .collect()
+        )
+        assert [_as_dict(row) for row in rows] == [
+            {**parse_gcn_binary_packet(p), **parse_packet_details(p)} for p in packets
+        ]
@@ -0,0 +1,217 @@
+"""
+Testes para o join de coincidência temporal/espacial (coincidence).
+
+Para rodar:
+    uv run pytest tests/test_coincidence.py -v
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from pyspark.sql import functions as F
+
+from nasa_gcn.coincidence import coincidence_join, time_bucket
+from nasa_gcn.spatial import angular_distance_deg, crossmatch
+
+GRB_SCHEMA = "grb_id INT, grb_time TIMESTAMP, ra DOUBLE, dec DOUBLE, err DOUBLE"
+GW_SCHEMA = "gw_id INT, gw_time TIMESTAMP, gw_ra DOUBLE, gw_dec DOUBLE, gw_err DOUBLE"
+
+_T0 = datetime(2026, 1, 1)
+
+
+def _rows(rng, n, seconds, err):
+    """Linhas (id, tempo, ra, dec, erro) com tempos uniformes em `seconds`."""
+    offsets = rng.uniform(0, seconds, n)
+    ra = rng.uniform(0, 360, n)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    return [
+        (k, _T0 + timedelta(seconds=float(t)), float(a), float(d), float(e))
+        for k, (t, a, d, e) in enumerate(zip(offsets, ra, dec, np.broadcast_to(err, n)))
+    ]
+
+
+def _naive_pairs_rows(grbs, gws, window_s):
+    return [(g, w) for g in grbs for w in gws if abs((w[1] - g[1]).total_seconds()) <= window_s]
+
+
+def _naive_pairs(grbs, gws, window_s):
+    return {(g[0], w[0]) for g, w in _naive_pairs_rows(grbs, gws, window_s)}
+
+
+class TestCoincidenceJoin:
+    """Paridade com o predicado ingênuo ABS(t_dir - t_esq) <= janela."""
+
+    def test_matches_naive_predicate(self, spark):
+        """Mesmos pares e time_diff_s que o filtro por par, inclusive na borda."""
+        rng = np.random.default_rng(0)
+        grbs = _rows(rng, 300, 3600, 1.0)
+        gws = _rows(rng, 200, 3600, 1.0)
+        # Pares exatamente na janela, antes e depois
+        grbs.append((1000, _T0 + timedelta(seconds=10), 0.0, 0.0, 1.0))
+        gws += [(1000, _T0, 0.0, 0.0, 1.0), (1001, _T0 + timedelta(seconds=20), 0.0, 0.0, 1.0)]
+
+        joined = coincidence_join(
+            spark.createDataFrame(grbs, GRB_SCHEMA),
+            spark.createDataFrame(gws, GW_SCHEMA),
+            10,
+            left_time="grb_time",
+            right_time="gw_time",
+        ).collect()
+
+        got = {(r.grb_id, r.gw_id): r.time_diff_s for r in joined}
+        assert len(got) == len(joined)
+        assert set(got) == _naive_pairs(grbs, gws, 10)
+        assert {(1000, 1000), (1000, 1001)} <= set(got)
+        assert got[(1000, 1000)] == -10.0 and got[(1000, 1001)] == 10.0
+
+    def test_fractional_window(self, spark):
+        """Janelas fracionárias usam o mesmo balde e o mesmo intervalo exato."""
+        rng = np.random.default_rng(1)
+        grbs = _rows(rng, 200, 60, 0.0)
+        gws = _rows(rng, 200, 60, 0.0)
+        joined = coincidence_join(
+            spark.createDataFrame(grbs, GRB_SCHEMA),
+            spark.createDataFrame(gws, GW_SCHEMA),
+            0.25,
+            left_time="grb_time",
+            right_time="gw_time",
+        ).collect()
+        assert {(r.grb_id, r.gw_id) for r in joined} == _naive_pairs(grbs, gws, 0.25)
+
+    def test_plan_is_equi_join(self, spark):
+        """O join físico é por igualdade do balde, não nested loop."""
+        df = coincidence_join(
+            spark.createDataFrame([], GRB_SCHEMA),
+            spark.createDataFrame([], GW_SCHEMA),
+            10,
+            left_time="grb_time",
+            right_time="gw_time",
+        )
+        plan = df._jdf.queryExecution().executedPlan().toString()
+        assert "NestedLoopJoin" not in plan and "CartesianProduct" not in plan
+
+    def test_with_positions(self, spark):
+        """Com posições, os pares também precisam de círculos de erro sobrepostos."""
+        rng = np.random.default_rng(2)
+        grbs = _rows(rng, 400, 600, rng.choice([0.5, 5.0], 400))
+        gws = _rows(rng, 300, 600, 10.0)
+
+        joined = coincidence_join(
+            spark.createDataFrame(grbs, GRB_SCHEMA),
+            spark.createDataFrame(gws, GW_SCHEMA),
+            30,
+            left_time="grb_time",
+            right_time="gw_time",
+            left_position=("ra", "dec", "err"),
+            right_position=("gw_ra", "gw_dec", "gw_err"),
+        ).collect()
+
+        i, j, _ = crossmatch(
+            *(np.array([r[k] for r in grbs]) for k in (2, 3, 4)),
+            *(np.array([r[k] for r in gws]) for k in (2, 3, 4)),
+        )
+        expected = set(zip(i.tolist(), j.tolist())) & _naive_pairs(grbs, gws, 30)
+        assert expected
+        got = {(r.grb_id, r.gw_id) for r in joined}
+        assert len(got) == len(joined)
+        assert got == expected
+        for r in joined:
+            g, w = grbs[r.grb_id], gws[r.gw_id]
+            assert r.angular_distance_deg == pytest.approx(
+                angular_distance_deg(g[2], g[3], w[2], w[3])
+            )
+
+    @pytest.mark.parametrize("max_radius_deg", [None, 5.0, 120.0])
+    def test_gw_sized_errors(self, spark, max_radius_deg):
+        """Erros de dezenas de graus (acima da ordem 0 ou do limite) não perdem coincidências."""
+        rng = np.random.default_rng(4)
+        grbs = _rows(rng, 300, 600, rng.choice([1.0, 40.0], 300))
+        gws = _rows(rng, 200, 600, rng.choice([20.0, 60.0], 200))
+
+        joined = coincidence_join(
+            spark.createDataFrame(grbs, GRB_SCHEMA),
+            spark.createDataFrame(gws, GW_SCHEMA),
+            30,
+            left_time="grb_time",
+            right_time="gw_time",
+            left_position=("ra", "dec", "err"),
+            right_position=("gw_ra", "gw_dec", "gw_err"),
+            max_radius_deg=max_radius_deg,
+        ).collect()
+
+        expected = {
+            (g[0], w[0])
+            for g, w in _naive_pairs_rows(grbs, gws, 30)
+            if angular_distance_deg(g[2], g[3], w[2], w[3]) <= g[4] + w[4]
+        }
+        assert expected
+        got = [(r.grb_id, r.gw_id) for r in joined]
+        assert len(got) == len(set(got))
+        assert set(got) == expected
+
+    def test_invalid_arguments(self, spark):
+        left = spark.createDataFrame([], GRB_SCHEMA)
+        right = spark.createDataFrame([], GW_SCHEMA)
+        with pytest.raises(ValueError):
+            time_bucket("grb_time", 0)
+        with pytest.raises(ValueError):
+            coincidence_join(
+                left, right, 10, "grb_time", "gw_time", left_position=("ra", "dec", "err")
+            )
+
+
+class TestStreamingCoincidence:
+    """Join stream-stream com watermark."""
+
+    def test_stream_stream_join(self, spark, tmp_path):
+        """Com watermark nos dois lados, o join em streaming devolve os pares da janela."""
+        spark.createDataFrame(
+            [(1, _T0, 10.0, 10.0, 1.0), (2, _T0 + timedelta(hours=1), 10.0, 10.0, 1.0)],
+            GRB_SCHEMA,
+        ).write.parquet(str(tmp_path / "grb"))
+        spark.createDataFrame(
+            [(7, _T0 + timedelta(seconds=5), 10.5, 10.0, 1.0)], GW_SCHEMA
+        ).write.parquet(str(tmp_path / "gw"))
+
+        def read(name, schema, ts):
+            return (
+                spark.readStream.schema(schema)
+                .parquet(str(tmp_path / name))
+                .withWatermark(ts, "10 minutes")
+            )
+
+        rows = []
+        joined = coincidence_join(
+            read("grb", GRB_SCHEMA, "grb_time"),
+            read("gw", GW_SCHEMA, "gw_time"),
+            10,
+            left_time="grb_time",
+            right_time="gw_time",
+            left_position=("ra", "dec", "err"),
+            right_position=("gw_ra", "gw_dec", "gw_err"),
+            max_radius_deg=2.0,
+        )
+        query = (
+            joined.select("grb_id", "gw_id", F.col("time_diff_s"))
+            .writeStream.foreachBatch(lambda df, _: rows.extend(df.collect()))
+            .option("checkpointLocation", str(tmp_path / "checkpoint"))
+            .trigger(availableNow=True)
+            .start()
+        )
+        query.awaitTermination()
+        assert [(r.grb_id, r.gw_id, r.time_diff_s) for r in rows] == [(1, 7, 5.0)]
+
+    def test_streaming_requires_radius(self, spark, tmp_path):
+        spark.createDataFrame([], GRB_SCHEMA).write.parquet(str(tmp_path / "grb"))
+        stream = spark.readStream.schema(GRB_SCHEMA).parquet(str(tmp_path / "grb"))
+        with pytest.raises(ValueError):
+            coincidence_join(
+                stream,
+                spark.createDataFrame([], GW_SCHEMA),
+                10,
+                "grb_time",
+                "gw_time",
+                left_position=("ra", "dec", "err"),
+                right_position=("gw_ra", "gw_dec", "gw_err"),
+            )
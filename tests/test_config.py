@@ -0,0 +1,252 @@
+"""
+Testes para o módulo config.
+
+Para rodar:
+    uv run pytest tests/test_config.py -v
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from nasa_gcn.config import (
+    BRONZE_LAYOUTS,
+    CATCHUP_TRIGGER_INTERVAL,
+    TOPIC_FAMILIES,
+    get_bronze_backfill,
+    get_kafka_options,
+    get_kafka_throughput_options,
+    get_latency_retention,
+    get_latency_thresholds,
+    get_topic_family,
+    get_topic_mission,
+    get_topic_pattern,
+    get_trigger_interval,
+    get_trigger_state_ttl,
+)
+
+
+class TestTopicFamilies:
+    """Testes para o mapeamento tópico -> família."""
+
+    @pytest.mark.parametrize(
+        "topic,family",
+        [
+            ("gcn.classic.text.SWIFT_BAT_GRB_POS_ACK", "text"),
+            ("gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK", "binary"),
+            ("gcn.classic.voevent.FERMI_GBM_FIN_POS", "voevent"),
+            ("gcn.notices.icecube.lvk_nu_track_search", "notices"),
+            ("gcn.circulars", "circulars"),
+            ("igwn.gwalert", "gwalert"),
+            ("gcn.heartbeat", "heartbeat"),
+            ("gcn.circulars.extra", "other"),
+        ],
+    )
+    def test_get_topic_family(self, topic, family):
+        assert get_topic_family(topic) == family
+
+    def test_topic_pattern(self):
+        """Cada padrão de assinatura casa apenas os tópicos da família."""
+        topics = [
+            "gcn.classic.text.A",
+            "gcn.classic.binary.B",
+            "gcn.notices.swift.bat.guano",
+            "gcn.circulars",
+            "gcn.circulars.extra",
+            "igwn.gwalert",
+        ]
+        for family in TOPIC_FAMILIES:
+            pattern = re.compile(get_topic_pattern(family))
+            matched = [t for t in topics if pattern.fullmatch(t)]
+            assert matched == [t for t in topics if get_topic_family(t) == family]
+
+    @pytest.mark.parametrize(
+        "topic,mission",
+        [
+            ("gcn.classic.text.SWIFT_BAT_GRB_POS_ACK", "swift"),
+            ("gcn.classic.binary.FERMI_GBM_FLT_POS", "fermi_gbm"),
+            ("gcn.classic.voevent.FERMI_LAT_POS_UPD", "fermi_lat"),
+            ("gcn.classic.text.FERMI_POINTDIR", "fermi"),
+            ("gcn.classic.text.SWIFT_XRT_POSITION", "swift"),
+            ("gcn.classic.voevent.ICECUBE_ASTROTRACK_GOLD", "icecube"),
+            ("gcn.notices.einstein_probe.wxt.alert", "einstein_probe"),
+            ("gcn.circulars", None),
+            ("igwn.gwalert", None),
+        ],
+    )
+    def test_get_topic_mission(self, topic, mission):
+        assert get_topic_mission(topic) == mission
+
+
+class TestKafkaThroughput:
+    """Limites por micro-batch do stream Kafka do Bronze."""
+
+    def test_defaults_are_bounded(self):
+        """Sem configuração, o primeiro update não lê todo o histórico de uma vez."""
+        options = get_kafka_throughput_options({})
+        assert options == {"startingOffsets": "earliest", "maxOffsetsPerTrigger": "100000"}
+        assert get_trigger_interval({}) is None
+
+    def test_bounded_settings(self):
+        settings = {
+            "nasa_gcn.kafka.starting_offsets": "latest",
+            "nasa_gcn.kafka.max_offsets_per_trigger": "5000",
+            "nasa_gcn.kafka.min_offsets_per_trigger": "100",
+            "nasa_gcn.kafka.max_trigger_delay": "30s",
+            "nasa_gcn.kafka.min_partitions": "16",
+            "nasa_gcn.kafka.trigger_interval": "10 seconds",
+        }
+        assert get_kafka_throughput_options(settings) == {
+            "startingOffsets": "latest",
+            "maxOffsetsPerTrigger": "5000",
+            "minOffsetsPerTrigger": "100",
+            "maxTriggerDelay": "30s",
+            "minPartitions": "16",
+        }
+        assert get_trigger_interval(settings) == "10 seconds"
+
+    def test_catchup_mode(self):
+        """Catchup: teto grande, sem mínimo (batches pequenos saem logo) e trigger curto."""
+        settings = {
+            "nasa_gcn.kafka.mode": "catchup",
+            "nasa_gcn.kafka.catchup_max_offsets_per_trigger": "2000000",
+            "nasa_gcn.kafka.min_offsets_per_trigger": "100",
+        }
+        options = get_kafka_throughput_options(settings)
+        assert options["maxOffsetsPerTrigger"] == "2000000"
+        assert "minOffsetsPerTrigger" not in options
+        assert get_trigger_interval(settings) == CATCHUP_TRIGGER_INTERVAL
+
+    @pytest.mark.parametrize(
+        "name,value",
+        [
+            ("nasa_gcn.kafka.mode", "fast"),
+            ("nasa_gcn.kafka.max_offsets_per_trigger", "0"),
+            ("nasa_gcn.kafka.min_partitions", "many"),
+        ],
+    )
+    def test_invalid_settings(self, name, value):
+        with pytest.raises(ValueError):
+            get_kafka_throughput_options({name: value})
+
+    def test_connection_options(self, monkeypatch):
+        """get_kafka_options junta conexão, assinatura e limites."""
+        monkeypatch.setenv("GCN_CLIENT_ID", "client")
+        monkeypatch.setenv("GCN_CLIENT_SECRET", "secret")
+        options = get_kafka_options({"nasa_gcn.kafka.max_offsets_per_trigger": "10"})
+        assert options["kafka.bootstrap.servers"] == "kafka.gcn.nasa.gov:9092"
+        assert 'clientId="client"' in options["kafka.sasl.jaas.config"]
+        assert options["maxOffsetsPerTrigger"] == "10"
+        assert re.fullmatch(options["subscribePattern"], "gcn.classic.text.SWIFT_XRT_POSITION")
+
+
+class TestBoundedMicroBatches:
+    """
+    Stand-in local do Kafka: cada offset é um arquivo de uma linha, lido pela
+    fonte de arquivos com maxFilesPerTrigger = maxOffsetsPerTrigger (o teto
+    por micro-batch tem a mesma semântica: min(atraso, teto)).
+    """
+
+    def test_backlog_drains_in_bounded_batches(self, spark, tmp_path):
+        source = tmp_path / "topic"
+        options = get_kafka_throughput_options({"nasa_gcn.kafka.max_offsets_per_trigger": "10"})
+
+        def produce(first, n):
+            for offset in range(first, first + n):
+                spark.createDataFrame([(offset,)], "offset LONG").coalesce(1).write.mode(
+                    "append"
+                ).parquet(str(source))
+
+        def consume():
+            sizes = []
+            query = (
+                spark.readStream.schema("offset LONG")
+                .option("maxFilesPerTrigger", options["maxOffsetsPerTrigger"])
+                .parquet(str(source))
+                .writeStream.foreachBatch(lambda df, _: sizes.append(df.count()))
+                .option("checkpointLocation", str(tmp_path / "checkpoint"))
+                .trigger(availableNow=True)
+                .start()
+            )
+            query.awaitTermination()
+            return sizes
+
+        # Atrasado: o backlog sai em batches de no máximo 10 offsets
+        produce(0, 25)
+        assert consume() == [10, 10, 5]
+        # Em dia: só o que chegou desde o último batch
+        produce(25, 2)
+        assert consume() == [2]
+
+
+class TestLatencyThresholds:
+    """Limites de latência verificados pelo main.py."""
+
+    def test_defaults_and_overrides(self):
+        thresholds = get_latency_thresholds({"nasa_gcn.latency.silver_p95_s": "120"})
+        assert thresholds[("ingest", "p95_s")] == 60.0
+        assert thresholds[("silver", "p95_s")] == 120.0
+
+    def test_disable_and_invalid(self):
+        assert ("ingest", "p99_s") not in get_latency_thresholds(
+            {"nasa_gcn.latency.ingest_p99_s": "0"}
+        )
+        with pytest.raises(ValueError):
+            get_latency_thresholds({"nasa_gcn.latency.ingest_p99_s": "fast"})
+
+    def test_retention(self):
+        """Amostras de latência: 7 dias por padrão; "0" mantém tudo."""
+        assert get_latency_retention({}) == timedelta(days=7)
+        assert get_latency_retention({"nasa_gcn.latency.retention_days": "0.5"}) == timedelta(
+            hours=12
+        )
+        assert get_latency_retention({"nasa_gcn.latency.retention_days": "0"}) is None
+        with pytest.raises(ValueError):
+            get_latency_retention({"nasa_gcn.latency.retention_days": "forever"})
+
+
+class TestTriggerStateTtl:
+    """Timeout do estado de gcn_triggers."""
+
+    def test_ttl(self):
+        """7 dias por padrão; "0" desliga o timeout."""
+        assert get_trigger_state_ttl({}) == timedelta(days=7)
+        assert get_trigger_state_ttl({"nasa_gcn.triggers.state_ttl_days": "1"}) == timedelta(days=1)
+        assert get_trigger_state_ttl({"nasa_gcn.triggers.state_ttl_days": "0"}) is None
+        with pytest.raises(ValueError):
+            get_trigger_state_ttl({"nasa_gcn.triggers.state_ttl_days": "never"})
+
+
+class TestBronzeLayout:
+    """Layout do Bronze e backfill da migração."""
+
+    def test_flat_is_default(self):
+        """O layout atual (flat) é o primeiro; os demais são opt-in."""
+        assert BRONZE_LAYOUTS[0] == "flat"
+
+    def test_backfill(self):
+        assert get_bronze_backfill({}) is None
+        table, cutoff = get_bronze_backfill(
+            {
+                "nasa_gcn.bronze_backfill_table": "main.gcn.gcn_raw_backup",
+                "nasa_gcn.bronze_backfill_before": "2026-10-10T00:00:00",
+            }
+        )
+        assert table == "main.gcn.gcn_raw_backup"
+        assert cutoff == datetime(2026, 10, 10, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize(
+        "settings",
+        [
+            {"nasa_gcn.bronze_backfill_table": "main.gcn.gcn_raw_backup"},
+            {"nasa_gcn.bronze_backfill_before": "2026-10-10"},
+            {
+                "nasa_gcn.bronze_backfill_table": "main.gcn.gcn_raw_backup",
+                "nasa_gcn.bronze_backfill_before": "last week",
+            },
+        ],
+    )
+    def test_backfill_invalid(self, settings):
+        with pytest.raises(ValueError):
+            get_bronze_backfill(settings)
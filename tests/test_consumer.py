@@ -0,0 +1,147 @@
+"""
+Testes para o consumidor Kafka standalone (consumer), com tópico em memória.
+
+Para rodar:
+    uv run pytest tests/test_consumer.py -v
+"""
+
+import asyncio
+import io
+import json
+import struct
+import threading
+
+import pytest
+
+from nasa_gcn.binary_parser import parse_gcn_binary_packet
+from nasa_gcn.consumer import (
+    AlertConsumer,
+    CallbackSink,
+    JsonlSink,
+    KafkaMessage,
+    MemorySource,
+    decode_messages,
+    subscription_patterns,
+)
+
+BINARY_TOPIC = "gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK"
+
+
+def _packet(trig_num: int) -> bytes:
+    """Pacote SWIFT_BAT_GRB_POSITION (61) com posição (180°, 45°) e erro de 1°."""
+    longs = [0] * 40
+    longs[0], longs[1], longs[4] = 61, 1, trig_num
+    longs[5], longs[6] = 20000, 4320000
+    longs[7], longs[8], longs[11] = 1800000, 450000, 10000
+    longs[39] = 10
+    return struct.pack(">40i", *longs)
+
+
+def _messages(n: int, partitions: int = 2):
+    return [
+        KafkaMessage(
+            BINARY_TOPIC, i % partitions, i // partitions, _packet(i + 1), 1_767_225_600_000
+        )
+        for i in range(n)
+    ]
+
+
+class TestDecodeMessages:
+    """Decodificação em processo de um lote."""
+
+    def test_binary_and_text(self):
+        messages = _messages(3) + [
+            KafkaMessage("gcn.classic.text.SWIFT_BAT_GRB_POS_ACK", 0, 9, b"TITLE: GCN", None),
+            KafkaMessage(BINARY_TOPIC, 0, 10, b"short", None),
+        ]
+        records = decode_messages(messages)
+        assert [r["topic_family"] for r in records] == ["binary"] * 3 + ["text", "binary"]
+
+        # Mesmos campos do parser escalar
+        expected = parse_gcn_binary_packet(_packet(2))
+        assert {k: records[1][k] for k in expected} == expected
+        assert records[1]["burst_ra_deg"] == pytest.approx(180.0)
+        assert records[0]["kafka_timestamp"].year == 2026
+
+        assert records[3]["text"] == "TITLE: GCN"
+        assert records[3]["kafka_timestamp"] is None
+        assert "Invalid packet size" in records[4]["parse_error"]
+
+    def test_subscription_patterns(self):
+        assert subscription_patterns(["binary", "circulars"]) == [
+            r"^gcn\.classic\.binary\..*",
+            r"^gcn\.circulars",
+        ]
+
+
+class TestAlertConsumer:
+    """Fluxo poll -> decode -> sink -> commit."""
+
+    def test_jsonl_and_batched_commits(self):
+        """Todas as mensagens gravadas; commits a cada commit_every e no fim."""
+        source = MemorySource(_messages(250))
+        output = io.StringIO()
+        consumer = AlertConsumer(source, JsonlSink(output), max_batch=50, commit_every=100)
+        stats = asyncio.run(consumer.run())
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert len(lines) == stats.messages == 250
+        assert lines[0]["trig_num"] == 1 and lines[0]["pkt_type_name"] == "SWIFT_BAT_GRB_POSITION"
+        assert stats.batches == 5
+        # 100, 200 e o restante no encerramento
+        assert source.commits == stats.commits == 3
+        assert source.committed == {(BINARY_TOPIC, 0): 125, (BINARY_TOPIC, 1): 125}
+        assert source.closed
+
+    def test_backpressure(self):
+        """Com o sink lento, o poll não passa de queue_batches lotes à frente."""
+        source = MemorySource(_messages(100))
+        ahead = []
+
+        async def slow_sink(records):
+            ahead.append(source.polls - len(ahead) - 1)
+            await asyncio.sleep(0.01)
+
+        consumer = AlertConsumer(source, CallbackSink(slow_sink), max_batch=10, queue_batches=2)
+        stats = asyncio.run(consumer.run())
+        assert stats.messages == 100
+        # Lotes lidos e ainda não gravados: a fila (2) mais o que espera no put()
+        assert max(ahead) <= 3
+
+    def test_max_messages_and_stop(self):
+        source = MemorySource(_messages(100))
+        received = []
+        consumer = AlertConsumer(source, CallbackSink(received.extend), max_batch=30)
+        stats = asyncio.run(consumer.run(max_messages=45))
+        assert stats.messages == len(received) == 45
+        assert sum(source.committed.values()) == 45
+
+        stop = asyncio.Event()
+        stop.set()
+        stats = asyncio.run(
+            AlertConsumer(MemorySource(_messages(10)), CallbackSink(print)).run(stop)
+        )
+        assert stats.messages == 0
+
+    def test_jsonl_writes_off_the_event_loop(self):
+        """JsonlSink grava e faz flush fora da thread do event loop."""
+        threads = set()
+
+        class Output(io.StringIO):
+            def flush(self):
+                threads.add(threading.get_ident())
+                super().flush()
+
+        asyncio.run(AlertConsumer(MemorySource(_messages(20)), JsonlSink(Output())).run())
+        assert threads and threading.get_ident() not in threads
+
+    def test_sink_failure_does_not_commit(self):
+        """Offsets de lotes não gravados não são commitados (at-least-once)."""
+        source = MemorySource(_messages(20))
+
+        def fail(records):
+            raise OSError("disk full")
+
+        with pytest.raises(OSError):
+            asyncio.run(AlertConsumer(source, CallbackSink(fail), max_batch=5).run())
+        assert source.committed == {} and source.closed
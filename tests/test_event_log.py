@@ -0,0 +1,61 @@
+"""
+Testes para as consultas ao event_log do pipeline DLT (event_log).
+
+Para rodar:
+    uv run pytest tests/test_event_log.py -v
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from nasa_gcn.event_log import latest_update_metrics
+
+# Subconjunto das colunas de event_log('<pipeline_id>')
+EVENT_LOG_SCHEMA = (
+    "event_type STRING, timestamp TIMESTAMP, "
+    "origin STRUCT<update_id: STRING, flow_name: STRING>, details STRING"
+)
+
+_T0 = datetime(2026, 1, 1)
+
+
+def _flow(update_id, minutes, flow_name, rows, status="COMPLETED"):
+    progress = {"status": status}
+    if rows is not None:
+        progress["metrics"] = {"num_output_rows": rows}
+    details = json.dumps({"flow_progress": progress})
+    return ("flow_progress", _T0 + timedelta(minutes=minutes), (update_id, flow_name), details)
+
+
+def _update(update_id, minutes):
+    return ("create_update", _T0 + timedelta(minutes=minutes), (update_id, None), "{}")
+
+
+class TestLatestUpdateMetrics:
+    """Uma leitura do event_log: último update e linhas por tabela."""
+
+    def test_latest_update(self, spark):
+        events = spark.createDataFrame(
+            [
+                _update("u1", 0),
+                _flow("u1", 1, "sandbox.nasa_gcn_dev.gcn_raw", 500),
+                _update("u2", 60),
+                _flow("u2", 61, "sandbox.nasa_gcn_dev.gcn_raw", 10, status="RUNNING"),
+                _flow("u2", 62, "sandbox.nasa_gcn_dev.gcn_raw", 5),
+                _flow("u2", 62, "sandbox.nasa_gcn_dev.gcn_events_summarized", 3),
+                _flow("u2", 63, "sandbox.nasa_gcn_dev.gcn_heartbeat", None, status="IDLE"),
+                ("user_action", _T0 + timedelta(minutes=64), ("u2", None), "{}"),
+            ],
+            EVENT_LOG_SCHEMA,
+        )
+        started_at, metrics = latest_update_metrics(events)
+        assert started_at == _T0 + timedelta(minutes=60)
+        assert metrics == {"gcn_raw": 15, "gcn_events_summarized": 3}
+
+    def test_time_bound(self, spark):
+        """Eventos antes de `since` não são considerados."""
+        events = spark.createDataFrame(
+            [_update("u1", 0), _flow("u1", 1, "gcn_raw", 500)], EVENT_LOG_SCHEMA
+        )
+        assert latest_update_metrics(events, _T0 - timedelta(days=1))[1] == {"gcn_raw": 500}
+        assert latest_update_metrics(events, _T0 + timedelta(days=1)) == (None, {})
@@ -0,0 +1,271 @@
+"""
+Testes para a agregação Gold por evento (gold), modos batch e incremental.
+
+Para rodar:
+    uv run pytest tests/test_gold.py -v
+"""
+
+from datetime import datetime
+
+import pytest
+
+from nasa_gcn.gold import (
+    NARRATIVE_SEPARATOR,
+    NARRATIVE_TAIL,
+    bound_narrative,
+    event_updates,
+    latest_gwalerts,
+    summarize_events_batch,
+    summarize_events_incremental,
+)
+
+CIRCULAR_SCHEMA = (
+    "event_id STRING, circular_id INT, created_on TIMESTAMP, document_text STRING, "
+    "kafka_timestamp TIMESTAMP"
+)
+GWALERT_SCHEMA = "event_id STRING, alert_type STRING, kafka_timestamp TIMESTAMP"
+
+
+def _circular(event_id: str, circular_id: int, day: int, text: str = None):
+    created = datetime(2026, 1, day)
+    return (event_id, circular_id, created, text or f"circular {circular_id}", created)
+
+
+def _alert(event_id: str, alert_type: str, day: int):
+    return (event_id, alert_type, datetime(2026, 1, day, 12))
+
+
+class _IncrementalRun:
+    """Executa summarize_events_incremental em micro-batches sobre Parquet local."""
+
+    def __init__(self, spark, tmp_path, max_bytes=None):
+        self.spark = spark
+        self.tmp = tmp_path
+        self.options = {} if max_bytes is None else {"max_bytes": max_bytes}
+        self.batches = []
+
+    def append(self, circulars=(), alerts=()):
+        """Acrescenta linhas às fontes e processa um micro-batch (availableNow)."""
+        for name, rows, schema in (
+            ("circulars", circulars, CIRCULAR_SCHEMA),
+            ("gwalerts", alerts, GWALERT_SCHEMA),
+        ):
+            self.spark.createDataFrame(list(rows), schema).write.mode("append").parquet(
+                str(self.tmp / name)
+            )
+
+        def read(name, schema):
+            return self.spark.readStream.schema(schema).parquet(str(self.tmp / name))
+
+        updates = event_updates(
+            read("circulars", CIRCULAR_SCHEMA), read("gwalerts", GWALERT_SCHEMA)
+        )
+        emitted = []
+        query = (
+            summarize_events_incremental(updates, **self.options)
+            .writeStream.foreachBatch(lambda df, _: emitted.extend(df.collect()))
+            .option("checkpointLocation", str(self.tmp / "checkpoint"))
+            .trigger(availableNow=True)
+            .start()
+        )
+        query.awaitTermination()
+        self.batches.append({row.event_id: row for row in emitted})
+        return self.batches[-1]
+
+
+@pytest.fixture
+def incremental(spark, tmp_path):
+    return _IncrementalRun(spark, tmp_path)
+
+
+class TestIncrementalSummary:
+    """Testes do modo incremental (applyInPandasWithState)."""
+
+    def test_matches_batch(self, spark, incremental):
+        """Um único micro-batch produz o mesmo resumo que o modo batch."""
+        circulars = [_circular("S1", 1, 2), _circular("S1", 2, 3), _circular("S2", 3, 4)]
+        alerts = [_alert("S1", "PRELIMINARY", 1), _alert("S3", "INITIAL", 1)]
+        emitted = incremental.append(circulars, alerts)
+
+        batch = summarize_events_batch(
+            spark.createDataFrame(circulars, CIRCULAR_SCHEMA),
+            latest_gwalerts(spark.createDataFrame(alerts, GWALERT_SCHEMA)),
+        ).collect()
+
+        # S3 só tem alerta GW: fora do Gold, como no left join do modo batch
+        assert set(emitted) == {row.event_id for row in batch} == {"S1", "S2"}
+        for expected in batch:
+            actual = emitted[expected.event_id]
+            assert actual.circular_count == expected.circular_count
+            assert actual.last_date == expected.last_date
+            assert actual.alert_type == expected.alert_type
+            assert actual.alert_history == expected.alert_history
+            assert actual.scientific_narrative == expected.scientific_narrative
+            assert actual.narrative_chunks == expected.narrative_chunks
+            assert actual.source_bytes == expected.source_bytes
+
+    def test_only_touched_events(self, incremental):
+        """Micro-batches seguintes emitem só os eventos com mensagens novas."""
+        incremental.append([_circular("S1", 1, 2), _circular("S2", 2, 2)])
+        emitted = incremental.append([_circular("S1", 3, 5)])
+
+        assert set(emitted) == {"S1"}
+        summary = emitted["S1"]
+        assert summary.circular_count == 2
+        assert summary.summary_version == 2
+        assert summary.last_date == datetime(2026, 1, 5)
+        assert summary.scientific_narrative == NARRATIVE_SEPARATOR.join(
+            ["circular 1", "circular 3"]
+        )
+
+    def test_alert_updates_summary(self, incremental):
+        """Um alerta GW novo re-emite o evento; vale o alerta mais recente."""
+        incremental.append([_circular("S1", 1, 2)], [_alert("S1", "INITIAL", 3)])
+        emitted = incremental.append(alerts=[_alert("S1", "PRELIMINARY", 1)])
+        assert emitted["S1"].alert_type == "INITIAL"
+
+        emitted = incremental.append(alerts=[_alert("S1", "UPDATE", 4)])
+        assert emitted["S1"].alert_type == "UPDATE"
+        assert emitted["S1"].circular_count == 1
+        assert [a.alert_type for a in emitted["S1"].alert_history] == [
+            "PRELIMINARY",
+            "INITIAL",
+            "UPDATE",
+        ]
+
+    def test_redelivery_is_idempotent(self, incremental):
+        """Circular reentregue (mesmo circular_id) não é contada duas vezes."""
+        incremental.append([_circular("S1", 1, 2)])
+        emitted = incremental.append([_circular("S1", 1, 2)])
+
+        assert emitted["S1"].circular_count == 1
+        assert emitted["S1"].scientific_narrative == "circular 1"
+
+
+class TestBoundedNarrative:
+    """Testes da narrativa ordenada e limitada em bytes."""
+
+    # Três circulares de 100 bytes: com separadores, só as duas primeiras cabem em 250
+    CIRCULARS = [
+        _circular("S1", 3, 4, "c" * 100),
+        _circular("S1", 1, 2, "a" * 100),
+        _circular("S1", 2, 3, "b" * 100),
+    ]
+    MAX_BYTES = 250
+
+    def test_bound_narrative(self):
+        """Entram circulares enquanto couberem; o restante vira o resumo final."""
+        chunks = [(1, 0, 3, "aaa"), (2, 1, 0, None), (3, 2, 3, "bbb"), (4, 3, 3, "ccc")]
+        narrative, included = bound_narrative(chunks, 3 + len(NARRATIVE_SEPARATOR) + 3)
+
+        assert included == [True, True, True, False]
+        assert narrative == NARRATIVE_SEPARATOR.join(["aaa", "bbb", NARRATIVE_TAIL % (1, 3)])
+
+    def test_missing_text_ends_narrative(self):
+        """Texto descartado do estado (bytes > 0, documento null) encerra a narrativa."""
+        _, included = bound_narrative([(1, 0, 3, None), (2, 1, 3, "bbb")], 1_000)
+        assert included == [False, False]
+
+    def test_batch_ordered_and_capped(self, spark):
+        """Modo batch: ordem por created_on, corte em max_bytes e métricas por evento."""
+        row = summarize_events_batch(
+            spark.createDataFrame(self.CIRCULARS, CIRCULAR_SCHEMA),
+            latest_gwalerts(spark.createDataFrame([], GWALERT_SCHEMA)),
+            max_bytes=self.MAX_BYTES,
+        ).first()
+
+        assert row.scientific_narrative == NARRATIVE_SEPARATOR.join(
+            ["a" * 100, "b" * 100, NARRATIVE_TAIL % (1, 100)]
+        )
+        assert [c.circular_id for c in row.narrative_chunks] == [1, 2, 3]
+        assert [c.in_narrative for c in row.narrative_chunks] == [True, True, False]
+        assert [c.bytes for c in row.narrative_chunks] == [100, 100, 100]
+        assert row.narrative_chunks[0].created_on == datetime(2026, 1, 2)
+        assert row.narrative_bytes == len(row.scientific_narrative.encode())
+        assert (row.circular_count, row.source_bytes, row.omitted_count) == (3, 300, 1)
+
+    def test_uncapped_keeps_everything(self, spark):
+        """Com o limite padrão a narrativa tem todas as circulares, sem resumo."""
+        row = summarize_events_batch(
+            spark.createDataFrame(self.CIRCULARS, CIRCULAR_SCHEMA),
+            latest_gwalerts(spark.createDataFrame([], GWALERT_SCHEMA)),
+        ).first()
+
+        assert row.scientific_narrative == NARRATIVE_SEPARATOR.join(
+            ["a" * 100, "b" * 100, "c" * 100]
+        )
+        assert row.omitted_count == 0
+
+    def test_incremental_late_circular(self, spark, tmp_path):
+        """Circular atrasada mais antiga entra na ordem e empurra a última para fora."""
+        incremental = _IncrementalRun(spark, tmp_path, max_bytes=self.MAX_BYTES)
+        incremental.append([self.CIRCULARS[0], self.CIRCULARS[2]])
+        emitted = incremental.append([self.CIRCULARS[1]])
+
+        batch = summarize_events_batch(
+            spark.createDataFrame(self.CIRCULARS, CIRCULAR_SCHEMA),
+            latest_gwalerts(spark.createDataFrame([], GWALERT_SCHEMA)),
+            max_bytes=self.MAX_BYTES,
+        ).first()
+        actual = emitted["S1"]
+        assert actual.scientific_narrative == batch.scientific_narrative
+        assert actual.narrative_chunks == batch.narrative_chunks
+        assert actual.narrative_bytes == batch.narrative_bytes
+        assert (actual.source_bytes, actual.omitted_count) == (300, 1)
+
+
+class TestLatestGwalerts:
+    """Testes de gw_latest (latest_gwalerts) e do join Gold com ele."""
+
+    ALERTS = [
+        _alert("S1", "PRELIMINARY", 1),
+        _alert("S1", "PRELIMINARY", 1),
+        _alert("S1", "INITIAL", 2),
+        _alert("S1", "UPDATE", 3),
+        _alert("S2", "RETRACTION", 5),
+        _alert(None, "PRELIMINARY", 1),
+    ]
+
+    def test_one_row_per_superevent(self, spark):
+        """Último alerta por kafka_timestamp e histórico sem reentregas."""
+        rows = {
+            row.event_id: row
+            for row in latest_gwalerts(spark.createDataFrame(self.ALERTS, GWALERT_SCHEMA)).collect()
+        }
+
+        assert set(rows) == {"S1", "S2"}
+        assert rows["S1"].alert_type == "UPDATE"
+        assert rows["S1"].kafka_timestamp == datetime(2026, 1, 3, 12)
+        assert [(a.alert_type, a.kafka_timestamp.day) for a in rows["S1"].alert_history] == [
+            ("PRELIMINARY", 1),
+            ("INITIAL", 2),
+            ("UPDATE", 3),
+        ]
+        assert rows["S2"].alert_type == "RETRACTION"
+
+    def test_latest_keeps_alert_columns(self, spark):
+        """As demais colunas do alerta vêm da mesma linha (o alerta mais recente)."""
+        alerts = spark.createDataFrame(
+            [
+                ("S1", "PRELIMINARY", datetime(2026, 1, 1), 0.9),
+                ("S1", "UPDATE", datetime(2026, 1, 2), 0.1),
+            ],
+            "event_id STRING, alert_type STRING, kafka_timestamp TIMESTAMP, far DOUBLE",
+        )
+        row = latest_gwalerts(alerts).first()
+        assert (row.alert_type, row.far) == ("UPDATE", 0.1)
+
+    def test_gold_one_row_per_event(self, spark):
+        """Vários alertas por superevento não multiplicam as linhas da Gold."""
+        circulars = [_circular("S1", 1, 2), _circular("S1", 2, 3), _circular("S4", 3, 3)]
+        gold = summarize_events_batch(
+            spark.createDataFrame(circulars, CIRCULAR_SCHEMA),
+            latest_gwalerts(spark.createDataFrame(self.ALERTS, GWALERT_SCHEMA)),
+        )
+        rows = {row.event_id: row for row in gold.collect()}
+
+        assert len(rows) == gold.count() == 2
+        assert rows["S1"].alert_type == "UPDATE"
+        assert len(rows["S1"].alert_history) == 3
+        assert rows["S4"].alert_type is None and rows["S4"].alert_history is None
+        assert "BroadcastHashJoin" in gold._jdf.queryExecution().executedPlan().toString()
@@ -0,0 +1,125 @@
+"""
+Testes para as métricas de latência de alerta (latency).
+
+Para rodar:
+    uv run pytest tests/test_latency.py -v
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from nasa_gcn.latency import (
+    LATENCY_SAMPLE_STRUCT,
+    combine_latency_metrics,
+    format_latency,
+    latency_breaches,
+    latency_metrics,
+    latency_samples,
+)
+
+_T0 = datetime(2026, 1, 1)
+
+
+class TestLatencyBreaches:
+    """Comparação dos percentis com os limites configurados."""
+
+    def test_breaches(self):
+        report = {
+            (None, "ingest"): {"p50_s": 1.0, "p95_s": 90.0, "p99_s": 100.0},
+            ("text", "silver"): {"p50_s": 10.0, "p95_s": 20.0, "p99_s": 30.0},
+            ("binary", "silver"): {"p50_s": 100.0, "p95_s": 400.0, "p99_s": None},
+        }
+        thresholds = {("ingest", "p95_s"): 60.0, ("silver", "p95_s"): 300.0}
+        assert latency_breaches(report, thresholds) == [
+            "ingest/todas: p95 90.0s > 60s",
+            "silver/binary: p95 400.0s > 300s",
+        ]
+        assert latency_breaches(report, {}) == []
+
+    def test_format_latency(self):
+        row = {"p50_s": 1.25, "p95_s": 3.0, "p99_s": 12.0}
+        assert format_latency(row) == "p50 1.2s · p95 3.0s · p99 12.0s"
+        assert format_latency(None) == ""
+
+
+class TestLatencyMetrics:
+    """Amostras por mensagem e percentis por micro-batch."""
+
+    def test_samples_and_percentiles(self, spark):
+        """Latência = commit - kafka_timestamp; percentis por família e batch_ts."""
+        batch = _T0 + timedelta(minutes=1)
+        rows = [("text", _T0 + timedelta(seconds=60 - s), batch) for s in range(1, 101)]
+        rows.append(("binary", _T0, batch + timedelta(minutes=1)))
+        rows.append(("binary", None, batch))
+        silver = spark.createDataFrame(
+            rows, "family STRING, kafka_timestamp TIMESTAMP, silver_ts TIMESTAMP"
+        )
+
+        samples = latency_samples(silver, "silver", "silver_ts", silver["family"])
+        assert samples.schema == LATENCY_SAMPLE_STRUCT
+        # Mensagens sem kafka_timestamp não viram amostra
+        assert samples.count() == 101
+
+        metrics = {r.topic_family: r for r in latency_metrics(samples).collect()}
+        text = metrics["text"]
+        assert text.stage == "silver" and text.batch_ts == batch
+        assert text.messages == 100
+        assert text.p50_s == pytest.approx(50.0, abs=1)
+        assert text.p95_s == pytest.approx(95.0, abs=1)
+        assert text.p99_s == pytest.approx(99.0, abs=1)
+        assert text.max_s == 100.0
+        assert metrics["binary"].max_s == 120.0
+
+    def test_combine_batches(self, spark):
+        """Percentis de vários micro-batches: média ponderada por mensagens."""
+        metrics = spark.createDataFrame(
+            [
+                ("text", "silver", 30, 1.0, 2.0, 4.0, 5.0, _T0, _T0 + timedelta(hours=1)),
+                ("text", "silver", 10, 5.0, 6.0, 8.0, 9.0, _T0 - timedelta(hours=1), _T0),
+            ],
+            "topic_family STRING, stage STRING, messages BIGINT, p50_s DOUBLE, p95_s DOUBLE, "
+            "p99_s DOUBLE, max_s DOUBLE, first_kafka_timestamp TIMESTAMP, "
+            "last_kafka_timestamp TIMESTAMP",
+        )
+        (row,) = combine_latency_metrics(metrics, "stage").collect()
+        assert row.messages == 40
+        assert (row.p50_s, row.p95_s, row.p99_s) == (2.0, 3.0, 5.0)
+        assert row.max_s == 9.0
+        assert row.first_kafka_timestamp == _T0 - timedelta(hours=1)
+        assert row.last_kafka_timestamp == _T0 + timedelta(hours=1)
+
+    def test_streaming_metrics(self, spark, tmp_path):
+        """Em streaming só as linhas por micro-batch da origem são emitidas, sem amostras."""
+        source = str(tmp_path / "silver")
+        schema = "kafka_timestamp TIMESTAMP, silver_ts TIMESTAMP"
+        rows = []
+
+        def run(batch_ts, delays):
+            spark.createDataFrame(
+                [(batch_ts - timedelta(seconds=d), batch_ts) for d in delays], schema
+            ).write.mode("append").parquet(source)
+            samples = latency_samples(
+                spark.readStream.schema(schema).parquet(source), "silver", "silver_ts", "text"
+            )
+            query = (
+                latency_metrics(samples)
+                .writeStream.foreachBatch(lambda df, _: rows.extend(df.collect()))
+                .option("checkpointLocation", str(tmp_path / "checkpoint"))
+                .trigger(availableNow=True)
+                .start()
+            )
+            query.awaitTermination()
+
+        first = _T0 + timedelta(minutes=1)
+        run(first, range(1, 11))
+        run(first + timedelta(minutes=1), [3.0])
+        by_batch = {r.batch_ts: r for r in rows}
+        assert len(rows) == 2
+        assert by_batch[first].messages == 10 and by_batch[first].max_s == 10.0
+        assert by_batch[first + timedelta(minutes=1)].p50_s == 3.0
+
+    def test_unknown_stage(self, spark):
+        df = spark.createDataFrame([], "kafka_timestamp TIMESTAMP, gold_ts TIMESTAMP")
+        with pytest.raises(ValueError):
+            latency_samples(df, "gold", "gold_ts", "text")
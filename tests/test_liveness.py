@@ -0,0 +1,171 @@
+"""
+Testes para o monitor de liveness dos heartbeats (liveness).
+
+Para rodar:
+    uv run pytest tests/test_liveness.py -v
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from nasa_gcn.liveness import (
+    LIVENESS_WINDOW,
+    liveness_rollups,
+    parse_heartbeats,
+    update_liveness,
+)
+
+HEARTBEAT_COLUMNS = ["topic", "heartbeat_at", "kafka_timestamp", "ingestion_timestamp"]
+HEARTBEAT_SCHEMA = (
+    "topic STRING, heartbeat_at TIMESTAMP, kafka_timestamp TIMESTAMP, ingestion_timestamp TIMESTAMP"
+)
+START = datetime(2026, 1, 1)
+
+
+class _State:
+    """GroupState mínimo para chamar update_liveness fora do Spark."""
+
+    def __init__(self):
+        self.value = None
+
+    @property
+    def exists(self):
+        return self.value is not None
+
+    @property
+    def get(self):
+        return self.value
+
+    def update(self, value):
+        self.value = value
+
+
+def _heartbeat(second, publish_lag=0.5, ingest_lag=2.0):
+    """Heartbeat recebido pelo broker em START + second segundos."""
+    received = START + timedelta(seconds=second)
+    return (
+        "gcn.heartbeat",
+        received - timedelta(seconds=publish_lag),
+        received,
+        received + timedelta(seconds=ingest_lag),
+    )
+
+
+def _apply(state, *heartbeats):
+    frame = pd.DataFrame(list(heartbeats), columns=HEARTBEAT_COLUMNS)
+    for name in HEARTBEAT_COLUMNS[1:]:
+        frame[name] = pd.to_datetime(frame[name])
+    (rollups,) = update_liveness(("gcn.heartbeat",), iter([frame]), state)
+    return {row.minute: row for row in rollups.itertuples()}
+
+
+class TestUpdateLiveness:
+    """Testes da função de estado, sem Spark."""
+
+    def test_minute_rollups(self):
+        """Gaps e lags por minuto; o minuto aberto sai parcial e depois fechado."""
+        state = _State()
+        rollups = _apply(state, *(_heartbeat(s) for s in (0, 1, 2, 5)))
+        (minute,) = rollups.values()
+        assert minute.minute == pd.Timestamp(START)
+        assert not minute.closed
+        assert minute.heartbeats == 4
+        assert minute.gap_mean_s == pytest.approx(5 / 3)
+        assert minute.gap_max_s == 3.0
+        assert minute.publish_lag_mean_s == pytest.approx(0.5)
+        assert minute.ingest_lag_max_s == pytest.approx(2.0)
+        assert minute.liveness_version == 1
+
+        # O primeiro gap do minuto seguinte vem do último heartbeat do anterior
+        rollups = _apply(state, _heartbeat(59, publish_lag=4.0), _heartbeat(70), _heartbeat(130))
+        assert [(r.minute.minute, r.closed, r.heartbeats) for r in rollups.values()] == [
+            (0, True, 5),
+            (1, True, 1),
+            (2, False, 1),
+        ]
+        first, second, third = rollups.values()
+        assert first.gap_max_s == 54.0
+        assert first.publish_lag_max_s == pytest.approx(4.0)
+        assert first.last_heartbeat_at == pd.Timestamp(START + timedelta(seconds=59))
+        assert second.gap_mean_s == 11.0
+        assert third.gap_mean_s == 60.0
+        assert third.window_gap_max_s == 60.0
+        assert {r.liveness_version for r in rollups.values()} == {2}
+
+    def test_late_heartbeats(self):
+        """Heartbeats anteriores ao último visto só contam como atrasados."""
+        state = _State()
+        _apply(state, _heartbeat(10), _heartbeat(20))
+        (minute,) = _apply(state, _heartbeat(5), _heartbeat(30)).values()
+        assert minute.heartbeats == 3
+        assert minute.late_heartbeats == 1
+        assert minute.gap_max_s == 10.0
+
+    def test_missing_timestamps(self):
+        """Sem heartbeat_at ou ingestion_timestamp o lag correspondente fica de fora."""
+        topic, _, received, _ = _heartbeat(0)
+        (minute,) = _apply(
+            _State(), (topic, None, received, None), _heartbeat(1, publish_lag=1.0)
+        ).values()
+        assert minute.heartbeats == 2
+        assert minute.publish_lag_mean_s == pytest.approx(1.0)
+        assert minute.ingest_lag_mean_s == pytest.approx(2.0)
+
+    def test_state_is_fixed_size(self):
+        """A janela de gaps é limitada e o estado não cresce com o histórico."""
+        state = _State()
+        for start in range(0, 3 * LIVENESS_WINDOW, 50):
+            _apply(state, *(_heartbeat(s) for s in range(start, start + 50)))
+        window = state.value[8]
+        assert len(window) == LIVENESS_WINDOW
+        size = len(repr(state.value))
+        _apply(state, *(_heartbeat(s) for s in range(1000, 1100)))
+        assert abs(len(repr(state.value)) - size) < 50
+
+
+class TestLivenessRollups:
+    """parse_heartbeats + applyInPandasWithState num stream."""
+
+    def test_parse_heartbeats(self, spark):
+        """heartbeat_at vem de alert_datetime; JSON inválido vira null."""
+        values = [
+            json.dumps({"alert_datetime": "2026-01-01T00:00:01+00:00"}).encode(),
+            b"not json",
+        ]
+        bronze = spark.createDataFrame(
+            [("k", value, "gcn.heartbeat", START, START) for value in values],
+            "message_key STRING, value BINARY, topic STRING, kafka_timestamp TIMESTAMP, "
+            "ingestion_timestamp TIMESTAMP",
+        )
+        rows = parse_heartbeats(bronze).collect()
+        assert rows[0].heartbeat_json.startswith("{")
+        assert rows[0].heartbeat_at is not None
+        assert rows[1].heartbeat_at is None
+
+    def test_micro_batches(self, spark, tmp_path):
+        """Cada micro-batch emite os minutos alterados do tópico."""
+        source = str(tmp_path / "heartbeats")
+
+        def run(heartbeats):
+            spark.createDataFrame(heartbeats, HEARTBEAT_SCHEMA).write.mode("append").parquet(source)
+            batch = []
+            query = (
+                liveness_rollups(spark.readStream.schema(HEARTBEAT_SCHEMA).parquet(source))
+                .writeStream.foreachBatch(lambda df, _: batch.extend(df.collect()))
+                .option("checkpointLocation", str(tmp_path / "checkpoint"))
+                .trigger(availableNow=True)
+                .start()
+            )
+            query.awaitTermination()
+            return batch
+
+        (first,) = run([_heartbeat(s) for s in (0, 1, 2)])
+        assert first.heartbeats == 3 and not first.closed
+
+        closed, opened = sorted(run([_heartbeat(61)]), key=lambda r: r.minute)
+        assert closed.closed and closed.heartbeats == 3
+        assert opened.heartbeats == 1 and opened.gap_max_s == 59.0
+        assert opened.liveness_version == 2
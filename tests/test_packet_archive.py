@@ -0,0 +1,164 @@
+"""
+Testes para o arquivo de pacotes com índice (packet_archive).
+
+Para rodar:
+    uv run pytest tests/test_packet_archive.py -v
+"""
+
+import struct
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from nasa_gcn.binary_parser import (
+    BINARY_FIELDS,
+    batch_to_records,
+    parse_gcn_binary_array,
+    parse_gcn_binary_batch,
+    parse_gcn_binary_packet,
+)
+from nasa_gcn.packet_archive import DATA_FILE, INDEX_FILE, PacketArchive, archive_from_dataframe
+
+# TJD de 2026-03-01 (1968-05-24 + 21100 dias)
+MARCH_1_TJD = 21100
+
+
+def _packet(pkt_type: int, tjd: int, trig_num: int = 1, sod_centi: int = 4_320_000) -> bytes:
+    longs = [0] * 40
+    longs[0], longs[1], longs[4] = pkt_type, 1, trig_num
+    longs[5], longs[6] = tjd, sod_centi
+    longs[7], longs[8], longs[11] = 1800000, 450000, 10000
+    return struct.pack(">40i", *longs)
+
+
+def _packets():
+    """Pacotes GBM (115) e BAT (61) espalhados de fevereiro a abril de 2026."""
+    return [
+        _packet(115 if i % 3 else 61, MARCH_1_TJD - 30 + i, trig_num=1000 + i) for i in range(90)
+    ]
+
+
+def _records(columns):
+    return batch_to_records({name: columns[name] for name in BINARY_FIELDS})
+
+
+class TestParseGcnBinaryArray:
+    def test_matches_batch(self):
+        packets = _packets()
+        longs = np.frombuffer(b"".join(packets), dtype=">i4").reshape(-1, 40)
+        assert _records(parse_gcn_binary_array(longs)) == batch_to_records(
+            parse_gcn_binary_batch(packets)
+        )
+
+    def test_shape(self):
+        with pytest.raises(ValueError, match="40"):
+            parse_gcn_binary_array(np.zeros((2, 39), dtype=np.int32))
+
+
+class TestPacketArchive:
+    def test_create_and_query_by_type_and_time(self, tmp_path):
+        """Só os pacotes do tipo e do intervalo, em ordem de gravação."""
+        packets = _packets()
+        archive = PacketArchive.create(tmp_path / "archive", packets)
+        assert len(archive) == 90
+        assert (tmp_path / "archive" / DATA_FILE).stat().st_size == 90 * 160
+
+        march = archive.query(
+            "FERMI_GBM_FINAL_POS", datetime(2026, 3, 1), datetime(2026, 4, 1, tzinfo=timezone.utc)
+        )
+        expected = [p for p in packets[30:61] if parse_gcn_binary_packet(p)["pkt_type"] == 115]
+        assert _records(march) == [parse_gcn_binary_packet(p) for p in expected]
+        assert list(march["offset"]) == [160 * i for i in range(30, 61) if i % 3]
+
+        # O filtro de horário é exato (os pacotes são do meio-dia): end é exclusivo
+        days = archive.query(115, datetime(2026, 3, 2), datetime(2026, 3, 3, 12))
+        assert list(days["burst_tjd"]) == [MARCH_1_TJD + 1]
+
+    def test_lookup(self, tmp_path):
+        archive = PacketArchive.create(tmp_path, _packets())
+        assert len(archive.lookup()) == 90
+        assert len(archive.lookup([61, 115])) == 90
+        assert list(archive.lookup(trig_num=1031)) == [160 * 31]
+        assert list(archive.lookup(61, trig_num=1031)) == []
+        assert len(archive.lookup(start=datetime(2026, 3, 1), end=datetime(2026, 3, 2))) == 2
+        assert archive.lookup(150).size == 0
+        with pytest.raises(ValueError, match="Unknown packet type"):
+            archive.lookup("NOT_A_TYPE")
+
+    def test_append_and_reopen(self, tmp_path):
+        """append estende os registros e o índice; reabrir lê o mesmo conteúdo."""
+        packets = _packets()
+        archive = PacketArchive.create(tmp_path)
+        assert archive.append(packets[:50]) == 50
+        assert archive.append(packets[50:] + [None, b"short"]) == 40
+
+        # O índice continua ordenado por (pkt_type, burst_tjd, trig_num, offset)
+        index = np.load(tmp_path / INDEX_FILE).tolist()
+        assert index == sorted(index) and len(index) == 90
+
+        reopened = PacketArchive(tmp_path)
+        assert len(reopened) == 90
+        everything = reopened.query()
+        assert _records(everything) == [parse_gcn_binary_packet(p) for p in packets]
+
+        with pytest.raises(FileExistsError):
+            PacketArchive.create(tmp_path)
+
+    def test_recovers_unindexed_tail(self, tmp_path):
+        """Pacotes gravados sem índice (crash no append) são indexados ao abrir."""
+        packets = _packets()
+        PacketArchive.create(tmp_path, packets[:10])
+        with open(tmp_path / DATA_FILE, "ab") as file:
+            file.write(b"".join(packets[10:20]) + b"\x00" * 70)
+
+        archive = PacketArchive(tmp_path)
+        assert len(archive) == 20
+        assert list(archive.lookup(trig_num=1015)) == [160 * 15]
+        # O registro parcial é descartado no próximo append
+        archive.append(packets[20:21])
+        assert (tmp_path / DATA_FILE).stat().st_size == 21 * 160
+        assert len(np.load(tmp_path / INDEX_FILE)) == 21
+
+    def test_append_stream(self, tmp_path):
+        packets = _packets()
+        dump = tmp_path / "dump.bin"
+        dump.write_bytes(b"".join(packets) + b"\x00" * 37)
+        errors = []
+        archive = PacketArchive.create(tmp_path / "archive")
+        appended = archive.append_stream(
+            dump, on_error=lambda *e: errors.append(e), batch_packets=25
+        )
+        assert appended == len(archive) == 90
+        assert [size for _, size, _ in errors] == [37]
+        assert _records(archive.query(61)) == [
+            parse_gcn_binary_packet(p) for p in packets if p[3] == 61
+        ]
+
+    def test_append_stream_unknown_type(self, tmp_path):
+        """Um tipo não listado num dump de socket não desalinha os registros gravados."""
+        packets = _packets()[:6]
+        packets[2] = _packet(190, MARCH_1_TJD, trig_num=4242)
+        # Cabeçalho do socket: pkt_sernum crescente, pkt_hop_cnt = 1, pkt_sod válido
+        packets = [
+            p[:4] + struct.pack(">3i", sernum, 1, 100 * sernum) + p[16:]
+            for sernum, p in enumerate(packets, start=1)
+        ]
+        dump = tmp_path / "dump.bin"
+        dump.write_bytes(b"".join(packets))
+
+        archive = PacketArchive.create(tmp_path / "archive")
+        assert archive.append_stream(dump, on_error=pytest.fail) == 6
+        assert (tmp_path / "archive" / DATA_FILE).read_bytes() == dump.read_bytes()
+        assert _records(archive.query()) == [parse_gcn_binary_packet(p) for p in packets]
+        assert list(archive.lookup(190)) == [2 * 160]
+        assert _records(parse_gcn_binary_array(archive.read(archive.lookup(190)))) == [
+            parse_gcn_binary_packet(packets[2])
+        ]
+
+    def test_from_dataframe(self, spark, tmp_path):
+        packets = _packets()
+        df = spark.createDataFrame([(p,) for p in packets], "value BINARY")
+        archive = archive_from_dataframe(df, tmp_path, batch_rows=40)
+        assert len(archive) == 90
+        assert len(archive.query("FERMI_GBM_FINAL_POS")["pkt_type"]) == 60
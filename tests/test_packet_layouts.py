@@ -0,0 +1,151 @@
+"""
+Testes para o registro de layouts por tipo de pacote (packet_layouts).
+
+Para rodar:
+    uv run pytest tests/test_packet_layouts.py -v
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import pytest
+from test_binary_parser import _fuzz_packets
+
+from nasa_gcn.binary_parser import packets_to_matrix, parse_gcn_binary_packet
+from nasa_gcn.packet_layouts import (
+    DETAIL_FIELDS,
+    PACKET_LAYOUTS,
+    get_packet_layout,
+    parse_packet_details,
+    parse_packet_details_batch,
+)
+
+# Pacotes de referência (um por família) e os valores publicados nos avisos de origem
+GOLDEN_DIR = Path(__file__).parent.parent / "fixtures" / "packets"
+GOLDEN = json.loads((GOLDEN_DIR / "golden.json").read_text())
+
+
+def _packet(pkt_type: int, **slots: int) -> bytes:
+    longs = [0] * 40
+    longs[0] = pkt_type
+    for slot, value in slots.items():
+        longs[int(slot.lstrip("s"))] = value
+    return struct.pack(">40i", *longs)
+
+
+def _batch_records(packets) -> list:
+    columns = parse_packet_details_batch(packets)
+    values = [columns[name].tolist() for name in DETAIL_FIELDS]
+    return [dict(zip(DETAIL_FIELDS, row)) for row in zip(*values)]
+
+
+class TestPacketLayouts:
+    """Testes do registro e do Struct pré-compilado por layout."""
+
+    def test_dispatch(self):
+        """Cada tipo registrado aponta para o layout da sua família."""
+        assert get_packet_layout(61).family == "swift_bat"
+        assert get_packet_layout(115).family == "fermi_gbm"
+        assert get_packet_layout(150).family == "lvc"
+        assert get_packet_layout(173).family == "icecube"
+        assert get_packet_layout(3) is None
+        assert get_packet_layout(-1) is None
+        assert get_packet_layout(10**6) is None
+
+    def test_compiled_struct_matches_full_unpack(self):
+        """O Struct com padding lê os mesmos valores que struct.unpack('>40i')."""
+        for packet in _fuzz_packets(50):
+            longs = struct.unpack(">40i", packet)
+            for layout in PACKET_LAYOUTS:
+                values = layout.compiled.unpack_from(packet)
+                for packet_field, index in zip(layout.fields, layout.value_index):
+                    assert values[index] == longs[packet_field.slot]
+
+
+class TestParsePacketDetails:
+    """Testes do decodificador escalar de campos específicos."""
+
+    def test_swift_bat_fields(self):
+        """Pacote Swift-BAT: escalas e flags de soln_status."""
+        packet = _packet(61, s9=12345, s12=4550, s18=0b10011, s20=1234, s24=3200)
+        result = parse_packet_details(packet)
+
+        assert result["swift_bat_burst_flue"] == 12345
+        assert result["swift_bat_phi_deg"] == 45.5
+        assert result["swift_bat_point_src"] is True
+        assert result["swift_bat_is_grb"] is True
+        assert result["swift_bat_interesting"] is False
+        assert result["swift_bat_image_trig"] is True
+        assert result["swift_bat_image_signif"] == 12.34
+        assert result["swift_bat_bkg_dur_s"] == 32.0
+        assert result["fermi_gbm_burst_inten"] is None
+
+    def test_lvc_probabilities(self):
+        """Pacote LVC: probabilidades em unidades de 0.0001."""
+        result = parse_packet_details(_packet(151, s20=9876, s24=124))
+        assert result["lvc_prob_bns"] == 0.9876
+        assert result["lvc_prob_terrestrial"] == 0.0124
+        assert result["swift_bat_burst_flue"] is None
+
+    def test_unregistered_type(self):
+        """Tipos sem layout retornam todas as colunas None."""
+        result = parse_packet_details(_packet(3))
+        assert tuple(result) == DETAIL_FIELDS
+        assert all(value is None for value in result.values())
+
+    def test_invalid_packet(self):
+        """Pacotes None ou de tamanho errado retornam todas as colunas None."""
+        assert all(value is None for value in parse_packet_details(None).values())
+        assert all(value is None for value in parse_packet_details(b"short").values())
+
+
+class TestParsePacketDetailsBatch:
+    """Paridade do caminho batch com o escalar."""
+
+    def test_fuzz_parity(self):
+        """Batch reproduz parse_packet_details em um corpus aleatório."""
+        packets = _fuzz_packets(3000, seed=21) + [None, b"short"]
+        expected = [parse_packet_details(p) for p in packets]
+        assert _batch_records(packets) == expected
+
+    def test_contiguous_buffer(self):
+        """Buffer contíguo equivale à lista de pacotes."""
+        packets = _fuzz_packets(100, seed=4)
+        assert _batch_records(b"".join(packets)) == _batch_records(packets)
+
+    def test_precomputed_matrix(self):
+        """Reaproveitar o packets_to_matrix dá o mesmo resultado."""
+        packets = _fuzz_packets(100, seed=6) + [None, b"short"]
+        columns = parse_packet_details_batch(packets, matrix=packets_to_matrix(packets))
+        values = [columns[name].tolist() for name in DETAIL_FIELDS]
+        assert [dict(zip(DETAIL_FIELDS, row)) for row in zip(*values)] == _batch_records(packets)
+
+
+class TestGoldenPackets:
+    """
+    Pacotes de fixtures/packets (na raiz do projeto): os slots de cada aviso
+    real (Swift-BAT, Fermi-GBM, LVC, IceCube) codificados como no socket GCN;
+    a decodificação tem que devolver os valores publicados no aviso
+    (golden.json).
+    """
+
+    @pytest.mark.parametrize("name", sorted(GOLDEN))
+    def test_decoded_values(self, name):
+        """Campos genéricos e da família batem com o aviso; as outras famílias ficam None."""
+        packet = (GOLDEN_DIR / f"{name}.bin").read_bytes()
+        result = {**parse_gcn_binary_packet(packet), **parse_packet_details(packet)}
+        expected = GOLDEN[name]["expected"]
+
+        assert result["parse_error"] is None
+        assert result["burst_datetime"].isoformat() == expected.pop("burst_datetime")
+        assert {key: result[key] for key in expected} == expected
+
+        family = get_packet_layout(result["pkt_type"]).family
+        others = [c for c in DETAIL_FIELDS if not c.startswith(f"{family}_")]
+        assert all(result[column] is None for column in others)
+
+    def test_batch_matches_scalar(self):
+        """O caminho batch decodifica os pacotes reais como o escalar."""
+        packets = [(GOLDEN_DIR / f"{name}.bin").read_bytes() for name in sorted(GOLDEN)]
+        assert _batch_records(packets) == [parse_packet_details(p) for p in packets]
@@ -0,0 +1,164 @@
+"""
+Testes para a escrita em micro-batches de gcn_raw (raw_writer).
+
+Para rodar:
+    uv run pytest tests/test_raw_writer.py -v
+"""
+
+import asyncio
+
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from nasa_gcn.consumer import AlertConsumer, KafkaMessage, MemorySource
+from nasa_gcn.raw_writer import RAW_ARROW_SCHEMA, RawWriter, raw_records
+
+BINARY_TOPIC = "gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK"
+TEXT_TOPIC = "gcn.classic.text.SWIFT_BAT_GRB_POS_ACK"
+DAY_MS = 86_400_000
+# 2026-01-01T00:00:00Z
+START_MS = 1_767_225_600_000
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _messages(n, topic=BINARY_TOPIC, start_offset=0, timestamp_ms=START_MS):
+    return [
+        KafkaMessage(topic, 0, start_offset + i, bytes(160), timestamp_ms, key=b"k")
+        for i in range(n)
+    ]
+
+
+def _write(writer, messages):
+    asyncio.run(writer.write(raw_records(messages)))
+
+
+def _files(root):
+    return sorted(p.relative_to(root).as_posix() for p in root.rglob("*.parquet"))
+
+
+class TestRawRecords:
+    def test_columns(self):
+        (record,) = raw_records(_messages(1))
+        assert set(record) == {f.name for f in RAW_ARROW_SCHEMA} - {"ingestion_timestamp"}
+        assert record["topic_family"] == "binary"
+        assert record["message_key"] == "k"
+        assert record["kafka_timestamp"].isoformat() == "2026-01-01T00:00:00+00:00"
+
+
+class TestRawWriter:
+    """Limites de flush e layout dos arquivos."""
+
+    def test_flush_by_rows(self, tmp_path):
+        flushes = []
+        writer = RawWriter(tmp_path, max_rows=100, on_flush=flushes.append)
+        for i in range(5):
+            _write(writer, _messages(30, start_offset=30 * i))
+        # 30, 60, 90, 120 -> flush; 30 em buffer
+        assert [f.reason for f in flushes] == ["rows"]
+        assert flushes[0].rows == 120
+        assert writer.buffered_rows == 30
+
+        asyncio.run(writer.close())
+        assert writer.rows_written == 150
+        assert pq.read_table(tmp_path).num_rows == 150
+
+    def test_flush_by_bytes(self, tmp_path):
+        flushes = []
+        writer = RawWriter(tmp_path, max_bytes=10_000, on_flush=flushes.append)
+        _write(writer, _messages(20))
+        assert not flushes
+        _write(writer, _messages(50))
+        assert [f.reason for f in flushes] == ["bytes"]
+        assert flushes[0].bytes >= 10_000 and writer.buffered_rows == 0
+
+    def test_flush_by_age(self, tmp_path):
+        """A idade conta a partir da mensagem mais antiga em buffer."""
+        clock, flushes = _Clock(), []
+        writer = RawWriter(tmp_path, max_age_s=5, clock=clock, on_flush=flushes.append)
+        _write(writer, _messages(1))
+        clock.now = 4.0
+        _write(writer, _messages(1, start_offset=1))
+        assert not flushes
+        clock.now = 5.5
+        _write(writer, _messages(1, start_offset=2))
+        assert [(f.reason, f.rows, f.oldest_age_s) for f in flushes] == [("age", 3, 5.5)]
+
+    def test_partitions_and_schema(self, tmp_path):
+        """Um arquivo por (família, data UTC) com o schema de gcn_raw."""
+        writer = RawWriter(tmp_path)
+        _write(writer, _messages(3) + _messages(2, topic=TEXT_TOPIC))
+        _write(writer, _messages(4, start_offset=3, timestamp_ms=START_MS + DAY_MS))
+        asyncio.run(writer.close())
+
+        files = _files(tmp_path)
+        assert [f.rsplit("/", 1)[0] for f in files] == [
+            "binary/2026-01-01",
+            "binary/2026-01-02",
+            "text/2026-01-01",
+        ]
+        assert writer.files_written == 3
+        # Nenhum arquivo temporário sobra
+        assert not list(tmp_path.rglob(".*"))
+
+        table = pq.read_table(tmp_path / files[1])
+        assert table.schema == RAW_ARROW_SCHEMA
+        assert table.column("offset").to_pylist() == [3, 4, 5, 6]
+        assert table.column("ingestion_timestamp").unique().to_pylist()[0].year >= 2026
+
+        dataset = ds.dataset(tmp_path, format="parquet", partitioning=None)
+        assert dataset.count_rows() == 9
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown format"):
+            RawWriter(tmp_path, format="csv")
+
+
+class TestConsumerIntegration:
+    """RawWriter como sink do AlertConsumer."""
+
+    def test_commits_after_flush(self, tmp_path):
+        """Cada commit encontra o buffer vazio: offsets só depois dos arquivos."""
+        writer = RawWriter(tmp_path, max_rows=10_000)
+        buffered_at_commit = []
+
+        class Source(MemorySource):
+            async def commit(self, offsets):
+                buffered_at_commit.append((writer.buffered_rows, len(_files(tmp_path))))
+                await super().commit(offsets)
+
+        source = Source(_messages(250))
+        consumer = AlertConsumer(source, writer, max_batch=50, commit_every=100, decode=raw_records)
+        stats = asyncio.run(consumer.run())
+
+        assert stats.messages == 250
+        assert [rows for rows, _ in buffered_at_commit] == [0, 0, 0]
+        assert [files for _, files in buffered_at_commit] == [1, 2, 3]
+        assert source.committed == {(BINARY_TOPIC, 0): 250}
+        assert pq.read_table(tmp_path).num_rows == 250
+
+    def test_spark_reads_files(self, spark, tmp_path):
+        """Os arquivos leem com o schema das colunas de gcn_raw."""
+        writer = RawWriter(tmp_path)
+        _write(writer, _messages(5) + _messages(2, topic=TEXT_TOPIC))
+        asyncio.run(writer.close())
+
+        df = spark.read.parquet(str(tmp_path / "*" / "*"))
+        assert df.count() == 7
+        assert dict(df.dtypes) == {
+            "message_key": "string",
+            "value": "binary",
+            "topic": "string",
+            "topic_family": "string",
+            "partition": "int",
+            "offset": "bigint",
+            "kafka_timestamp": "timestamp",
+            "ingestion_timestamp": "timestamp",
+        }
@@ -0,0 +1,121 @@
+"""
+Testes para os schemas JSON versionados (schemas).
+
+Para rodar:
+    uv run pytest tests/test_schemas.py -v
+"""
+
+import json
+
+import numpy as np
+import pytest
+from pyspark.sql.functions import from_json
+
+from benchmarks.replay.synthetic import NOTICE_TOPICS, _event_ids, _gwalert, _notices
+from nasa_gcn.schemas import (
+    GWALERT_SCHEMA,
+    NOTICE_CORE_FIELDS,
+    NOTICE_SCHEMA,
+    NOTICE_TOPIC_FIELDS,
+    get_notice_schema,
+    infer_json_fields,
+    merge_fields,
+    to_ddl,
+)
+
+
+def _synthetic(generator, n: int = 40):
+    return generator(np.random.default_rng(0), n, _event_ids(10))
+
+
+class TestSchemaHelpers:
+    """Testes das funções de montagem dos schemas."""
+
+    def test_to_ddl(self):
+        """Nomes entre crases (ex: $schema) e tipos na ordem declarada."""
+        assert to_ddl((("$schema", "STRING"), ("id", "ARRAY<STRING>"))) == (
+            "`$schema` STRING, `id` ARRAY<STRING>"
+        )
+
+    def test_merge_fields(self):
+        """União preserva a ordem e ignora campos repetidos com o mesmo tipo."""
+        merged = merge_fields((("a", "INT"), ("b", "STRING")), (("b", "STRING"), ("c", "DOUBLE")))
+        assert merged == (("a", "INT"), ("b", "STRING"), ("c", "DOUBLE"))
+
+    def test_merge_conflict(self):
+        """O mesmo campo com tipos diferentes é erro."""
+        with pytest.raises(ValueError, match="'a'"):
+            merge_fields((("a", "INT"),), (("a", "STRING"),))
+
+    def test_topic_schemas(self):
+        """Tópicos registrados têm core + específicos; os demais, só o core."""
+        for topic, fields in NOTICE_TOPIC_FIELDS.items():
+            assert get_notice_schema(topic) == to_ddl(NOTICE_CORE_FIELDS + fields)
+        assert get_notice_schema("gcn.notices.unknown") == to_ddl(NOTICE_CORE_FIELDS)
+
+    def test_synthetic_topics_registered(self):
+        """Todo tópico do corpus sintético tem schema versionado."""
+        assert set(NOTICE_TOPICS) <= set(NOTICE_TOPIC_FIELDS)
+
+    def test_schemas_cover_documents(self):
+        """Cada chave dos notices sintéticos está declarada no schema do tópico."""
+        for topic, value in zip(*_synthetic(_notices)):
+            declared = {name for name, _ in NOTICE_CORE_FIELDS + NOTICE_TOPIC_FIELDS[topic]}
+            assert set(json.loads(value)) <= declared
+
+
+class TestFromJson:
+    """Testes de from_json com os schemas no Spark."""
+
+    def test_notices(self, spark):
+        """Um from_json com o schema combinado lê campos core, id e específicos."""
+        topics, values = _synthetic(_notices)
+        df = spark.createDataFrame(
+            [(t, v.decode()) for t, v in zip(topics, values)], "topic string, json string"
+        )
+        rows = df.select("topic", "json", from_json("json", NOTICE_SCHEMA).alias("p")).collect()
+
+        for row in rows:
+            doc, parsed = json.loads(row.json), row.p.asDict()
+            assert parsed["id"] == doc["id"]
+            assert parsed["mission"] == doc["mission"]
+            assert parsed["ra"] == doc["ra"]
+            assert parsed["alert_datetime"] is not None
+            for name, _ in NOTICE_TOPIC_FIELDS[row.topic]:
+                assert parsed[name] == doc[name]
+
+    def test_gwalert(self, spark):
+        """Campos aninhados de event (classification, instruments) viram tipos nativos."""
+        _, values = _synthetic(_gwalert)
+        df = spark.createDataFrame([(v.decode(),) for v in values], "json string")
+        rows = df.select("json", from_json("json", GWALERT_SCHEMA).alias("p")).collect()
+
+        for row in rows:
+            doc = json.loads(row.json)
+            assert row.p.superevent_id == doc["superevent_id"]
+            assert row.p.time_created is not None
+            assert row.p.event.instruments == doc["event"]["instruments"]
+            assert row.p.event.classification == doc["event"]["classification"]
+            assert row.p.event.significant == doc["event"]["significant"]
+
+    def test_type_mismatch(self, spark):
+        """Campo com tipo inesperado vira null sem anular o restante do documento."""
+        df = spark.createDataFrame([('{"id": "not-an-array", "mission": "Swift"}',)], "json string")
+        parsed = df.select(from_json("json", NOTICE_SCHEMA).alias("p")).first().p
+
+        assert parsed.id is None
+        assert parsed.mission == "Swift"
+
+    def test_infer_json_fields(self, spark, tmp_path):
+        """A inferência sobre uma amostra encontra os campos do tópico."""
+        topic = "gcn.notices.superk.sn_alert"
+        topics, values = _synthetic(_notices)
+        sample = [v.decode() for t, v in zip(topics, values) if t == topic]
+        (tmp_path / "sample.json").write_text("\n".join(sample))
+
+        inferred = dict(infer_json_fields(spark, str(tmp_path)))
+        declared = NOTICE_CORE_FIELDS + NOTICE_TOPIC_FIELDS[topic]
+        assert set(inferred) <= {name for name, _ in declared}
+        assert "n_events" in inferred
+        # Sem schema, a inferência deixa timestamps como string (por isso são fixados no módulo)
+        assert inferred["alert_datetime"] == "string"
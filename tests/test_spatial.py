@@ -0,0 +1,295 @@
+"""
+Testes para o índice espacial HEALPix (spatial): funções NumPy e expressões Spark.
+
+Para rodar:
+    uv run pytest tests/test_spatial.py -v
+"""
+
+import numpy as np
+import pytest
+
+from nasa_gcn.spatial import (
+    COVER_MAX_RADIUS_DEG,
+    FULL_SKY_ORDER,
+    MAX_ORDER,
+    ang2pix,
+    angular_distance,
+    angular_distance_deg,
+    cover,
+    cover_cells,
+    cover_order,
+    cover_order_column,
+    crossmatch,
+    healpix,
+    neighbours,
+    parent,
+    parent_cell,
+    pix2ang,
+    resolution_deg,
+    spatial_join,
+)
+
+
+def _positions(rng, n):
+    """(ra, dec) uniformes na esfera, em graus."""
+    return rng.uniform(0, 360, n), np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+
+
+def _brute_force(ra1, dec1, err1, ra2, dec2, err2):
+    dist = angular_distance_deg(ra1[:, None], dec1[:, None], ra2[None], dec2[None])
+    i, j = np.nonzero(dist <= err1[:, None] + err2[None])
+    return set(zip(i.tolist(), j.tolist()))
+
+
+class TestAng2Pix:
+    """Atribuição de células NESTED."""
+
+    @pytest.mark.parametrize("order", [0, 1, 4, 12, MAX_ORDER])
+    def test_roundtrip_through_cell_center(self, order):
+        """O centro de cada célula cai na própria célula."""
+        ra, dec = _positions(np.random.default_rng(order), 5000)
+        cells = ang2pix(order, ra, dec)
+        assert cells.min() >= 0 and cells.max() < 12 * 4**order
+        assert np.array_equal(ang2pix(order, *pix2ang(order, cells)), cells)
+
+    def test_equal_area(self):
+        """Posições uniformes se distribuem por igual entre as 48 células da ordem 1."""
+        ra, dec = _positions(np.random.default_rng(0), 48_000)
+        counts = np.bincount(ang2pix(1, ra, dec), minlength=48)
+        assert counts.min() > 850 and counts.max() < 1150
+
+    def test_known_cells(self):
+        """Polos, calotas, equador e ra=360 caem nas faces esperadas."""
+        cells = ang2pix(0, [0.0, 0.0, 45.0, 45.0, 0.0, 360.0, 90.0], [90, -90, 60, -60, 0, 0, 0])
+        assert cells.tolist() == [0, 8, 0, 8, 4, 4, 5]
+
+    def test_nan_position_is_minus_one(self):
+        """Posição NaN não tem célula."""
+        assert ang2pix(5, [np.nan, 10.0], [0.0, np.nan]).tolist() == [-1, -1]
+
+    def test_parent_is_shift(self):
+        """A célula ancestral em ordem menor é a célula calculada direto na ordem menor."""
+        ra, dec = _positions(np.random.default_rng(1), 2000)
+        fine = ang2pix(MAX_ORDER, ra, dec)
+        for order in (0, 3, 10, 20):
+            assert np.array_equal(parent(fine, MAX_ORDER, order), ang2pix(order, ra, dec))
+
+    def test_invalid_order(self):
+        with pytest.raises(ValueError):
+            ang2pix(MAX_ORDER + 1, [0.0], [0.0])
+        with pytest.raises(ValueError):
+            parent([0], 3, 4)
+
+
+class TestNeighbours:
+    """Vizinhança de células, inclusive nas bordas entre faces."""
+
+    @pytest.mark.parametrize("order", [0, 1, 2, 6])
+    def test_symmetric(self, order):
+        """Se b é vizinha de a, a é vizinha de b."""
+        cells = np.arange(12 * 4**order)
+        nbs = neighbours(order, cells)
+        for cell, row in zip(cells, nbs):
+            for nb in row[row >= 0]:
+                assert cell in neighbours(order, [nb])[0]
+
+    def test_corner_cells_have_seven(self):
+        """Só as 3 células em volta de cada um dos 8 vértices de 3 faces têm 7 vizinhas."""
+        order = 3
+        missing = (neighbours(order, np.arange(12 * 4**order)) < 0).sum(axis=1)
+        assert set(missing.tolist()) == {0, 1}
+        assert missing.sum() == 24
+
+    def test_cover_contains_cell(self):
+        """cover é a célula seguida das 8 vizinhas."""
+        covered = cover(4, [100, 2000])
+        assert covered.shape == (2, 9)
+        assert covered[:, 0].tolist() == [100, 2000]
+
+
+class TestCoverOrder:
+    """Escolha da ordem do join a partir do raio de busca."""
+
+    def test_resolution_bounds_radius(self):
+        """A resolução da ordem escolhida cobre COVER_MARGIN × raio, e a seguinte não."""
+        for radius in (0.001, 0.05, 1.0, 5.0):
+            order = cover_order(radius)
+            assert resolution_deg(order) >= 2 * radius
+            assert resolution_deg(order + 1) < 2 * radius
+
+    def test_degenerate_radius(self):
+        """Raio 0 ou NaN usa MAX_ORDER; raio acima da ordem 0 não tem chave de célula."""
+        assert cover_order(0.0) == MAX_ORDER
+        assert cover_order(np.array([np.nan, 180.0])).tolist() == [MAX_ORDER, FULL_SKY_ORDER]
+        assert cover_order(COVER_MAX_RADIUS_DEG) == 0
+        assert cover_order(COVER_MAX_RADIUS_DEG + 0.01) == FULL_SKY_ORDER
+
+    @pytest.mark.parametrize("radius", [0.01, 0.5, 3.0, COVER_MAX_RADIUS_DEG])
+    def test_cover_margin(self, radius):
+        """Todo par a até `radius` de distância cai em célula + vizinhas na cover_order."""
+        rng = np.random.default_rng(7)
+        ra, dec = _positions(rng, 20_000)
+        # Segundo ponto a exatamente `radius` em direção aleatória
+        bearing = rng.uniform(0, 2 * np.pi, len(ra))
+        d, lat = np.radians(radius), np.radians(dec)
+        lat2 = np.arcsin(np.sin(lat) * np.cos(d) + np.cos(lat) * np.sin(d) * np.cos(bearing))
+        dlon = np.arctan2(
+            np.sin(bearing) * np.sin(d) * np.cos(lat), np.cos(d) - np.sin(lat) * np.sin(lat2)
+        )
+        ra2, dec2 = ra + np.degrees(dlon), np.degrees(lat2)
+        assert np.allclose(angular_distance_deg(ra, dec, ra2, dec2), radius)
+
+        order = cover_order(radius)
+        covered = cover(order, ang2pix(order, ra, dec))
+        assert (covered == ang2pix(order, ra2, dec2)[:, None]).any(axis=1).all()
+
+
+class TestCrossmatch:
+    """Cross-match NumPy contra força bruta."""
+
+    def test_matches_brute_force(self):
+        """Mesmos pares que o haversine de todos os pares, com erros mistos."""
+        rng = np.random.default_rng(3)
+        ra1, dec1 = _positions(rng, 3000)
+        err1 = np.where(rng.random(3000) < 0.1, 5.0, 0.05)
+        ra2, dec2 = _positions(rng, 2000)
+        err2 = np.full(2000, 0.2)
+        i, j, dist = crossmatch(ra1, dec1, err1, ra2, dec2, err2)
+        assert len(i) > 0
+        assert set(zip(i.tolist(), j.tolist())) == _brute_force(ra1, dec1, err1, ra2, dec2, err2)
+        assert np.allclose(dist, angular_distance_deg(ra1[i], dec1[i], ra2[j], dec2[j]))
+        assert np.all(np.diff(i) >= 0)
+
+    @pytest.mark.parametrize("error", [20.0, 40.0, 80.0])
+    def test_large_radii_match_brute_force(self, error):
+        """Erros de GBM/GW (dezenas de graus) não perdem pares, inclusive acima da ordem 0."""
+        rng = np.random.default_rng(int(error))
+        ra1, dec1 = _positions(rng, 400)
+        err1 = np.where(rng.random(400) < 0.5, error, 0.1)
+        ra2, dec2 = _positions(rng, 300)
+        err2 = np.where(rng.random(300) < 0.5, error, 0.1)
+        i, j, _ = crossmatch(ra1, dec1, err1, ra2, dec2, err2)
+        assert set(zip(i.tolist(), j.tolist())) == _brute_force(ra1, dec1, err1, ra2, dec2, err2)
+
+    def test_window_and_nan(self):
+        """window_deg soma ao raio; erro NaN conta como 0 e posição NaN não casa."""
+        i, j, _ = crossmatch(
+            [10.0, np.nan], [0.0, 0.0], [np.nan, 1.0], [10.5, 10.0], [0.0, 0.0], 0.0
+        )
+        assert list(zip(i.tolist(), j.tolist())) == [(0, 1)]
+        i, j, _ = crossmatch([10.0], [0.0], 0.0, [10.5], [0.0], 0.0, window_deg=0.6)
+        assert list(zip(i.tolist(), j.tolist())) == [(0, 0)]
+
+    def test_empty(self):
+        i, j, dist = crossmatch([], [], [], [1.0], [1.0], [1.0])
+        assert len(i) == len(j) == len(dist) == 0
+
+
+class TestSparkExpressions:
+    """Paridade das expressões Spark com as funções NumPy."""
+
+    @pytest.mark.parametrize("engine", ["pandas", "sql"])
+    def test_healpix_matches_ang2pix(self, spark, engine):
+        """healpix dá os mesmos ids que ang2pix, e null para posições ausentes."""
+        ra, dec = _positions(np.random.default_rng(11), 500)
+        rows = [(float(a), float(b)) for a, b in zip(ra, dec)]
+        rows += [(None, 1.0), (float("nan"), 1.0), (0.0, 90.0), (0.0, -90.0)]
+        df = spark.createDataFrame(rows, "ra DOUBLE, dec DOUBLE")
+        for order in (0, 8, MAX_ORDER):
+            got = [r[0] for r in df.select(healpix("ra", "dec", order, engine=engine)).collect()]
+            expected = ang2pix(order, [r[0] for r in rows[:-4]], [r[1] for r in rows[:-4]])
+            assert got[:-4] == expected.tolist()
+            assert got[-4:-2] == [None, None]
+            assert got[-2:] == ang2pix(order, [0.0, 0.0], [90.0, -90.0]).tolist()
+
+    def test_healpix_unknown_engine(self):
+        with pytest.raises(ValueError):
+            healpix("ra", "dec", engine="gpu")
+
+    def test_cell_helpers(self, spark):
+        """parent_cell, cover_order_column e cover_cells seguem parent, cover_order e cover."""
+        df = spark.createDataFrame([(123456789, 0.05), (98765, 0.0)], "cell LONG, radius DOUBLE")
+        row = df.select(
+            parent_cell("cell", MAX_ORDER, 20).alias("parent"),
+            cover_order_column("radius").alias("order"),
+            cover_cells(parent_cell("cell", MAX_ORDER, 6), 6).alias("cover"),
+        ).collect()
+        assert [r["parent"] for r in row] == parent([123456789, 98765], MAX_ORDER, 20).tolist()
+        assert [r["order"] for r in row] == [cover_order(0.05), MAX_ORDER]
+        assert [r["cover"] for r in row] == cover(6, parent([123456789, 98765], 29, 6)).tolist()
+
+    def test_angular_distance(self, spark):
+        df = spark.createDataFrame(
+            [(10.0, 20.0, 200.0, -35.0)], "a DOUBLE, b DOUBLE, c DOUBLE, d DOUBLE"
+        )
+        got = df.select(angular_distance("a", "b", "c", "d")).first()[0]
+        assert got == pytest.approx(angular_distance_deg(10.0, 20.0, 200.0, -35.0))
+
+    @pytest.mark.parametrize("engine", ["pandas", "sql"])
+    def test_spatial_join_matches_crossmatch(self, spark, engine):
+        """spatial_join devolve os mesmos pares e distâncias que crossmatch."""
+        rng = np.random.default_rng(5)
+        ra1, dec1 = _positions(rng, 400)
+        err1 = np.where(rng.random(400) < 0.2, 5.0, 0.5)
+        ra2, dec2 = _positions(rng, 300)
+        err2 = np.full(300, 1.0)
+        left = spark.createDataFrame(
+            [(k, float(a), float(b), float(e)) for k, (a, b, e) in enumerate(zip(ra1, dec1, err1))],
+            "grb_id INT, ra DOUBLE, dec DOUBLE, err DOUBLE",
+        )
+        right = spark.createDataFrame(
+            [(k, float(a), float(b), float(e)) for k, (a, b, e) in enumerate(zip(ra2, dec2, err2))],
+            "notice_id INT, n_ra DOUBLE, n_dec DOUBLE, n_err DOUBLE",
+        )
+        joined = spatial_join(
+            left, right, ("ra", "dec", "err"), ("n_ra", "n_dec", "n_err"), engine=engine
+        ).collect()
+
+        i, j, dist = crossmatch(ra1, dec1, err1, ra2, dec2, err2)
+        assert len(i) > 0
+        got = {(r["grb_id"], r["notice_id"]): r["angular_distance_deg"] for r in joined}
+        assert len(got) == len(joined)
+        assert set(got) == set(zip(i.tolist(), j.tolist()))
+        for a, b, d in zip(i.tolist(), j.tolist(), dist.tolist()):
+            assert got[(a, b)] == pytest.approx(d)
+
+    @pytest.mark.parametrize("max_radius_deg", [None, 1.0, 60.0])
+    @pytest.mark.parametrize("error", [10.0, 40.0])
+    def test_spatial_join_large_radii(self, spark, error, max_radius_deg):
+        """Com raios acima de COVER_MAX_RADIUS_DEG (ou do limite) o join bate com a força bruta."""
+        rng = np.random.default_rng(9)
+        ra1, dec1 = _positions(rng, 200)
+        err1 = np.where(rng.random(200) < 0.3, error, 0.2)
+        ra2, dec2 = _positions(rng, 150)
+        err2 = np.where(rng.random(150) < 0.3, error, 0.2)
+        left = spark.createDataFrame(
+            [(k, float(a), float(b), float(e)) for k, (a, b, e) in enumerate(zip(ra1, dec1, err1))],
+            "grb_id INT, ra DOUBLE, dec DOUBLE, err DOUBLE",
+        )
+        right = spark.createDataFrame(
+            [(k, float(a), float(b), float(e)) for k, (a, b, e) in enumerate(zip(ra2, dec2, err2))],
+            "notice_id INT, n_ra DOUBLE, n_dec DOUBLE, n_err DOUBLE",
+        )
+        joined = spatial_join(
+            left,
+            right,
+            ("ra", "dec", "err"),
+            ("n_ra", "n_dec", "n_err"),
+            max_radius_deg=max_radius_deg,
+        )
+        got = [(r["grb_id"], r["notice_id"]) for r in joined.collect()]
+        assert len(got) == len(set(got))
+        assert set(got) == _brute_force(ra1, dec1, err1, ra2, dec2, err2)
+
+    def test_spatial_join_streaming_requires_radius(self, spark, tmp_path):
+        """Sem max_radius_deg não há como consultar o erro máximo de um stream."""
+        schema = "grb_id INT, ra DOUBLE, dec DOUBLE, err DOUBLE"
+        spark.createDataFrame([], schema).write.parquet(str(tmp_path / "grb"))
+        stream = spark.readStream.schema(schema).parquet(str(tmp_path / "grb"))
+        right = spark.createDataFrame([], "notice_id INT, n_ra DOUBLE, n_dec DOUBLE, n_err DOUBLE")
+        with pytest.raises(ValueError, match="max_radius_deg"):
+            spatial_join(stream, right, ("ra", "dec", "err"), ("n_ra", "n_dec", "n_err"))
+        joined = spatial_join(
+            stream, right, ("ra", "dec", "err"), ("n_ra", "n_dec", "n_err"), max_radius_deg=2.0
+        )
+        assert joined.isStreaming
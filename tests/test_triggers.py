@@ -0,0 +1,257 @@
+"""
+Testes para a consolidação por trigger (triggers).
+
+Para rodar:
+    uv run pytest tests/test_triggers.py -v
+"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from nasa_gcn.triggers import (
+    TRIGGER_SOURCES,
+    TRIGGER_UPDATE_STRUCT,
+    consolidate_triggers,
+    trigger_updates,
+    update_trigger_summary,
+)
+
+UPDATE_SCHEMA = ", ".join(f"{f.name} {f.dataType.simpleString()}" for f in TRIGGER_UPDATE_STRUCT)
+
+
+class _State:
+    """GroupState mínimo para chamar update_trigger_summary fora do Spark."""
+
+    def __init__(self):
+        self.value = None
+        self.hasTimedOut = False
+        self.timeout_ms = None
+
+    @property
+    def exists(self):
+        return self.value is not None
+
+    @property
+    def get(self):
+        return self.value
+
+    def update(self, value):
+        self.value = value
+
+    def remove(self):
+        self.value = None
+
+    def getCurrentWatermarkMs(self):
+        return 0
+
+    def setTimeoutTimestamp(self, timestamp_ms):
+        self.timeout_ms = timestamp_ms
+
+
+def _packet(source, minute, error=None, trigger_minute=None, packet_type="P", trig_num=7):
+    """Pacote do trigger ("swift", trig_num) recebido em 2026-01-01 00:minute."""
+    return {
+        "mission": "swift",
+        "trig_num": trig_num,
+        "source": source,
+        "packet_type": packet_type,
+        "trigger_time": None if trigger_minute is None else datetime(2026, 1, 1, 0, trigger_minute),
+        "ra_deg": None if error is None else 10.0 + minute,
+        "dec_deg": None if error is None else -5.0,
+        "error_deg": error,
+        "kafka_timestamp": datetime(2026, 1, 1, 0, minute),
+    }
+
+
+def _apply(state, *packets):
+    frame = pd.DataFrame(list(packets), columns=[f.name for f in TRIGGER_UPDATE_STRUCT])
+    for name in ("trigger_time", "kafka_timestamp"):
+        frame[name] = pd.to_datetime(frame[name])
+    (summary,) = update_trigger_summary(("swift", 7), iter([frame]), state)
+    return summary.iloc[0]
+
+
+class TestUpdateTriggerSummary:
+    """Testes da função de estado, sem Spark."""
+
+    def test_best_localization_and_counts(self):
+        """Fica a posição de menor erro; contagens e tempos acumulam entre batches."""
+        state = _State()
+        summary = _apply(
+            state,
+            _packet("binary", 3, error=0.05, packet_type="SWIFT_BAT_GRB_POSITION"),
+            _packet("text", 1, trigger_minute=0),
+            _packet("voevent", 2, error=0.1),
+        )
+        assert summary.best_error_deg == 0.05
+        assert summary.best_source == "binary"
+        assert summary.best_packet_type == "SWIFT_BAT_GRB_POSITION"
+        assert summary.best_packet_at == pd.Timestamp(2026, 1, 1, 0, 3)
+        assert summary.first_packet_at == pd.Timestamp(2026, 1, 1, 0, 1)
+        assert summary.trigger_time == pd.Timestamp(2026, 1, 1, 0, 0)
+        assert summary.packet_count == 3
+        assert summary.trigger_version == 1
+
+        summary = _apply(
+            state,
+            _packet("notices", 9, error=0.3, trigger_minute=5),
+            _packet("binary", 8, error=0.001, packet_type="SWIFT_XRT_POSITION"),
+        )
+        assert summary.best_error_deg == 0.001
+        assert summary.best_ra_deg == 18.0
+        assert summary.best_packet_type == "SWIFT_XRT_POSITION"
+        assert summary.first_packet_at == pd.Timestamp(2026, 1, 1, 0, 1)
+        assert summary.last_packet_at == pd.Timestamp(2026, 1, 1, 0, 9)
+        # trigger_time vem do primeiro pacote que o informa
+        assert summary.trigger_time == pd.Timestamp(2026, 1, 1, 0, 0)
+        assert [summary[f"{s}_packets"] for s in TRIGGER_SOURCES] == [2, 1, 1, 1]
+        assert summary.packet_count == 5
+        assert summary.trigger_version == 2
+
+    def test_worse_position_keeps_state(self):
+        """Posição com erro maior ou igual não substitui a anterior."""
+        state = _State()
+        _apply(state, _packet("binary", 1, error=0.05))
+        summary = _apply(state, _packet("voevent", 2, error=0.05), _packet("binary", 3, error=1))
+        assert summary.best_source == "binary"
+        assert summary.best_packet_at == pd.Timestamp(2026, 1, 1, 0, 1)
+
+    def test_state_is_fixed_size(self):
+        """O estado não cresce com o número de pacotes."""
+        state = _State()
+        _apply(state, _packet("binary", 1, error=1.0))
+        size = len(repr(state.value))
+        for minute in range(2, 50):
+            _apply(state, _packet("text", minute))
+        assert abs(len(repr(state.value)) - size) < 10
+
+    def test_timeout_removes_state(self):
+        """Com state_ttl_ms o timeout vai para último pacote + ttl; ao expirar o estado sai."""
+        state = _State()
+        frame = pd.DataFrame([_packet("text", 1)], columns=[f.name for f in TRIGGER_UPDATE_STRUCT])
+        frame["kafka_timestamp"] = pd.to_datetime(frame["kafka_timestamp"])
+        list(update_trigger_summary(("swift", 7), iter([frame]), state, state_ttl_ms=1000))
+        received = pd.Timestamp(2026, 1, 1, 0, 1, tz="UTC")
+        assert state.exists and state.timeout_ms == received.value // 1_000_000 + 1000
+        state.hasTimedOut = True
+        assert list(update_trigger_summary(("swift", 7), iter([]), state, 1000)) == []
+        assert not state.exists
+
+    def test_without_position(self):
+        """Trigger só com pacotes sem posição não tem melhor localização."""
+        summary = _apply(_State(), _packet("text", 1))
+        assert summary.best_error_deg is None and summary.best_source is None
+        assert summary.trigger_time is None
+
+
+class TestTriggerUpdates:
+    """Normalização das tabelas Silver."""
+
+    def test_sources(self, spark):
+        """Missão pelo tópico e trig_num de cada formato; pacotes sem trigger saem."""
+        ts = datetime(2026, 1, 1)
+        binary = spark.createDataFrame(
+            [
+                ("gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK", 7, "SWIFT_BAT_GRB_POSITION", ts),
+                ("gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK", None, "SWIFT_BAT_GRB_POSITION", ts),
+            ],
+            "topic STRING, trig_num INT, pkt_type_name STRING, kafka_timestamp TIMESTAMP",
+        ).selectExpr(
+            "*",
+            "kafka_timestamp AS burst_datetime",
+            "1.0D AS burst_ra_deg",
+            "2.0D AS burst_dec_deg",
+            "0.05D AS burst_error_deg",
+        )
+        text = spark.createDataFrame(
+            [
+                ("gcn.classic.text.SWIFT_XRT_POSITION", "TRIGGER_NUM:     7,   Seg_Num: 0\n", ts),
+                ("gcn.classic.text.SWIFT_XRT_POSITION", "no trigger", ts),
+            ],
+            "topic STRING, message_text STRING, kafka_timestamp TIMESTAMP",
+        )
+        voevent = spark.createDataFrame(
+            [("gcn.classic.voevent.FERMI_GBM_FIN_POS", {"TrigID": "123"}, ts, 1.0, 2.0, 5.0, ts)],
+            "topic STRING, params MAP<STRING, STRING>, event_time TIMESTAMP, ra_deg DOUBLE, "
+            "dec_deg DOUBLE, error_deg DOUBLE, kafka_timestamp TIMESTAMP",
+        )
+        notices = spark.createDataFrame(
+            [
+                ("gcn.notices.swift.bat.guano", "7", ts, 1.0, 2.0, 0.1, ts),
+                ("gcn.notices.einstein_probe.wxt.alert", "EP260101a", ts, 1.0, 2.0, 0.1, ts),
+            ],
+            "topic STRING, notice_id STRING, trigger_time TIMESTAMP, ra DOUBLE, dec DOUBLE, "
+            "ra_dec_error DOUBLE, kafka_timestamp TIMESTAMP",
+        )
+
+        rows = trigger_updates(binary, text, voevent, notices).collect()
+        assert sorted((r.source, r.mission, r.trig_num) for r in rows) == [
+            ("binary", "swift", 7),
+            ("notices", "swift", 7),
+            ("text", "swift", 7),
+            ("voevent", "fermi_gbm", 123),
+        ]
+
+
+class TestConsolidateTriggers:
+    """applyInPandasWithState sobre um stream de trigger_updates."""
+
+    @staticmethod
+    def _runner(spark, tmp_path, **kwargs):
+        """Grava pacotes no stream e roda um micro-batch availableNow por chamada."""
+        source = str(tmp_path / "updates")
+
+        def run(packets):
+            rows = [tuple(p[f.name] for f in TRIGGER_UPDATE_STRUCT) for p in packets]
+            spark.createDataFrame(rows, UPDATE_SCHEMA).write.mode("append").parquet(source)
+            batch = []
+            query = (
+                consolidate_triggers(
+                    spark.readStream.schema(UPDATE_SCHEMA).parquet(source), **kwargs
+                )
+                .writeStream.foreachBatch(lambda df, _: batch.extend(df.collect()))
+                .option("checkpointLocation", str(tmp_path / "checkpoint"))
+                .trigger(availableNow=True)
+                .start()
+            )
+            query.awaitTermination()
+            return {(r.mission, r.trig_num): r for r in batch}
+
+        return run
+
+    def test_micro_batches(self, spark, tmp_path):
+        """Cada micro-batch emite só os triggers com pacotes novos."""
+        run = self._runner(spark, tmp_path)
+        first = run([_packet("binary", 1, error=0.1), _packet("text", 2, trig_num=8)])
+        assert set(first) == {("swift", 7), ("swift", 8)}
+        assert first[("swift", 7)].best_error_deg == 0.1
+
+        second = run([_packet("voevent", 3, error=0.01)])
+        assert set(second) == {("swift", 7)}
+        summary = second[("swift", 7)]
+        assert summary.best_error_deg == 0.01
+        assert summary.best_source == "voevent"
+        assert summary.packet_count == 2
+        assert summary.trigger_version == 2
+
+    def test_state_expires(self, spark, tmp_path):
+        """Trigger sem pacotes há state_ttl (em event time) recomeça do zero."""
+        run = self._runner(spark, tmp_path, state_ttl=timedelta(minutes=1))
+        run([_packet("binary", 1, error=0.1)])
+        run([_packet("text", 10, trig_num=8)])
+        summary = run([_packet("text", 11)])[("swift", 7)]
+        assert summary.trigger_version == 1
+        assert summary.best_error_deg is None
+
+    def test_invalid_state_ttl(self, spark):
+        with pytest.raises(ValueError):
+            consolidate_triggers(spark.createDataFrame([], UPDATE_SCHEMA), timedelta(0))
+
+
+@pytest.mark.parametrize("source", TRIGGER_SOURCES)
+def test_sources_have_counts(source):
+    """Cada fonte tem a sua coluna de contagem no resumo."""
+    summary = _apply(_State(), _packet(source, 1))
+    assert summary[f"{source}_packets"] == 1
@@ -0,0 +1,43 @@
+"""
+Testes para o módulo utils (funções de coluna Spark).
+
+Para rodar:
+    uv run pytest tests/test_utils.py -v
+"""
+
+from pyspark.sql.functions import col
+
+from nasa_gcn.config import TOPIC_FAMILIES, get_topic_family, get_topic_mission
+from nasa_gcn.utils import topic_family, topic_mission
+
+
+class TestTopicFamily:
+    """Testes para a coluna topic_family."""
+
+    def test_matches_python(self, spark):
+        """utils.topic_family reproduz config.get_topic_family."""
+        topics = [f"{m}X" if m.endswith(".") else m for m in TOPIC_FAMILIES.values()]
+        topics += ["gcn.circulars.extra", "gcn.classic", "unknown"]
+        df = spark.createDataFrame([(t,) for t in topics], "topic STRING")
+        rows = df.select(topic_family(col("topic")).alias("family")).collect()
+        assert [r.family for r in rows] == [get_topic_family(t) for t in topics]
+
+
+class TestTopicMission:
+    """Testes para a coluna topic_mission."""
+
+    def test_matches_python(self, spark):
+        """utils.topic_mission reproduz config.get_topic_mission."""
+        topics = [
+            "gcn.classic.binary.SWIFT_BAT_GRB_POS_ACK",
+            "gcn.classic.text.FERMI_GBM_FIN_POS",
+            "gcn.classic.binary.FERMI_LAT_POS_UPD",
+            "gcn.classic.voevent.FERMI_POINTDIR",
+            "gcn.notices.icecube.lvk_nu_track_search",
+            "gcn.notices.",
+            "gcn.circulars",
+            "igwn.gwalert",
+        ]
+        df = spark.createDataFrame([(t,) for t in topics], "topic STRING")
+        rows = df.select(topic_mission(col("topic")).alias("mission")).collect()
+        assert [r.mission for r in rows] == [get_topic_mission(t) for t in topics]
@@ -0,0 +1,137 @@
+"""
+Testes para a extração de campos VOEvent em uma única passada (voevent).
+
+Para rodar:
+    uv run pytest tests/test_voevent.py -v
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from nasa_gcn.voevent import VOEVENT_FIELDS, parse_iso_timestamp, parse_voevent, voevent_details
+
+VOEVENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<voe:VOEvent xmlns:voe="http://www.ivoa.net/xml/VOEvent/v2.0"
+    ivorn="ivo://nasa.gsfc.gcn/SWIFT#BAT_GRB_Pos_1234567-123" role="observation" version="2.0">
+  <Who>
+    <AuthorIVORN>ivo://nasa.gsfc.tan/gcn</AuthorIVORN>
+    <Date>2024-03-01T12:34:56</Date>
+  </Who>
+  <What>
+    <Param name="Packet_Type" value="61" />
+    <Param name="TrigID" value="1234567" />
+    <Group name="Solution_Status">
+      <Param name="Point_Source" value="true" />
+    </Group>
+  </What>
+  <WhereWhen>
+    <ObsDataLocation><ObservationLocation><AstroCoords coord_system_id="UTC-FK5-GEO">
+      <Time><TimeInstant><ISOTime>2024-03-01T12:30:00.25</ISOTime></TimeInstant></Time>
+      <Position2D unit="deg">
+        <Value2><C1>123.4567</C1><C2>-45.6789</C2></Value2>
+        <Error2Radius>0.0500</Error2Radius>
+      </Position2D>
+    </AstroCoords></ObservationLocation></ObsDataLocation>
+  </WhereWhen>
+  <Why>
+    <Inference probability="1.0"><Concept>process.variation.burst;em.gamma</Concept></Inference>
+  </Why>
+</voe:VOEvent>
+"""
+
+
+class TestParseVoevent:
+    """Testes do parser de passada única."""
+
+    def test_fields(self):
+        """Extrai atributos da raiz, Who, WhereWhen, Why e os Params."""
+        result = parse_voevent(VOEVENT_XML.encode())
+
+        assert result["parse_error"] is None
+        assert result["ivorn"] == "ivo://nasa.gsfc.gcn/SWIFT#BAT_GRB_Pos_1234567-123"
+        assert result["role"] == "observation"
+        assert result["version"] == "2.0"
+        assert result["author_ivorn"] == "ivo://nasa.gsfc.tan/gcn"
+        assert result["author_date"] == datetime(2024, 3, 1, 12, 34, 56, tzinfo=timezone.utc)
+        assert result["event_time"] == datetime(2024, 3, 1, 12, 30, 0, 250000, tzinfo=timezone.utc)
+        assert result["ra_deg"] == 123.4567
+        assert result["dec_deg"] == -45.6789
+        assert result["error_deg"] == 0.05
+        assert result["concept"] == "process.variation.burst;em.gamma"
+        assert result["params"] == {
+            "Packet_Type": "61",
+            "TrigID": "1234567",
+            "Point_Source": "true",
+        }
+
+    def test_str_input(self):
+        """Aceita o documento já decodificado (str)."""
+        assert parse_voevent(VOEVENT_XML) == parse_voevent(VOEVENT_XML.encode())
+
+    def test_missing_fields(self):
+        """Campos ausentes ficam None sem erro."""
+        result = parse_voevent(b'<VOEvent ivorn="ivo://x" role="test"/>')
+
+        assert result["parse_error"] is None
+        assert result["ivorn"] == "ivo://x"
+        assert result["role"] == "test"
+        assert result["ra_deg"] is None
+        assert result["params"] == {}
+
+    def test_invalid_value(self):
+        """Valor inválido anula só o campo e é reportado em parse_error."""
+        xml = VOEVENT_XML.replace("<C1>123.4567</C1>", "<C1>n/a</C1>")
+        result = parse_voevent(xml)
+
+        assert result["ra_deg"] is None
+        assert result["dec_deg"] == -45.6789
+        assert "ra_deg" in result["parse_error"]
+
+    @pytest.mark.parametrize(
+        "xml, error",
+        [
+            (None, "Empty document"),
+            (b"", "Empty document"),
+            (b"<VOEvent ivorn='x'", "unclosed token"),
+            (b"<html/>", "expected 'VOEvent'"),
+        ],
+    )
+    def test_invalid_document(self, xml, error):
+        """Documentos vazios, truncados ou de outro tipo retornam parse_error."""
+        result = parse_voevent(xml)
+
+        assert set(result) == set(VOEVENT_FIELDS)
+        assert error in result["parse_error"]
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("2024-03-01T12:34:56", datetime(2024, 3, 1, 12, 34, 56)),
+            ("2024-03-01T12:34:56Z", datetime(2024, 3, 1, 12, 34, 56)),
+            ("2024-03-01T12:34:56.1", datetime(2024, 3, 1, 12, 34, 56, 100000)),
+            ("2024-03-01T12:34:56.1234567", datetime(2024, 3, 1, 12, 34, 56, 123456)),
+            ("2024-03-01T14:34:56+02:00", datetime(2024, 3, 1, 12, 34, 56)),
+        ],
+    )
+    def test_parse_iso_timestamp(self, text, expected):
+        """ISO 8601 sem sufixo é UTC; Z, offsets e frações variadas são aceitos."""
+        assert parse_iso_timestamp(text) == expected.replace(tzinfo=timezone.utc)
+
+
+class TestVoeventDetails:
+    """Testes da coluna struct no Spark."""
+
+    def test_matches_parser(self, spark):
+        """O pandas_udf reproduz parse_voevent linha a linha."""
+        docs = [VOEVENT_XML, '<VOEvent ivorn="ivo://x"/>', "junk", None]
+        df = spark.createDataFrame([(doc,) for doc in docs], "xml string")
+        rows = df.select(voevent_details("xml").alias("v")).select("v.*").collect()
+
+        for doc, row in zip(docs, rows):
+            actual = row.asDict()
+            expected = parse_voevent(doc)
+            for name in ("author_date", "event_time"):
+                if actual[name] is not None:
+                    actual[name] = actual[name].astimezone(timezone.utc)
+            assert actual == expected